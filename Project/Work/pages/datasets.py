@@ -2,6 +2,7 @@
 
 import streamlit as st
 import pandas as pd
+import mimetypes
 from services import dataset_service
 from services.api_client import APIError
 from components import loading_spinner, error_message, empty_state
@@ -72,17 +73,31 @@ def render():
     # Datasets table
     st.subheader("All Datasets")
     
+    # Pagination: the cursor of every page visited so far, so Previous can go back
+    items_per_page = 10
+    if "datasets_cursors" not in st.session_state:
+        st.session_state.datasets_cursors = [None]
+    cursors = st.session_state.datasets_cursors
+    page = len(cursors)
+    
     try:
         with loading_spinner.render_loading_container("Loading datasets..."):
-            datasets = dataset_service.get_datasets()
+            result = dataset_service.get_datasets_page(cursor=cursors[-1], limit=items_per_page)
     except APIError as e:
+        if e.status_code == 400 and page > 1:
+            # The page's cursor went stale; start over from the first page
+            st.session_state.datasets_cursors = [None]
+            st.rerun()
         error_message.render_api_error(e, show_retry=True, retry_callback=render)
         return
     except Exception as e:
         error_message.render_error_message(e)
         return
     
-    if not datasets:
+    page_datasets = result.get("items", [])
+    next_cursor = result.get("next_cursor")
+    
+    if not page_datasets and page == 1:
         empty_state.render_empty_state(
             "No datasets uploaded yet.",
             action_label="Upload Dataset",
@@ -90,35 +105,21 @@ def render():
         )
         return
     
-    # Pagination
-    items_per_page = 10
-    total_pages = (len(datasets) + items_per_page - 1) // items_per_page
-    
-    if "datasets_page" not in st.session_state:
-        st.session_state.datasets_page = 1
-    
-    page = st.session_state.datasets_page
-    
     # Page controls
     col1, col2, col3 = st.columns([1, 2, 1])
     with col1:
         if st.button("◀ Previous", disabled=(page <= 1)):
-            st.session_state.datasets_page = page - 1
+            cursors.pop()
             st.rerun()
     
     with col2:
-        st.caption(f"Page {page} of {total_pages} ({len(datasets)} total datasets)")
+        st.caption(f"Page {page}")
     
     with col3:
-        if st.button("Next ▶", disabled=(page >= total_pages)):
-            st.session_state.datasets_page = page + 1
+        if st.button("Next ▶", disabled=not next_cursor):
+            cursors.append(next_cursor)
             st.rerun()
     
-    # Display current page
-    start_idx = (page - 1) * items_per_page
-    end_idx = start_idx + items_per_page
-    page_datasets = datasets[start_idx:end_idx]
-    
     # Prepare table data
     table_data = []
     for ds in page_datasets:
@@ -133,6 +134,40 @@ def render():
     df = pd.DataFrame(table_data)
     st.dataframe(df, use_container_width=True, hide_index=True)
     
+    # Row preview
+    st.markdown("---")
+    st.subheader("Preview Dataset")
+    preview_id = st.text_input("Enter Dataset ID to preview", key="preview_dataset_id")
+    col1, col2 = st.columns(2)
+    with col1:
+        preview_offset = st.number_input("Start at row", min_value=0, value=0, step=50, key="preview_offset")
+    with col2:
+        preview_limit = st.number_input("Rows", min_value=1, max_value=1000, value=50, step=10, key="preview_limit")
+    
+    if st.button("Preview", key="preview_button"):
+        if not preview_id:
+            st.warning("Please enter a dataset ID.")
+        else:
+            try:
+                with loading_spinner.render_loading_container("Loading rows..."):
+                    page_rows = dataset_service.get_dataset_rows(
+                        preview_id, offset=int(preview_offset), limit=int(preview_limit)
+                    )
+                
+                rows = page_rows.get("rows", [])
+                if rows:
+                    st.caption(
+                        f"Rows {int(preview_offset) + 1}-{int(preview_offset) + len(rows)} "
+                        f"of {format_number(page_rows.get('total_rows'))}"
+                    )
+                    st.dataframe(pd.DataFrame(rows), use_container_width=True, hide_index=True)
+                else:
+                    st.info("No rows at this position.")
+            except APIError as e:
+                error_message.render_api_error(e)
+            except Exception as e:
+                error_message.render_error_message(e)
+    
     # Download functionality
     st.markdown("---")
     st.subheader("Download Dataset")
@@ -144,14 +179,15 @@ def render():
         else:
             try:
                 with loading_spinner.render_loading_container("Downloading dataset..."):
-                    file_content = dataset_service.download_dataset(download_id)
+                    file_path, file_name = dataset_service.download_dataset(download_id)
                 
-                st.download_button(
-                    label="📥 Download File",
-                    data=file_content,
-                    file_name=f"dataset_{download_id}.csv",
-                    mime="text/csv"
-                )
+                with open(file_path, "rb") as f:
+                    st.download_button(
+                        label="📥 Download File",
+                        data=f,
+                        file_name=file_name,
+                        mime=mimetypes.guess_type(file_name)[0] or "application/octet-stream"
+                    )
             except APIError as e:
                 error_message.render_api_error(e)
             except Exception as e:
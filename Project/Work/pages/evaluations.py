@@ -20,7 +20,6 @@ def render():
             experiments = experiment_service.get_experiments()
             models = model_service.get_models()
             datasets = dataset_service.get_datasets()
-            evaluations = evaluation_service.get_evaluations()
     except APIError as e:
         error_message.render_api_error(e, show_retry=True, retry_callback=render)
         return
@@ -45,22 +44,73 @@ def render():
         dataset_options = ["All"] + [f"{d.get('name', 'N/A')} ({d.get('id', 'N/A')[:8]})" for d in datasets]
         selected_dataset = st.selectbox("Evaluation Dataset", dataset_options, key="eval_dataset")
     
-    # Filter evaluations
-    filtered_evaluations = evaluations
-    
+    exp_id = None
     if selected_experiment != "All":
         exp_id = experiments[experiment_options.index(selected_experiment) - 1].get("id")
-        filtered_evaluations = [e for e in filtered_evaluations if e.get("experiment_id") == exp_id]
     
-    if not filtered_evaluations:
+    # Pagination: the cursor of every page visited so far, so Previous can go back;
+    # changing the experiment starts over from the first page
+    items_per_page = 10
+    if st.session_state.get("evaluations_cursors_experiment") != selected_experiment:
+        st.session_state.evaluations_cursors = [None]
+        st.session_state.evaluations_cursors_experiment = selected_experiment
+    cursors = st.session_state.evaluations_cursors
+    page = len(cursors)
+    
+    # Load evaluations, filtered by the API
+    try:
+        with loading_spinner.render_loading_container("Loading evaluations..."):
+            result = evaluation_service.get_evaluations_page(
+                experiment_id=exp_id,
+                cursor=cursors[-1],
+                limit=items_per_page
+            )
+    except APIError as e:
+        if e.status_code == 400 and page > 1:
+            # The page's cursor went stale; start over from the first page
+            st.session_state.evaluations_cursors = [None]
+            st.rerun()
+        error_message.render_api_error(e, show_retry=True, retry_callback=render)
+        return
+    except Exception as e:
+        error_message.render_error_message(e)
+        return
+    
+    filtered_evaluations = result.get("items", [])
+    next_cursor = result.get("next_cursor")
+    
+    if not filtered_evaluations and page == 1:
         empty_state.render_empty_state(
             "No evaluations found matching the selected criteria.",
             icon="📊"
         )
         return
     
-    # Evaluation selector
-    eval_options = [f"Evaluation {i+1} ({e.get('id', 'N/A')[:8]})" for i, e in enumerate(filtered_evaluations)]
+    # Page controls
+    col1, col2, col3 = st.columns([1, 2, 1])
+    with col1:
+        if st.button("◀ Previous", disabled=(page <= 1)):
+            cursors.pop()
+            st.rerun()
+    
+    with col2:
+        st.caption(f"Page {page}")
+    
+    with col3:
+        if st.button("Next ▶", disabled=not next_cursor):
+            cursors.append(next_cursor)
+            st.rerun()
+    
+    if not filtered_evaluations:
+        st.info("No evaluations on this page.")
+        return
+    
+    # Evaluation selector, numbered across pages
+    first_number = (page - 1) * items_per_page + 1
+    eval_options = [
+        f"Evaluation {first_number + i} ({e.get('id', 'N/A')[:8]})"
+        for i, e in enumerate(filtered_evaluations)
+    ]
     selected_eval_idx = st.selectbox("Select Evaluation", range(len(eval_options)), format_func=lambda x: eval_options[x], key="selected_eval")
     
     selected_evaluation = filtered_evaluations[selected_eval_idx]
@@ -206,7 +256,7 @@ def render():
     st.subheader("Compare Evaluations")
     
     if len(filtered_evaluations) > 1:
-        compare_options = [f"Evaluation {i+1} ({e.get('id', 'N/A')[:8]})" for i, e in enumerate(filtered_evaluations)]
+        compare_options = eval_options
         selected_compare = st.multiselect("Select evaluations to compare", compare_options, key="compare_evals")
         
         if selected_compare:
@@ -17,18 +17,33 @@ def render():
     # Auto-refresh toggle
     auto_refresh = st.checkbox("🔄 Auto-refresh (every 5 seconds)", value=False, key="auto_refresh")
     
+    # Pagination: the cursor of every page visited so far, so Previous can go back.
+    # Auto-refresh reloads only the page being viewed.
+    items_per_page = 10
+    if "experiments_cursors" not in st.session_state:
+        st.session_state.experiments_cursors = [None]
+    cursors = st.session_state.experiments_cursors
+    page = len(cursors)
+    
     # Load experiments
     try:
         with loading_spinner.render_loading_container("Loading experiments..."):
-            experiments = experiment_service.get_experiments()
+            result = experiment_service.get_experiments_page(cursor=cursors[-1], limit=items_per_page)
     except APIError as e:
+        if e.status_code == 400 and page > 1:
+            # The page's cursor went stale; start over from the first page
+            st.session_state.experiments_cursors = [None]
+            st.rerun()
         error_message.render_api_error(e, show_retry=True, retry_callback=render)
         return
     except Exception as e:
         error_message.render_error_message(e)
         return
     
-    if not experiments:
+    experiments = result.get("items", [])
+    next_cursor = result.get("next_cursor")
+    
+    if not experiments and page == 1:
         empty_state.render_empty_state(
             "No experiments yet.",
             action_label="Create New Experiment",
@@ -51,7 +66,22 @@ def render():
         st.caption(f"⏱️ Last refreshed: {time.strftime('%H:%M:%S')}")
     
     # Experiments table
-    st.subheader(f"All Experiments ({len(experiments)} total)")
+    st.subheader("All Experiments")
+    
+    # Page controls
+    col1, col2, col3 = st.columns([1, 2, 1])
+    with col1:
+        if st.button("◀ Previous", disabled=(page <= 1)):
+            cursors.pop()
+            st.rerun()
+    
+    with col2:
+        st.caption(f"Page {page}")
+    
+    with col3:
+        if st.button("Next ▶", disabled=not next_cursor):
+            cursors.append(next_cursor)
+            st.rerun()
     
     # Prepare table data
     table_data = []
@@ -143,6 +173,45 @@ def render():
                 
                 st.markdown(timeline)
                 
+                # Per-step training metrics, downsampled by the API
+                metrics = experiment_service.get_experiment_metrics(experiment_id)
+                if metrics:
+                    st.markdown("---")
+                    st.markdown("**Training Metrics:**")
+                    metric = st.selectbox(
+                        "Metric",
+                        [m["metric"] for m in metrics],
+                        key="experiment_metric_select"
+                    )
+                    series = experiment_service.get_experiment_metric_series(experiment_id, metric)
+                    if series.get("points"):
+                        chart = pd.DataFrame(series["points"]).set_index("step")
+                        st.line_chart(chart.rename(columns={"value": metric}))
+                
+                # Queue position and cancellation, until the experiment finishes
+                if status in ("created", "running"):
+                    st.markdown("---")
+                    try:
+                        schedule = experiment_service.get_experiment_schedule(experiment_id)
+                        if schedule.get("queue_position"):
+                            st.markdown(f"**Queue Position:** {schedule['queue_position']}")
+                        if schedule.get("estimated_finish_at"):
+                            st.markdown(f"**Estimated Finish:** {format_date(schedule['estimated_finish_at'])} UTC")
+                    except APIError:
+                        pass  # Experiments from before the job queue have no schedule
+                    
+                    col1, col2 = st.columns(2)
+                    with col1:
+                        watch = st.button("📡 Watch Live Progress", key="watch_progress_btn")
+                    with col2:
+                        if st.button("Cancel Experiment", key="cancel_experiment_btn"):
+                            experiment_service.cancel_experiment(experiment_id)
+                            st.rerun()
+                    
+                    if watch:
+                        _render_live_progress(experiment_id)
+                        st.rerun()
+                
                 # Links
                 st.markdown("---")
                 col1, col2 = st.columns(2)
@@ -162,7 +231,7 @@ def render():
                             st.session_state.current_page = "evaluations"
                             st.session_state.filter_experiment_id = exp_details.get("id")
                             st.rerun()
-                
+            
             except APIError as e:
                 error_message.render_api_error(e)
             except Exception as e:
@@ -173,3 +242,34 @@ def render():
     # Manual refresh button
     if st.button("🔄 Refresh Now", use_container_width=True):
         st.rerun()
+
+
+def _render_live_progress(experiment_id: str):
+    """
+    Show an experiment's progress as the API streams it, until it finishes.
+    
+    Args:
+        experiment_id: ID of the experiment
+    """
+    status_placeholder = st.empty()
+    bar = st.progress(0.0)
+    metrics_placeholder = st.empty()
+    
+    for event in experiment_service.stream_experiment_progress(experiment_id):
+        progress = event.get("progress") or {}
+        epoch = progress.get("epoch") or 0
+        total_epochs = progress.get("total_epochs") or 0
+        status_placeholder.markdown(
+            f"**Status:** {event.get('status', 'N/A')} · Epoch {epoch}/{total_epochs or '?'}"
+        )
+        if total_epochs:
+            bar.progress(min(epoch / total_epochs, 1.0))
+        
+        with metrics_placeholder.container():
+            col1, col2, col3 = st.columns(3)
+            if progress.get("train_loss") is not None:
+                col1.metric("Train Loss", f"{progress['train_loss']:.4f}")
+            if progress.get("samples_per_second") is not None:
+                col2.metric("Samples/sec", f"{progress['samples_per_second']:.1f}")
+            if progress.get("eta_seconds") is not None:
+                col3.metric("ETA", f"{progress['eta_seconds']:.0f}s")
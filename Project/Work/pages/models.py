@@ -20,22 +20,39 @@ def render():
         key="model_filter"
     )
     
+    type_filter = {"Base": "base", "Fine-tuned": "fine_tuned"}.get(filter_type)
+    
+    # Pagination: the cursor of every page visited so far, so Previous can go back;
+    # changing the filter starts over from the first page
+    items_per_page = 10
+    if st.session_state.get("models_cursors_filter") != filter_type:
+        st.session_state.models_cursors = [None]
+        st.session_state.models_cursors_filter = filter_type
+    cursors = st.session_state.models_cursors
+    page = len(cursors)
+    
     try:
         with loading_spinner.render_loading_container("Loading models..."):
-            if filter_type == "All":
-                models = model_service.get_models()
-            elif filter_type == "Base":
-                models = model_service.get_models(model_type="base")
-            else:  # Fine-tuned
-                models = model_service.get_models(model_type="fine_tuned")
+            result = model_service.get_models_page(
+                model_type=type_filter,
+                cursor=cursors[-1],
+                limit=items_per_page
+            )
     except APIError as e:
+        if e.status_code == 400 and page > 1:
+            # The page's cursor went stale; start over from the first page
+            st.session_state.models_cursors = [None]
+            st.rerun()
         error_message.render_api_error(e, show_retry=True, retry_callback=render)
         return
     except Exception as e:
         error_message.render_error_message(e)
         return
     
-    if not models:
+    models = result.get("items", [])
+    next_cursor = result.get("next_cursor")
+    
+    if not models and page == 1:
         empty_state.render_empty_state(
             "No models available.",
             icon="🤖"
@@ -43,7 +60,22 @@ def render():
         return
     
     # Models table
-    st.subheader(f"Models ({len(models)} total)")
+    st.subheader("Models")
+    
+    # Page controls
+    col1, col2, col3 = st.columns([1, 2, 1])
+    with col1:
+        if st.button("◀ Previous", disabled=(page <= 1)):
+            cursors.pop()
+            st.rerun()
+    
+    with col2:
+        st.caption(f"Page {page}")
+    
+    with col3:
+        if st.button("Next ▶", disabled=not next_cursor):
+            cursors.append(next_cursor)
+            st.rerun()
     
     # Prepare table data
     table_data = []
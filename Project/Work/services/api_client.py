@@ -1,11 +1,72 @@
 """Base API client with error handling for the SLM Training Platform UI."""
 
+import os
+import re
+import gzip
+import json
+import shutil
 import requests
-from typing import Optional, Dict, Any
+from pathlib import Path
+from typing import Optional, Dict, Any, Iterator, List, Tuple
+from urllib.parse import unquote
 from requests.exceptions import RequestException, Timeout, ConnectionError as RequestsConnectionError
 
 from utils.config import get_api_base_url
 
+try:
+    import zstandard
+except ImportError:  # zstd transfer compression is optional
+    zstandard = None
+
+# Bytes written per iteration when streaming downloads to disk
+DOWNLOAD_CHUNK_SIZE = 1024 * 1024
+
+# Items requested per page when collecting a whole list
+LIST_PAGE_SIZE = 200
+
+# Encodings the API may compress downloads with, best first
+ACCEPT_ENCODING = "zstd, gzip" if zstandard else "gzip"
+
+
+def _decompress_file(source: Path, dest: Path, encoding: str) -> None:
+    """
+    Decompress a downloaded file.
+    
+    Args:
+        source: Compressed file
+        dest: Where to write the decompressed content
+        encoding: Content-Encoding of the download
+    """
+    temp_path = dest.with_name(dest.name + ".tmp")
+    with open(source, "rb") as src, open(temp_path, "wb") as out:
+        if encoding == "zstd":
+            reader = zstandard.ZstdDecompressor().stream_reader(src, read_across_frames=True)
+        else:
+            reader = gzip.GzipFile(fileobj=src, mode="rb")
+        shutil.copyfileobj(reader, out, DOWNLOAD_CHUNK_SIZE)
+    os.replace(temp_path, dest)
+
+
+def _content_disposition_filename(header: Optional[str]) -> Optional[str]:
+    """
+    Get the file name of a Content-Disposition header.
+    
+    Args:
+        header: Header value
+    
+    Returns:
+        The RFC 5987 ``filename*`` if present, else ``filename``, or None
+    """
+    if not header:
+        return None
+    encoded = re.search(r"filename\*\s*=\s*([\w-]+)'[^']*'([^;\s]+)", header, re.IGNORECASE)
+    if encoded:
+        return unquote(encoded.group(2), encoding=encoded.group(1), errors="replace")
+    plain = re.search(r'filename\s*=\s*(?:"((?:[^"\\]|\\.)*)"|([^;\s]+))', header, re.IGNORECASE)
+    if plain:
+        return re.sub(r"\\(.)", r"\1", plain.group(1)) if plain.group(1) is not None else plain.group(2)
+    return None
+
 
 class APIError(Exception):
     """Custom exception for API errors."""
@@ -36,7 +97,7 @@ class APIClient:
         
         Args:
             endpoint: API endpoint (e.g., "/datasets")
-            
+        
         Returns:
             Full URL
         """
@@ -52,10 +113,10 @@ class APIClient:
         
         Args:
             response: HTTP response object
-            
+        
         Returns:
             JSON data from response
-            
+        
         Raises:
             APIError: If response indicates an error
         """
@@ -92,10 +153,10 @@ class APIClient:
         Args:
             endpoint: API endpoint
             params: Query parameters
-            
+        
         Returns:
             JSON response data
-            
+        
         Raises:
             APIError: If request fails
         """
@@ -114,6 +175,67 @@ class APIClient:
         except RequestException as e:
             raise APIError(f"Network error: {str(e)}")
     
+    def stream_events(self, endpoint: str) -> Iterator[Dict[str, Any]]:
+        """
+        Follow a Server-Sent Events stream until the server ends it.
+        
+        Args:
+            endpoint: API endpoint
+        
+        Yields:
+            Data of each event, parsed as JSON
+        
+        Raises:
+            APIError: If request fails
+        """
+        url = self._build_url(endpoint)
+        
+        try:
+            # The server sends keep-alives on idle streams, well within the read timeout
+            with requests.get(
+                url, headers={"Accept": "text/event-stream"}, timeout=self.timeout, stream=True
+            ) as response:
+                if not response.ok:
+                    self._handle_response(response)
+                for line in response.iter_lines(decode_unicode=True):
+                    if line and line.startswith("data:"):
+                        yield json.loads(line[len("data:"):])
+        except Timeout:
+            raise APIError("Request timed out. Please try again.")
+        except RequestsConnectionError:
+            raise APIError(
+                f"Could not connect to API at {self.base_url}. "
+                "Please check if the backend server is running."
+            )
+        except RequestException as e:
+            raise APIError(f"Network error: {str(e)}")
+    
+    def get_all(self, endpoint: str, params: Optional[Dict] = None) -> List[Dict[str, Any]]:
+        """
+        Get every item of a paginated list endpoint, following its cursors.
+        
+        Args:
+            endpoint: API endpoint
+            params: Query parameters (filters and sort)
+        
+        Returns:
+            All items, in the endpoint's order
+        
+        Raises:
+            APIError: If a request fails
+        """
+        params = {"limit": LIST_PAGE_SIZE, **(params or {})}
+        items = []
+        while True:
+            response = self.get(endpoint, params=params)
+            if isinstance(response, list):
+                return response
+            items.extend(response.get("items", []))
+            cursor = response.get("next_cursor")
+            if not cursor:
+                return items
+            params["cursor"] = cursor
+    
     def post(self, endpoint: str, data: Optional[Dict] = None, json_data: Optional[Dict] = None, 
              files: Optional[Dict] = None) -> Dict[str, Any]:
         """
@@ -124,10 +246,10 @@ class APIClient:
             data: Form data
             json_data: JSON data
             files: Files to upload (multipart/form-data)
-            
+        
         Returns:
             JSON response data
-            
+        
         Raises:
             APIError: If request fails
         """
@@ -168,26 +290,124 @@ class APIClient:
         except RequestException as e:
             raise APIError(f"Network error: {str(e)}")
     
-    def download_file(self, endpoint: str, params: Optional[Dict] = None) -> bytes:
+    def put(self, endpoint: str, data: bytes, headers: Optional[Dict[str, str]] = None) -> Dict[str, Any]:
+        """
+        Make a PUT request with a raw body.
+        
+        Args:
+            endpoint: API endpoint
+            data: Raw request body
+            headers: Extra request headers
+        
+        Returns:
+            JSON response data
+        
+        Raises:
+            APIError: If request fails
+        """
+        url = self._build_url(endpoint)
+        
+        try:
+            response = requests.put(
+                url,
+                data=data,
+                headers={"Content-Type": "application/octet-stream", **(headers or {})},
+                timeout=self.timeout
+            )
+            return self._handle_response(response)
+        except Timeout:
+            raise APIError("Request timed out. Please try again.")
+        except RequestsConnectionError:
+            raise APIError(
+                f"Could not connect to API at {self.base_url}. "
+                "Please check if the backend server is running."
+            )
+        except RequestException as e:
+            raise APIError(f"Network error: {str(e)}")
+    
+    def download_to_file(
+        self, endpoint: str, dest_path: str, params: Optional[Dict] = None
+    ) -> Tuple[str, Optional[str]]:
         """
-        Download a file from the API.
+        Stream a file download to disk chunk by chunk.
+        
+        An existing copy is revalidated with its ETag and reused if unchanged.
+        An interrupted download is kept as ``{dest_path}.part`` and resumed
+        with a Range request, as long as the file has not changed since.
+        Compressed responses are transferred as is and decompressed once
+        complete, so resuming works on the compressed bytes. The file name
+        the API gives in ``Content-Disposition`` is kept next to the copy.
         
         Args:
             endpoint: API endpoint
+            dest_path: Where to write the file
             params: Query parameters
-            
+        
         Returns:
-            File content as bytes
-            
+            Path to the downloaded file, and its file name from the API, if any
+        
         Raises:
             APIError: If request fails
         """
         url = self._build_url(endpoint)
+        dest = Path(dest_path)
+        partial = dest.with_name(dest.name + ".part")
+        etag_path = dest.with_name(dest.name + ".etag")
+        encoding_path = dest.with_name(dest.name + ".encoding")
+        name_path = dest.with_name(dest.name + ".name")
+        etag = etag_path.read_text() if etag_path.exists() else None
+        
+        headers = {"Accept-Encoding": ACCEPT_ENCODING}
+        if etag and dest.exists():
+            headers["If-None-Match"] = etag
+        elif etag and partial.exists():
+            headers["Range"] = f"bytes={partial.stat().st_size}-"
+            headers["If-Range"] = etag
         
         try:
-            response = requests.get(url, params=params, timeout=self.timeout, stream=True)
-            response.raise_for_status()
-            return response.content
+            with requests.get(url, params=params, headers=headers, timeout=self.timeout, stream=True) as response:
+                if response.status_code == 304:
+                    return str(dest), name_path.read_text(encoding="utf-8") if name_path.exists() else None
+                if response.status_code == 416:
+                    # The partial copy is stale or already complete; start over
+                    partial.unlink()
+                    return self.download_to_file(endpoint, dest_path, params)
+                if not response.ok:
+                    self._handle_response(response)
+                
+                dest.parent.mkdir(parents=True, exist_ok=True)
+                if response.status_code == 206:
+                    mode = "ab"
+                else:
+                    mode = "wb"
+                    new_etag = response.headers.get("ETag")
+                    if new_etag:
+                        etag_path.write_text(new_etag)
+                    elif etag_path.exists():
+                        etag_path.unlink()
+                    encoding = response.headers.get("Content-Encoding")
+                    if encoding:
+                        encoding_path.write_text(encoding)
+                    elif encoding_path.exists():
+                        encoding_path.unlink()
+                    filename = _content_disposition_filename(response.headers.get("Content-Disposition"))
+                    if filename:
+                        name_path.write_text(filename, encoding="utf-8")
+                    elif name_path.exists():
+                        name_path.unlink()
+                
+                with open(partial, mode) as f:
+                    # Keep the bytes as sent, so a resumed range lines up with them
+                    for chunk in response.raw.stream(DOWNLOAD_CHUNK_SIZE, decode_content=False):
+                        f.write(chunk)
+            
+            encoding = encoding_path.read_text() if encoding_path.exists() else None
+            if encoding:
+                _decompress_file(partial, dest, encoding)
+                partial.unlink()
+            else:
+                os.replace(partial, dest)
+            return str(dest), name_path.read_text(encoding="utf-8") if name_path.exists() else None
         except Timeout:
             raise APIError("Request timed out. Please try again.")
         except RequestsConnectionError:
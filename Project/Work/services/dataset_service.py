@@ -1,8 +1,27 @@
 """Dataset service for API calls related to datasets."""
 
-from typing import List, Dict, Any, Optional
+import gzip
+import hashlib
+import os
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Dict, Any, Optional, Tuple
 from services.api_client import api_client, APIError
 
+# Files larger than this are sent with the chunked upload protocol
+CHUNKED_UPLOAD_THRESHOLD = 8 * 1024 * 1024
+UPLOAD_PARALLELISM = 4
+PART_RETRIES = 3
+
+# Uploads are gzipped in transit; the API decompresses them as they arrive
+UPLOAD_COMPRESSION_LEVEL = 6
+
+# Unfinished chunked uploads by content hash, so a retried upload resumes
+_pending_uploads: Dict[str, str] = {}
+
+# Local cache of downloaded dataset files, revalidated with ETags
+DOWNLOAD_CACHE_DIR = os.path.join(tempfile.gettempdir(), "slm_dataset_cache")
+
 
 def upload_dataset(
     file,
@@ -13,6 +32,10 @@ def upload_dataset(
     """
     Upload a dataset file.
     
+    Large files are split into parts that are uploaded in parallel; if the
+    upload is interrupted, uploading the same file again resumes it. The
+    content is gzipped for transfer.
+    
     Args:
         file: Uploaded file object
         name: Dataset name
@@ -25,16 +48,112 @@ def upload_dataset(
     Raises:
         APIError: If upload fails
     """
-    files = {"file": (file.name, file.getvalue(), file.type)}
+    content = file.getvalue()
+    content_sha256 = hashlib.sha256(content).hexdigest()
+    
+    if len(content) > CHUNKED_UPLOAD_THRESHOLD:
+        return _upload_dataset_chunked(content, file.name, name, description, dataset_type, content_sha256)
+    
+    # A ".gz" suffix tells the API to decompress the file as it stores it
+    files = {"file": (file.name + ".gz", gzip.compress(content, UPLOAD_COMPRESSION_LEVEL), "application/gzip")}
     data = {
         "name": name,
         "description": description,
-        "dataset_type": dataset_type
+        "dataset_type": dataset_type,
+        # Lets the backend skip parsing when identical content is already stored
+        "content_sha256": content_sha256
     }
     
     return api_client.post("/datasets/upload", data=data, files=files)
 
 
+def _upload_dataset_chunked(
+    content: bytes,
+    filename: str,
+    name: str,
+    description: str,
+    dataset_type: str,
+    content_sha256: str
+) -> Dict[str, Any]:
+    """
+    Upload a dataset with the chunked upload protocol.
+    
+    Args:
+        content: File content
+        filename: Original filename
+        name: Dataset name
+        description: Dataset description
+        dataset_type: 'training' or 'evaluation'
+        content_sha256: SHA-256 of the content
+        
+    Returns:
+        Dataset data from API response
+        
+    Raises:
+        APIError: If upload fails
+    """
+    session = None
+    upload_id = _pending_uploads.get(content_sha256)
+    if upload_id:
+        try:
+            session = api_client.get(f"/datasets/uploads/{upload_id}")
+        except APIError:
+            session = None
+        if session and session.get("status") != "pending":
+            session = None
+    
+    if session is None:
+        session = api_client.post("/datasets/uploads", json_data={
+            "name": name,
+            "description": description,
+            "dataset_type": dataset_type,
+            "filename": filename,
+            "total_size": len(content),
+            "content_sha256": content_sha256
+        })
+        _pending_uploads[content_sha256] = session["upload_id"]
+    
+    upload_id = session["upload_id"]
+    part_size = session["part_size"]
+    received = {part["part_number"] for part in session.get("received_parts", [])}
+    missing = [n for n in range(1, session["total_parts"] + 1) if n not in received]
+    
+    def send_part(part_number: int) -> None:
+        data = content[(part_number - 1) * part_size:part_number * part_size]
+        _upload_part(upload_id, part_number, data)
+    
+    with ThreadPoolExecutor(max_workers=UPLOAD_PARALLELISM) as executor:
+        list(executor.map(send_part, missing))
+    
+    result = api_client.post(f"/datasets/uploads/{upload_id}/complete")
+    _pending_uploads.pop(content_sha256, None)
+    return result
+
+
+def _upload_part(upload_id: str, part_number: int, data: bytes) -> None:
+    """
+    Upload one part, retrying transient failures.
+    
+    Args:
+        upload_id: Upload session ID
+        part_number: 1-based part number
+        data: Part content
+        
+    Raises:
+        APIError: If the part cannot be uploaded
+    """
+    headers = {"X-Part-SHA256": hashlib.sha256(data).hexdigest(), "Content-Encoding": "gzip"}
+    body = gzip.compress(data, UPLOAD_COMPRESSION_LEVEL)
+    for attempt in range(PART_RETRIES):
+        try:
+            api_client.put(f"/datasets/uploads/{upload_id}/parts/{part_number}", data=body, headers=headers)
+            return
+        except APIError as e:
+            client_error = e.status_code is not None and 400 <= e.status_code < 500
+            if client_error or attempt == PART_RETRIES - 1:
+                raise
+
+
 def get_datasets() -> List[Dict[str, Any]]:
     """
     Get all datasets.
@@ -45,30 +164,73 @@ def get_datasets() -> List[Dict[str, Any]]:
     Raises:
         APIError: If request fails
     """
-    response = api_client.get("/datasets")
+    return api_client.get_all("/datasets")
+
+
+def get_datasets_page(cursor: Optional[str] = None, limit: int = 10) -> Dict[str, Any]:
+    """
+    Get one page of datasets, newest first.
     
-    # Handle both list and dict responses
-    if isinstance(response, list):
-        return response
-    elif isinstance(response, dict) and "datasets" in response:
-        return response["datasets"]
-    elif isinstance(response, dict) and "items" in response:
-        return response["items"]
-    else:
-        return []
+    Args:
+        cursor: Cursor from the previous page, or None for the first page
+        limit: Page size
+        
+    Returns:
+        Page with ``items`` and ``next_cursor``
+        
+    Raises:
+        APIError: If request fails
+    """
+    params = {"limit": limit}
+    if cursor:
+        params["cursor"] = cursor
+    return api_client.get("/datasets", params=params)
 
 
-def download_dataset(dataset_id: str) -> bytes:
+def download_dataset(dataset_id: str) -> Tuple[str, str]:
     """
-    Download a dataset file.
+    Download a dataset file to the local cache without holding it in memory.
+    
+    Interrupted downloads resume where they stopped, and an unchanged file
+    that is already cached is not downloaded again.
     
     Args:
         dataset_id: ID of the dataset to download
         
     Returns:
-        File content as bytes
+        Path to the downloaded file, and its file name (the dataset's name
+        and format)
         
     Raises:
         APIError: If download fails
     """
-    return api_client.download_file(f"/datasets/{dataset_id}/download")
+    dest_path = os.path.join(DOWNLOAD_CACHE_DIR, dataset_id)
+    file_path, file_name = api_client.download_to_file(f"/datasets/{dataset_id}/download", dest_path)
+    return file_path, file_name or f"dataset_{dataset_id}"
+
+
+def get_dataset_rows(
+    dataset_id: str,
+    offset: int = 0,
+    limit: int = 50,
+    columns: Optional[List[str]] = None
+) -> Dict[str, Any]:
+    """
+    Get a page of a dataset's rows.
+    
+    Args:
+        dataset_id: ID of the dataset
+        offset: Index of the first row
+        limit: Maximum number of rows
+        columns: Columns to return, or None for all
+        
+    Returns:
+        Page with ``rows`` and ``total_rows``
+        
+    Raises:
+        APIError: If request fails
+    """
+    params = {"offset": offset, "limit": limit}
+    if columns:
+        params["columns"] = ",".join(columns)
+    return api_client.get(f"/datasets/{dataset_id}/rows", params=params)
@@ -21,17 +21,35 @@ def get_evaluations(experiment_id: Optional[str] = None) -> List[Dict[str, Any]]
     if experiment_id:
         params["experiment_id"] = experiment_id
     
-    response = api_client.get("/evaluations", params=params)
+    return api_client.get_all("/evaluations", params=params)
+
+
+def get_evaluations_page(
+    experiment_id: Optional[str] = None,
+    cursor: Optional[str] = None,
+    limit: int = 10
+) -> Dict[str, Any]:
+    """
+    Get one page of evaluations, newest first, optionally filtered by
+    experiment.
     
-    # Handle both list and dict responses
-    if isinstance(response, list):
-        return response
-    elif isinstance(response, dict) and "evaluations" in response:
-        return response["evaluations"]
-    elif isinstance(response, dict) and "items" in response:
-        return response["items"]
-    else:
-        return []
+    Args:
+        experiment_id: Optional filter by experiment ID
+        cursor: Cursor from the previous page, or None for the first page
+        limit: Page size
+        
+    Returns:
+        Page with ``items`` and ``next_cursor``
+        
+    Raises:
+        APIError: If request fails
+    """
+    params = {"limit": limit}
+    if experiment_id:
+        params["experiment_id"] = experiment_id
+    if cursor:
+        params["cursor"] = cursor
+    return api_client.get("/evaluations", params=params)
 
 
 def get_evaluation(evaluation_id: str) -> Dict[str, Any]:
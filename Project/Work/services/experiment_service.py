@@ -1,6 +1,6 @@
 """Experiment service for API calls related to experiments."""
 
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Iterator, Optional
 from services.api_client import api_client, APIError
 
 
@@ -28,10 +28,10 @@ def create_experiment(
         learning_rate: Learning rate for training
         epochs: Number of training epochs
         batch_size: Batch size for training
-        
+    
     Returns:
         Experiment data from API response
-        
+    
     Raises:
         APIError: If creation fails
     """
@@ -60,21 +60,31 @@ def get_experiments() -> List[Dict[str, Any]]:
     
     Returns:
         List of experiment dictionaries
-        
+    
     Raises:
         APIError: If request fails
     """
-    response = api_client.get("/experiments")
+    return api_client.get_all("/experiments")
+
+
+def get_experiments_page(cursor: Optional[str] = None, limit: int = 10) -> Dict[str, Any]:
+    """
+    Get one page of experiments, newest first.
+    
+    Args:
+        cursor: Cursor from the previous page, or None for the first page
+        limit: Page size
+    
+    Returns:
+        Page with ``items`` and ``next_cursor``
     
-    # Handle both list and dict responses
-    if isinstance(response, list):
-        return response
-    elif isinstance(response, dict) and "experiments" in response:
-        return response["experiments"]
-    elif isinstance(response, dict) and "items" in response:
-        return response["items"]
-    else:
-        return []
+    Raises:
+        APIError: If request fails
+    """
+    params = {"limit": limit}
+    if cursor:
+        params["cursor"] = cursor
+    return api_client.get("/experiments", params=params)
 
 
 def get_experiment(experiment_id: str) -> Dict[str, Any]:
@@ -83,11 +93,104 @@ def get_experiment(experiment_id: str) -> Dict[str, Any]:
     
     Args:
         experiment_id: ID of the experiment
-        
+    
     Returns:
         Experiment dictionary
-        
+    
     Raises:
         APIError: If request fails
     """
     return api_client.get(f"/experiments/{experiment_id}")
+
+
+def get_experiment_schedule(experiment_id: str) -> Dict[str, Any]:
+    """
+    Get the scheduling state of an experiment's training job.
+    
+    Args:
+        experiment_id: ID of the experiment
+    
+    Returns:
+        Dictionary with the job status, queue position, scheduler capacity
+        and estimated start and finish times
+    
+    Raises:
+        APIError: If request fails
+    """
+    return api_client.get(f"/experiments/{experiment_id}/schedule")
+
+
+def get_experiment_metrics(experiment_id: str) -> List[Dict[str, Any]]:
+    """
+    List the training metrics recorded for an experiment.
+    
+    Args:
+        experiment_id: ID of the experiment
+    
+    Returns:
+        List of metrics with their number of values and step range
+    
+    Raises:
+        APIError: If request fails
+    """
+    return api_client.get(f"/experiments/{experiment_id}/metrics")
+
+
+def get_experiment_metric_series(
+    experiment_id: str,
+    metric: str,
+    points: int = 1000,
+    method: str = "lttb"
+) -> Dict[str, Any]:
+    """
+    Get a training metric's curve, downsampled by the API for charting.
+    
+    Args:
+        experiment_id: ID of the experiment
+        metric: Metric name (e.g. "train_loss")
+        points: Points to return, at most
+        method: "lttb" for points, or "minmax" for min/max buckets
+    
+    Returns:
+        Dictionary with the curve's ``points`` or ``buckets``
+    
+    Raises:
+        APIError: If request fails
+    """
+    return api_client.get(
+        f"/experiments/{experiment_id}/metrics/{metric}",
+        params={"points": points, "method": method}
+    )
+
+
+def cancel_experiment(experiment_id: str) -> Dict[str, Any]:
+    """
+    Cancel an experiment, stopping its training job.
+    
+    Args:
+        experiment_id: ID of the experiment
+    
+    Returns:
+        Cancelled experiment dictionary
+    
+    Raises:
+        APIError: If the experiment has already finished or the request fails
+    """
+    return api_client.post(f"/experiments/{experiment_id}/cancel")
+
+
+def stream_experiment_progress(experiment_id: str) -> Iterator[Dict[str, Any]]:
+    """
+    Follow an experiment's training progress as it happens.
+    
+    Args:
+        experiment_id: ID of the experiment
+    
+    Yields:
+        Progress events with the experiment's status and its latest epoch's
+        progress (loss, throughput and ETA), until the experiment finishes
+    
+    Raises:
+        APIError: If request fails
+    """
+    yield from api_client.stream_events(f"/experiments/{experiment_id}/events")
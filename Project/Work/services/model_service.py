@@ -21,17 +21,34 @@ def get_models(model_type: Optional[str] = None) -> List[Dict[str, Any]]:
     if model_type:
         params["model_type"] = model_type
     
-    response = api_client.get("/models", params=params)
+    return api_client.get_all("/models", params=params)
+
+
+def get_models_page(
+    model_type: Optional[str] = None,
+    cursor: Optional[str] = None,
+    limit: int = 10
+) -> Dict[str, Any]:
+    """
+    Get one page of models, newest first, optionally filtered by type.
     
-    # Handle both list and dict responses
-    if isinstance(response, list):
-        return response
-    elif isinstance(response, dict) and "models" in response:
-        return response["models"]
-    elif isinstance(response, dict) and "items" in response:
-        return response["items"]
-    else:
-        return []
+    Args:
+        model_type: Optional filter by 'base' or 'fine_tuned'
+        cursor: Cursor from the previous page, or None for the first page
+        limit: Page size
+        
+    Returns:
+        Page with ``items`` and ``next_cursor``
+        
+    Raises:
+        APIError: If request fails
+    """
+    params = {"limit": limit}
+    if model_type:
+        params["model_type"] = model_type
+    if cursor:
+        params["cursor"] = cursor
+    return api_client.get("/models", params=params)
 
 
 def get_model(model_id: str) -> Dict[str, Any]:
@@ -1,39 +1,153 @@
 """Database setup and session management."""
 
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import Engine, make_url
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker, Session
-from typing import Generator
+from sqlalchemy.orm import sessionmaker
+from typing import Any, AsyncGenerator, Dict, List
 
 from app.config import settings
+from app.migrations import run_migrations
 
-# Create SQLAlchemy engine
-engine = create_engine(
-    settings.database_url,
-    connect_args={"check_same_thread": False} if "sqlite" in settings.database_url else {}
-)
+# Async drivers for the database URLs the app supports
+ASYNC_DRIVERS = {
+    "sqlite": "sqlite+aiosqlite",
+    "postgresql": "postgresql+asyncpg",
+    "postgresql+psycopg": "postgresql+asyncpg",
+    "postgresql+psycopg2": "postgresql+asyncpg",
+}
+
+
+def async_database_url(url: str) -> str:
+    """
+    Get the URL of the same database with its async driver.
+    
+    Args:
+        url: Database URL, e.g. ``sqlite:///./database.db``
+    
+    Returns:
+        URL for ``create_async_engine``; URLs that already name an async
+        driver are returned unchanged
+    """
+    parsed = make_url(url)
+    drivername = ASYNC_DRIVERS.get(parsed.drivername, parsed.drivername)
+    return parsed.set(drivername=drivername).render_as_string(hide_password=False)
+
+
+def engine_options(url: str) -> Dict[str, Any]:
+    """
+    Get the ``create_engine`` keyword arguments for a database, including
+    the configured pool sizing.
+    
+    Args:
+        url: Database URL
+    
+    Returns:
+        Keyword arguments for ``create_engine`` or ``create_async_engine``
+    """
+    parsed = make_url(url)
+    options: Dict[str, Any] = {"pool_pre_ping": settings.db_pool_pre_ping}
+    if parsed.get_backend_name() == "sqlite":
+        options["connect_args"] = {"check_same_thread": False}
+        if parsed.database in (None, "", ":memory:"):
+            return options  # A single shared connection, not a pool
+    elif parsed.get_driver_name() == "asyncpg":
+        options["connect_args"] = {"prepared_statement_cache_size": settings.db_statement_cache_size}
+    options.update(
+        pool_size=settings.db_pool_size,
+        max_overflow=settings.db_max_overflow,
+        pool_timeout=settings.db_pool_timeout,
+        pool_recycle=settings.db_pool_recycle
+    )
+    return options
+
+
+def sqlite_pragmas(profile: str) -> List[str]:
+    """
+    Get the PRAGMA statements a SQLite profile runs on each connection.
+    
+    Args:
+        profile: "performance" or "default"
+    
+    Returns:
+        PRAGMA statements, without the ``PRAGMA`` keyword
+    
+    Raises:
+        ValueError: If the profile is unknown
+    """
+    if profile == "default":
+        return []
+    if profile != "performance":
+        raise ValueError(f"Unknown SQLite profile: {profile}")
+    return [
+        "journal_mode = WAL",  # Readers no longer wait for the writer, nor it for them
+        f"synchronous = {settings.sqlite_synchronous}",
+        f"mmap_size = {settings.sqlite_mmap_size}",
+        f"cache_size = {-settings.sqlite_cache_size}",  # Negative: KiB rather than pages
+        f"busy_timeout = {settings.sqlite_busy_timeout}",
+    ]
+
+
+def apply_sqlite_profile(engine: Engine, profile: str) -> None:
+    """
+    Run a SQLite profile's PRAGMAs on every new connection of an engine.
+    Does nothing for other databases.
+    
+    Args:
+        engine: Engine, or the ``sync_engine`` of an async engine
+        profile: "performance" or "default"
+    """
+    pragmas = sqlite_pragmas(profile)
+    if engine.dialect.name != "sqlite" or not pragmas:
+        return
+    
+    @event.listens_for(engine, "connect")
+    def _set_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        for pragma in pragmas:
+            cursor.execute(f"PRAGMA {pragma}")
+        cursor.close()
+
+
+# Sync engine, for migrations and work that runs in worker threads
+engine = create_engine(settings.database_url, **engine_options(settings.database_url))
+apply_sqlite_profile(engine, settings.sqlite_profile)
 
 # Create SessionLocal class
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# Async engine, for request handlers and background coroutines. Queries are
+# awaited, so a slow one no longer holds up other requests on the event loop.
+_async_url = async_database_url(settings.database_url)
+async_engine = create_async_engine(_async_url, **engine_options(_async_url))
+apply_sqlite_profile(async_engine.sync_engine, settings.sqlite_profile)
+
+# Objects stay usable after commit; reloading them would need an await
+AsyncSessionLocal = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+
 # Base class for models
 Base = declarative_base()
 
 
-def get_db() -> Generator[Session, None, None]:
+async def get_db() -> AsyncGenerator[AsyncSession, None]:
     """
     Database session dependency.
     
     Yields:
-        Database session
+        Async database session
     """
-    db = SessionLocal()
-    try:
+    async with AsyncSessionLocal() as db:
         yield db
-    finally:
-        db.close()
 
 
 def init_db():
-    """Initialize database - create all tables."""
+    """
+    Initialize database - create missing tables, then migrate existing ones.
+    
+    ``create_all`` only creates tables that do not exist yet, so changes to
+    existing tables (new columns and indexes) are shipped as versioned
+    migrations in ``app.migrations``.
+    """
     Base.metadata.create_all(bind=engine)
+    run_migrations(engine)
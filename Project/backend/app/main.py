@@ -3,10 +3,14 @@
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
+from sqlalchemy import func, select
+
 from app.config import settings
-from app.database import init_db, SessionLocal
-from app.routes import datasets, models, experiments, evaluations
+from app.database import init_db, engine, async_engine, AsyncSessionLocal
+from app.migrations import schema_lock
+from app.routes import datasets, uploads, models, experiments, evaluations
 from app.models.model import Model, ModelType
+from app.services.progress import progress_broker
 
 # Create FastAPI app
 app = FastAPI(
@@ -25,6 +29,7 @@ app.add_middleware(
 )
 
 # Include routers
+app.include_router(uploads.router, prefix="/datasets/uploads", tags=["datasets"])
 app.include_router(datasets.router, prefix="/datasets", tags=["datasets"])
 app.include_router(models.router, prefix="/models", tags=["models"])
 app.include_router(experiments.router, prefix="/experiments", tags=["experiments"])
@@ -34,52 +39,63 @@ app.include_router(evaluations.router, prefix="/evaluations", tags=["evaluations
 @app.on_event("startup")
 async def startup_event():
     """Initialize database and create tables on startup."""
-    init_db()
-    
-    # Seed sample base models if database is empty
-    db = SessionLocal()
-    try:
-        existing_models = db.query(Model).filter(Model.model_type == ModelType.BASE).count()
-        if existing_models == 0:
-            sample_models = [
-                Model(
-                    name="GPT-2 Small",
-                    model_type=ModelType.BASE,
-                    version="1.0",
-                    architecture="transformer",
-                    parameters_count=124000000,
-                    description="Small GPT-2 model for fine-tuning",
-                    is_latest_version=True
-                ),
-                Model(
-                    name="GPT-2 Medium",
-                    model_type=ModelType.BASE,
-                    version="1.0",
-                    architecture="transformer",
-                    parameters_count=355000000,
-                    description="Medium GPT-2 model for fine-tuning",
-                    is_latest_version=True
-                ),
-                Model(
-                    name="BERT Base",
-                    model_type=ModelType.BASE,
-                    version="1.0",
-                    architecture="transformer",
-                    parameters_count=110000000,
-                    description="BERT base model for fine-tuning",
-                    is_latest_version=True
-                ),
-            ]
-            for model in sample_models:
-                db.add(model)
-            db.commit()
-            print("Sample base models seeded")
-    finally:
-        db.close()
+    # Workers starting together take turns, so tables are created and seeded once
+    with schema_lock(engine):
+        init_db()
+        
+        # Seed sample base models if database is empty
+        db = AsyncSessionLocal()
+        try:
+            existing_models = await db.scalar(
+                select(func.count()).select_from(Model).where(Model.model_type == ModelType.BASE)
+            )
+            if existing_models == 0:
+                sample_models = [
+                    Model(
+                        name="GPT-2 Small",
+                        model_type=ModelType.BASE,
+                        version="1.0",
+                        architecture="transformer",
+                        parameters_count=124000000,
+                        description="Small GPT-2 model for fine-tuning",
+                        is_latest_version=True
+                    ),
+                    Model(
+                        name="GPT-2 Medium",
+                        model_type=ModelType.BASE,
+                        version="1.0",
+                        architecture="transformer",
+                        parameters_count=355000000,
+                        description="Medium GPT-2 model for fine-tuning",
+                        is_latest_version=True
+                    ),
+                    Model(
+                        name="BERT Base",
+                        model_type=ModelType.BASE,
+                        version="1.0",
+                        architecture="transformer",
+                        parameters_count=110000000,
+                        description="BERT base model for fine-tuning",
+                        is_latest_version=True
+                    ),
+                ]
+                for model in sample_models:
+                    db.add(model)
+                await db.commit()
+                print("Sample base models seeded")
+        finally:
+            await db.close()
     
     print("Database initialized")
 
 
+@app.on_event("shutdown")
+async def shutdown_event():
+    """Stop the progress poller and close the async engine's pooled connections."""
+    await progress_broker.close()
+    await async_engine.dispose()
+
+
 @app.get("/")
 async def root():
     """Root endpoint with API information."""
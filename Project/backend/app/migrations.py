@@ -0,0 +1,256 @@
+"""Versioned schema migrations."""
+
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterator, List, NamedTuple, Tuple
+
+from sqlalchemy import (
+    BigInteger, Column, DateTime, Enum as SQLEnum, Float, Integer, JSON, MetaData, String, Table, inspect, select, text
+)
+from sqlalchemy.dialects.postgresql import JSONB, UUID
+from sqlalchemy.engine import Connection, Engine
+from sqlalchemy.sql import func
+
+
+class Migration(NamedTuple):
+    """A numbered change to the schema of existing tables."""
+    version: int
+    description: str
+    apply: Callable[[Connection], None]
+
+
+# Registered migrations; versions must increase and never be reused
+MIGRATIONS: List[Migration] = []
+
+# Key of the PostgreSQL advisory lock that serializes schema changes
+SCHEMA_LOCK_KEY = 0x534C4D  # "SLM"
+
+# Applied versions, kept apart from the models' metadata
+schema_migrations = Table(
+    "schema_migrations",
+    MetaData(),
+    Column("version", Integer, primary_key=True),
+    Column("description", String, nullable=False),
+    Column("applied_at", DateTime(timezone=True), server_default=func.now()),
+)
+
+
+def migration(version: int, description: str):
+    """
+    Register a function as the migration to a schema version.
+    
+    Migrations run on databases created by any earlier version of the app,
+    and also on new databases, whose tables ``create_all`` has already
+    created in their latest form. They must therefore be idempotent.
+    
+    Args:
+        version: Schema version the migration brings the database to
+        description: What the migration changes
+    """
+    def register(apply: Callable[[Connection], None]) -> Callable[[Connection], None]:
+        MIGRATIONS.append(Migration(version, description, apply))
+        return apply
+    return register
+
+
+def _add_column(conn: Connection, table: str, column: Column) -> None:
+    """Add a nullable column to a table unless it already exists."""
+    if column.name in {existing["name"] for existing in inspect(conn).get_columns(table)}:
+        return
+    if isinstance(column.type, SQLEnum):
+        column.type.create(conn, checkfirst=True)  # Native enum types, e.g. on PostgreSQL
+    column_type = column.type.compile(dialect=conn.dialect)
+    conn.execute(text(f"ALTER TABLE {table} ADD COLUMN {column.name} {column_type}"))
+
+
+def _create_index(conn: Connection, name: str, table: str, *columns: str) -> None:
+    """Create an index unless it already exists."""
+    conn.execute(text(f"CREATE INDEX IF NOT EXISTS {name} ON {table} ({', '.join(columns)})"))
+
+
+@migration(1, "Add dataset content hash, size, schema summary and columnar copy columns")
+def _add_dataset_columns(conn: Connection) -> None:
+    _add_column(conn, "datasets", Column("content_hash", String))
+    _add_column(conn, "datasets", Column("size_bytes", BigInteger))
+    _add_column(conn, "datasets", Column("schema_summary", JSON))
+    _add_column(conn, "datasets", Column(
+        "columnar_status", SQLEnum("PENDING", "READY", "FAILED", "SKIPPED", name="columnarstatus")
+    ))
+    _add_column(conn, "datasets", Column("columnar_path", String))
+
+
+@migration(2, "Add (sort field, id) indexes for keyset pagination")
+def _add_pagination_indexes(conn: Connection) -> None:
+    for table in ("datasets", "experiments", "models"):
+        _create_index(conn, f"ix_{table}_created_at_id", table, "created_at", "id")
+        _create_index(conn, f"ix_{table}_name_id", table, "name", "id")
+    _create_index(conn, "ix_evaluations_created_at_id", "evaluations", "created_at", "id")
+    _create_index(
+        conn, "ix_evaluations_experiment_id_created_at_id", "evaluations", "experiment_id", "created_at", "id"
+    )
+
+
+@migration(3, "Add indexes for filtered lists and foreign key lookups")
+def _add_filter_indexes(conn: Connection) -> None:
+    # Filtered lists, in their default created_at order
+    _create_index(conn, "ix_datasets_dataset_type_created_at_id", "datasets", "dataset_type", "created_at", "id")
+    _create_index(conn, "ix_models_model_type_created_at_id", "models", "model_type", "created_at", "id")
+    _create_index(conn, "ix_models_base_model_id_created_at_id", "models", "base_model_id", "created_at", "id")
+    _create_index(conn, "ix_experiments_status_created_at_id", "experiments", "status", "created_at", "id")
+    _create_index(
+        conn, "ix_experiments_base_model_id_created_at_id", "experiments", "base_model_id", "created_at", "id"
+    )
+    _create_index(
+        conn, "ix_experiments_training_dataset_id_created_at_id",
+        "experiments", "training_dataset_id", "created_at", "id"
+    )
+    # Linked evaluations of a model, and whether a dataset is still in use
+    _create_index(conn, "ix_experiments_resulting_model_id", "experiments", "resulting_model_id")
+    _create_index(conn, "ix_experiments_eval_dataset_id", "experiments", "eval_dataset_id")
+
+
+# Columns stored as native types on PostgreSQL: table -> (UUID columns, JSON columns)
+_NATIVE_COLUMNS: Dict[str, Tuple[Tuple[str, ...], Tuple[str, ...]]] = {
+    "datasets": (("id",), ("schema_summary",)),
+    "models": (("id", "base_model_id"), ("metadata",)),
+    "experiments": (
+        ("id", "base_model_id", "training_dataset_id", "eval_dataset_id", "resulting_model_id"),
+        ("training_config",)
+    ),
+    "evaluations": (("id", "experiment_id"), ("metrics", "loss_curve", "training_statistics")),
+    "upload_sessions": (("id", "dataset_id"), ()),
+}
+
+
+@migration(4, "Use native UUID and JSONB columns on PostgreSQL")
+def _use_native_types(conn: Connection) -> None:
+    if conn.dialect.name != "postgresql":
+        return
+    inspector = inspect(conn)
+    changes = {}
+    for table, (uuid_columns, json_columns) in _NATIVE_COLUMNS.items():
+        types = {column["name"]: column["type"] for column in inspector.get_columns(table)}
+        alterations = [
+            f'ALTER COLUMN "{name}" TYPE UUID USING "{name}"::uuid'
+            for name in uuid_columns if not isinstance(types[name], UUID)
+        ] + [
+            f'ALTER COLUMN "{name}" TYPE JSONB USING "{name}"::jsonb'
+            for name in json_columns if not isinstance(types[name], JSONB)
+        ]
+        if alterations:
+            changes[table] = alterations
+    if not changes:
+        return
+    
+    # Keys and the columns referencing them must change type together
+    foreign_keys = [(table, fk) for table in _NATIVE_COLUMNS for fk in inspector.get_foreign_keys(table)]
+    for table, fk in foreign_keys:
+        conn.execute(text(f'ALTER TABLE {table} DROP CONSTRAINT "{fk["name"]}"'))
+    for table, alterations in changes.items():
+        conn.execute(text(f"ALTER TABLE {table} {', '.join(alterations)}"))
+    for table, fk in foreign_keys:
+        conn.execute(text(
+            f'ALTER TABLE {table} ADD CONSTRAINT "{fk["name"]}" '
+            f'FOREIGN KEY ({", ".join(fk["constrained_columns"])}) '
+            f'REFERENCES {fk["referred_table"]} ({", ".join(fk["referred_columns"])})'
+        ))
+
+
+@migration(5, "Add job cost, work estimate and start time for the training scheduler")
+def _add_job_schedule_columns(conn: Connection) -> None:
+    _add_column(conn, "jobs", Column("cost", Integer))
+    _add_column(conn, "jobs", Column("work", Float))
+    _add_column(conn, "jobs", Column("started_at", DateTime(timezone=True)))
+
+
+@migration(6, "Add the cancelled job status")
+def _add_cancelled_job_status(conn: Connection) -> None:
+    # Enums are native types on PostgreSQL, and plain strings elsewhere
+    if conn.dialect.name != "postgresql":
+        return
+    conn.execute(text("ALTER TYPE jobstatus ADD VALUE IF NOT EXISTS 'CANCELLED'"))
+
+
+@migration(7, "Add experiment training progress")
+def _add_experiment_progress(conn: Connection) -> None:
+    _add_column(conn, "experiments", Column("progress", JSON().with_variant(JSONB(), "postgresql")))
+
+
+@migration(8, "Add experiment training checkpoint")
+def _add_experiment_checkpoint(conn: Connection) -> None:
+    _add_column(conn, "experiments", Column("checkpoint", JSON().with_variant(JSONB(), "postgresql")))
+
+
+@contextmanager
+def schema_lock(engine: Engine) -> Iterator[None]:
+    """
+    Hold a lock that serializes schema changes across processes, so several
+    workers starting at once do not create tables or migrate concurrently.
+    
+    Uses a PostgreSQL advisory lock; SQLite databases are not shared between
+    hosts, and migrations there run in exclusive transactions anyway.
+    
+    Args:
+        engine: Database engine
+    """
+    if engine.dialect.name != "postgresql":
+        yield
+        return
+    with engine.connect() as conn:
+        conn.execute(text("SELECT pg_advisory_lock(:key)"), {"key": SCHEMA_LOCK_KEY})
+        conn.commit()
+        try:
+            yield
+        finally:
+            conn.execute(text("SELECT pg_advisory_unlock(:key)"), {"key": SCHEMA_LOCK_KEY})
+            conn.commit()
+
+
+def applied_versions(engine: Engine) -> List[int]:
+    """
+    Get the migration versions applied to a database.
+    
+    Args:
+        engine: Database engine
+    
+    Returns:
+        Applied versions, in order
+    """
+    schema_migrations.create(bind=engine, checkfirst=True)
+    with engine.connect() as conn:
+        return sorted(conn.execute(select(schema_migrations.c.version)).scalars())
+
+
+def run_migrations(engine: Engine) -> List[int]:
+    """
+    Apply pending migrations in version order, each in its own transaction.
+    
+    Args:
+        engine: Database engine
+    
+    Returns:
+        Versions applied by this call
+    """
+    applied = set(applied_versions(engine))
+    newly_applied = []
+    for pending in sorted(MIGRATIONS, key=lambda m: m.version):
+        if pending.version in applied:
+            continue
+        with engine.begin() as conn:
+            pending.apply(conn)
+            conn.execute(schema_migrations.insert().values(
+                version=pending.version, description=pending.description
+            ))
+        newly_applied.append(pending.version)
+    return newly_applied
+
+
+if __name__ == "__main__":
+    # python -m app.migrations: bring the configured database up to date
+    from app.database import init_db, engine
+    import app.main  # noqa: F401  Registers every model
+    
+    with schema_lock(engine):
+        init_db()
+    descriptions = {m.version: m.description for m in MIGRATIONS}
+    for version in applied_versions(engine):
+        print(f"{version:4d}  {descriptions.get(version, '(unknown)')}")
@@ -1,12 +1,12 @@
 """Dataset ORM model."""
 
 import uuid
-from sqlalchemy import Column, String, Integer, DateTime, Enum as SQLEnum
-from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy import Column, String, Integer, BigInteger, DateTime, Enum as SQLEnum, Index
 from sqlalchemy.sql import func
 import enum
 
 from app.database import Base
+from app.models.types import GUID, JSONDocument
 
 
 class DatasetType(str, enum.Enum):
@@ -15,15 +15,35 @@ class DatasetType(str, enum.Enum):
     EVALUATION = "evaluation"
 
 
+class ColumnarStatus(str, enum.Enum):
+    """Status of a dataset's columnar (Parquet) copy."""
+    PENDING = "pending"
+    READY = "ready"
+    FAILED = "failed"
+    SKIPPED = "skipped"  # Not convertible, or pyarrow is not installed
+
+
 class Dataset(Base):
     """Dataset model."""
     
     __tablename__ = "datasets"
+    __table_args__ = (
+        # Keyset pagination: (sort field, id)
+        Index("ix_datasets_created_at_id", "created_at", "id"),
+        Index("ix_datasets_name_id", "name", "id"),
+        # Filtered list
+        Index("ix_datasets_dataset_type_created_at_id", "dataset_type", "created_at", "id"),
+    )
     
-    id = Column(String, primary_key=True, default=lambda: str(uuid.uuid4()))
+    id = Column(GUID, primary_key=True, default=lambda: str(uuid.uuid4()))
     name = Column(String, nullable=False)
     description = Column(String, nullable=True)
     dataset_type = Column(SQLEnum(DatasetType), nullable=False)
     file_path = Column(String, nullable=False)
     row_count = Column(Integer, nullable=True)
+    content_hash = Column(String, nullable=True)  # SHA-256 of the uncompressed content
+    size_bytes = Column(BigInteger, nullable=True)
+    schema_summary = Column(JSONDocument, nullable=True)  # Columns, null counts and string-length stats
+    columnar_status = Column(SQLEnum(ColumnarStatus), nullable=True)
+    columnar_path = Column(String, nullable=True)  # Parquet sidecar, once converted
     created_at = Column(DateTime(timezone=True), server_default=func.now())
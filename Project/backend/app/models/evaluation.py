@@ -1,24 +1,30 @@
 """Evaluation ORM model."""
 
 import uuid
-from sqlalchemy import Column, String, DateTime, ForeignKey, JSON
+from sqlalchemy import Column, DateTime, ForeignKey, Index
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 
 from app.database import Base
+from app.models.types import GUID, JSONDocument
 
 
 class Evaluation(Base):
     """Evaluation model."""
     
     __tablename__ = "evaluations"
+    __table_args__ = (
+        # Keyset pagination: (sort field, id), alone and within an experiment
+        Index("ix_evaluations_created_at_id", "created_at", "id"),
+        Index("ix_evaluations_experiment_id_created_at_id", "experiment_id", "created_at", "id"),
+    )
     
-    id = Column(String, primary_key=True, default=lambda: str(uuid.uuid4()))
-    experiment_id = Column(String, ForeignKey("experiments.id"), nullable=False)
-    metrics = Column(JSON, nullable=False)
-    loss_curve = Column(JSON, nullable=True)
-    training_statistics = Column(JSON, nullable=True)
+    id = Column(GUID, primary_key=True, default=lambda: str(uuid.uuid4()))
+    experiment_id = Column(GUID, ForeignKey("experiments.id"), nullable=False)
+    metrics = Column(JSONDocument, nullable=False)
+    loss_curve = Column(JSONDocument, nullable=True)
+    training_statistics = Column(JSONDocument, nullable=True)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     
     # Relationships
-    experiment = relationship("Experiment", back_populates="evaluations")
+    experiment = relationship("Experiment", back_populates="evaluations", lazy="raise_on_sql")
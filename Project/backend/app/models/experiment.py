@@ -1,12 +1,13 @@
 """Experiment ORM model."""
 
 import uuid
-from sqlalchemy import Column, String, DateTime, ForeignKey, Enum as SQLEnum, JSON
+from sqlalchemy import Column, String, DateTime, ForeignKey, Enum as SQLEnum, Index
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 import enum
 
 from app.database import Base
+from app.models.types import GUID, JSONDocument
 
 
 class ExperimentStatus(str, enum.Enum):
@@ -22,22 +23,37 @@ class Experiment(Base):
     """Experiment model."""
     
     __tablename__ = "experiments"
+    __table_args__ = (
+        # Keyset pagination: (sort field, id)
+        Index("ix_experiments_created_at_id", "created_at", "id"),
+        Index("ix_experiments_name_id", "name", "id"),
+        # Filtered lists
+        Index("ix_experiments_status_created_at_id", "status", "created_at", "id"),
+        Index("ix_experiments_base_model_id_created_at_id", "base_model_id", "created_at", "id"),
+        Index("ix_experiments_training_dataset_id_created_at_id", "training_dataset_id", "created_at", "id"),
+        # Linked evaluations of a model, and whether a dataset is still in use
+        Index("ix_experiments_resulting_model_id", "resulting_model_id"),
+        Index("ix_experiments_eval_dataset_id", "eval_dataset_id"),
+    )
     
-    id = Column(String, primary_key=True, default=lambda: str(uuid.uuid4()))
+    id = Column(GUID, primary_key=True, default=lambda: str(uuid.uuid4()))
     name = Column(String, nullable=False)
     description = Column(String, nullable=True)
     goal = Column(String, nullable=True)
-    base_model_id = Column(String, ForeignKey("models.id"), nullable=False)
-    training_dataset_id = Column(String, ForeignKey("datasets.id"), nullable=False)
-    eval_dataset_id = Column(String, ForeignKey("datasets.id"), nullable=True)
+    base_model_id = Column(GUID, ForeignKey("models.id"), nullable=False)
+    training_dataset_id = Column(GUID, ForeignKey("datasets.id"), nullable=False)
+    eval_dataset_id = Column(GUID, ForeignKey("datasets.id"), nullable=True)
     status = Column(SQLEnum(ExperimentStatus), nullable=False, default=ExperimentStatus.CREATED)
-    training_config = Column(JSON, nullable=False)
-    resulting_model_id = Column(String, ForeignKey("models.id"), nullable=True)
+    training_config = Column(JSONDocument, nullable=False)
+    resulting_model_id = Column(GUID, ForeignKey("models.id"), nullable=True)
+    progress = Column(JSONDocument, nullable=True)  # Latest epoch's progress, written by the training job
+    checkpoint = Column(JSONDocument, nullable=True)  # Last checkpoint of the training job, to resume from
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     
-    # Relationships
-    base_model = relationship("Model", foreign_keys=[base_model_id])
-    training_dataset = relationship("Dataset", foreign_keys=[training_dataset_id])
-    eval_dataset = relationship("Dataset", foreign_keys=[eval_dataset_id])
-    resulting_model = relationship("Model", foreign_keys=[resulting_model_id])
-    evaluations = relationship("Evaluation", back_populates="experiment")
+    # Relationships. Lazy loads raise, so that touching a relationship per row
+    # cannot turn into one query per row; load them with explicit loader options.
+    base_model = relationship("Model", foreign_keys=[base_model_id], lazy="raise_on_sql")
+    training_dataset = relationship("Dataset", foreign_keys=[training_dataset_id], lazy="raise_on_sql")
+    eval_dataset = relationship("Dataset", foreign_keys=[eval_dataset_id], lazy="raise_on_sql")
+    resulting_model = relationship("Model", foreign_keys=[resulting_model_id], lazy="raise_on_sql")
+    evaluations = relationship("Evaluation", back_populates="experiment", lazy="raise_on_sql")
@@ -0,0 +1,53 @@
+"""Background job ORM model."""
+
+import uuid
+from sqlalchemy import Column, String, Integer, Float, DateTime, ForeignKey, Enum as SQLEnum, Index
+from sqlalchemy.sql import func
+import enum
+
+from app.database import Base
+from app.models.types import GUID, JSONDocument
+
+
+class JobStatus(str, enum.Enum):
+    """Job status enumeration."""
+    QUEUED = "queued"
+    RUNNING = "running"
+    SUCCEEDED = "succeeded"
+    FAILED = "failed"
+    CANCELLED = "cancelled"
+
+
+class Job(Base):
+    """
+    A unit of background work, claimed and run by a worker process.
+    
+    A running job is leased to one worker until ``lease_expires_at``; the
+    worker renews the lease while it runs, so the job of a worker that dies
+    is claimed again once its lease runs out.
+    """
+    
+    __tablename__ = "jobs"
+    __table_args__ = (
+        # Claiming: highest priority first, oldest first within a priority
+        Index("ix_jobs_status_priority_created_at", "status", "priority", "created_at"),
+        Index("ix_jobs_experiment_id", "experiment_id"),
+    )
+    
+    id = Column(GUID, primary_key=True, default=lambda: str(uuid.uuid4()))
+    kind = Column(String, nullable=False)  # Selects the handler that runs the job
+    payload = Column(JSONDocument, nullable=False)
+    experiment_id = Column(GUID, ForeignKey("experiments.id"), nullable=True)
+    status = Column(SQLEnum(JobStatus), nullable=False, default=JobStatus.QUEUED)
+    priority = Column(Integer, nullable=False, default=0)  # Higher runs first
+    cost = Column(Integer, nullable=True, default=1)  # Scheduler capacity used while running
+    work = Column(Float, nullable=True)  # Estimated amount of work, for ETAs
+    attempts = Column(Integer, nullable=False, default=0)  # Times the job has been claimed
+    max_attempts = Column(Integer, nullable=False)
+    run_after = Column(DateTime(timezone=True), nullable=True)  # Not claimed before this, e.g. retry backoff
+    lease_owner = Column(String, nullable=True)  # Worker running the job
+    lease_expires_at = Column(DateTime(timezone=True), nullable=True)
+    last_error = Column(String, nullable=True)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    started_at = Column(DateTime(timezone=True), nullable=True)  # Start of the latest attempt
+    finished_at = Column(DateTime(timezone=True), nullable=True)
@@ -0,0 +1,47 @@
+"""Training metric ORM models: per-step values and their rollups."""
+
+from sqlalchemy import Column, String, Integer, BigInteger, Float, ForeignKey
+
+from app.database import Base
+from app.models.types import GUID
+
+
+class TrainingMetric(Base):
+    """
+    One value of a training metric, e.g. the loss at a step.
+    
+    Keyed by (experiment, metric, step), so a curve or a step range of it is
+    a single range scan; on SQLite the table is clustered on that key.
+    """
+    
+    __tablename__ = "training_metrics"
+    __table_args__ = {"sqlite_with_rowid": False}
+    
+    experiment_id = Column(GUID, ForeignKey("experiments.id"), primary_key=True)
+    metric = Column(String, primary_key=True)
+    step = Column(BigInteger, primary_key=True)
+    value = Column(Float, nullable=False)
+
+
+class TrainingMetricRollup(Base):
+    """
+    Aggregate of a metric over a bucket of steps.
+    
+    Level ``n`` has buckets of ``ROLLUP_FACTOR ** n`` steps, aligned to
+    multiples of that width. Rollups are kept up to date as values are
+    recorded, so a chart of millions of steps reads a few thousand rows.
+    """
+    
+    __tablename__ = "training_metric_rollups"
+    __table_args__ = {"sqlite_with_rowid": False}
+    
+    experiment_id = Column(GUID, ForeignKey("experiments.id"), primary_key=True)
+    level = Column(Integer, primary_key=True)  # Ahead of the metric, so a level of every metric is one range
+    metric = Column(String, primary_key=True)
+    bucket = Column(BigInteger, primary_key=True)  # First step // bucket width
+    first_step = Column(BigInteger, nullable=False)
+    last_step = Column(BigInteger, nullable=False)
+    count = Column(Integer, nullable=False)
+    min_value = Column(Float, nullable=False)
+    max_value = Column(Float, nullable=False)
+    sum_value = Column(Float, nullable=False)
@@ -1,12 +1,13 @@
 """Model ORM model."""
 
 import uuid
-from sqlalchemy import Column, String, BigInteger, Boolean, DateTime, ForeignKey, Enum as SQLEnum, JSON
+from sqlalchemy import Column, String, BigInteger, Boolean, DateTime, ForeignKey, Enum as SQLEnum, Index
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 import enum
 
 from app.database import Base
+from app.models.types import GUID, JSONDocument
 
 
 class ModelType(str, enum.Enum):
@@ -19,18 +20,28 @@ class Model(Base):
     """Model model."""
     
     __tablename__ = "models"
+    __table_args__ = (
+        # Keyset pagination: (sort field, id)
+        Index("ix_models_created_at_id", "created_at", "id"),
+        Index("ix_models_name_id", "name", "id"),
+        # Filtered lists
+        Index("ix_models_model_type_created_at_id", "model_type", "created_at", "id"),
+        Index("ix_models_base_model_id_created_at_id", "base_model_id", "created_at", "id"),
+    )
     
-    id = Column(String, primary_key=True, default=lambda: str(uuid.uuid4()))
+    id = Column(GUID, primary_key=True, default=lambda: str(uuid.uuid4()))
     name = Column(String, nullable=False)
     model_type = Column(SQLEnum(ModelType), nullable=False)
-    base_model_id = Column(String, ForeignKey("models.id"), nullable=True)
+    base_model_id = Column(GUID, ForeignKey("models.id"), nullable=True)
     version = Column(String, nullable=True)
     architecture = Column(String, nullable=True)
     parameters_count = Column(BigInteger, nullable=True)
     description = Column(String, nullable=True)
-    model_metadata = Column("metadata", JSON, nullable=True)  # Use "metadata" as DB column name
+    model_metadata = Column("metadata", JSONDocument, nullable=True)  # Use "metadata" as DB column name
     is_latest_version = Column(Boolean, default=True)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     
-    # Relationships
-    base_model = relationship("Model", remote_side=[id], backref="fine_tuned_models")
+    # Relationships. Lazy loads raise, so that touching a relationship per row
+    # cannot turn into one query per row; load them with explicit loader options.
+    base_model = relationship("Model", remote_side=[id], back_populates="fine_tuned_models", lazy="raise_on_sql")
+    fine_tuned_models = relationship("Model", back_populates="base_model", lazy="raise_on_sql")
@@ -0,0 +1,36 @@
+"""Column types that use native PostgreSQL types where available."""
+
+import uuid
+from sqlalchemy import JSON, String
+from sqlalchemy.dialects.postgresql import JSONB, UUID
+from sqlalchemy.types import TypeDecorator
+
+
+class GUID(TypeDecorator):
+    """
+    A UUID, held as a string in Python.
+    
+    Stored as a native ``UUID`` on PostgreSQL and as text elsewhere, so
+    existing SQLite databases keep their values. On PostgreSQL a value that
+    is not a UUID is sent as NULL, so looking a row up by a malformed ID
+    finds nothing rather than failing.
+    """
+    impl = String
+    cache_ok = True
+    
+    def load_dialect_impl(self, dialect):
+        if dialect.name == "postgresql":
+            return dialect.type_descriptor(UUID(as_uuid=False))
+        return dialect.type_descriptor(String())
+    
+    def process_bind_param(self, value, dialect):
+        if value is None or dialect.name != "postgresql":
+            return value
+        try:
+            return str(uuid.UUID(str(value)))
+        except ValueError:
+            return None
+
+
+# JSON documents, stored as JSONB on PostgreSQL so they can be indexed and queried
+JSONDocument = JSON().with_variant(JSONB(), "postgresql")
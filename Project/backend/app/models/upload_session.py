@@ -0,0 +1,55 @@
+"""Upload session ORM model."""
+
+import uuid
+from sqlalchemy import Column, String, Integer, BigInteger, DateTime, ForeignKey, Enum as SQLEnum
+from sqlalchemy.sql import func
+import enum
+
+from app.database import Base
+from app.models.types import GUID
+from app.models.dataset import DatasetType
+
+
+class UploadStatus(str, enum.Enum):
+    """Upload session status enumeration."""
+    PENDING = "pending"
+    ASSEMBLING = "assembling"
+    COMPLETED = "completed"
+    ABORTED = "aborted"
+
+
+class UploadSession(Base):
+    """Chunked upload session. Received parts are tracked on disk."""
+    
+    __tablename__ = "upload_sessions"
+    
+    id = Column(GUID, primary_key=True, default=lambda: str(uuid.uuid4()))
+    name = Column(String, nullable=False)
+    description = Column(String, nullable=True)
+    dataset_type = Column(SQLEnum(DatasetType), nullable=False)
+    filename = Column(String, nullable=False)
+    total_size = Column(BigInteger, nullable=False)
+    part_size = Column(Integer, nullable=False)
+    content_hash = Column(String, nullable=True)  # Expected SHA-256 of the whole file
+    status = Column(SQLEnum(UploadStatus), nullable=False, default=UploadStatus.PENDING)
+    dataset_id = Column(GUID, ForeignKey("datasets.id"), nullable=True)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    
+    @property
+    def total_parts(self) -> int:
+        """Number of parts the file is split into."""
+        return max((self.total_size + self.part_size - 1) // self.part_size, 1)
+    
+    def expected_part_size(self, part_number: int) -> int:
+        """
+        Get the size a part must have.
+        
+        Args:
+            part_number: 1-based part number
+        
+        Returns:
+            Part size in bytes
+        """
+        if part_number < self.total_parts:
+            return self.part_size
+        return self.total_size - self.part_size * (self.total_parts - 1)
@@ -1,37 +1,63 @@
 """Dataset API routes."""
 
-from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, Form
-from fastapi.responses import FileResponse
-from sqlalchemy.orm import Session
-from typing import List
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, UploadFile, File, Form, Query, Request, Response
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import FileResponse, StreamingResponse
+from sqlalchemy import select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List, Optional
 from pathlib import Path
+from urllib.parse import quote
+import re
+import uuid
 
+from app.config import settings
 from app.database import get_db
-from app.models.dataset import Dataset, DatasetType
-from app.schemas.dataset import DatasetResponse, DatasetCreate
-from app.services.storage_service import save_uploaded_file
+from app.models.dataset import Dataset, DatasetType, ColumnarStatus
+from app.models.experiment import Experiment
+from app.models.upload_session import UploadSession
+from app.schemas.dataset import (
+    DatasetResponse, DatasetDetailResponse, DatasetCreate, DatasetRowsResponse,
+    DatasetShard, DatasetShardsResponse, ColumnStatistics
+)
+from app.schemas.pagination import Page
+from app.services.pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE, SortOrder, paginate
+from app.services.columnar_service import convert_dataset, column_statistics, read_page
+from app.services.compression import parse_accept_encoding
+from app.services.storage_service import save_uploaded_file, delete_file, dataset_format, open_dataset, shard_rows
 
 router = APIRouter()
 
+# Fields the dataset list can be sorted by
+DATASET_SORT_FIELDS = ("created_at", "name")
+
 
 @router.post("/upload", response_model=DatasetResponse, status_code=201)
 async def upload_dataset(
+    background_tasks: BackgroundTasks,
     file: UploadFile = File(...),
     name: str = Form(...),
     description: str = Form(None),
     dataset_type: str = Form(...),
-    db: Session = Depends(get_db)
+    content_sha256: str = Form(None),
+    db: AsyncSession = Depends(get_db)
 ):
     """
     Upload a dataset file.
     
+    A columnar (Parquet) copy is created in the background once the file is
+    stored.
+    
     Args:
+        background_tasks: FastAPI background tasks
         file: Uploaded file
         name: Dataset name
         description: Dataset description
         dataset_type: 'training' or 'evaluation'
+        content_sha256: Optional SHA-256 of the file; lets already stored
+            content skip parsing
         db: Database session
-        
+    
     Returns:
         Created dataset
     """
@@ -41,23 +67,28 @@ async def upload_dataset(
     except ValueError:
         raise HTTPException(status_code=400, detail="dataset_type must be 'training' or 'evaluation'")
     
-    # Create dataset record first to get ID
-    dataset = Dataset(
-        name=name,
-        description=description,
-        dataset_type=dataset_type_enum,
-        file_path=""  # Will be updated
-    )
-    db.add(dataset)
-    db.flush()  # Get the ID
-    
+    # Store the file before inserting the dataset, so no write transaction is held meanwhile
+    dataset_id = str(uuid.uuid4())
+    stored = None
     try:
-        # Save file
-        file_path, row_count = save_uploaded_file(file, dataset.id)
-        dataset.file_path = file_path
-        dataset.row_count = row_count
-        db.commit()
-        db.refresh(dataset)
+        # Stream file to disk in a worker thread so the event loop stays free
+        stored = await run_in_threadpool(save_uploaded_file, file, dataset_id, content_sha256)
+        dataset = Dataset(
+            id=dataset_id,
+            name=name,
+            description=description,
+            dataset_type=dataset_type_enum,
+            file_path=stored.file_path,
+            row_count=stored.row_count,
+            content_hash=stored.content_hash,
+            size_bytes=stored.size_bytes,
+            schema_summary=stored.schema_summary,
+            columnar_status=ColumnarStatus.PENDING
+        )
+        db.add(dataset)
+        await db.commit()
+        await db.refresh(dataset)
+        background_tasks.add_task(convert_dataset, dataset.id)
         
         # Format response
         return DatasetResponse(
@@ -66,65 +97,393 @@ async def upload_dataset(
             description=dataset.description,
             dataset_type=dataset.dataset_type.value,
             row_count=dataset.row_count,
+            size_bytes=dataset.size_bytes,
+            content_hash=dataset.content_hash,
             upload_date=dataset.created_at.isoformat() if dataset.created_at else None,
             created_at=dataset.created_at
         )
     except ValueError as e:
-        db.rollback()
+        await db.rollback()
         raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
-        db.rollback()
+        await db.rollback()
+        if stored is not None:
+            # The dataset was not recorded: release its reference to the stored file
+            await run_in_threadpool(delete_file, stored.file_path)
         raise HTTPException(status_code=500, detail=f"Failed to upload dataset: {str(e)}")
 
 
-@router.get("", response_model=List[DatasetResponse])
-def get_datasets(db: Session = Depends(get_db)):
+@router.get("", response_model=Page[DatasetResponse])
+async def get_datasets(
+    dataset_type: Optional[str] = Query(None, description="Filter by dataset type: 'training' or 'evaluation'"),
+    name: Optional[str] = Query(None, description="Filter by name (case-insensitive substring)"),
+    cursor: Optional[str] = Query(None, description="Cursor from the previous page"),
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE, description="Page size"),
+    sort: str = Query("created_at", description="Sort field: created_at, name"),
+    order: SortOrder = Query(SortOrder.DESC, description="Sort direction"),
+    db: AsyncSession = Depends(get_db)
+):
     """
-    Get all datasets.
+    Get a page of datasets, optionally filtered.
     
     Args:
+        dataset_type: Optional filter by dataset type
+        name: Optional filter by name
+        cursor: Cursor from the previous page
+        limit: Page size
+        sort: Sort field
+        order: Sort direction
         db: Database session
-        
+    
     Returns:
-        List of datasets
+        Page of datasets, with a cursor for the next page
     """
-    datasets = db.query(Dataset).all()
-    return [
+    statement = select(Dataset)
+    
+    if dataset_type:
+        try:
+            statement = statement.where(Dataset.dataset_type == DatasetType(dataset_type.lower()))
+        except ValueError:
+            raise HTTPException(status_code=400, detail="dataset_type must be 'training' or 'evaluation'")
+    if name:
+        statement = statement.where(Dataset.name.icontains(name, autoescape=True))
+    
+    try:
+        datasets, next_cursor = await paginate(db, statement, Dataset, sort, order, cursor, limit, DATASET_SORT_FIELDS)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    return Page(items=[
         DatasetResponse(
             id=ds.id,
             name=ds.name,
             description=ds.description,
             dataset_type=ds.dataset_type.value,
             row_count=ds.row_count,
+            size_bytes=ds.size_bytes,
+            content_hash=ds.content_hash,
             upload_date=ds.created_at.isoformat() if ds.created_at else None,
             created_at=ds.created_at
         )
         for ds in datasets
-    ]
+    ], next_cursor=next_cursor)
+
+
+@router.get("/{dataset_id}", response_model=DatasetDetailResponse)
+async def get_dataset(dataset_id: str, db: AsyncSession = Depends(get_db)):
+    """
+    Get a specific dataset by ID, including its schema summary.
+    
+    Args:
+        dataset_id: Dataset ID
+        db: Database session
+    
+    Returns:
+        Dataset details
+    """
+    dataset = await _get_dataset(dataset_id, db)
+    return _detail_response(dataset)
+
+
+async def _get_dataset(dataset_id: str, db: AsyncSession) -> Dataset:
+    """Load a dataset or raise 404."""
+    dataset = await db.get(Dataset, dataset_id)
+    if not dataset:
+        raise HTTPException(status_code=404, detail="Dataset not found")
+    return dataset
+
+
+def _detail_response(dataset: Dataset) -> DatasetDetailResponse:
+    """Build the detail response for a dataset."""
+    return DatasetDetailResponse(
+        id=dataset.id,
+        name=dataset.name,
+        description=dataset.description,
+        dataset_type=dataset.dataset_type.value,
+        row_count=dataset.row_count,
+        size_bytes=dataset.size_bytes,
+        content_hash=dataset.content_hash,
+        upload_date=dataset.created_at.isoformat() if dataset.created_at else None,
+        created_at=dataset.created_at,
+        schema_summary=dataset.schema_summary,
+        columnar_status=dataset.columnar_status.value if dataset.columnar_status else None
+    )
+
+
+@router.get("/{dataset_id}/rows", response_model=DatasetRowsResponse)
+async def get_dataset_rows(
+    dataset_id: str,
+    offset: int = Query(0, ge=0, description="Index of the first row"),
+    limit: int = Query(50, ge=1, le=1000, description="Maximum number of rows"),
+    columns: Optional[str] = Query(None, description="Comma-separated columns to return"),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Get a page of a dataset's rows, for previews.
+    
+    Pages are located with the row index built at upload, so any page costs
+    about the same to read.
+    
+    Args:
+        dataset_id: Dataset ID
+        offset: Index of the first row
+        limit: Maximum number of rows
+        columns: Columns to return
+        db: Database session
+    
+    Returns:
+        Page of rows
+    """
+    dataset = await _get_dataset(dataset_id, db)
+    if not Path(dataset.file_path).exists():
+        raise HTTPException(status_code=404, detail="File not found")
+    
+    column_list = [name.strip() for name in columns.split(",") if name.strip()] if columns else None
+    try:
+        rows = await run_in_threadpool(read_page, dataset, offset, limit, column_list)
+    except (ValueError, UnicodeDecodeError) as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    return DatasetRowsResponse(
+        dataset_id=dataset.id,
+        offset=offset,
+        limit=limit,
+        total_rows=dataset.row_count,
+        rows=rows
+    )
+
+
+@router.get("/{dataset_id}/shards", response_model=DatasetShardsResponse)
+async def get_dataset_shards(
+    dataset_id: str,
+    count: int = Query(..., ge=1, le=1024, description="Number of shards"),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Split a dataset into contiguous shards of near-equal row counts.
+    
+    Shards come from the row index, so no rows are read. Byte ranges refer
+    to the uncompressed file and can be fetched with a Range request.
+    
+    Args:
+        dataset_id: Dataset ID
+        count: Number of shards
+        db: Database session
+    
+    Returns:
+        Row and byte range of each shard
+    """
+    dataset = await _get_dataset(dataset_id, db)
+    if not Path(dataset.file_path).exists():
+        raise HTTPException(status_code=404, detail="File not found")
+    
+    ranges = await run_in_threadpool(shard_rows, dataset.file_path, count)
+    if ranges is None:
+        raise HTTPException(status_code=409, detail="Dataset has no row index")
+    
+    return DatasetShardsResponse(
+        dataset_id=dataset.id,
+        total_rows=ranges[-1].stop_row,
+        data_start_byte=ranges[0].start_byte,
+        shards=[
+            DatasetShard(
+                shard=number,
+                start_row=shard.start_row,
+                stop_row=shard.stop_row,
+                row_count=shard.stop_row - shard.start_row,
+                start_byte=shard.start_byte,
+                end_byte=shard.end_byte
+            )
+            for number, shard in enumerate(ranges)
+        ]
+    )
+
+
+@router.post("/{dataset_id}/convert", response_model=DatasetDetailResponse, status_code=202)
+async def convert_dataset_columnar(dataset_id: str, background_tasks: BackgroundTasks, db: AsyncSession = Depends(get_db)):
+    """
+    (Re)create the columnar copy of a dataset in the background, e.g. for
+    datasets uploaded before conversion existed or after a failure.
+    
+    Args:
+        dataset_id: Dataset ID
+        background_tasks: FastAPI background tasks
+        db: Database session
+    
+    Returns:
+        Dataset details with the pending conversion
+    """
+    dataset = await _get_dataset(dataset_id, db)
+    if dataset.columnar_status == ColumnarStatus.PENDING:
+        raise HTTPException(status_code=409, detail="Conversion already in progress")
+    
+    dataset.columnar_status = ColumnarStatus.PENDING
+    await db.commit()
+    background_tasks.add_task(convert_dataset, dataset.id)
+    return _detail_response(dataset)
+
+
+@router.get("/{dataset_id}/columns", response_model=List[ColumnStatistics])
+async def get_dataset_columns(dataset_id: str, db: AsyncSession = Depends(get_db)):
+    """
+    Get per-column types, null counts and value ranges of a dataset.
+    
+    Read from the footer of the columnar copy, without scanning any rows.
+    
+    Args:
+        dataset_id: Dataset ID
+        db: Database session
+    
+    Returns:
+        Column statistics
+    """
+    dataset = await _get_dataset(dataset_id, db)
+    
+    columns = await run_in_threadpool(column_statistics, dataset)
+    if columns is None:
+        raise HTTPException(status_code=409, detail="Columnar copy is not available")
+    return columns
+
+
+def _etag_matches(if_none_match: str, etag: str) -> bool:
+    """
+    Check an If-None-Match header against an ETag.
+    
+    Args:
+        if_none_match: Header value (a list of ETags or "*")
+        etag: Current ETag
+    
+    Returns:
+        True if the client's cached copy is current
+    """
+    candidates = [tag.strip() for tag in if_none_match.split(",")]
+    return "*" in candidates or etag in candidates or f"W/{etag}" in candidates
+
+
+def _content_disposition(filename: str) -> str:
+    """
+    Build the Content-Disposition header of a download.
+    
+    Names that need no quoting are sent as is, as FileResponse does. Others
+    are sent encoded as UTF-8 per RFC 5987, with an ASCII fallback, without
+    quotes or backslashes, for clients that do not support it.
+    
+    Args:
+        filename: Name of the downloaded file
+    
+    Returns:
+        Header value
+    """
+    quoted = quote(filename, safe="")
+    if quoted == filename:
+        return f'attachment; filename="{filename}"'
+    fallback = re.sub(r'[^\x20-\x7e]|["\\]', "_", filename)
+    return f"attachment; filename=\"{fallback}\"; filename*=utf-8''{quoted}"
+
+
+def _iter_decompressed(file_path: str):
+    """Stream the uncompressed content of a stored dataset file."""
+    with open_dataset(file_path) as f:
+        while True:
+            chunk = f.read(settings.upload_chunk_size)
+            if not chunk:
+                break
+            yield chunk
 
 
 @router.get("/{dataset_id}/download")
-def download_dataset(dataset_id: str, db: Session = Depends(get_db)):
+async def download_dataset(dataset_id: str, request: Request, db: AsyncSession = Depends(get_db)):
     """
     Download a dataset file.
     
+    Supports Range and If-Range for resuming partial downloads, and
+    If-None-Match for revalidating cached copies. The ETag is the content
+    hash, so it only changes when the bytes do. The file is sent with
+    sendfile when the server supports it, or handed to the reverse proxy if
+    ``download_offload_header`` is configured.
+    
+    A file stored compressed is sent as is, with ``Content-Encoding``, to
+    clients whose ``Accept-Encoding`` includes its encoding; ranges then
+    apply to the compressed bytes. Other clients get it decompressed on the
+    fly, without range support.
+    
     Args:
         dataset_id: Dataset ID
+        request: Incoming request
         db: Database session
-        
+    
     Returns:
         File download response
     """
-    dataset = db.query(Dataset).filter(Dataset.id == dataset_id).first()
-    if not dataset:
-        raise HTTPException(status_code=404, detail="Dataset not found")
+    dataset = await _get_dataset(dataset_id, db)
     
     file_path = Path(dataset.file_path)
     if not file_path.exists():
         raise HTTPException(status_code=404, detail="File not found")
     
+    file_ext, encoding = dataset_format(dataset.file_path)
+    accepted = parse_accept_encoding(request.headers.get("accept-encoding"))
+    send_encoded = encoding is not None and (encoding in accepted or "*" in accepted)
+    
+    headers = {"Cache-Control": "private, no-cache", "Vary": "Accept-Encoding"}
+    if send_encoded:
+        headers["Content-Encoding"] = encoding
+    if dataset.content_hash:
+        # Each representation needs its own ETag
+        headers["ETag"] = f'"{dataset.content_hash}-{encoding}"' if send_encoded else f'"{dataset.content_hash}"'
+        if_none_match = request.headers.get("if-none-match")
+        if if_none_match and _etag_matches(if_none_match, headers["ETag"]):
+            return Response(status_code=304, headers=headers)
+    
+    headers["Content-Disposition"] = _content_disposition(dataset.name + file_ext)
+    if encoding and not send_encoded:
+        if dataset.size_bytes is not None:
+            headers["Content-Length"] = str(dataset.size_bytes)
+        return StreamingResponse(
+            _iter_decompressed(dataset.file_path),
+            media_type="application/octet-stream",
+            headers=headers
+        )
+    
+    offload_header = settings.download_offload_header
+    if offload_header:
+        # The proxy serves the file (including ranges) without passing it through Python
+        if offload_header.lower() == "x-accel-redirect":
+            location = settings.download_offload_prefix + file_path.relative_to(Path(settings.upload_dir)).as_posix()
+        else:
+            location = str(file_path.resolve())
+        headers[offload_header] = location
+        return Response(headers=headers, media_type="application/octet-stream")
+    
     return FileResponse(
         path=file_path,
-        filename=dataset.name + file_path.suffix,
-        media_type="application/octet-stream"
+        media_type="application/octet-stream",
+        headers=headers
+    )
+
+
+@router.delete("/{dataset_id}", status_code=204)
+async def delete_dataset(dataset_id: str, db: AsyncSession = Depends(get_db)):
+    """
+    Delete a dataset and release its stored file.
+    
+    Args:
+        dataset_id: Dataset ID
+        db: Database session
+    """
+    dataset = await _get_dataset(dataset_id, db)
+    
+    in_use = await db.scalar(select(Experiment.id).where(
+        (Experiment.training_dataset_id == dataset_id) | (Experiment.eval_dataset_id == dataset_id)
+    ).limit(1))
+    if in_use:
+        raise HTTPException(status_code=409, detail="Dataset is used by an experiment")
+    
+    file_path = dataset.file_path
+    # Finished uploads keep their record, without the link to the deleted dataset
+    await db.execute(
+        update(UploadSession).where(UploadSession.dataset_id == dataset_id).values(dataset_id=None)
     )
+    await db.delete(dataset)
+    await db.commit()
+    await run_in_threadpool(delete_file, file_path)
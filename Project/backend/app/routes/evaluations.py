@@ -1,60 +1,80 @@
 """Evaluation API routes."""
 
 from fastapi import APIRouter, Depends, HTTPException, Query
-from sqlalchemy.orm import Session
-from typing import List, Optional
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import Optional
 
 from app.database import get_db
 from app.models.evaluation import Evaluation
 from app.schemas.evaluation import EvaluationResponse, EvaluationDetailResponse
+from app.schemas.pagination import Page
+from app.services.pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE, SortOrder, paginate
 
 router = APIRouter()
 
+# Fields the evaluation list can be sorted by
+EVALUATION_SORT_FIELDS = ("created_at",)
 
-@router.get("", response_model=List[EvaluationResponse])
-def get_evaluations(
+
+@router.get("", response_model=Page[EvaluationResponse])
+async def get_evaluations(
     experiment_id: Optional[str] = Query(None, description="Filter by experiment ID"),
-    db: Session = Depends(get_db)
+    cursor: Optional[str] = Query(None, description="Cursor from the previous page"),
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE, description="Page size"),
+    sort: str = Query("created_at", description="Sort field: created_at"),
+    order: SortOrder = Query(SortOrder.DESC, description="Sort direction"),
+    db: AsyncSession = Depends(get_db)
 ):
     """
-    Get all evaluations, optionally filtered by experiment.
+    Get a page of evaluations, optionally filtered by experiment.
     
     Args:
         experiment_id: Optional filter by experiment ID
+        cursor: Cursor from the previous page
+        limit: Page size
+        sort: Sort field
+        order: Sort direction
         db: Database session
-        
+    
     Returns:
-        List of evaluations
+        Page of evaluations, with a cursor for the next page
     """
-    query = db.query(Evaluation)
+    statement = select(Evaluation)
     
     if experiment_id:
-        query = query.filter(Evaluation.experiment_id == experiment_id)
+        statement = statement.where(Evaluation.experiment_id == experiment_id)
     
-    evaluations = query.all()
-    return [
+    try:
+        evaluations, next_cursor = await paginate(
+            db, statement, Evaluation, sort, order, cursor, limit, EVALUATION_SORT_FIELDS
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    return Page(items=[
         EvaluationResponse(
             id=eval.id,
             experiment_id=eval.experiment_id,
             created_at=eval.created_at
         )
         for eval in evaluations
-    ]
+    ], next_cursor=next_cursor)
 
 
 @router.get("/{evaluation_id}", response_model=EvaluationDetailResponse)
-def get_evaluation(evaluation_id: str, db: Session = Depends(get_db)):
+async def get_evaluation(evaluation_id: str, db: AsyncSession = Depends(get_db)):
     """
     Get a specific evaluation by ID.
     
     Args:
         evaluation_id: Evaluation ID
         db: Database session
-        
+    
     Returns:
         Evaluation details
     """
-    evaluation = db.query(Evaluation).filter(Evaluation.id == evaluation_id).first()
+    evaluation = await db.get(Evaluation, evaluation_id)
     if not evaluation:
         raise HTTPException(status_code=404, detail="Evaluation not found")
     
@@ -1,49 +1,84 @@
 """Experiment API routes."""
 
-from fastapi import APIRouter, Depends, HTTPException, BackgroundTasks
-from sqlalchemy.orm import Session
-from typing import List
+import asyncio
 
-from app.database import get_db
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List, Optional
+
+from app.database import AsyncSessionLocal, get_db
 from app.models.experiment import Experiment, ExperimentStatus
+from app.models.job import Job
 from app.models.model import Model
 from app.models.dataset import Dataset
-from app.schemas.experiment import ExperimentCreate, ExperimentResponse, ExperimentDetailResponse
-from app.services.training_service import simulate_training
+from app.schemas.experiment import (
+    ExperimentCreate, ExperimentResponse, ExperimentDetailResponse, ExperimentScheduleResponse
+)
+from app.schemas.metric import (
+    MetricBucketResponse, MetricPointResponse, MetricSeriesResponse, MetricSummaryResponse
+)
+from app.schemas.pagination import Page
+from app.services.pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE, SortOrder, paginate
+from app.services.progress import format_event, progress_broker
+from app.config import settings
+from app.services.checkpoints import remove_checkpoints
+from app.services.job_queue import cancel_jobs, enqueue_job, job_cost
+from app.services.metrics_store import MAX_POINTS, DownsampleMethod, load_series, metric_summaries
+from app.services.scheduler import estimate_training, queue_status, queued_jobs
+from app.services.trainers import trainer_class, training_epochs
+from app.services.training_service import FINISHED_STATUSES, TRAINING_JOB
 
 router = APIRouter()
 
+# Fields the experiment list can be sorted by
+EXPERIMENT_SORT_FIELDS = ("created_at", "name")
+
 
 @router.post("", response_model=ExperimentResponse, status_code=201)
 async def create_experiment(
     experiment_data: ExperimentCreate,
-    background_tasks: BackgroundTasks,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """
-    Create a new experiment (training job).
+    Create a new experiment and queue its training job, which a worker
+    (``python -m app.worker``) picks up.
     
     Args:
         experiment_data: Experiment creation data
-        background_tasks: FastAPI background tasks
         db: Database session
-        
+    
     Returns:
         Created experiment
+    
+    Raises:
+        HTTPException: 400 if the training config names an unknown trainer,
+            503 if ``scheduler_max_queued`` jobs are already waiting
     """
+    try:
+        trainer_class(experiment_data.training_config)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    if settings.scheduler_max_queued is not None:
+        if await queued_jobs(db, TRAINING_JOB) >= settings.scheduler_max_queued:
+            raise HTTPException(status_code=503, detail="Training queue is full, try again later")
+    
     # Validate base model exists
-    base_model = db.query(Model).filter(Model.id == experiment_data.base_model_id).first()
+    base_model = await db.get(Model, experiment_data.base_model_id)
     if not base_model:
         raise HTTPException(status_code=404, detail="Base model not found")
     
     # Validate training dataset exists
-    training_dataset = db.query(Dataset).filter(Dataset.id == experiment_data.training_dataset_id).first()
+    training_dataset = await db.get(Dataset, experiment_data.training_dataset_id)
     if not training_dataset:
         raise HTTPException(status_code=404, detail="Training dataset not found")
     
     # Validate eval dataset if provided
     if experiment_data.eval_dataset_id:
-        eval_dataset = db.query(Dataset).filter(Dataset.id == experiment_data.eval_dataset_id).first()
+        eval_dataset = await db.get(Dataset, experiment_data.eval_dataset_id)
         if not eval_dataset:
             raise HTTPException(status_code=404, detail="Evaluation dataset not found")
     
@@ -60,11 +95,19 @@ async def create_experiment(
     )
     
     db.add(experiment)
-    db.commit()
-    db.refresh(experiment)
+    await db.flush()  # Get the ID
     
-    # Start training simulation in background
-    background_tasks.add_task(simulate_training, experiment.id)
+    # Queue training in the same transaction, so every experiment gets its job
+    estimate = estimate_training(
+        base_model.parameters_count, training_dataset.row_count, training_epochs(experiment_data.training_config)
+    )
+    enqueue_job(
+        db, TRAINING_JOB, {"experiment_id": experiment.id},
+        priority=experiment_data.priority, experiment_id=experiment.id,
+        cost=estimate.cost, work=estimate.work
+    )
+    await db.commit()
+    await db.refresh(experiment)
     
     return ExperimentResponse(
         id=experiment.id,
@@ -76,19 +119,54 @@ async def create_experiment(
     )
 
 
-@router.get("", response_model=List[ExperimentResponse])
-def get_experiments(db: Session = Depends(get_db)):
+@router.get("", response_model=Page[ExperimentResponse])
+async def get_experiments(
+    status: Optional[str] = Query(None, description="Filter by status"),
+    base_model_id: Optional[str] = Query(None, description="Filter by base model ID"),
+    training_dataset_id: Optional[str] = Query(None, description="Filter by training dataset ID"),
+    cursor: Optional[str] = Query(None, description="Cursor from the previous page"),
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE, description="Page size"),
+    sort: str = Query("created_at", description="Sort field: created_at, name"),
+    order: SortOrder = Query(SortOrder.DESC, description="Sort direction"),
+    db: AsyncSession = Depends(get_db)
+):
     """
-    Get all experiments.
+    Get a page of experiments, optionally filtered.
     
     Args:
+        status: Optional filter by status
+        base_model_id: Optional filter by base model ID
+        training_dataset_id: Optional filter by training dataset ID
+        cursor: Cursor from the previous page
+        limit: Page size
+        sort: Sort field
+        order: Sort direction
         db: Database session
-        
+    
     Returns:
-        List of experiments
+        Page of experiments, with a cursor for the next page
     """
-    experiments = db.query(Experiment).all()
-    return [
+    statement = select(Experiment)
+    
+    if status:
+        try:
+            statement = statement.where(Experiment.status == ExperimentStatus(status.lower()))
+        except ValueError:
+            statuses = ", ".join(f"'{s.value}'" for s in ExperimentStatus)
+            raise HTTPException(status_code=400, detail=f"status must be one of {statuses}")
+    if base_model_id:
+        statement = statement.where(Experiment.base_model_id == base_model_id)
+    if training_dataset_id:
+        statement = statement.where(Experiment.training_dataset_id == training_dataset_id)
+    
+    try:
+        experiments, next_cursor = await paginate(
+            db, statement, Experiment, sort, order, cursor, limit, EXPERIMENT_SORT_FIELDS
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    return Page(items=[
         ExperimentResponse(
             id=exp.id,
             name=exp.name,
@@ -98,22 +176,22 @@ def get_experiments(db: Session = Depends(get_db)):
             created_at=exp.created_at
         )
         for exp in experiments
-    ]
+    ], next_cursor=next_cursor)
 
 
 @router.get("/{experiment_id}", response_model=ExperimentDetailResponse)
-def get_experiment(experiment_id: str, db: Session = Depends(get_db)):
+async def get_experiment(experiment_id: str, db: AsyncSession = Depends(get_db)):
     """
     Get a specific experiment by ID.
     
     Args:
         experiment_id: Experiment ID
         db: Database session
-        
+    
     Returns:
         Experiment details
     """
-    experiment = db.query(Experiment).filter(Experiment.id == experiment_id).first()
+    experiment = await db.get(Experiment, experiment_id)
     if not experiment:
         raise HTTPException(status_code=404, detail="Experiment not found")
     
@@ -128,5 +206,205 @@ def get_experiment(experiment_id: str, db: Session = Depends(get_db)):
         status=experiment.status.value,
         training_config=experiment.training_config,
         resulting_model_id=experiment.resulting_model_id,
+        progress=experiment.progress,
+        checkpoint=experiment.checkpoint,
+        created_at=experiment.created_at
+    )
+
+
+@router.post("/{experiment_id}/cancel", response_model=ExperimentResponse)
+async def cancel_experiment(experiment_id: str, db: AsyncSession = Depends(get_db)):
+    """
+    Cancel an experiment. A queued training job never starts, and a running
+    one frees its scheduler slots at once and is stopped by its worker.
+    Checkpoints of its training are deleted.
+    
+    Args:
+        experiment_id: Experiment ID
+        db: Database session
+    
+    Returns:
+        Cancelled experiment
+    
+    Raises:
+        HTTPException: 409 if the experiment has already finished
+    """
+    experiment = await db.get(Experiment, experiment_id)
+    if not experiment:
+        raise HTTPException(status_code=404, detail="Experiment not found")
+    if experiment.status in FINISHED_STATUSES:
+        raise HTTPException(status_code=409, detail=f"Experiment is already {experiment.status.value}")
+    
+    experiment.status = ExperimentStatus.CANCELLED
+    experiment.checkpoint = None
+    await cancel_jobs(db, experiment.id)
+    await db.commit()
+    await run_in_threadpool(remove_checkpoints, experiment.id)
+    
+    return ExperimentResponse(
+        id=experiment.id,
+        name=experiment.name,
+        status=experiment.status.value,
+        base_model_id=experiment.base_model_id,
+        training_dataset_id=experiment.training_dataset_id,
         created_at=experiment.created_at
     )
+
+
+@router.get("/{experiment_id}/schedule", response_model=ExperimentScheduleResponse)
+async def get_experiment_schedule(experiment_id: str, db: AsyncSession = Depends(get_db)):
+    """
+    Get the scheduling state of an experiment's training job: its queue
+    position, the scheduler's capacity and its estimated start and finish.
+    
+    Args:
+        experiment_id: Experiment ID
+        db: Database session
+    
+    Returns:
+        Scheduling state of the experiment's latest training job
+    """
+    experiment = await db.get(Experiment, experiment_id)
+    if not experiment:
+        raise HTTPException(status_code=404, detail="Experiment not found")
+    
+    job = await db.scalar(
+        select(Job)
+        .where(Job.experiment_id == experiment.id, Job.kind == TRAINING_JOB)
+        .order_by(Job.created_at.desc(), Job.id.desc())
+        .limit(1)
+    )
+    if not job:
+        raise HTTPException(status_code=404, detail="Experiment has no training job")
+    
+    queue = await queue_status(db, job)
+    return ExperimentScheduleResponse(
+        experiment_id=experiment.id,
+        job_id=job.id,
+        job_status=job.status.value,
+        priority=job.priority,
+        cost=job_cost(job.cost),
+        attempts=job.attempts,
+        queue_position=queue.position,
+        capacity=queue.capacity,
+        capacity_in_use=queue.capacity_in_use,
+        estimated_start_at=queue.estimated_start,
+        estimated_finish_at=queue.estimated_finish
+    )
+
+
+@router.get("/{experiment_id}/events")
+async def stream_experiment_events(experiment_id: str):
+    """
+    Stream an experiment's training progress as Server-Sent Events.
+    
+    Each ``progress`` event carries the experiment's status and its latest
+    epoch's progress (loss, throughput, ETA). The current state is sent
+    first, then every change; the stream ends once the experiment finishes.
+    
+    Args:
+        experiment_id: Experiment ID
+    
+    Returns:
+        ``text/event-stream`` response
+    """
+    # The stream outlives the request, so it does not hold a session
+    async with AsyncSessionLocal() as db:
+        experiment = await db.get(Experiment, experiment_id)
+    if not experiment:
+        raise HTTPException(status_code=404, detail="Experiment not found")
+    finished = {status.value for status in FINISHED_STATUSES}
+    
+    async def events():
+        async with progress_broker.subscribe(experiment.id) as queue:
+            while True:
+                try:
+                    event = await asyncio.wait_for(queue.get(), timeout=settings.progress_heartbeat_interval)
+                except asyncio.TimeoutError:
+                    yield ": keep-alive\n\n"  # Keeps proxies from closing an idle stream
+                    continue
+                yield format_event(event)
+                if event["status"] in finished:
+                    return
+    
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
+@router.get("/{experiment_id}/metrics", response_model=List[MetricSummaryResponse])
+async def get_experiment_metrics(experiment_id: str, db: AsyncSession = Depends(get_db)):
+    """
+    List the per-step metrics recorded for an experiment.
+    
+    Args:
+        experiment_id: Experiment ID
+        db: Database session
+    
+    Returns:
+        Each metric with its number of values and step range
+    """
+    experiment = await db.get(Experiment, experiment_id)
+    if not experiment:
+        raise HTTPException(status_code=404, detail="Experiment not found")
+    
+    return [MetricSummaryResponse(**summary._asdict()) for summary in await metric_summaries(db, experiment.id)]
+
+
+@router.get("/{experiment_id}/metrics/{metric}", response_model=MetricSeriesResponse)
+async def get_experiment_metric_series(
+    experiment_id: str,
+    metric: str,
+    points: int = Query(1000, ge=3, le=MAX_POINTS, description="Points or buckets to return, at most"),
+    method: DownsampleMethod = Query(DownsampleMethod.LTTB, description="Downsampling: lttb or minmax"),
+    start_step: Optional[int] = Query(None, ge=0, description="First step of the range"),
+    end_step: Optional[int] = Query(None, ge=0, description="Last step of the range"),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Get a metric's curve, downsampled on the server for charting.
+    
+    ``lttb`` returns points that keep the curve's shape; ``minmax`` returns
+    buckets with their min, max and mean, so no spike is lost.
+    
+    Args:
+        experiment_id: Experiment ID
+        metric: Metric name, e.g. train_loss
+        points: Points or buckets to return, at most
+        method: Downsampling method
+        start_step: First step of the range
+        end_step: Last step of the range
+        db: Database session
+    
+    Returns:
+        Downsampled curve
+    """
+    experiment = await db.get(Experiment, experiment_id)
+    if not experiment:
+        raise HTTPException(status_code=404, detail="Experiment not found")
+    
+    try:
+        series = await load_series(db, experiment.id, metric, points, method, start_step, end_step)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    return MetricSeriesResponse(
+        experiment_id=experiment.id,
+        metric=metric,
+        method=method.value,
+        resolution=series.resolution,
+        points=[MetricPointResponse(step=step, value=value) for step, value in series.points],
+        buckets=[
+            MetricBucketResponse(
+                first_step=bucket.first_step,
+                last_step=bucket.last_step,
+                count=bucket.count,
+                min=bucket.min_value,
+                max=bucket.max_value,
+                mean=bucket.sum_value / bucket.count
+            )
+            for bucket in series.buckets
+        ]
+    )
@@ -1,44 +1,70 @@
 """Model API routes."""
 
 from fastapi import APIRouter, Depends, HTTPException, Query
-from sqlalchemy.orm import Session
-from typing import List, Optional
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import Optional
 
 from app.database import get_db
 from app.models.model import Model, ModelType
 from app.models.evaluation import Evaluation
 from app.models.experiment import Experiment
 from app.schemas.model import ModelResponse, ModelDetailResponse
+from app.schemas.pagination import Page
+from app.services.pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE, SortOrder, paginate
 
 router = APIRouter()
 
+# Fields the model list can be sorted by
+MODEL_SORT_FIELDS = ("created_at", "name")
 
-@router.get("", response_model=List[ModelResponse])
-def get_models(
+
+@router.get("", response_model=Page[ModelResponse])
+async def get_models(
     model_type: Optional[str] = Query(None, description="Filter by model type: 'base' or 'fine_tuned'"),
-    db: Session = Depends(get_db)
+    base_model_id: Optional[str] = Query(None, description="Filter by base model ID"),
+    is_latest_version: Optional[bool] = Query(None, description="Filter by whether the model is the latest version"),
+    cursor: Optional[str] = Query(None, description="Cursor from the previous page"),
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE, description="Page size"),
+    sort: str = Query("created_at", description="Sort field: created_at, name"),
+    order: SortOrder = Query(SortOrder.DESC, description="Sort direction"),
+    db: AsyncSession = Depends(get_db)
 ):
     """
-    Get all models, optionally filtered by type.
+    Get a page of models, optionally filtered.
     
     Args:
         model_type: Optional filter by model type
+        base_model_id: Optional filter by base model ID
+        is_latest_version: Optional filter by latest-version flag
+        cursor: Cursor from the previous page
+        limit: Page size
+        sort: Sort field
+        order: Sort direction
         db: Database session
-        
+    
     Returns:
-        List of models
+        Page of models, with a cursor for the next page
     """
-    query = db.query(Model)
+    statement = select(Model)
     
     if model_type:
         try:
             model_type_enum = ModelType(model_type.lower())
-            query = query.filter(Model.model_type == model_type_enum)
+            statement = statement.where(Model.model_type == model_type_enum)
         except ValueError:
             raise HTTPException(status_code=400, detail="model_type must be 'base' or 'fine_tuned'")
+    if base_model_id:
+        statement = statement.where(Model.base_model_id == base_model_id)
+    if is_latest_version is not None:
+        statement = statement.where(Model.is_latest_version == is_latest_version)
+    
+    try:
+        models, next_cursor = await paginate(db, statement, Model, sort, order, cursor, limit, MODEL_SORT_FIELDS)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     
-    models = query.all()
-    return [
+    return Page(items=[
         ModelResponse(
             id=m.id,
             name=m.name,
@@ -50,34 +76,32 @@ def get_models(
             is_latest_version=m.is_latest_version
         )
         for m in models
-    ]
+    ], next_cursor=next_cursor)
 
 
 @router.get("/{model_id}", response_model=ModelDetailResponse)
-def get_model(model_id: str, db: Session = Depends(get_db)):
+async def get_model(model_id: str, db: AsyncSession = Depends(get_db)):
     """
     Get a specific model by ID.
     
     Args:
         model_id: Model ID
         db: Database session
-        
+    
     Returns:
         Model details
     """
-    model = db.query(Model).filter(Model.id == model_id).first()
+    model = await db.get(Model, model_id)
     if not model:
         raise HTTPException(status_code=404, detail="Model not found")
     
     # Get linked evaluations (evaluations for experiments that used this model as resulting model)
-    experiments_with_model = db.query(Experiment).filter(
-        Experiment.resulting_model_id == model_id
-    ).all()
-    
-    linked_evaluations = []
-    for exp in experiments_with_model:
-        evals = db.query(Evaluation).filter(Evaluation.experiment_id == exp.id).all()
-        linked_evaluations.extend([e.id for e in evals])
+    linked_evaluations = list(await db.scalars(
+        select(Evaluation.id)
+        .join(Experiment, Evaluation.experiment_id == Experiment.id)
+        .where(Experiment.resulting_model_id == model_id)
+        .order_by(Evaluation.created_at, Evaluation.id)
+    ))
     
     linked_evaluations = linked_evaluations if linked_evaluations else None
     
@@ -0,0 +1,254 @@
+"""Chunked dataset upload API routes."""
+
+import uuid
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, Header, Request
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import settings
+from app.database import get_db
+from app.models.dataset import Dataset, DatasetType, ColumnarStatus
+from app.models.upload_session import UploadSession, UploadStatus
+from app.schemas.dataset import DatasetResponse
+from app.schemas.upload import UploadSessionCreate, UploadSessionResponse, UploadPartResponse
+from app.services.columnar_service import convert_dataset
+from app.services.compression import is_supported
+from app.services.storage_service import validate_file_type, delete_file, ALLOWED_EXTENSIONS
+from app.services.upload_service import list_parts, save_part, assemble_upload, discard_upload
+
+router = APIRouter()
+
+
+async def _session_response(session: UploadSession) -> UploadSessionResponse:
+    """Build the response for an upload session, including received parts."""
+    parts = await run_in_threadpool(list_parts, session.id) if session.status == UploadStatus.PENDING else {}
+    return UploadSessionResponse(
+        upload_id=session.id,
+        status=session.status.value,
+        filename=session.filename,
+        total_size=session.total_size,
+        part_size=session.part_size,
+        total_parts=session.total_parts,
+        received_parts=[
+            UploadPartResponse(part_number=n, sha256=sha256, size=size)
+            for n, (sha256, size) in sorted(parts.items())
+        ],
+        dataset_id=session.dataset_id,
+        created_at=session.created_at
+    )
+
+
+async def _get_session(upload_id: str, db: AsyncSession) -> UploadSession:
+    """Load an upload session or raise 404."""
+    session = await db.get(UploadSession, upload_id)
+    if not session:
+        raise HTTPException(status_code=404, detail="Upload not found")
+    return session
+
+
+@router.post("", response_model=UploadSessionResponse, status_code=201)
+async def create_upload(upload_data: UploadSessionCreate, db: AsyncSession = Depends(get_db)):
+    """
+    Start a chunked upload.
+    
+    Args:
+        upload_data: Upload metadata
+        db: Database session
+    
+    Returns:
+        Upload session with the part size to use
+    """
+    try:
+        dataset_type_enum = DatasetType(upload_data.dataset_type.lower())
+    except ValueError:
+        raise HTTPException(status_code=400, detail="dataset_type must be 'training' or 'evaluation'")
+    
+    if not validate_file_type(upload_data.filename):
+        raise HTTPException(status_code=400, detail=f"Invalid file type. Allowed: {', '.join(ALLOWED_EXTENSIONS)}")
+    if upload_data.total_size <= 0:
+        raise HTTPException(status_code=400, detail="total_size must be positive")
+    
+    part_size = upload_data.part_size or settings.upload_part_size
+    if not 0 < part_size <= settings.upload_max_part_size:
+        raise HTTPException(status_code=400, detail=f"part_size must be between 1 and {settings.upload_max_part_size}")
+    if (upload_data.total_size + part_size - 1) // part_size > settings.upload_max_parts:
+        raise HTTPException(status_code=400, detail=f"Upload would need more than {settings.upload_max_parts} parts")
+    
+    session = UploadSession(
+        name=upload_data.name,
+        description=upload_data.description,
+        dataset_type=dataset_type_enum,
+        filename=upload_data.filename,
+        total_size=upload_data.total_size,
+        part_size=part_size,
+        content_hash=upload_data.content_sha256.lower() if upload_data.content_sha256 else None,
+        status=UploadStatus.PENDING
+    )
+    db.add(session)
+    await db.commit()
+    await db.refresh(session)
+    
+    return await _session_response(session)
+
+
+@router.get("/{upload_id}", response_model=UploadSessionResponse)
+async def get_upload(upload_id: str, db: AsyncSession = Depends(get_db)):
+    """
+    Get an upload session and the parts received so far, for resuming.
+    
+    Args:
+        upload_id: Upload session ID
+        db: Database session
+    
+    Returns:
+        Upload session
+    """
+    return await _session_response(await _get_session(upload_id, db))
+
+
+@router.put("/{upload_id}/parts/{part_number}", response_model=UploadPartResponse)
+async def upload_part(
+    upload_id: str,
+    part_number: int,
+    request: Request,
+    x_part_sha256: str = Header(..., description="SHA-256 of the uncompressed part, hex encoded"),
+    content_encoding: str = Header(None, description="gzip or zstd if the body is compressed"),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Upload one part as the raw request body. Parts may be sent in parallel
+    and in any order; re-sending a part replaces it. The body may be
+    compressed with gzip or zstd, declared with ``Content-Encoding``.
+    
+    Args:
+        upload_id: Upload session ID
+        part_number: 1-based part number
+        request: Request whose body is the part content
+        x_part_sha256: Checksum of the part
+        content_encoding: Encoding of the body
+        db: Database session
+    
+    Returns:
+        Received part
+    """
+    encoding = content_encoding.strip().lower() if content_encoding else None
+    if encoding == "identity":
+        encoding = None
+    if encoding and not is_supported(encoding):
+        raise HTTPException(status_code=415, detail=f"Unsupported Content-Encoding: {content_encoding}")
+    
+    session = await _get_session(upload_id, db)
+    if session.status != UploadStatus.PENDING:
+        raise HTTPException(status_code=409, detail=f"Upload is {session.status.value}")
+    if not 1 <= part_number <= session.total_parts:
+        raise HTTPException(status_code=400, detail=f"part_number must be between 1 and {session.total_parts}")
+    expected_size = session.expected_part_size(part_number)
+    await db.close()  # Do not hold a connection while the body streams in
+    
+    try:
+        sha256, size = await save_part(
+            upload_id, part_number, request.stream(), expected_size, x_part_sha256, encoding
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    return UploadPartResponse(part_number=part_number, sha256=sha256, size=size)
+
+
+@router.post("/{upload_id}/complete", response_model=DatasetResponse, status_code=201)
+async def complete_upload(upload_id: str, background_tasks: BackgroundTasks, db: AsyncSession = Depends(get_db)):
+    """
+    Assemble the uploaded parts and create the dataset. A columnar copy is
+    created in the background afterwards.
+    
+    Args:
+        upload_id: Upload session ID
+        background_tasks: FastAPI background tasks
+        db: Database session
+    
+    Returns:
+        Created dataset
+    """
+    session = await _get_session(upload_id, db)
+    
+    # Claim the session so concurrent complete calls cannot assemble twice
+    claimed = (await db.execute(
+        update(UploadSession)
+        .where(UploadSession.id == upload_id, UploadSession.status == UploadStatus.PENDING)
+        .values(status=UploadStatus.ASSEMBLING)
+        .execution_options(synchronize_session=False)
+    )).rowcount
+    await db.commit()
+    await db.refresh(session)
+    if not claimed:
+        raise HTTPException(status_code=409, detail=f"Upload is {session.status.value}")
+    
+    # Assemble before inserting the dataset, so no write transaction is held meanwhile
+    dataset_id = str(uuid.uuid4())
+    try:
+        stored = await run_in_threadpool(
+            assemble_upload, session.id, session.total_parts, session.filename, dataset_id
+        )
+    except Exception as e:
+        # The staged parts are kept, so the upload can be completed again
+        session.status = UploadStatus.PENDING
+        await db.commit()
+        if isinstance(e, ValueError):
+            raise HTTPException(status_code=400, detail=str(e))
+        raise
+    
+    if session.content_hash and stored.content_hash != session.content_hash:
+        await run_in_threadpool(delete_file, stored.file_path)
+        session.status = UploadStatus.ABORTED
+        await db.commit()
+        raise HTTPException(status_code=400, detail="Checksum mismatch for the assembled file")
+    
+    dataset = Dataset(
+        id=dataset_id,
+        name=session.name,
+        description=session.description,
+        dataset_type=session.dataset_type,
+        file_path=stored.file_path,
+        row_count=stored.row_count,
+        content_hash=stored.content_hash,
+        size_bytes=stored.size_bytes,
+        schema_summary=stored.schema_summary,
+        columnar_status=ColumnarStatus.PENDING
+    )
+    db.add(dataset)
+    session.status = UploadStatus.COMPLETED
+    session.dataset_id = dataset.id
+    await db.commit()
+    await db.refresh(dataset)
+    background_tasks.add_task(convert_dataset, dataset.id)
+    
+    return DatasetResponse(
+        id=dataset.id,
+        name=dataset.name,
+        description=dataset.description,
+        dataset_type=dataset.dataset_type.value,
+        row_count=dataset.row_count,
+        size_bytes=dataset.size_bytes,
+        content_hash=dataset.content_hash,
+        upload_date=dataset.created_at.isoformat() if dataset.created_at else None,
+        created_at=dataset.created_at
+    )
+
+
+@router.delete("/{upload_id}", status_code=204)
+async def abort_upload(upload_id: str, db: AsyncSession = Depends(get_db)):
+    """
+    Abort an upload and delete its staged parts.
+    
+    Args:
+        upload_id: Upload session ID
+        db: Database session
+    """
+    session = await _get_session(upload_id, db)
+    if session.status == UploadStatus.COMPLETED:
+        raise HTTPException(status_code=409, detail="Upload is already completed")
+    
+    session.status = UploadStatus.ABORTED
+    await db.commit()
+    await run_in_threadpool(discard_upload, upload_id)
@@ -1,7 +1,7 @@
 """Dataset Pydantic schemas."""
 
 from pydantic import BaseModel
-from typing import Optional
+from typing import Optional, Dict, Any, List
 from datetime import datetime
 
 
@@ -12,6 +12,8 @@ class DatasetResponse(BaseModel):
     description: Optional[str] = None
     dataset_type: str
     row_count: Optional[int] = None
+    size_bytes: Optional[int] = None
+    content_hash: Optional[str] = None
     upload_date: Optional[str] = None
     created_at: Optional[datetime] = None
     
@@ -19,6 +21,48 @@ class DatasetResponse(BaseModel):
         from_attributes = True
 
 
+class DatasetDetailResponse(DatasetResponse):
+    """Dataset detail response schema."""
+    schema_summary: Optional[Dict[str, Any]] = None
+    columnar_status: Optional[str] = None
+
+
+class ColumnStatistics(BaseModel):
+    """Per-column statistics from a dataset's columnar copy."""
+    name: str
+    type: str
+    null_count: int
+    min: Optional[Any] = None
+    max: Optional[Any] = None
+
+
+class DatasetRowsResponse(BaseModel):
+    """A page of dataset rows."""
+    dataset_id: str
+    offset: int
+    limit: int
+    total_rows: Optional[int] = None
+    rows: List[Dict[str, Any]]
+
+
+class DatasetShard(BaseModel):
+    """A contiguous run of dataset rows and the bytes that hold them."""
+    shard: int
+    start_row: int
+    stop_row: int
+    row_count: int
+    start_byte: int
+    end_byte: int
+
+
+class DatasetShardsResponse(BaseModel):
+    """A dataset split into shards."""
+    dataset_id: str
+    total_rows: int
+    data_start_byte: int
+    shards: List[DatasetShard]
+
+
 class DatasetCreate(BaseModel):
     """Dataset creation schema."""
     name: str
@@ -14,6 +14,7 @@ class ExperimentCreate(BaseModel):
     training_dataset_id: str
     eval_dataset_id: Optional[str] = None
     training_config: Dict[str, Any]
+    priority: int = 0  # Training jobs with a higher priority are run first
 
 
 class ExperimentResponse(BaseModel):
@@ -41,7 +42,24 @@ class ExperimentDetailResponse(BaseModel):
     status: str
     training_config: Dict[str, Any]
     resulting_model_id: Optional[str] = None
+    progress: Optional[Dict[str, Any]] = None  # Latest epoch: loss, throughput and ETA
+    checkpoint: Optional[Dict[str, Any]] = None  # Last checkpoint of a running job: epoch, step and losses
     created_at: Optional[datetime] = None
     
     class Config:
         from_attributes = True
+
+
+class ExperimentScheduleResponse(BaseModel):
+    """Scheduling state of an experiment's training job."""
+    experiment_id: str
+    job_id: str
+    job_status: str
+    priority: int
+    cost: int  # Scheduler slots the job holds while it runs
+    attempts: int
+    queue_position: Optional[int] = None  # 1 for the next job to start; only while queued
+    capacity: int
+    capacity_in_use: int
+    estimated_start_at: Optional[datetime] = None
+    estimated_finish_at: Optional[datetime] = None
@@ -0,0 +1,38 @@
+"""Training metric Pydantic schemas."""
+
+from pydantic import BaseModel
+from typing import List
+
+
+class MetricSummaryResponse(BaseModel):
+    """A metric recorded for an experiment."""
+    metric: str
+    count: int
+    first_step: int
+    last_step: int
+
+
+class MetricPointResponse(BaseModel):
+    """A metric's value at a step."""
+    step: int
+    value: float
+
+
+class MetricBucketResponse(BaseModel):
+    """A metric's values over a range of steps."""
+    first_step: int
+    last_step: int
+    count: int
+    min: float
+    max: float
+    mean: float
+
+
+class MetricSeriesResponse(BaseModel):
+    """A metric's curve, downsampled."""
+    experiment_id: str
+    metric: str
+    method: str
+    resolution: int  # Steps per row read: 1 for raw values, else the rollup bucket width
+    points: List[MetricPointResponse] = []  # lttb
+    buckets: List[MetricBucketResponse] = []  # minmax
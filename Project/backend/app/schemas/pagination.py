@@ -0,0 +1,12 @@
+"""Pagination Pydantic schemas."""
+
+from pydantic import BaseModel
+from typing import Generic, List, Optional, TypeVar
+
+T = TypeVar("T")
+
+
+class Page(BaseModel, Generic[T]):
+    """A page of a list endpoint's results."""
+    items: List[T]
+    next_cursor: Optional[str] = None  # Pass as ``cursor`` to get the next page
@@ -0,0 +1,36 @@
+"""Chunked upload Pydantic schemas."""
+
+from pydantic import BaseModel
+from typing import Optional, List
+from datetime import datetime
+
+
+class UploadSessionCreate(BaseModel):
+    """Upload session creation schema."""
+    name: str
+    description: Optional[str] = None
+    dataset_type: str
+    filename: str
+    total_size: int
+    part_size: Optional[int] = None
+    content_sha256: Optional[str] = None
+
+
+class UploadPartResponse(BaseModel):
+    """Received part schema."""
+    part_number: int
+    size: int
+    sha256: str
+
+
+class UploadSessionResponse(BaseModel):
+    """Upload session response schema."""
+    upload_id: str
+    status: str
+    filename: str
+    total_size: int
+    part_size: int
+    total_parts: int
+    received_parts: List[UploadPartResponse] = []
+    dataset_id: Optional[str] = None
+    created_at: Optional[datetime] = None
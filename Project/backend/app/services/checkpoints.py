@@ -0,0 +1,129 @@
+"""Checkpoints of training jobs, from which a restarted job resumes."""
+
+import json
+import os
+import shutil
+import sys
+import uuid
+import zlib
+from array import array
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+from app.config import settings
+
+# Subdirectory of upload_dir holding a directory of checkpoints per experiment
+CHECKPOINTS_DIR = "checkpoints"
+
+# First line of a checkpoint file, with the version of its format
+CHECKPOINT_MAGIC = b"SLM-CHECKPOINT 1\n"
+
+
+def checkpoint_dir(experiment_id: str) -> Path:
+    """Directory of an experiment's checkpoints."""
+    return Path(settings.upload_dir) / CHECKPOINTS_DIR / experiment_id
+
+
+def save_checkpoint(experiment_id: str, name: str, state: Dict[str, Any]) -> None:
+    """
+    Write a trainer's state to a checkpoint file.
+    
+    The file is written under a temporary name, synced to disk and then
+    renamed, so a crash never leaves a partially written checkpoint. It
+    holds a JSON header with the state's values, followed by the raw bytes
+    of its arrays, and a checksum of them.
+    
+    Args:
+        experiment_id: Experiment ID
+        name: File name of the checkpoint
+        state: State from ``Trainer.state_dict``; arrays and memoryviews
+            are stored as raw bytes, everything else as JSON
+    """
+    directory = checkpoint_dir(experiment_id)
+    directory.mkdir(parents=True, exist_ok=True)
+    values: Dict[str, Any] = {}
+    arrays: Dict[str, memoryview] = {}
+    for key, value in state.items():
+        if isinstance(value, (array, memoryview)):
+            arrays[key] = memoryview(value)
+        else:
+            values[key] = value
+    checksum = 0
+    for view in arrays.values():
+        checksum = zlib.crc32(view, checksum)
+    header = {
+        "byteorder": sys.byteorder,
+        "values": values,
+        "arrays": [[key, view.format, view.nbytes // view.itemsize] for key, view in arrays.items()],
+        "crc32": checksum,
+    }
+    
+    path = directory / name
+    temp_path = path.with_name(f"{path.name}.{uuid.uuid4().hex}.tmp")
+    try:
+        with open(temp_path, "wb") as f:
+            f.write(CHECKPOINT_MAGIC)
+            f.write(json.dumps(header).encode("utf-8") + b"\n")
+            for view in arrays.values():
+                f.write(view)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temp_path, path)
+    finally:
+        temp_path.unlink(missing_ok=True)
+
+
+def load_checkpoint(experiment_id: str, name: str) -> Dict[str, Any]:
+    """
+    Read a trainer's state from a checkpoint file.
+    
+    Args:
+        experiment_id: Experiment ID
+        name: File name of the checkpoint
+    
+    Returns:
+        State for ``Trainer.load_state_dict``, with its arrays as ``array``
+    
+    Raises:
+        OSError: If the file cannot be read
+        ValueError: If it is not a checkpoint, or is damaged
+    """
+    with open(checkpoint_dir(experiment_id) / name, "rb") as f:
+        if f.readline() != CHECKPOINT_MAGIC:
+            raise ValueError(f"{name} is not a checkpoint")
+        header = json.loads(f.readline())
+        if header["byteorder"] != sys.byteorder:
+            raise ValueError(f"{name} was written on a {header['byteorder']}-endian machine")
+        state = dict(header["values"])
+        checksum = 0
+        for key, typecode, length in header["arrays"]:
+            values = array(typecode)
+            try:
+                values.fromfile(f, length)
+            except EOFError:
+                raise ValueError(f"{name} is truncated")
+            checksum = zlib.crc32(values, checksum)
+            state[key] = values
+    if checksum != header["crc32"]:
+        raise ValueError(f"{name} is damaged: checksum mismatch")
+    return state
+
+
+def remove_checkpoints(experiment_id: str, keep: Optional[str] = None) -> None:
+    """
+    Delete an experiment's checkpoints, with any left over by interrupted
+    writes.
+    
+    Args:
+        experiment_id: Experiment ID
+        keep: File name of a checkpoint to keep; all are deleted if None
+    """
+    directory = checkpoint_dir(experiment_id)
+    if keep is None:
+        shutil.rmtree(directory, ignore_errors=True)
+        return
+    if not directory.exists():
+        return
+    for path in directory.iterdir():
+        if path.name != keep:
+            path.unlink(missing_ok=True)
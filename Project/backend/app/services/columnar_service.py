@@ -0,0 +1,355 @@
+"""Columnar (Parquet) conversion and reading of dataset files."""
+
+import json
+import os
+import uuid
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # Columnar copies are optional
+    pa = None
+
+from app.config import settings
+from app.database import SessionLocal
+from app.models.dataset import Dataset, ColumnarStatus
+from app.services.profiling_service import VALUE_COLUMN
+from app.services.storage_service import iter_dataset_rows, sidecar_path, dataset_format, read_rows
+
+
+# Suffix of the Parquet sidecar stored next to a dataset's file
+COLUMNAR_SUFFIX = ".parquet"
+
+# Parquet metadata key listing the columns stored as JSON text
+JSON_COLUMNS_KEY = b"json_columns"
+
+def is_available() -> bool:
+    """Check whether pyarrow is installed."""
+    return pa is not None
+
+
+def _arrow_type(types: Sequence[str]):
+    """
+    Map the JSON types seen in a column to an Arrow type.
+    
+    Args:
+        types: Type names from the schema summary
+    
+    Returns:
+        Arrow type, or None if values must be stored as JSON text
+    """
+    kinds = set(types)
+    if not kinds or kinds == {"string"}:
+        return pa.string()
+    if kinds == {"boolean"}:
+        return pa.bool_()
+    if kinds == {"integer"}:
+        return pa.int64()
+    if kinds <= {"integer", "number"}:
+        return pa.float64()
+    return None
+
+
+def build_schema(schema_summary: Dict[str, Any]) -> Tuple["pa.Schema", List[str]]:
+    """
+    Build the Arrow schema for a dataset from its schema summary.
+    
+    Columns with arrays, objects or mixed types are stored as JSON text and
+    listed in the schema metadata.
+    
+    Args:
+        schema_summary: Schema summary recorded at upload
+    
+    Returns:
+        Tuple of (Arrow schema, names of JSON text columns)
+    """
+    fields = []
+    json_columns = []
+    for column in schema_summary["columns"]:
+        arrow_type = _arrow_type(column["types"])
+        if arrow_type is None:
+            json_columns.append(column["name"])
+            arrow_type = pa.string()
+        fields.append(pa.field(column["name"], arrow_type))
+    metadata = {JSON_COLUMNS_KEY: json.dumps(json_columns).encode("utf-8")}
+    return pa.schema(fields, metadata=metadata), json_columns
+
+
+def _iter_batches(file_path: str, schema: "pa.Schema", json_columns: List[str]) -> Iterator["pa.RecordBatch"]:
+    """
+    Parse a dataset file into record batches of one row group each.
+    
+    Args:
+        file_path: Path to the dataset file
+        schema: Arrow schema of the dataset
+        json_columns: Columns to store as JSON text
+    
+    Yields:
+        Record batches
+    """
+    names = schema.names
+    json_set = set(json_columns)
+    rows = []
+    
+    def to_batch() -> "pa.RecordBatch":
+        arrays = []
+        for field in schema:
+            if field.name in json_set:
+                values = [
+                    None if row.get(field.name) is None else json.dumps(row[field.name])
+                    for row in rows
+                ]
+            elif pa.types.is_string(field.type):
+                values = [row.get(field.name) for row in rows]
+            else:
+                # Empty strings are nulls to the profiler, which typed the column without them
+                values = [None if row.get(field.name) == "" else row.get(field.name) for row in rows]
+            arrays.append(pa.array(values, type=field.type))
+        return pa.RecordBatch.from_arrays(arrays, names=names)
+    
+    for row in iter_dataset_rows(file_path):
+        rows.append(row if isinstance(row, dict) else {VALUE_COLUMN: row})
+        if len(rows) >= settings.columnar_row_group_size:
+            yield to_batch()
+            rows = []
+    if rows:
+        yield to_batch()
+
+
+def convert_file(file_path: str, schema_summary: Dict[str, Any]) -> str:
+    """
+    Write the Parquet sidecar of a dataset file.
+    
+    The dataset is streamed one row group at a time, so memory is bounded by
+    the row group size. Content that was already converted for another
+    dataset is not converted again.
+    
+    Args:
+        file_path: Path to the dataset file
+        schema_summary: Schema summary recorded at upload
+    
+    Returns:
+        Path to the Parquet file
+    """
+    target = sidecar_path(file_path, COLUMNAR_SUFFIX)
+    if target.exists():
+        return str(target)
+    
+    schema, json_columns = build_schema(schema_summary)
+    temp_path = target.with_name(f"{target.name}.{uuid.uuid4().hex}.tmp")
+    try:
+        with pq.ParquetWriter(temp_path, schema, compression="zstd") as writer:
+            for batch in _iter_batches(file_path, schema, json_columns):
+                writer.write_batch(batch)
+        os.replace(temp_path, target)
+    finally:
+        temp_path.unlink(missing_ok=True)
+    
+    if not os.path.exists(file_path):
+        # The dataset was deleted meanwhile; do not leave an orphan behind
+        target.unlink(missing_ok=True)
+    return str(target)
+
+
+def _convertible(dataset: Dataset) -> bool:
+    """Check whether a dataset can be converted to Parquet."""
+    summary = dataset.schema_summary or {}
+    return (
+        is_available()
+        and settings.columnar_conversion
+        and dataset.row_count is not None
+        and bool(summary.get("columns"))
+        and not summary.get("truncated")  # Columns beyond the profile limit would be lost
+    )
+
+
+def convert_dataset(dataset_id: str) -> None:
+    """
+    Convert a dataset to Parquet and record the result on the dataset.
+    
+    Meant to run as a background task after the upload has been stored.
+    
+    Args:
+        dataset_id: Dataset ID
+    """
+    db = SessionLocal()
+    try:
+        dataset = db.query(Dataset).filter(Dataset.id == dataset_id).first()
+        if not dataset:
+            return
+        if not _convertible(dataset):
+            values = {Dataset.columnar_status: ColumnarStatus.SKIPPED, Dataset.columnar_path: None}
+        else:
+            file_path, schema_summary = dataset.file_path, dataset.schema_summary
+            db.rollback()  # Do not hold a transaction while converting
+            try:
+                columnar_path = convert_file(file_path, schema_summary)
+                values = {Dataset.columnar_status: ColumnarStatus.READY, Dataset.columnar_path: columnar_path}
+            except Exception as e:
+                print(f"Columnar conversion error: {e}")
+                values = {Dataset.columnar_status: ColumnarStatus.FAILED, Dataset.columnar_path: None}
+        
+        # A bulk update is a no-op if the dataset was deleted meanwhile
+        db.query(Dataset).filter(Dataset.id == dataset_id).update(values, synchronize_session=False)
+        db.commit()
+    finally:
+        db.close()
+
+
+def columnar_file(dataset: Dataset) -> Optional[str]:
+    """
+    Get the Parquet copy of a dataset, if it is ready.
+    
+    Args:
+        dataset: Dataset
+    
+    Returns:
+        Path to the Parquet file, or None
+    """
+    if not is_available() or dataset.columnar_status != ColumnarStatus.READY:
+        return None
+    if not dataset.columnar_path or not os.path.exists(dataset.columnar_path):
+        return None
+    return dataset.columnar_path
+
+
+def _json_columns(schema: "pa.Schema") -> List[str]:
+    """Get the JSON text columns recorded in a Parquet schema."""
+    metadata = schema.metadata or {}
+    return json.loads(metadata.get(JSON_COLUMNS_KEY, b"[]"))
+
+
+def _decode_json_columns(rows: List[Dict[str, Any]], json_columns: List[str]) -> List[Dict[str, Any]]:
+    """Parse the values of JSON text columns in rows read from Parquet."""
+    for name in json_columns:
+        for row in rows:
+            if row.get(name) is not None:
+                row[name] = json.loads(row[name])
+    return rows
+
+
+def _read_columnar_page(path: str, offset: int, limit: int, columns: Optional[List[str]]) -> List[Dict[str, Any]]:
+    """
+    Read a page of rows from a Parquet file, decoding only the row groups
+    that overlap it.
+    
+    Args:
+        path: Parquet file
+        offset: Index of the first row
+        limit: Maximum number of rows
+        columns: Columns to return, or None for all
+    
+    Returns:
+        Rows as dicts
+    """
+    parquet_file = pq.ParquetFile(path)
+    metadata = parquet_file.metadata
+    groups = []
+    first_row = None
+    row = 0
+    for group in range(metadata.num_row_groups):
+        size = metadata.row_group(group).num_rows
+        if row + size > offset and row < offset + limit:
+            groups.append(group)
+            if first_row is None:
+                first_row = row
+        row += size
+    if not groups:
+        return []
+    
+    table = parquet_file.read_row_groups(groups, columns=columns)
+    rows = table.slice(offset - first_row, limit).to_pylist()
+    return _decode_json_columns(rows, _json_columns(parquet_file.schema_arrow))
+
+
+def read_page(
+    dataset: Dataset,
+    offset: int,
+    limit: int,
+    columns: Optional[List[str]] = None
+) -> List[Dict[str, Any]]:
+    """
+    Read a page of rows from whichever copy of a dataset gives the cheapest
+    random access.
+    
+    An uncompressed file is read through its row index with a single seek.
+    A compressed file cannot seek, so the Parquet copy is used when ready.
+    
+    Args:
+        dataset: Dataset
+        offset: Index of the first row
+        limit: Maximum number of rows
+        columns: Columns to return, or None for all
+    
+    Returns:
+        Rows as dicts; non-object rows are returned under ``value``
+    
+    Raises:
+        ValueError: If a column is unknown
+    """
+    if columns is not None and dataset.schema_summary:
+        known = {column["name"] for column in dataset.schema_summary.get("columns", [])}
+        unknown = [name for name in columns if name not in known]
+        if unknown:
+            raise ValueError(f"Unknown columns: {', '.join(unknown)}")
+    
+    path = columnar_file(dataset)
+    if path is not None and dataset_format(dataset.file_path)[1] is not None:
+        return _read_columnar_page(path, offset, limit, columns)
+    
+    rows = []
+    for row in read_rows(dataset.file_path, offset, limit):
+        if not isinstance(row, dict):
+            row = {VALUE_COLUMN: row}
+        if columns is not None:
+            row = {name: row.get(name) for name in columns}
+        else:
+            row.pop(None, None)  # Extra CSV fields without a header
+        rows.append(row)
+    return rows
+
+
+def column_statistics(dataset: Dataset) -> Optional[List[Dict[str, Any]]]:
+    """
+    Get per-column statistics from the Parquet footer, without reading rows.
+    
+    Args:
+        dataset: Dataset
+    
+    Returns:
+        One entry per column with its type, null count and, for numeric and
+        boolean columns, min and max. None if there is no Parquet copy.
+    """
+    path = columnar_file(dataset)
+    if path is None:
+        return None
+    
+    parquet_file = pq.ParquetFile(path)
+    schema = parquet_file.schema_arrow
+    json_columns = set(_json_columns(schema))
+    metadata = parquet_file.metadata
+    
+    columns = []
+    for index, field in enumerate(schema):
+        has_range = pa.types.is_integer(field.type) or pa.types.is_floating(field.type) or pa.types.is_boolean(field.type)
+        null_count = 0
+        minimum = maximum = None
+        for row_group in range(metadata.num_row_groups):
+            stats = metadata.row_group(row_group).column(index).statistics
+            if stats is None:
+                continue
+            null_count += stats.null_count or 0
+            if has_range and stats.has_min_max:
+                minimum = stats.min if minimum is None else min(minimum, stats.min)
+                maximum = stats.max if maximum is None else max(maximum, stats.max)
+        if isinstance(minimum, float):
+            minimum += 0.0  # Parquet writes -0.0 as the minimum of zeros
+        columns.append({
+            "name": field.name,
+            "type": "json" if field.name in json_columns else str(field.type),
+            "null_count": null_count,
+            "min": minimum,
+            "max": maximum,
+        })
+    return columns
@@ -0,0 +1,277 @@
+"""Compression codecs for dataset storage and transfer."""
+
+import gzip
+import io
+import zlib
+from typing import BinaryIO, Dict, Optional, Tuple
+
+try:
+    import zstandard
+except ImportError:  # zstd support is optional
+    zstandard = None
+
+
+# Content-Encoding name -> filename suffix
+ENCODING_SUFFIXES: Dict[str, str] = {
+    "gzip": ".gz",
+    "zstd": ".zst",
+}
+
+# Compressed bytes fed to a decoder per read
+_READ_SIZE = 64 * 1024
+
+# Decompressed bytes a reader holds at once, however well its input compresses
+_READ_OUTPUT_LIMIT = _READ_SIZE * 16
+
+# Compressed bytes fed to the zstd decoder at a time when its output is
+# limited; zstd expands a byte to 32 KiB at most, so a step yields 2 MiB at most
+_ZSTD_LIMITED_STEP = 64
+
+
+class DecompressionError(ValueError):
+    """Raised when compressed data is corrupt or truncated."""
+
+
+def is_supported(encoding: str) -> bool:
+    """
+    Check whether an encoding can be used in this environment.
+    
+    Args:
+        encoding: Content-Encoding name
+    
+    Returns:
+        True if the codec is available
+    """
+    if encoding == "zstd":
+        return zstandard is not None
+    return encoding in ENCODING_SUFFIXES
+
+
+def _require(encoding: str) -> None:
+    """Raise if an encoding cannot be used."""
+    if encoding not in ENCODING_SUFFIXES:
+        raise ValueError(f"Unsupported encoding: {encoding}")
+    if not is_supported(encoding):
+        raise RuntimeError(f"The {encoding} encoding requires the zstandard package")
+
+
+def split_encoding(filename: str) -> Tuple[str, Optional[str]]:
+    """
+    Split a compression suffix off a filename.
+    
+    Args:
+        filename: Filename, e.g. ``data.jsonl.gz``
+    
+    Returns:
+        Tuple of (filename without the suffix, encoding or None)
+    """
+    lower = filename.lower()
+    for encoding, suffix in ENCODING_SUFFIXES.items():
+        if lower.endswith(suffix):
+            return filename[:-len(suffix)], encoding
+    return filename, None
+
+
+def open_writer(fileobj: BinaryIO, encoding: str, level: Optional[int] = None) -> BinaryIO:
+    """
+    Wrap a binary file so that written data is compressed.
+    
+    Closing the returned writer finishes the compressed stream but leaves
+    ``fileobj`` open.
+    
+    Args:
+        fileobj: Destination file
+        encoding: Content-Encoding name
+        level: Compression level, or None for the codec default
+    
+    Returns:
+        Writable binary stream
+    """
+    _require(encoding)
+    if encoding == "zstd":
+        compressor = zstandard.ZstdCompressor(level=3 if level is None else level)
+        return compressor.stream_writer(fileobj, closefd=False)
+    return gzip.GzipFile(
+        filename="", fileobj=fileobj, mode="wb", compresslevel=6 if level is None else level, mtime=0
+    )
+
+
+class _GzipDecoder:
+    """Incremental gzip decoder that handles multi-member streams."""
+    
+    def __init__(self):
+        self._decoder = zlib.decompressobj(wbits=16 + zlib.MAX_WBITS)
+        self._unconsumed = b""  # Input left over when the output limit was reached
+    
+    @property
+    def needs_input(self) -> bool:
+        return not self._unconsumed
+    
+    def decompress(self, data: bytes, max_length: Optional[int] = None) -> bytes:
+        if self._unconsumed:
+            data = self._unconsumed + data
+            self._unconsumed = b""
+        output, produced = [], 0
+        while data:
+            if max_length is not None and produced >= max_length:
+                self._unconsumed = data
+                break
+            try:
+                chunk = self._decoder.decompress(data, 0 if max_length is None else max_length - produced)
+            except zlib.error as e:
+                raise DecompressionError(f"Invalid gzip stream: {e}")
+            output.append(chunk)
+            produced += len(chunk)
+            if not self._decoder.eof:
+                data = self._decoder.unconsumed_tail
+                continue
+            data = self._decoder.unused_data
+            if data:
+                self._decoder = zlib.decompressobj(wbits=16 + zlib.MAX_WBITS)
+        return b"".join(output)
+    
+    def flush(self) -> bytes:
+        # Output still held by zlib after its input ran out at the limit
+        try:
+            output = self._decoder.flush()
+        except zlib.error as e:
+            raise DecompressionError(f"Invalid gzip stream: {e}")
+        if not self._decoder.eof:
+            raise DecompressionError("Truncated gzip stream")
+        return output
+
+
+class _ZstdDecoder:
+    """Incremental zstd decoder that handles multi-frame streams."""
+    
+    def __init__(self):
+        self._decoder = zstandard.ZstdDecompressor().decompressobj()
+        self._unconsumed = b""  # Input left over when the output limit was reached
+        self._output = b""  # Output of the last step beyond the limit
+    
+    @property
+    def needs_input(self) -> bool:
+        return not self._unconsumed and not self._output
+    
+    def decompress(self, data: bytes, max_length: Optional[int] = None) -> bytes:
+        if self._unconsumed:
+            data = self._unconsumed + data
+            self._unconsumed = b""
+        output, produced = [self._output], len(self._output)
+        self._output = b""
+        
+        # The decoder has no output limit, so limited input is fed in small steps
+        step = max(len(data), 1) if max_length is None else _ZSTD_LIMITED_STEP
+        start = 0
+        while start < len(data) and (max_length is None or produced < max_length):
+            piece = data[start:start + step]
+            start += step
+            while piece:
+                try:
+                    chunk = self._decoder.decompress(piece)
+                except zstandard.ZstdError as e:
+                    raise DecompressionError(f"Invalid zstd stream: {e}")
+                output.append(chunk)
+                produced += len(chunk)
+                piece = self._decoder.unused_data if self._decoder.eof else b""
+                if piece:
+                    self._decoder = zstandard.ZstdDecompressor().decompressobj()
+        self._unconsumed = data[start:]
+        
+        output = b"".join(output)
+        if max_length is not None and len(output) > max_length:
+            self._output = output[max_length:]
+            output = output[:max_length]
+        return output
+    
+    def flush(self) -> bytes:
+        if not self._decoder.eof:
+            raise DecompressionError("Truncated zstd stream")
+        return b""
+
+
+def make_decoder(encoding: str):
+    """
+    Create an incremental decoder for chunks of an encoded stream.
+    
+    Args:
+        encoding: Content-Encoding name
+    
+    Returns:
+        Object with ``decompress(chunk, max_length=None)`` and ``flush()``
+        methods. With ``max_length``, ``decompress`` returns that many bytes
+        at most, holding no more than a few MiB beyond them in memory, and
+        keeps the input it has not decoded yet: ``needs_input`` is False
+        until a next call (with an empty chunk) has decoded it.
+    """
+    _require(encoding)
+    if encoding == "zstd":
+        return _ZstdDecoder()
+    return _GzipDecoder()
+
+
+class _DecodingReader(io.RawIOBase):
+    """Read-only raw stream that decompresses another stream."""
+    
+    def __init__(self, fileobj: BinaryIO, decoder):
+        self._fileobj = fileobj
+        self._decoder = decoder
+        self._buffer = b""
+        self._offset = 0
+        self._eof = False
+    
+    def readable(self) -> bool:
+        return True
+    
+    def readinto(self, buffer) -> int:
+        while self._offset >= len(self._buffer):
+            if self._eof:
+                return 0
+            chunk = self._fileobj.read(_READ_SIZE) if self._decoder.needs_input else b""
+            if chunk or not self._decoder.needs_input:
+                # Bounded, so a small input cannot expand without limit in memory
+                self._buffer = self._decoder.decompress(chunk, max_length=_READ_OUTPUT_LIMIT)
+            else:
+                self._buffer = self._decoder.flush()
+                self._eof = True
+            self._offset = 0
+        size = min(len(buffer), len(self._buffer) - self._offset)
+        buffer[:size] = self._buffer[self._offset:self._offset + size]
+        self._offset += size
+        return size
+
+
+def open_reader(fileobj: BinaryIO, encoding: str) -> BinaryIO:
+    """
+    Wrap a binary file so that reads return decompressed data.
+    
+    Corrupt or truncated input raises DecompressionError from ``read``.
+    
+    Args:
+        fileobj: Compressed source
+        encoding: Content-Encoding name
+    
+    Returns:
+        Readable binary stream
+    """
+    return io.BufferedReader(_DecodingReader(fileobj, make_decoder(encoding)))
+
+
+def parse_accept_encoding(header: Optional[str]) -> set:
+    """
+    Get the encodings a client accepts from an Accept-Encoding header.
+    
+    Args:
+        header: Header value
+    
+    Returns:
+        Set of accepted encoding names (q=0 entries excluded)
+    """
+    accepted = set()
+    for item in (header or "").split(","):
+        name, _, params = item.strip().partition(";")
+        params = params.replace(" ", "")
+        if not name or params in ("q=0", "q=0.0", "q=0.00", "q=0.000"):
+            continue
+        accepted.add(name.strip().lower())
+    return accepted
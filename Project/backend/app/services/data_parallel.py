@@ -0,0 +1,294 @@
+"""Data-parallel training of a trainer across processes."""
+
+import math
+import multiprocessing
+import os
+import threading
+from array import array
+from multiprocessing.connection import Connection, wait
+from typing import Any, Dict, List, Optional, Sequence, Tuple, Type
+
+from app.config import settings
+from app.services.trainers import EpochResult, Trainer, int_option, trainer_class
+
+# Seconds between checks for a stop while the processes train
+STOP_POLL_INTERVAL = 0.1
+
+# Values a communicator slot holds at least, for all_reduce
+MIN_SLOT_SIZE = 16
+
+
+def _view(buffer: Any, typecode: str) -> memoryview:
+    """View a shared ``RawArray`` as an array of ``typecode``."""
+    return memoryview(buffer).cast("B").cast(typecode)
+
+
+class Communicator:
+    """
+    Collective operations between the processes of a data-parallel trainer,
+    over shared memory.
+    
+    Each process (rank) has a slot of ``slot_size`` doubles that it writes
+    and the others read, with every process waiting at a barrier in between.
+    """
+    
+    def __init__(self, world_size: int, slot_size: int, context: Any):
+        """
+        Args:
+            world_size: Processes
+            slot_size: Doubles each process can publish at a time
+            context: Multiprocessing context the processes are started with
+        """
+        self.world_size = world_size
+        self.slot_size = max(slot_size, MIN_SLOT_SIZE)
+        self.rank = 0
+        self._slots = context.RawArray("d", world_size * self.slot_size)
+        self._barrier = context.Barrier(world_size)
+        self._view: Optional[memoryview] = None
+    
+    def __getstate__(self) -> Dict[str, Any]:
+        return {**self.__dict__, "_view": None}
+    
+    def slot(self, rank: int) -> memoryview:
+        """
+        Get the slot of a process.
+        
+        Args:
+            rank: Rank of the process
+        
+        Returns:
+            View of its doubles
+        """
+        if self._view is None:
+            self._view = _view(self._slots, "d")
+        return self._view[rank * self.slot_size:(rank + 1) * self.slot_size]
+    
+    def wait(self) -> None:
+        """Wait until every process gets here."""
+        self._barrier.wait()
+    
+    def all_reduce(self, values: Sequence[float]) -> List[float]:
+        """
+        Sum values over the processes; every process must call it.
+        
+        Args:
+            values: This process's values
+        
+        Returns:
+            Sum of each value
+        """
+        self.slot(self.rank)[:len(values)] = array("d", values)
+        self.wait()
+        totals = [0.0] * len(values)
+        for rank in range(self.world_size):
+            totals = [a + b for a, b in zip(totals, self.slot(rank)[:len(values)].tolist())]
+        self.wait()  # Everyone has read the slots before they are written again
+        return totals
+
+
+def _serve(
+    trainer_cls: Type[Trainer],
+    args: Tuple[Any, ...],
+    buffers: Dict[str, Tuple[str, Any]],
+    communicator: Communicator,
+    rank: int,
+    connection: Connection
+) -> None:
+    """Training process: run the trainer's epochs, evaluation and checkpoints on request."""
+    communicator.rank = rank
+    trainer = trainer_cls(*args)
+    trainer.attach({name: _view(buffer, typecode) for name, (typecode, buffer) in buffers.items()}, communicator)
+    stop = threading.Event()  # Never set: the processes are terminated to stop them
+    commands = {
+        "train_epoch": lambda epoch: trainer.train_epoch(epoch, stop),
+        "evaluate": trainer.evaluate,
+        # The shared arrays are read and written by the job's process
+        "state_dict": lambda: {name: value for name, value in trainer.state_dict().items() if name not in buffers},
+        "load_state_dict": trainer.load_state_dict,
+    }
+    while True:
+        try:
+            command, *arguments = connection.recv()
+        except EOFError:
+            return  # The job's process is gone
+        try:
+            result = ("ok", commands[command](*arguments))
+        except Exception as e:
+            result = ("error", e)
+        try:
+            connection.send(result)
+        except Exception as e:  # An error that cannot be pickled
+            connection.send(("error", RuntimeError(f"{type(e).__name__}: {e}")))
+
+
+class DataParallelTrainer(Trainer):
+    """
+    Trains with ``num_workers`` processes, each running the trainer on one
+    shard of the dataset.
+    
+    The trainer's state from ``shared_buffers`` is allocated in shared
+    memory, where every process, and the trainer's instance in this
+    process, works on the same copy. The processes exchange gradients and
+    metrics through a ``Communicator``, so each one reports the results of
+    all of them. They are started with the first epoch, or when resuming
+    from a checkpoint, kept for the following epochs and the evaluation,
+    and terminated once training stops or is stopped.
+    """
+    
+    def __init__(self, trainer_cls: Type[Trainer], num_workers: int, *args: Any):
+        """
+        Args:
+            trainer_cls: Trainer to run, with ``data_parallel`` set
+            num_workers: Processes
+            *args: Arguments of the trainer
+        """
+        super().__init__(*args)
+        self.trainer = trainer_cls(*args)
+        self.num_workers = num_workers
+        self._trainer_cls = trainer_cls
+        self._args = args
+        self._processes: List[multiprocessing.Process] = []
+        # Kept while the processes use them: they are freed with the last reference
+        self._buffers: Dict[str, Tuple[str, Any]] = {}
+        self._communicator: Optional[Communicator] = None
+        self._connections: List[Connection] = []
+    
+    @property
+    def architecture(self) -> str:
+        return self.trainer.architecture
+    
+    @property
+    def start_delay(self) -> float:
+        return self.trainer.start_delay
+    
+    @property
+    def parameters_count(self) -> int:
+        return self.trainer.parameters_count
+    
+    def _start(self) -> None:
+        # Spawned, not forked: the job's process runs threads and an event loop
+        context = multiprocessing.get_context("spawn")
+        self._buffers = buffers = {
+            name: (typecode, context.RawArray(typecode, length))
+            for name, (typecode, length) in self.trainer.shared_buffers().items()
+        }
+        self.trainer.attach({name: _view(buffer, typecode) for name, (typecode, buffer) in buffers.items()})
+        self._communicator = communicator = Communicator(self.num_workers, self.trainer.exchange_size(), context)
+        for rank in range(self.num_workers):
+            connection, child_connection = context.Pipe()
+            process = context.Process(
+                target=_serve,
+                args=(self._trainer_cls, self._args, buffers, communicator, rank, child_connection),
+                name=f"trainer-{rank}",
+                daemon=True
+            )
+            process.start()
+            child_connection.close()
+            self._processes.append(process)
+            self._connections.append(connection)
+    
+    def _run(self, stop: threading.Event, command: str, *arguments: Any) -> Any:
+        """
+        Run a command in every process.
+        
+        Args:
+            stop: Terminates the processes when set
+            command: Command of ``_serve``
+            *arguments: Its arguments
+        
+        Returns:
+            Result of the first process, or None if stopped
+        
+        Raises:
+            Exception: The error of a process
+        """
+        if not self._processes:
+            self._start()
+        pending = {connection: rank for rank, connection in enumerate(self._connections)}
+        results: Dict[int, Any] = {}
+        try:
+            for connection in pending:
+                connection.send((command, *arguments))
+            while pending:
+                if stop.is_set():
+                    self.close()
+                    return None
+                for connection in wait(list(pending), timeout=STOP_POLL_INTERVAL):
+                    status, value = connection.recv()
+                    if status == "error":
+                        self.close()  # The others may wait for it forever
+                        raise value
+                    results[pending.pop(connection)] = value
+        except (EOFError, OSError, ValueError):
+            if stop.is_set():
+                return None  # Closed while stopping
+            self.close()
+            raise RuntimeError("A training process exited unexpectedly")
+        return results[0]
+    
+    def train_epoch(self, epoch: int, stop: threading.Event) -> EpochResult:
+        result = self._run(stop, "train_epoch", epoch)
+        if result is None:
+            return EpochResult(math.nan, None, [], 0, 0.0)  # Discarded by the caller
+        return result
+    
+    def evaluate(self) -> Dict[str, float]:
+        return self._run(threading.Event(), "evaluate")
+    
+    def state_dict(self) -> Dict[str, Any]:
+        # Shared arrays from the instance in this process, the rest from the processes
+        state = self.trainer.state_dict()
+        if self._processes:
+            state.update(self._run(threading.Event(), "state_dict"))
+        return state
+    
+    def load_state_dict(self, state: Dict[str, Any]) -> None:
+        if not self._processes:
+            self._start()
+        self.trainer.load_state_dict(state)  # Into shared memory
+        shared = self.trainer.shared_buffers()
+        self._run(threading.Event(), "load_state_dict", {
+            name: value for name, value in state.items() if name not in shared
+        })
+    
+    def close(self) -> None:
+        # Idle or not, the processes hold nothing that the shared state needs
+        processes, self._processes = self._processes, []
+        connections, self._connections = self._connections, []
+        for process in processes:
+            process.terminate()
+        for process in processes:
+            process.join()
+        for connection in connections:
+            connection.close()
+
+
+def create_trainer(
+    training_config: Dict[str, Any],
+    train_path: Optional[str],
+    eval_path: Optional[str] = None,
+    row_count: int = 0
+) -> Trainer:
+    """
+    Create the trainer a training config asks for, running in
+    ``num_workers`` processes if it is more than one and the trainer
+    supports it.
+    
+    Args:
+        training_config: Experiment training config
+        train_path: Stored file of the training dataset
+        eval_path: Stored file of the evaluation dataset, if any
+        row_count: Rows of the training dataset
+    
+    Returns:
+        Trainer
+    
+    Raises:
+        ValueError: If the trainer is unknown
+    """
+    trainer_cls = trainer_class(training_config)
+    max_workers = settings.training_max_workers or os.cpu_count() or 1
+    num_workers = min(int_option(training_config, "num_workers", 1), max_workers)
+    if num_workers > 1 and trainer_cls.data_parallel:
+        return DataParallelTrainer(trainer_cls, num_workers, training_config, train_path, eval_path, row_count)
+    return trainer_cls(training_config, train_path, eval_path, row_count)
@@ -0,0 +1,376 @@
+"""Persistent job queue, stored in the database and run by ``app.worker``."""
+
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, Optional, Sequence
+
+from sqlalchemy import and_, func, literal, or_, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import settings
+from app.models.job import Job, JobStatus
+
+# Times a worker retries claiming when another worker takes the same job first
+CLAIM_RETRIES = 5
+
+# PostgreSQL advisory lock held while claiming, so capacity checks do not race
+CLAIM_LOCK_KEY = 0x534C4E
+
+# Longest error message kept on a job
+MAX_ERROR_LENGTH = 2000
+
+
+class JobFailed(Exception):
+    """Raised by a job handler for a failure that retrying cannot fix: the job fails at once."""
+
+
+def utcnow() -> datetime:
+    """Current time, in UTC. Queue timestamps are always written from Python."""
+    return datetime.now(timezone.utc)
+
+
+def retry_delay(attempts: int) -> float:
+    """
+    Get how long a failed job waits before it is run again.
+    
+    Args:
+        attempts: Attempts made so far
+    
+    Returns:
+        Delay in seconds, doubling with each attempt up to the configured maximum
+    """
+    return min(settings.job_retry_backoff * 2 ** max(attempts - 1, 0), settings.job_retry_backoff_max)
+
+
+def enqueue_job(
+    db: AsyncSession,
+    kind: str,
+    payload: Dict[str, Any],
+    priority: int = 0,
+    experiment_id: Optional[str] = None,
+    max_attempts: Optional[int] = None,
+    cost: int = 1,
+    work: Optional[float] = None
+) -> Job:
+    """
+    Add a job to the queue.
+    
+    The job is only added to the session, so it is committed together with
+    the caller's other changes: it exists if and only if they do.
+    
+    Args:
+        db: Database session
+        kind: Job kind, which selects the worker's handler
+        payload: JSON arguments for the handler
+        priority: Higher priorities are claimed first
+        experiment_id: Experiment the job works on, if any
+        max_attempts: Attempts before the job fails for good (default: ``job_max_attempts``)
+        cost: Scheduler slots the job holds while it runs
+        work: Estimated amount of work, used to estimate run times
+    
+    Returns:
+        Queued job
+    """
+    job = Job(
+        kind=kind,
+        payload=payload,
+        priority=priority,
+        experiment_id=experiment_id,
+        status=JobStatus.QUEUED,
+        attempts=0,
+        max_attempts=max_attempts or settings.job_max_attempts,
+        cost=cost,
+        work=work,
+        created_at=utcnow()  # Orders the queue, finer than the database clock
+    )
+    db.add(job)
+    return job
+
+
+def job_cost(cost: Optional[int]) -> int:
+    """
+    Get the slots a job holds while it runs.
+    
+    Args:
+        cost: Cost recorded on the job
+    
+    Returns:
+        The cost, between 1 and ``scheduler_capacity``, so a job larger than
+        the whole capacity still runs, alone
+    """
+    return min(max(cost or 1, 1), settings.scheduler_capacity)
+
+
+def _running(now: datetime):
+    """Running jobs whose worker still holds the lease."""
+    return and_(Job.status == JobStatus.RUNNING, Job.lease_expires_at >= now)
+
+
+def _capacity_in_use(now: datetime):
+    return select(func.coalesce(func.sum(func.coalesce(Job.cost, 1)), 0)).where(_running(now))
+
+
+async def capacity_in_use(db: AsyncSession) -> int:
+    """
+    Get the scheduler slots held by running jobs, across all workers.
+    
+    Args:
+        db: Database session
+    
+    Returns:
+        Slots in use
+    """
+    return int(await db.scalar(_capacity_in_use(utcnow())))
+
+
+def _claimable(now: datetime):
+    """Queued jobs that are due, and running jobs whose worker lost its lease."""
+    return or_(
+        and_(Job.status == JobStatus.QUEUED, or_(Job.run_after.is_(None), Job.run_after <= now)),
+        and_(Job.status == JobStatus.RUNNING, Job.lease_expires_at < now)
+    )
+
+
+async def _preempt(db: AsyncSession, priority: int, needed: int, now: datetime) -> bool:
+    """
+    Put running jobs of a lower priority back in the queue until they free
+    enough slots: the lowest priority first, then the latest started, which
+    loses the least work. Nothing is preempted if they cannot free enough.
+    """
+    candidates = (await db.execute(
+        select(Job.id, Job.cost)
+        .where(_running(now), Job.priority < priority)
+        .order_by(Job.priority, Job.started_at.desc())
+    )).all()
+    preempted, freed = [], 0
+    for candidate in candidates:
+        if freed >= needed:
+            break
+        preempted.append(candidate.id)
+        freed += job_cost(candidate.cost)
+    if freed < needed:
+        return False
+    
+    # Their workers notice the lost lease and stop them; the attempt is not counted
+    await db.execute(
+        update(Job)
+        .where(Job.id.in_(preempted), _running(now))
+        .values(status=JobStatus.QUEUED, attempts=Job.attempts - 1, lease_owner=None, lease_expires_at=None)
+        .execution_options(synchronize_session=False)
+    )
+    return True
+
+
+async def claim_job(db: AsyncSession, worker_id: str, kinds: Sequence[str]) -> Optional[Job]:
+    """
+    Lease the next job to a worker: the highest priority, then the oldest.
+    
+    The next job is only started once the slots held by running jobs leave
+    room for its cost. Jobs behind it wait too, even if they would fit, so a
+    stream of small jobs cannot keep a large one waiting forever. With
+    ``scheduler_preemption``, running jobs of a lower priority are put back
+    in the queue to make room for it.
+    
+    The job is taken with a conditional update, which also rechecks the
+    capacity, so when several workers race for it exactly one wins. On
+    PostgreSQL, claims take turns on an advisory lock, since concurrent
+    updates would each check the capacity without seeing the others.
+    
+    Args:
+        db: Database session
+        worker_id: Worker taking the job
+        kinds: Job kinds the worker can run
+    
+    Returns:
+        Claimed job, with its attempt counted, or None if none is due or
+        there is no room for the next one
+    """
+    for _ in range(CLAIM_RETRIES):
+        now = utcnow()
+        if db.bind.dialect.name == "postgresql":
+            await db.execute(select(func.pg_advisory_xact_lock(CLAIM_LOCK_KEY)))
+        head = (await db.execute(
+            select(Job.id, Job.cost, Job.priority)
+            .where(Job.kind.in_(kinds), _claimable(now))
+            .order_by(Job.priority.desc(), Job.created_at, Job.id)
+            .limit(1)
+        )).first()
+        if head is None:
+            await db.rollback()
+            return None
+        cost = job_cost(head.cost)
+        free = settings.scheduler_capacity - await db.scalar(_capacity_in_use(now))
+        if cost > free and not (
+            settings.scheduler_preemption and await _preempt(db, head.priority, cost - free, now)
+        ):
+            await db.rollback()
+            return None
+        
+        claimed = (await db.execute(
+            update(Job)
+            .where(
+                Job.id == head.id,
+                _claimable(now),
+                _capacity_in_use(now).correlate(None).scalar_subquery() + literal(cost) <= settings.scheduler_capacity
+            )
+            .values(
+                status=JobStatus.RUNNING,
+                attempts=Job.attempts + 1,
+                lease_owner=worker_id,
+                lease_expires_at=now + timedelta(seconds=settings.job_lease_seconds),
+                started_at=now
+            )
+            .execution_options(synchronize_session=False)
+        )).rowcount
+        await db.commit()
+        if claimed:
+            return await db.get(Job, head.id, populate_existing=True)
+    return None
+
+
+async def _set_leased(db: AsyncSession, job_id: str, worker_id: str, **values) -> bool:
+    """Update a job only while the worker still holds its lease, without committing."""
+    return bool((await db.execute(
+        update(Job)
+        .where(Job.id == job_id, Job.status == JobStatus.RUNNING, Job.lease_owner == worker_id)
+        .values(**values)
+        .execution_options(synchronize_session=False)
+    )).rowcount)
+
+
+async def _update_leased(db: AsyncSession, job_id: str, worker_id: str, **values) -> bool:
+    """Update a job only while the worker still holds its lease."""
+    updated = await _set_leased(db, job_id, worker_id, **values)
+    await db.commit()
+    return updated
+
+
+async def check_lease(db: AsyncSession, job_id: str, worker_id: str) -> Optional[JobStatus]:
+    """
+    Check whether a worker may keep running a job.
+    
+    Args:
+        db: Database session
+        job_id: Job ID
+        worker_id: Worker running the job
+    
+    Returns:
+        None while the worker holds the lease; otherwise the job's status,
+        e.g. CANCELLED, or QUEUED if it was preempted
+    """
+    job = (await db.execute(select(Job.status, Job.lease_owner).where(Job.id == job_id))).first()
+    if job is None:
+        return JobStatus.CANCELLED
+    if job.status == JobStatus.RUNNING and job.lease_owner == worker_id:
+        return None
+    return job.status
+
+
+async def renew_lease(db: AsyncSession, job_id: str, worker_id: str) -> bool:
+    """
+    Extend a running job's lease.
+    
+    Args:
+        db: Database session
+        job_id: Job ID
+        worker_id: Worker running the job
+    
+    Returns:
+        False if the worker no longer holds the lease and must stop the job
+    """
+    expires_at = utcnow() + timedelta(seconds=settings.job_lease_seconds)
+    return await _update_leased(db, job_id, worker_id, lease_expires_at=expires_at)
+
+
+async def complete_job(db: AsyncSession, job_id: str, worker_id: str) -> bool:
+    """
+    Mark a job as succeeded.
+    
+    Args:
+        db: Database session
+        job_id: Job ID
+        worker_id: Worker that ran the job
+    
+    Returns:
+        False if the worker had lost the lease
+    """
+    return await _update_leased(
+        db, job_id, worker_id,
+        status=JobStatus.SUCCEEDED, finished_at=utcnow(), lease_owner=None, lease_expires_at=None
+    )
+
+
+async def fail_job(
+    db: AsyncSession,
+    job: Job,
+    worker_id: str,
+    error: str,
+    retry: bool = True
+) -> Optional[JobStatus]:
+    """
+    Record a failed attempt. The job is queued again after a backoff delay
+    while it has attempts left, and fails for good otherwise.
+    
+    Args:
+        db: Database session
+        job: Job, as claimed
+        worker_id: Worker that ran the job
+        error: Error message
+        retry: False to fail the job for good, whatever attempts it has left
+    
+    Returns:
+        The job's new status (QUEUED or FAILED), or None if the worker had
+        lost the lease
+    """
+    now = utcnow()
+    values: Dict[str, Any] = {"last_error": error[:MAX_ERROR_LENGTH], "lease_owner": None, "lease_expires_at": None}
+    if retry and job.attempts < job.max_attempts:
+        values.update(status=JobStatus.QUEUED, run_after=now + timedelta(seconds=retry_delay(job.attempts)))
+    else:
+        values.update(status=JobStatus.FAILED, finished_at=now)
+    if not await _update_leased(db, job.id, worker_id, **values):
+        return None
+    return values["status"]
+
+
+async def release_job(db: AsyncSession, job_id: str, worker_id: str) -> bool:
+    """
+    Put a job back in the queue without counting the attempt, e.g. when its
+    worker shuts down. The change is committed by the caller, so that what
+    the job had started (such as its experiment's status) can be reset in
+    the same transaction.
+    
+    Args:
+        db: Database session
+        job_id: Job ID
+        worker_id: Worker that was running the job
+    
+    Returns:
+        False if the worker had lost the lease
+    """
+    return await _set_leased(
+        db, job_id, worker_id,
+        status=JobStatus.QUEUED, attempts=Job.attempts - 1, lease_owner=None, lease_expires_at=None
+    )
+
+
+async def cancel_jobs(db: AsyncSession, experiment_id: str) -> int:
+    """
+    Cancel an experiment's queued and running jobs.
+    
+    Queued jobs are never claimed, and running ones free their slots at once;
+    their workers stop them within ``worker_poll_interval``. The change is
+    committed by the caller.
+    
+    Args:
+        db: Database session
+        experiment_id: Experiment ID
+    
+    Returns:
+        Number of jobs cancelled
+    """
+    return (await db.execute(
+        update(Job)
+        .where(Job.experiment_id == experiment_id, Job.status.in_((JobStatus.QUEUED, JobStatus.RUNNING)))
+        .values(status=JobStatus.CANCELLED, finished_at=utcnow(), lease_owner=None, lease_expires_at=None)
+        .execution_options(synchronize_session=False)
+    )).rowcount
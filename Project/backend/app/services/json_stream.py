@@ -0,0 +1,252 @@
+"""Incremental tokenizer for streaming the items of a top-level JSON array."""
+
+import json
+import re
+from typing import Any, BinaryIO, Iterator, Optional, Tuple
+
+from app.config import settings
+
+
+# Bytes that change tokenizer state outside and inside strings. JSON
+# structural characters are ASCII, and UTF-8 multi-byte sequences never
+# contain ASCII bytes, so the scan can run on raw bytes without decoding.
+_STRUCTURAL = re.compile(rb'["\[\]{},]')
+_STRING_SPECIAL = re.compile(rb'["\\]')
+_WHITESPACE = b" \t\r\n"
+
+
+def _read_start(stream: BinaryIO) -> Tuple[bytes, int]:
+    """
+    Read up to the first significant byte of a JSON document.
+    
+    Args:
+        stream: Binary stream positioned at the start of the document
+    
+    Returns:
+        Tuple of (chunk starting at the first non-whitespace byte, or empty
+        at EOF; offset of that byte in the stream)
+    """
+    chunk = b""
+    offset = 0
+    while True:
+        stripped = chunk.lstrip(_WHITESPACE)
+        offset += len(chunk) - len(stripped)
+        if stripped:
+            return stripped, offset
+        chunk = stream.read(settings.upload_chunk_size)
+        if not chunk:
+            return b"", offset
+
+
+def _scan_array(
+    chunk: bytes,
+    stream: BinaryIO,
+    collect: bool,
+    base: int = 0
+) -> Iterator[Tuple[Optional[bytes], int, int]]:
+    """
+    Scan a top-level JSON array and yield each of its items.
+    
+    Only the current item is buffered, so memory is bounded by the largest
+    item rather than the file size.
+    
+    Args:
+        chunk: First chunk of the document, starting with ``[``
+        stream: Stream to read the rest of the document from
+        collect: Whether to yield item bytes; if False, yields None per item
+        base: Offset of ``chunk`` in the stream
+    
+    Yields:
+        Tuples of (raw bytes of the item, or None when not collecting; start
+        offset; end offset). The span runs from just after the preceding
+        ``[`` or ``,`` to the following ``,`` or ``]``, so it includes any
+        surrounding whitespace.
+    
+    Raises:
+        ValueError: If the array is malformed or truncated
+    """
+    chunk_size = settings.upload_chunk_size
+    depth = 1
+    in_string = False
+    skip_next = False  # Escape sequence split across chunks
+    pending = bytearray()
+    pending_has_content = False
+    after_comma = False  # An item must follow, as in [1,]
+    position = 1
+    item_start = base + 1
+    
+    while True:
+        size = len(chunk)
+        segment_start = position
+        if skip_next:
+            position += 1
+            skip_next = False
+        
+        while position < size:
+            if in_string:
+                match = _STRING_SPECIAL.search(chunk, position)
+                if not match:
+                    position = size
+                    break
+                index = match.start()
+                if chunk[index] == 0x5C:  # Backslash escapes the next byte
+                    if index + 1 < size:
+                        position = index + 2
+                    else:
+                        skip_next = True
+                        position = size
+                    continue
+                in_string = False
+                position = index + 1
+                continue
+            
+            match = _STRUCTURAL.search(chunk, position)
+            if not match:
+                position = size
+                break
+            index = match.start()
+            char = chunk[index]
+            position = index + 1
+            
+            if char == 0x22:  # "
+                in_string = True
+            elif char in b"[{":
+                depth += 1
+            elif char in b"]}" and depth > 1:
+                depth -= 1
+            elif (char == 0x2C and depth == 1) or char == 0x5D:  # ',' or closing ']'
+                segment = chunk[segment_start:index]
+                has_content = pending_has_content or bool(segment.strip(_WHITESPACE))
+                if has_content:
+                    yield (bytes(pending + segment) if collect else None), item_start, base + index
+                elif char == 0x2C or after_comma:
+                    raise ValueError("Invalid JSON: empty item in array")
+                after_comma = char == 0x2C
+                pending.clear()
+                pending_has_content = False
+                segment_start = position
+                item_start = base + position
+                
+                if char == 0x5D:
+                    _expect_end(chunk[position:], stream)
+                    return
+            elif char == 0x7D:
+                raise ValueError("Invalid JSON: unexpected '}' in array")
+        
+        # Carry the unfinished item into the next chunk
+        segment = chunk[segment_start:]
+        if collect:
+            pending += segment
+        if not pending_has_content:
+            pending_has_content = bool(segment.strip(_WHITESPACE))
+        
+        base += size
+        chunk = stream.read(chunk_size)
+        if not chunk:
+            raise ValueError("Invalid JSON: unexpected end of input inside array")
+        position = 0
+
+
+def _expect_end(rest: bytes, stream: BinaryIO) -> None:
+    """
+    Check that only whitespace follows the top-level array.
+    
+    Args:
+        rest: Remainder of the current chunk
+        stream: Stream to read the remaining bytes from
+    
+    Raises:
+        ValueError: If anything but whitespace follows
+    """
+    while True:
+        if rest.strip(_WHITESPACE):
+            raise ValueError("Invalid JSON: extra data after top-level array")
+        rest = stream.read(settings.upload_chunk_size)
+        if not rest:
+            return
+
+
+def _parse_document(chunk: bytes, stream: BinaryIO) -> Tuple[Any, int]:
+    """
+    Parse a document that is not an array. Such a document is at most one row.
+    
+    Args:
+        chunk: First chunk of the document
+        stream: Stream to read the rest of the document from
+    
+    Returns:
+        Tuple of (parsed document, length of the document in bytes)
+    """
+    data = chunk + stream.read()
+    return json.loads(data), len(data)
+
+
+def iter_json_item_spans(stream: BinaryIO) -> Iterator[Tuple[Any, int, int]]:
+    """
+    Iterate over the items of a top-level JSON array with their byte spans.
+    
+    A top-level object is yielded as a single item; other scalar documents
+    yield nothing.
+    
+    Args:
+        stream: Binary stream positioned at the start of the document
+    
+    Yields:
+        Tuples of (parsed item, start offset, end offset)
+    
+    Raises:
+        ValueError: If the document is not valid JSON
+    """
+    chunk, offset = _read_start(stream)
+    if not chunk:
+        return
+    if chunk[:1] != b"[":
+        document, size = _parse_document(chunk, stream)
+        if isinstance(document, dict):
+            yield document, offset, offset + size
+        return
+    
+    for raw, start, end in _scan_array(chunk, stream, collect=True, base=offset):
+        yield json.loads(raw), start, end
+
+
+def iter_json_items(stream: BinaryIO) -> Iterator[Any]:
+    """
+    Iterate over the items of a top-level JSON array with bounded memory.
+    
+    A top-level object is yielded as a single item; other scalar documents
+    yield nothing.
+    
+    Args:
+        stream: Binary stream positioned at the start of the document
+    
+    Yields:
+        Parsed items
+    
+    Raises:
+        ValueError: If the document is not valid JSON
+    """
+    for item, _, _ in iter_json_item_spans(stream):
+        yield item
+
+
+def count_json_items(stream: BinaryIO) -> int:
+    """
+    Count the items of a top-level JSON array without parsing them.
+    
+    Args:
+        stream: Binary stream positioned at the start of the document
+    
+    Returns:
+        Number of items (1 for a top-level object, 0 for other scalars)
+    
+    Raises:
+        ValueError: If the document is malformed or truncated
+    """
+    chunk, _ = _read_start(stream)
+    if not chunk:
+        return 0
+    if chunk[:1] != b"[":
+        return 1 if isinstance(_parse_document(chunk, stream)[0], dict) else 0
+    
+    return sum(1 for _ in _scan_array(chunk, stream, collect=False))
@@ -0,0 +1,399 @@
+"""Time-series store for per-step training metrics, with server-side downsampling."""
+
+import enum
+from typing import Dict, Iterable, List, NamedTuple, Optional, Sequence, Tuple
+
+from sqlalchemy import delete, func, insert, select
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.metric import TrainingMetric, TrainingMetricRollup
+
+# Each rollup level's buckets are this many times wider than the previous level's
+ROLLUP_FACTOR = 16
+
+# Rollup levels kept: buckets of 16, 256, 4,096 and 65,536 steps
+ROLLUP_LEVELS = 4
+
+# Rows per INSERT statement
+INSERT_BATCH_SIZE = 10_000
+
+# Rows read per requested point, at most; picks the raw values or a rollup level
+SOURCE_ROWS_PER_POINT = 4
+
+# Largest number of points or buckets a series request may ask for
+MAX_POINTS = 10_000
+
+# Dialects whose INSERT supports ON CONFLICT DO UPDATE, which rollups rely on
+_UPSERT_INSERTS = {"sqlite": sqlite.insert, "postgresql": postgresql.insert}
+
+
+class DownsampleMethod(str, enum.Enum):
+    """How a long series is reduced to the requested number of points."""
+    LTTB = "lttb"  # Largest-Triangle-Three-Buckets: points that keep the curve's shape
+    MINMAX = "minmax"  # Buckets with their min, max and mean: keeps every spike
+
+
+class MetricSummary(NamedTuple):
+    """A metric recorded for an experiment."""
+    metric: str
+    count: int
+    first_step: int
+    last_step: int
+
+
+class MetricBucket(NamedTuple):
+    """Aggregate of a metric's values over a range of steps."""
+    first_step: int
+    last_step: int
+    count: int
+    min_value: float
+    max_value: float
+    sum_value: float
+
+
+class MetricSeries(NamedTuple):
+    """A metric's values over a range of steps, downsampled."""
+    resolution: int  # Steps per row read: 1 for raw values, else the rollup bucket width
+    points: List[Tuple[int, float]]  # LTTB: (step, value)
+    buckets: List[MetricBucket]  # MINMAX
+
+
+def bucket_width(level: int) -> int:
+    """Steps per bucket of a rollup level."""
+    return ROLLUP_FACTOR ** level
+
+
+def _least_greatest(dialect: str):
+    if dialect == "postgresql":
+        return func.least, func.greatest
+    return func.min, func.max  # SQLite's scalar min() and max() take several arguments
+
+
+async def _upsert_rollups(db: AsyncSession, experiment_id: str, rollups: Dict[Tuple[str, int, int], List]) -> None:
+    """Merge bucket aggregates into the stored rollups."""
+    dialect = db.bind.dialect.name
+    if dialect not in _UPSERT_INSERTS:
+        raise ValueError(f"Metric rollups are not supported on {dialect}")
+    least, greatest = _least_greatest(dialect)
+    
+    statement = _UPSERT_INSERTS[dialect](TrainingMetricRollup)
+    excluded = statement.excluded
+    statement = statement.on_conflict_do_update(
+        index_elements=["experiment_id", "level", "metric", "bucket"],
+        set_={
+            "first_step": least(TrainingMetricRollup.first_step, excluded.first_step),
+            "last_step": greatest(TrainingMetricRollup.last_step, excluded.last_step),
+            "count": TrainingMetricRollup.count + excluded.count,
+            "min_value": least(TrainingMetricRollup.min_value, excluded.min_value),
+            "max_value": greatest(TrainingMetricRollup.max_value, excluded.max_value),
+            "sum_value": TrainingMetricRollup.sum_value + excluded.sum_value,
+        }
+    )
+    rows = [
+        {
+            "experiment_id": experiment_id, "metric": metric, "level": level, "bucket": bucket,
+            "first_step": first_step, "last_step": last_step, "count": count,
+            "min_value": min_value, "max_value": max_value, "sum_value": sum_value,
+        }
+        for (metric, level, bucket), (first_step, last_step, count, min_value, max_value, sum_value)
+        in rollups.items()
+    ]
+    for start in range(0, len(rows), INSERT_BATCH_SIZE):
+        await db.execute(statement, rows[start:start + INSERT_BATCH_SIZE])
+
+
+async def record_metrics(db: AsyncSession, experiment_id: str, points: Iterable[Tuple[str, int, float]]) -> int:
+    """
+    Append metric values, e.g. a training loop's batch of steps.
+    
+    Values are inserted in batches, and each rollup bucket they touch is
+    updated once. Steps must not have been recorded before: call
+    ``truncate_metrics`` first when training starts over. The caller commits.
+    
+    Args:
+        db: Database session
+        experiment_id: Experiment ID
+        points: (metric, step, value) tuples
+    
+    Returns:
+        Number of values recorded
+    """
+    rows = [
+        {"experiment_id": experiment_id, "metric": metric, "step": step, "value": float(value)}
+        for metric, step, value in points
+    ]
+    if not rows:
+        return 0
+    for start in range(0, len(rows), INSERT_BATCH_SIZE):
+        # Core insert: the ORM's per-row bookkeeping is not needed here
+        await db.execute(insert(TrainingMetric.__table__), rows[start:start + INSERT_BATCH_SIZE])
+    
+    # Aggregate the batch per level 1 bucket: [first step, last step, count, min, max, sum]
+    buckets: Dict[Tuple[str, int], List] = {}
+    for row in rows:
+        step, value = row["step"], row["value"]
+        key = (row["metric"], step // ROLLUP_FACTOR)
+        rollup = buckets.get(key)
+        if rollup is None:
+            buckets[key] = [step, step, 1, value, value, value]
+            continue
+        if step < rollup[0]:
+            rollup[0] = step
+        if step > rollup[1]:
+            rollup[1] = step
+        rollup[2] += 1
+        if value < rollup[3]:
+            rollup[3] = value
+        if value > rollup[4]:
+            rollup[4] = value
+        rollup[5] += value
+    
+    # Then each level from the one below, ROLLUP_FACTOR times fewer buckets each
+    rollups: Dict[Tuple[str, int, int], List] = {}
+    for level in range(1, ROLLUP_LEVELS + 1):
+        if level > 1:
+            merged: Dict[Tuple[str, int], List] = {}
+            for (metric, bucket), (first_step, last_step, count, min_value, max_value, sum_value) in buckets.items():
+                key = (metric, bucket // ROLLUP_FACTOR)
+                rollup = merged.get(key)
+                if rollup is None:
+                    merged[key] = [first_step, last_step, count, min_value, max_value, sum_value]
+                    continue
+                rollup[0] = min(rollup[0], first_step)
+                rollup[1] = max(rollup[1], last_step)
+                rollup[2] += count
+                rollup[3] = min(rollup[3], min_value)
+                rollup[4] = max(rollup[4], max_value)
+                rollup[5] += sum_value
+            buckets = merged
+        for (metric, bucket), rollup in buckets.items():
+            rollups[(metric, level, bucket)] = rollup
+    await _upsert_rollups(db, experiment_id, rollups)
+    return len(rows)
+
+
+async def truncate_metrics(db: AsyncSession, experiment_id: str, from_step: int = 0) -> None:
+    """
+    Delete an experiment's metric values from a step on, e.g. when training
+    starts over or resumes from an earlier step. The caller commits.
+    
+    Args:
+        db: Database session
+        experiment_id: Experiment ID
+        from_step: First step to delete
+    """
+    await db.execute(delete(TrainingMetric).where(
+        TrainingMetric.experiment_id == experiment_id, TrainingMetric.step >= from_step
+    ))
+    for level in range(1, ROLLUP_LEVELS + 1):
+        width = bucket_width(level)
+        first_bucket = from_step // width
+        await db.execute(delete(TrainingMetricRollup).where(
+            TrainingMetricRollup.experiment_id == experiment_id,
+            TrainingMetricRollup.level == level,
+            TrainingMetricRollup.bucket >= first_bucket
+        ))
+        if from_step % width == 0:
+            continue
+        
+        # Rebuild the bucket cut in two from the values that remain
+        kept = (await db.execute(
+            select(
+                TrainingMetric.metric,
+                func.min(TrainingMetric.step), func.max(TrainingMetric.step), func.count(),
+                func.min(TrainingMetric.value), func.max(TrainingMetric.value), func.sum(TrainingMetric.value)
+            )
+            .where(
+                TrainingMetric.experiment_id == experiment_id,
+                TrainingMetric.step >= first_bucket * width,
+                TrainingMetric.step < from_step
+            )
+            .group_by(TrainingMetric.metric)
+        )).all()
+        await _upsert_rollups(db, experiment_id, {
+            (metric, level, first_bucket): list(aggregate) for metric, *aggregate in kept
+        })
+
+
+async def metric_summaries(db: AsyncSession, experiment_id: str) -> List[MetricSummary]:
+    """
+    List the metrics recorded for an experiment.
+    
+    Args:
+        db: Database session
+        experiment_id: Experiment ID
+    
+    Returns:
+        Each metric with its number of values and step range, by name
+    """
+    rows = (await db.execute(
+        select(
+            TrainingMetricRollup.metric,
+            func.sum(TrainingMetricRollup.count),
+            func.min(TrainingMetricRollup.first_step),
+            func.max(TrainingMetricRollup.last_step)
+        )
+        .where(TrainingMetricRollup.experiment_id == experiment_id, TrainingMetricRollup.level == ROLLUP_LEVELS)
+        .group_by(TrainingMetricRollup.metric)
+        .order_by(TrainingMetricRollup.metric)
+    )).all()
+    return [MetricSummary(metric, int(count), first_step, last_step) for metric, count, first_step, last_step in rows]
+
+
+def lttb(points: Sequence[Tuple[int, float]], threshold: int) -> List[Tuple[int, float]]:
+    """
+    Downsample a series with Largest-Triangle-Three-Buckets.
+    
+    Keeps the first and last points, and from each of ``threshold - 2``
+    buckets in between, the point forming the largest triangle with the
+    point kept before it and the average of the next bucket.
+    
+    Args:
+        points: (x, y) points, ordered by x
+        threshold: Points to keep, at least 3
+    
+    Returns:
+        Downsampled points
+    """
+    if threshold >= len(points) or threshold < 3:
+        return list(points)
+    
+    sampled = [points[0]]
+    every = (len(points) - 2) / (threshold - 2)
+    kept = 0
+    for i in range(threshold - 2):
+        # Average of the next bucket
+        next_start = int((i + 1) * every) + 1
+        next_end = min(int((i + 2) * every) + 1, len(points))
+        next_points = points[next_start:next_end]
+        avg_x = sum(x for x, _ in next_points) / len(next_points)
+        avg_y = sum(y for _, y in next_points) / len(next_points)
+        
+        kept_x, kept_y = points[kept]
+        best_area, best = -1.0, next_start - 1
+        for j in range(int(i * every) + 1, next_start):
+            x, y = points[j]
+            area = abs((kept_x - avg_x) * (y - kept_y) - (kept_x - x) * (avg_y - kept_y))
+            if area > best_area:
+                best_area, best = area, j
+        sampled.append(points[best])
+        kept = best
+    sampled.append(points[-1])
+    return sampled
+
+
+def _merge_buckets(buckets: Sequence[MetricBucket], count: int, first_step: int, span: int) -> List[MetricBucket]:
+    """Merge buckets into ``count`` buckets of equal step ranges."""
+    merged: Dict[int, MetricBucket] = {}
+    for bucket in buckets:
+        index = min(max(bucket.first_step - first_step, 0) * count // span, count - 1)
+        current = merged.get(index)
+        merged[index] = bucket if current is None else MetricBucket(
+            min(current.first_step, bucket.first_step),
+            max(current.last_step, bucket.last_step),
+            current.count + bucket.count,
+            min(current.min_value, bucket.min_value),
+            max(current.max_value, bucket.max_value),
+            current.sum_value + bucket.sum_value
+        )
+    return [merged[index] for index in sorted(merged)]
+
+
+async def load_series(
+    db: AsyncSession,
+    experiment_id: str,
+    metric: str,
+    points: int,
+    method: DownsampleMethod = DownsampleMethod.LTTB,
+    start_step: Optional[int] = None,
+    end_step: Optional[int] = None
+) -> MetricSeries:
+    """
+    Load a metric's curve, downsampled to at most ``points`` points or buckets.
+    
+    Short ranges are read from the raw values. Longer ones are read from the
+    finest rollup level with at most ``SOURCE_ROWS_PER_POINT`` buckets per
+    requested point, so the rows read depend on ``points``, not on the
+    length of the curve. Rollup buckets at the ends of a range may extend
+    past it.
+    
+    Args:
+        db: Database session
+        experiment_id: Experiment ID
+        metric: Metric name
+        points: Points or buckets to return, at most
+        method: Downsampling method
+        start_step: First step of the range (default: the first recorded)
+        end_step: Last step of the range (default: the last recorded)
+    
+    Returns:
+        Points (LTTB) or buckets (MINMAX), ordered by step
+    
+    Raises:
+        ValueError: If ``points`` is out of range
+    """
+    if not 3 <= points <= MAX_POINTS:
+        raise ValueError(f"points must be between 3 and {MAX_POINTS}")
+    
+    bounds = (await db.execute(
+        select(func.min(TrainingMetricRollup.first_step), func.max(TrainingMetricRollup.last_step))
+        .where(
+            TrainingMetricRollup.experiment_id == experiment_id,
+            TrainingMetricRollup.metric == metric,
+            TrainingMetricRollup.level == ROLLUP_LEVELS
+        )
+    )).one()
+    if bounds[0] is None:
+        return MetricSeries(1, [], [])
+    first_step = bounds[0] if start_step is None else max(start_step, bounds[0])
+    last_step = bounds[1] if end_step is None else min(end_step, bounds[1])
+    if first_step > last_step:
+        return MetricSeries(1, [], [])
+    span = last_step - first_step + 1
+    
+    # Finest resolution that reads at most SOURCE_ROWS_PER_POINT rows per point
+    level = 0
+    while level < ROLLUP_LEVELS and span > bucket_width(level) * SOURCE_ROWS_PER_POINT * points:
+        level += 1
+    
+    if level == 0:
+        rows = (await db.execute(
+            select(TrainingMetric.step, TrainingMetric.value)
+            .where(
+                TrainingMetric.experiment_id == experiment_id,
+                TrainingMetric.metric == metric,
+                TrainingMetric.step.between(first_step, last_step)
+            )
+            .order_by(TrainingMetric.step)
+        )).all()
+        source = [MetricBucket(step, step, 1, value, value, value) for step, value in rows]
+    else:
+        width = bucket_width(level)
+        rows = (await db.execute(
+            select(
+                TrainingMetricRollup.first_step, TrainingMetricRollup.last_step, TrainingMetricRollup.count,
+                TrainingMetricRollup.min_value, TrainingMetricRollup.max_value, TrainingMetricRollup.sum_value
+            )
+            .where(
+                TrainingMetricRollup.experiment_id == experiment_id,
+                TrainingMetricRollup.metric == metric,
+                TrainingMetricRollup.level == level,
+                TrainingMetricRollup.bucket.between(first_step // width, last_step // width)
+            )
+            .order_by(TrainingMetricRollup.bucket)
+        )).all()
+        source = [MetricBucket(*row) for row in rows]
+    
+    resolution = bucket_width(level)
+    if method == DownsampleMethod.MINMAX:
+        if len(source) > points:
+            source = _merge_buckets(source, points, first_step, span)
+        return MetricSeries(resolution, [], source)
+    
+    # LTTB over the values, or over the means of the rollup buckets
+    series = [
+        ((bucket.first_step + bucket.last_step) // 2, bucket.sum_value / bucket.count)
+        for bucket in source
+    ]
+    return MetricSeries(resolution, lttb(series, points), [])
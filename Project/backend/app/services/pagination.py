@@ -0,0 +1,124 @@
+"""Keyset (cursor) pagination for list endpoints."""
+
+import base64
+import binascii
+import enum
+import json
+from typing import Any, List, Optional, Sequence, Tuple
+
+from sqlalchemy import Select, literal, select, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+
+
+# Page size when none is requested, and the largest allowed
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 200
+
+
+class SortOrder(str, enum.Enum):
+    """Sort direction for list endpoints."""
+    ASC = "asc"
+    DESC = "desc"
+
+
+def encode_cursor(row_id: str, sort: str, order: SortOrder) -> str:
+    """
+    Encode the position after a row as an opaque cursor.
+    
+    Args:
+        row_id: ID of the last row of a page
+        sort: Sort field the page was listed by
+        order: Sort direction
+    
+    Returns:
+        URL-safe cursor string
+    """
+    payload = json.dumps({"id": row_id, "sort": sort, "order": order.value}, separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str, sort: str, order: SortOrder) -> str:
+    """
+    Decode a cursor made by ``encode_cursor``.
+    
+    Args:
+        cursor: Cursor string
+        sort: Sort field of the current request
+        order: Sort direction of the current request
+    
+    Returns:
+        ID of the row the cursor points after
+    
+    Raises:
+        ValueError: If the cursor is malformed or was made for another sort
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+        row_id, cursor_sort, cursor_order = payload["id"], payload["sort"], payload["order"]
+    except (binascii.Error, UnicodeError, ValueError, KeyError, TypeError):
+        raise ValueError("Invalid cursor")
+    if cursor_sort != sort or cursor_order != order.value:
+        raise ValueError("Cursor was issued for a different sort order")
+    return row_id
+
+
+async def paginate(
+    db: AsyncSession,
+    statement: Select,
+    model: Any,
+    sort: str,
+    order: SortOrder,
+    cursor: Optional[str],
+    limit: int,
+    sortable: Sequence[str]
+) -> Tuple[List[Any], Optional[str]]:
+    """
+    Fetch one page of a query, ordered by a field and then by ID.
+    
+    Pages continue from the row a cursor points after, using a range
+    condition on ``(sort field, id)`` rather than an offset, so every page
+    costs one index range scan wherever it is in the table. The sort value
+    of that row is looked up in the database when the page is fetched,
+    which keeps comparisons in the column's own storage format.
+    
+    Args:
+        db: Database session
+        statement: Filtered select of ``model``
+        model: ORM model with an ``id`` primary key
+        sort: Field to sort by
+        order: Sort direction
+        cursor: Cursor from the previous page, or None for the first page
+        limit: Page size
+        sortable: Fields that may be sorted by
+    
+    Returns:
+        Tuple of (rows, cursor for the next page or None on the last page)
+    
+    Raises:
+        ValueError: If the sort field or cursor is invalid
+    """
+    if sort not in sortable:
+        raise ValueError(f"sort must be one of: {', '.join(sortable)}")
+    sort_column = getattr(model, sort)
+    
+    if cursor:
+        row_id = decode_cursor(cursor, sort, order)
+        if await db.scalar(select(model.id).where(model.id == row_id)) is None:
+            raise ValueError("Cursor is no longer valid; start again from the first page")
+        anchor = select(sort_column).where(model.id == row_id).scalar_subquery()
+        key = tuple_(sort_column, model.id)
+        bound = tuple_(anchor, literal(row_id, model.id.type))
+        statement = statement.where(key > bound if order == SortOrder.ASC else key < bound)
+    
+    if order == SortOrder.ASC:
+        statement = statement.order_by(sort_column.asc(), model.id.asc())
+    else:
+        statement = statement.order_by(sort_column.desc(), model.id.desc())
+    
+    rows = (await db.scalars(statement.limit(limit + 1))).all()
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_cursor(rows[-1].id, sort, order)
+    return rows, next_cursor
@@ -0,0 +1,136 @@
+"""Schema profiling service for summarizing dataset rows."""
+
+from typing import Any, Dict, Optional
+
+
+# Upper bound on profiled columns, so rows with unbounded key sets (e.g. JSON
+# objects keyed by ID) cannot grow the profile without limit
+MAX_PROFILED_COLUMNS = 256
+
+# Column name used when rows are scalars or arrays rather than objects
+VALUE_COLUMN = "value"
+
+
+def _type_name(value: Any) -> str:
+    """
+    Get the JSON type name of a parsed value.
+    
+    Args:
+        value: Parsed value
+    
+    Returns:
+        Type name
+    """
+    if value is None:
+        return "null"
+    if isinstance(value, bool):
+        return "boolean"
+    if isinstance(value, int):
+        return "integer"
+    if isinstance(value, float):
+        return "number"
+    if isinstance(value, str):
+        return "string"
+    if isinstance(value, list):
+        return "array"
+    return "object"
+
+
+class ColumnProfile:
+    """Running statistics for a single column."""
+    
+    def __init__(self):
+        self.present = 0
+        self.nulls = 0
+        self.types = set()
+        self.string_count = 0
+        self.total_length = 0
+        self.min_length: Optional[int] = None
+        self.max_length: Optional[int] = None
+    
+    def add(self, value: Any) -> None:
+        """
+        Record one value of the column.
+        
+        Args:
+            value: Column value from a row
+        """
+        self.present += 1
+        if value is None or value == "":
+            self.nulls += 1
+            return
+        
+        self.types.add(_type_name(value))
+        if isinstance(value, str):
+            length = len(value)
+            self.string_count += 1
+            self.total_length += length
+            self.min_length = length if self.min_length is None else min(self.min_length, length)
+            self.max_length = length if self.max_length is None else max(self.max_length, length)
+
+
+class SchemaProfiler:
+    """
+    Incremental schema profiler fed one parsed row at a time.
+    
+    Detects columns (CSV headers or JSON object keys) and tracks per-column
+    null counts and string-length statistics in constant memory per column.
+    Missing keys count as nulls.
+    """
+    
+    def __init__(self):
+        self.row_count = 0
+        self.columns: Dict[str, ColumnProfile] = {}
+        self.truncated = False
+        self.error: Optional[str] = None
+    
+    def add_row(self, row: Any) -> None:
+        """
+        Record one parsed row.
+        
+        Args:
+            row: Row as a dict, or a scalar/array for non-object rows
+        """
+        self.row_count += 1
+        if not isinstance(row, dict):
+            row = {VALUE_COLUMN: row}
+        
+        for key, value in row.items():
+            if key is None:
+                continue  # Extra CSV fields without a header
+            column = self.columns.get(key)
+            if column is None:
+                if len(self.columns) >= MAX_PROFILED_COLUMNS:
+                    self.truncated = True
+                    continue
+                column = self.columns[key] = ColumnProfile()
+            column.add(value)
+    
+    def summary(self) -> Dict[str, Any]:
+        """
+        Build a JSON-serializable schema summary.
+        
+        Returns:
+            Schema summary with one entry per column
+        """
+        columns = []
+        for name, column in self.columns.items():
+            columns.append({
+                "name": str(name),
+                "types": sorted(column.types),
+                "null_count": self.row_count - column.present + column.nulls,
+                "min_length": column.min_length,
+                "max_length": column.max_length,
+                "mean_length": (
+                    round(column.total_length / column.string_count, 2)
+                    if column.string_count else None
+                ),
+            })
+        
+        summary = {
+            "columns": columns,
+            "truncated": self.truncated,
+        }
+        if self.error:
+            summary["error"] = self.error
+        return summary
@@ -0,0 +1,152 @@
+"""Live training progress: epoch events, and their in-process pub/sub."""
+
+import asyncio
+import json
+from contextlib import asynccontextmanager
+from datetime import datetime, timezone
+from typing import Any, AsyncIterator, Dict, Optional, Set
+
+from sqlalchemy import select
+
+from app.config import settings
+from app.database import AsyncSessionLocal
+from app.models.experiment import Experiment
+
+# Events buffered per subscriber; a slow client skips to the latest ones
+SUBSCRIBER_QUEUE_SIZE = 16
+
+
+def epoch_progress(
+    epoch: int,
+    total_epochs: int,
+    train_loss: Optional[float] = None,
+    val_loss: Optional[float] = None,
+    samples_per_second: Optional[float] = None,
+    eta_seconds: Optional[float] = None
+) -> Dict[str, Any]:
+    """
+    Build the progress a training job records after an epoch.
+    
+    Args:
+        epoch: Epochs completed so far
+        total_epochs: Epochs the job runs
+        train_loss: Training loss of the epoch
+        val_loss: Validation loss of the epoch
+        samples_per_second: Training throughput so far
+        eta_seconds: Estimated time left
+    
+    Returns:
+        JSON progress, stored on ``Experiment.progress``
+    """
+    return {
+        "epoch": epoch,
+        "total_epochs": total_epochs,
+        "train_loss": train_loss,
+        "val_loss": val_loss,
+        "samples_per_second": samples_per_second,
+        "eta_seconds": eta_seconds,
+        "updated_at": datetime.now(timezone.utc).isoformat(),
+    }
+
+
+def format_event(event: Dict[str, Any]) -> str:
+    """
+    Encode a progress event as a Server-Sent Event.
+    
+    Args:
+        event: Progress event
+    
+    Returns:
+        ``progress`` event, with the JSON event as its data
+    """
+    return f"event: progress\ndata: {json.dumps(event)}\n\n"
+
+
+class ProgressBroker:
+    """
+    In-process pub/sub of experiment progress.
+    
+    Training runs in worker processes, which record each epoch's progress on
+    its experiment. While anyone is subscribed, a single poller reads the
+    status and progress of every watched experiment in one query, and
+    publishes the changes to their subscribers. The database load depends on
+    the number of API processes, not on the number of clients.
+    """
+    
+    def __init__(self):
+        self._subscribers: Dict[str, Set[asyncio.Queue]] = {}
+        self._latest: Dict[str, Dict[str, Any]] = {}
+        self._poller: Optional[asyncio.Task] = None
+    
+    @asynccontextmanager
+    async def subscribe(self, experiment_id: str) -> AsyncIterator[asyncio.Queue]:
+        """
+        Receive an experiment's progress events while the context is open.
+        
+        The latest event is delivered first, then every change.
+        
+        Args:
+            experiment_id: Experiment ID
+        
+        Yields:
+            Queue of progress events
+        """
+        queue: asyncio.Queue = asyncio.Queue(maxsize=SUBSCRIBER_QUEUE_SIZE)
+        self._subscribers.setdefault(experiment_id, set()).add(queue)
+        if experiment_id in self._latest:
+            queue.put_nowait(self._latest[experiment_id])
+        if self._poller is None or self._poller.done():
+            self._poller = asyncio.create_task(self._poll())
+        try:
+            yield queue
+        finally:
+            subscribers = self._subscribers.get(experiment_id, set())
+            subscribers.discard(queue)
+            if not subscribers:
+                self._subscribers.pop(experiment_id, None)
+                self._latest.pop(experiment_id, None)
+    
+    def publish(self, experiment_id: str, event: Dict[str, Any]) -> None:
+        """
+        Deliver an event to an experiment's subscribers.
+        
+        Args:
+            experiment_id: Experiment ID
+            event: Progress event
+        """
+        self._latest[experiment_id] = event
+        for queue in self._subscribers.get(experiment_id, ()):
+            if queue.full():
+                queue.get_nowait()  # Each event supersedes the older ones
+            queue.put_nowait(event)
+    
+    async def close(self) -> None:
+        """Stop polling, e.g. on shutdown."""
+        if self._poller:
+            self._poller.cancel()
+            try:
+                await self._poller
+            except asyncio.CancelledError:
+                pass
+            self._poller = None
+    
+    async def _poll(self) -> None:
+        while self._subscribers:
+            try:
+                async with AsyncSessionLocal() as db:
+                    rows = (await db.execute(
+                        select(Experiment.id, Experiment.status, Experiment.progress)
+                        .where(Experiment.id.in_(list(self._subscribers)))
+                    )).all()
+            except Exception as e:
+                print(f"Progress poll error: {e}")
+                rows = []
+            for experiment_id, status, progress in rows:
+                event = {"experiment_id": experiment_id, "status": status.value, "progress": progress}
+                if event != self._latest.get(experiment_id):
+                    self.publish(experiment_id, event)
+            await asyncio.sleep(settings.progress_poll_interval)
+
+
+# Broker shared by the API process's streams
+progress_broker = ProgressBroker()
@@ -0,0 +1,246 @@
+"""Row offset index for random access into dataset files."""
+
+import mmap
+import os
+import struct
+import sys
+from array import array
+from pathlib import Path
+from typing import List, NamedTuple
+
+
+# Suffix of the row index sidecar stored next to a dataset's file
+ROW_INDEX_SUFFIX = ".rows"
+
+# Header: magic, format version, offset width in bytes, padding to 8 bytes
+_HEADER = struct.Struct("<4sBB2x")
+_MAGIC = b"RIDX"
+_VERSION = 1
+
+# Offsets are little-endian unsigned integers, 32-bit while they fit
+_NARROW_MAX = 2 ** 32 - 1
+_TYPECODES = {4: "I", 8: "Q"}
+_FORMATS = {4: "<I", 8: "<Q"}
+
+# Offsets buffered in memory, and copied per step when widening
+_BUFFER_ITEMS = 64 * 1024
+
+
+class RowRange(NamedTuple):
+    """A contiguous run of rows and the bytes that hold them."""
+    start_row: int
+    stop_row: int
+    start_byte: int
+    end_byte: int
+
+
+def _to_bytes(offsets: array) -> bytes:
+    """Serialize offsets in the on-disk byte order."""
+    if sys.byteorder == "big":
+        offsets = array(offsets.typecode, offsets)
+        offsets.byteswap()
+    return offsets.tobytes()
+
+
+def _from_bytes(typecode: str, data: bytes) -> array:
+    """Deserialize offsets stored in the on-disk byte order."""
+    offsets = array(typecode)
+    offsets.frombytes(data)
+    if sys.byteorder == "big":
+        offsets.byteswap()
+    return offsets
+
+
+class RowIndexWriter:
+    """
+    Writes the byte offset at which each row starts, followed by the offset
+    where the last row ends, while a file is being parsed.
+    
+    Offsets refer to the uncompressed content. Entry ``i`` is where row ``i``
+    starts and entry ``i + 1`` bounds it, so reading any run of rows takes a
+    single seek and read. Offsets take 4 bytes each until the file passes
+    4 GiB, at which point the index is rewritten with 8-byte offsets.
+    """
+    
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self._file = open(self.path, "wb")
+        # The width stays 0 until close, so an incomplete index is never read
+        self._file.write(_HEADER.pack(_MAGIC, _VERSION, 0))
+        self._buffer = array("I")
+    
+    def add(self, offset: int) -> None:
+        """
+        Record the start offset of the next row.
+        
+        Args:
+            offset: Byte offset of the row
+        """
+        if offset > _NARROW_MAX and self._buffer.typecode == "I":
+            self._widen()
+        self._buffer.append(offset)
+        if len(self._buffer) >= _BUFFER_ITEMS:
+            self._flush()
+    
+    def _flush(self) -> None:
+        self._file.write(_to_bytes(self._buffer))
+        self._buffer = array(self._buffer.typecode)
+    
+    def _widen(self) -> None:
+        """Rewrite the offsets so far with 8 bytes each."""
+        self._flush()
+        self._file.close()
+        wide_path = self.path.with_name(self.path.name + ".tmp")
+        with open(self.path, "rb") as narrow, open(wide_path, "wb") as wide:
+            wide.write(narrow.read(_HEADER.size))
+            while True:
+                data = narrow.read(_BUFFER_ITEMS * 4)
+                if not data:
+                    break
+                wide.write(_to_bytes(array("Q", _from_bytes("I", data))))
+        os.replace(wide_path, self.path)
+        self._file = open(self.path, "ab")
+        self._buffer = array("Q")
+    
+    def close(self, end_offset: int) -> None:
+        """
+        Record where the last row ends and close the index.
+        
+        Args:
+            end_offset: Byte offset just past the last row
+        """
+        self.add(end_offset)
+        self._flush()
+        self._file.close()
+        with open(self.path, "r+b") as f:
+            f.write(_HEADER.pack(_MAGIC, _VERSION, self._buffer.itemsize))
+    
+    def discard(self) -> None:
+        """Close and delete an incomplete index."""
+        self._file.close()
+        self.path.unlink(missing_ok=True)
+
+
+class RowIndex:
+    """
+    Memory-mapped reader for a row index.
+    
+    Looking up a row costs the same wherever it is in the file, and only
+    the pages holding the requested offsets are read from disk.
+    """
+    
+    def __init__(self, path: Path):
+        """
+        Open an index.
+        
+        Args:
+            path: Index path
+        
+        Raises:
+            ValueError: If the file is not a complete row index
+        """
+        self.path = Path(path)
+        with open(self.path, "rb") as f:
+            self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        
+        if len(self._map) < _HEADER.size:
+            self.close()
+            raise ValueError(f"Not a row index: {self.path}")
+        magic, version, width = _HEADER.unpack_from(self._map)
+        if magic != _MAGIC or version != _VERSION or width not in _FORMATS:
+            self.close()
+            raise ValueError(f"Unsupported or incomplete row index: {self.path}")
+        self._start = _HEADER.size
+        self._width = width
+        self._format = _FORMATS[width]
+        self._count = max((len(self._map) - self._start) // width - 1, 0)
+    
+    def __len__(self) -> int:
+        return self._count
+    
+    def __enter__(self) -> "RowIndex":
+        return self
+    
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+    
+    def close(self) -> None:
+        """Unmap the index."""
+        self._map.close()
+    
+    def offset(self, row: int) -> int:
+        """
+        Get the byte offset where a row starts.
+        
+        Args:
+            row: Row number; the row count gives the end of the last row
+        
+        Returns:
+            Byte offset
+        """
+        if not 0 <= row <= self._count:
+            raise IndexError(f"Row {row} is out of range")
+        return struct.unpack_from(self._format, self._map, self._start + row * self._width)[0]
+    
+    def offsets(self, start: int, stop: int) -> List[int]:
+        """
+        Get the offsets bounding rows ``start`` to ``stop - 1``.
+        
+        Args:
+            start: First row
+            stop: Row after the last one (at most the row count)
+        
+        Returns:
+            ``stop - start + 1`` offsets: the start of each row, then the end
+            of the last one
+        """
+        if not 0 <= start <= stop <= self._count:
+            raise IndexError(f"Rows {start}-{stop} are out of range")
+        position = self._start + start * self._width
+        size = (stop - start + 1) * self._width
+        return _from_bytes(_TYPECODES[self._width], self._map[position:position + size]).tolist()
+    
+    def span(self, row: int) -> RowRange:
+        """
+        Get the bytes holding a single row.
+        
+        Args:
+            row: Row number
+        
+        Returns:
+            Range of the row
+        """
+        start, end = self.offsets(row, row + 1)
+        return RowRange(row, row + 1, start, end)
+    
+    def shard(self, index: int, count: int) -> RowRange:
+        """
+        Get one of ``count`` contiguous shards of near-equal row counts.
+        
+        Shard sizes differ by at most one row, and together the shards cover
+        every row exactly once.
+        
+        Args:
+            index: Shard number, from 0
+            count: Number of shards
+        
+        Returns:
+            Range of the shard
+        """
+        if count < 1 or not 0 <= index < count:
+            raise ValueError(f"Invalid shard {index} of {count}")
+        start_row = index * self._count // count
+        stop_row = (index + 1) * self._count // count
+        return RowRange(start_row, stop_row, self.offset(start_row), self.offset(stop_row))
+    
+    def shards(self, count: int) -> List[RowRange]:
+        """
+        Split the rows into contiguous shards.
+        
+        Args:
+            count: Number of shards
+        
+        Returns:
+            Range of each shard, in order
+        """
+        return [self.shard(index, count) for index in range(count)]
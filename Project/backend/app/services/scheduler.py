@@ -0,0 +1,191 @@
+"""Training scheduler: job cost estimates, queue positions and ETAs."""
+
+import heapq
+from datetime import datetime, timedelta, timezone
+from typing import List, NamedTuple, Optional, Tuple
+
+from sqlalchemy import and_, func, or_, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import settings
+from app.models.job import Job, JobStatus
+from app.services.job_queue import capacity_in_use, job_cost, utcnow
+
+# Recently finished jobs used to calibrate run time estimates
+CALIBRATION_JOBS = 50
+
+# Queued jobs simulated ahead of a job for its ETA; further back, no ETA is given
+MAX_SIMULATED_JOBS = 1000
+
+
+class TrainingEstimate(NamedTuple):
+    """Estimated resources of a training job."""
+    cost: int  # Scheduler slots held while it runs
+    work: Optional[float]  # Parameters x rows x epochs, or None if unknown
+
+
+class RunTimes(NamedTuple):
+    """Run time model, calibrated from finished jobs."""
+    seconds_per_work: float
+    mean_seconds: float  # For jobs without a work estimate
+    
+    def seconds(self, work: Optional[float]) -> float:
+        return work * self.seconds_per_work if work else self.mean_seconds
+
+
+class QueueStatus(NamedTuple):
+    """Where a job is in the queue and when it should run."""
+    position: Optional[int]  # 1 for the next job to start; None unless queued
+    capacity: int
+    capacity_in_use: int
+    estimated_start: Optional[datetime]
+    estimated_finish: Optional[datetime]
+
+
+def estimate_training(parameters_count: Optional[int], row_count: Optional[int], epochs: int) -> TrainingEstimate:
+    """
+    Estimate the resources a training job needs.
+    
+    The cost is one slot per ``scheduler_params_per_slot`` parameters, since
+    memory grows with the model. The work grows with the model, the dataset
+    and the epochs alike.
+    
+    Args:
+        parameters_count: Base model parameters, if known
+        row_count: Training dataset rows, if known
+        epochs: Training epochs
+    
+    Returns:
+        Estimated cost and work
+    """
+    cost = job_cost(-(-(parameters_count or 0) // settings.scheduler_params_per_slot))
+    if not parameters_count or row_count is None:
+        return TrainingEstimate(cost, None)
+    return TrainingEstimate(cost, float(parameters_count) * row_count * epochs)
+
+
+def _as_utc(value: datetime) -> datetime:
+    """SQLite returns naive timestamps; queue timestamps are always UTC."""
+    return value if value.tzinfo else value.replace(tzinfo=timezone.utc)
+
+
+async def run_times(db: AsyncSession) -> RunTimes:
+    """
+    Calibrate run time estimates from the jobs that finished last.
+    
+    Args:
+        db: Database session
+    
+    Returns:
+        Run time model; ``scheduler_throughput`` until a job with a work
+        estimate has finished
+    """
+    finished = (await db.execute(
+        select(Job.work, Job.started_at, Job.finished_at)
+        .where(Job.status == JobStatus.SUCCEEDED, Job.started_at.is_not(None), Job.finished_at.is_not(None))
+        .order_by(Job.finished_at.desc())
+        .limit(CALIBRATION_JOBS)
+    )).all()
+    durations = [
+        (work, (_as_utc(finished_at) - _as_utc(started_at)).total_seconds())
+        for work, started_at, finished_at in finished
+    ]
+    mean_seconds = sum(seconds for _, seconds in durations) / len(durations) if durations else 0.0
+    estimated = [(work, seconds) for work, seconds in durations if work]
+    if not estimated:
+        return RunTimes(1 / settings.scheduler_throughput, mean_seconds)
+    return RunTimes(sum(seconds for _, seconds in estimated) / sum(work for work, _ in estimated), mean_seconds)
+
+
+def _ahead_of(job: Job):
+    """Queued jobs that are claimed before the given one."""
+    return and_(
+        Job.status == JobStatus.QUEUED,
+        Job.id != job.id,
+        or_(
+            Job.priority > job.priority,
+            and_(Job.priority == job.priority, Job.created_at < job.created_at),
+            and_(Job.priority == job.priority, Job.created_at == job.created_at, Job.id < job.id)
+        )
+    )
+
+
+async def queue_status(db: AsyncSession, job: Job) -> QueueStatus:
+    """
+    Get a job's queue position and estimated start and finish.
+    
+    The estimate replays the scheduler: the running jobs finish after their
+    estimated run time, and the queued jobs start in claim order, each once
+    enough slots are free.
+    
+    Args:
+        db: Database session
+        job: Job
+    
+    Returns:
+        Queue status; estimates are None once the job has finished, or if too
+        many jobs are ahead of it
+    """
+    now = utcnow()
+    in_use = await capacity_in_use(db)
+    if job.status not in (JobStatus.QUEUED, JobStatus.RUNNING):
+        return QueueStatus(None, settings.scheduler_capacity, in_use, None, None)
+    
+    times = await run_times(db)
+    if job.status == JobStatus.RUNNING and job.started_at:
+        start = _as_utc(job.started_at)
+        finish = max(start + timedelta(seconds=times.seconds(job.work)), now)
+        return QueueStatus(None, settings.scheduler_capacity, in_use, start, finish)
+    
+    position = await db.scalar(select(func.count()).select_from(Job).where(_ahead_of(job))) + 1
+    if position > MAX_SIMULATED_JOBS:
+        return QueueStatus(position, settings.scheduler_capacity, in_use, None, None)
+    
+    # Finish times (seconds from now) and slots of the running jobs
+    running: List[Tuple[float, int]] = []
+    for cost, work, started_at in (await db.execute(
+        select(Job.cost, Job.work, Job.started_at)
+        .where(Job.status == JobStatus.RUNNING, Job.lease_expires_at >= now)
+    )).all():
+        elapsed = (now - _as_utc(started_at)).total_seconds() if started_at else 0.0
+        running.append((max(times.seconds(work) - elapsed, 0.0), job_cost(cost)))
+    heapq.heapify(running)
+    used = sum(cost for _, cost in running)
+    
+    ahead = (await db.execute(
+        select(Job.cost, Job.work)
+        .where(_ahead_of(job))
+        .order_by(Job.priority.desc(), Job.created_at, Job.id)
+    )).all()
+    clock = 0.0
+    for cost, work in [*ahead, (job.cost, job.work)]:
+        cost = job_cost(cost)
+        while running and used + cost > settings.scheduler_capacity:
+            finish, freed = heapq.heappop(running)
+            clock = max(clock, finish)
+            used -= freed
+        heapq.heappush(running, (clock + times.seconds(work), cost))
+        used += cost
+    
+    start = now + timedelta(seconds=clock)
+    if job.run_after:
+        start = max(start, _as_utc(job.run_after))  # Waiting to be retried
+    return QueueStatus(
+        position, settings.scheduler_capacity, in_use, start, start + timedelta(seconds=times.seconds(job.work))
+    )
+
+
+async def queued_jobs(db: AsyncSession, kind: str) -> int:
+    """
+    Count the jobs of a kind waiting to run.
+    
+    Args:
+        db: Database session
+        kind: Job kind
+    
+    Returns:
+        Queued jobs
+    """
+    return await db.scalar(
+        select(func.count()).select_from(Job).where(Job.kind == kind, Job.status == JobStatus.QUEUED)
+    )
@@ -1,119 +1,754 @@
 """File storage service for handling uploads and downloads."""
 
 import os
+import io
 import csv
 import json
+import hashlib
+import itertools
+import uuid
+from dataclasses import dataclass
 from pathlib import Path
-from typing import Tuple
+from contextlib import contextmanager
+from typing import Any, BinaryIO, Dict, Iterator, List, Optional, Tuple
 from fastapi import UploadFile
 
 from app.config import settings
+from app.services.profiling_service import SchemaProfiler
+from app.services.json_stream import iter_json_item_spans
+from app.services.row_index import ROW_INDEX_SUFFIX, RowIndex, RowIndexWriter, RowRange
+from app.services.compression import (
+    ENCODING_SUFFIXES, DecompressionError, is_supported, split_encoding, open_reader, open_writer
+)
 
 
 ALLOWED_EXTENSIONS = {".csv", ".json", ".jsonl"}
 
+# Subdirectory of upload_dir holding content-addressed objects
+OBJECTS_DIR = "objects"
+
+# Rows read at a time when streaming a shard of a dataset
+SHARD_PAGE_ROWS = 1024
+
 
 def validate_file_type(filename: str) -> bool:
     """
     Validate file extension.
     
+    A compression suffix (``.gz``, or ``.zst`` when zstandard is installed)
+    may follow the extension, e.g. ``data.jsonl.gz``.
+    
     Args:
         filename: Name of the file
         
     Returns:
         True if valid, False otherwise
     """
-    ext = Path(filename).suffix.lower()
+    name, encoding = split_encoding(filename)
+    if encoding and not is_supported(encoding):
+        return False
+    ext = Path(name).suffix.lower()
     return ext in ALLOWED_EXTENSIONS
 
 
-def save_uploaded_file(file: UploadFile, dataset_id: str) -> Tuple[str, int]:
+def dataset_format(file_path: str) -> Tuple[str, Optional[str]]:
+    """
+    Get the format of a stored dataset file.
+    
+    Args:
+        file_path: Path to the stored file
+        
+    Returns:
+        Tuple of (file extension, encoding or None if stored uncompressed)
+    """
+    name, encoding = split_encoding(Path(file_path).name)
+    return Path(name).suffix.lower(), encoding
+
+
+@dataclass
+class StoredFile:
+    """Result of streaming an upload to storage."""
+    file_path: str
+    row_count: Optional[int]
+    content_hash: str
+    size_bytes: int
+    schema_summary: Dict[str, Any]
+
+
+class _TeeReader(io.RawIOBase):
+    """
+    Read-only raw stream that copies everything it reads into a sink.
+    
+    Wrapping an upload in this reader lets a parser pull rows from it while
+    the same bytes are written to disk and hashed, so the upload is only
+    traversed once.
+    """
+    
+    def __init__(self, source: BinaryIO, sink: BinaryIO):
+        self._source = source
+        self._sink = sink
+        self.hasher = hashlib.sha256()
+        self.size_bytes = 0
+    
+    def readable(self) -> bool:
+        return True
+    
+    def _copy(self, chunk: bytes) -> None:
+        """Write a chunk to the sink and add it to the hash."""
+        self._sink.write(chunk)
+        self.hasher.update(chunk)
+        self.size_bytes += len(chunk)
+    
+    def readinto(self, buffer) -> int:
+        chunk = self._source.read(len(buffer))
+        size = len(chunk)
+        buffer[:size] = chunk
+        if size:
+            self._copy(chunk)
+        return size
+    
+    def drain(self) -> None:
+        """Copy whatever the parser did not consume."""
+        while True:
+            chunk = self._source.read(settings.upload_chunk_size)
+            if not chunk:
+                break
+            self._copy(chunk)
+
+
+def _iter_csv_spans(stream: BinaryIO) -> Iterator[Tuple[Dict[str, Any], int, int]]:
+    """
+    Iterate over CSV records as dicts, with their byte spans.
+    
+    The reader is fed one line at a time and never reads ahead, so the bytes
+    consumed after each record mark where it ends, including records with
+    quoted newlines.
+    
+    Args:
+        stream: Binary stream positioned at the start of the file
+        
+    Yields:
+        Tuples of (row, start offset, end offset)
+    """
+    consumed = 0
+    
+    def lines() -> Iterator[str]:
+        nonlocal consumed
+        for line in stream:
+            consumed += len(line)
+            yield line.decode("utf-8")
+    
+    reader = csv.DictReader(lines())
+    if reader.fieldnames is None:
+        return  # Empty file
+    start = consumed
+    for row in reader:
+        yield row, start, consumed
+        start = consumed
+
+
+def iter_row_spans(stream: BinaryIO, file_ext: str) -> Iterator[Tuple[Any, int, int]]:
+    """
+    Iterate over the parsed rows of a dataset stream with their byte spans.
+    
+    Spans are offsets into the stream. Bytes between rows (blank lines,
+    JSON separators) are not part of any span.
+    
+    Args:
+        stream: Binary stream positioned at the start of the file
+        file_ext: File extension
+        
+    Yields:
+        Tuples of (row, start offset, end offset)
+        
+    Raises:
+        ValueError: If the content cannot be parsed
+    """
+    if file_ext == ".csv":
+        yield from _iter_csv_spans(stream)
+    elif file_ext == ".jsonl":
+        position = 0
+        for line_number, line in enumerate(stream, start=1):
+            start = position
+            position += len(line)
+            if not line.strip():
+                continue
+            try:
+                yield json.loads(line), start, position
+            except json.JSONDecodeError as e:
+                raise ValueError(f"Invalid JSON on line {line_number}: {e}")
+    elif file_ext == ".json":
+        yield from iter_json_item_spans(stream)
+
+
+def iter_rows(stream: BinaryIO, file_ext: str) -> Iterator[Any]:
+    """
+    Iterate over the parsed rows of a dataset stream.
+    
+    CSV rows are yielded as dicts keyed by header, JSONL rows as parsed
+    values. A JSON document yields the items of a top-level array, or the
+    document itself if it is an object. Memory use is bounded by the size of
+    a single row for every format.
+    
+    Args:
+        stream: Binary stream positioned at the start of the file
+        file_ext: File extension
+        
+    Yields:
+        Parsed rows
+        
+    Raises:
+        ValueError: If the content cannot be parsed
+    """
+    for row, _, _ in iter_row_spans(stream, file_ext):
+        yield row
+
+
+@contextmanager
+def open_dataset(file_path: str) -> Iterator[BinaryIO]:
     """
-    Save uploaded file to storage.
+    Open a stored dataset file, decompressing it on the fly if needed.
+    
+    Args:
+        file_path: Path to the stored file
+        
+    Yields:
+        Binary stream over the uncompressed content
+    """
+    encoding = dataset_format(file_path)[1]
+    with open(file_path, "rb") as f:
+        yield open_reader(f, encoding) if encoding else f
+
+
+def iter_dataset_rows(file_path: str) -> Iterator[Any]:
+    """
+    Iterate over the parsed rows of a stored dataset file.
+    
+    Args:
+        file_path: Path to the stored file
+        
+    Yields:
+        Parsed rows, as produced by ``iter_rows``
+    """
+    with open_dataset(file_path) as f:
+        yield from iter_rows(f, dataset_format(file_path)[0])
+
+
+def _object_path(content_hash: str, file_ext: str, encoding: Optional[str] = None) -> Path:
+    """
+    Get the content-addressed storage path for an object.
+    
+    Args:
+        content_hash: SHA-256 of the uncompressed content
+        file_ext: File extension (the same bytes parse differently per format)
+        encoding: Encoding the object is stored with, or None if uncompressed
+        
+    Returns:
+        Object path
+    """
+    suffix = ENCODING_SUFFIXES[encoding] if encoding else ""
+    return Path(settings.upload_dir) / OBJECTS_DIR / content_hash[:2] / f"{content_hash}{file_ext}{suffix}"
+
+
+def _find_object(content_hash: str, file_ext: str) -> Tuple[Path, Optional[Dict[str, Any]]]:
+    """
+    Find a stored object with the given content, in any encoding.
+    
+    Args:
+        content_hash: SHA-256 of the uncompressed content
+        file_ext: File extension
+        
+    Returns:
+        Tuple of (object path, stats). Stats are None if no object exists, in
+        which case the path is where a new object would be stored.
+    """
+    current = settings.storage_compression or None
+    for encoding in [current] + [e for e in [None, *ENCODING_SUFFIXES] if e != current]:
+        object_path = _object_path(content_hash, file_ext, encoding)
+        stats = _load_stats(object_path)
+        if stats is not None:
+            return object_path, stats
+    return _object_path(content_hash, file_ext, current), None
+
+
+def _stats_path(object_path: Path) -> Path:
+    """Get the path of the stats sidecar stored next to an object."""
+    return object_path.with_name(object_path.name + ".meta.json")
+
+
+def _object_for(file_path: str) -> Optional[Path]:
+    """
+    Find the stored object a dataset file links to.
+    
+    Dataset files are named ``{dataset_id}_{object name}``. Files from
+    before content-addressed storage do not match and return None.
+    
+    Args:
+        file_path: Path to the dataset file
+        
+    Returns:
+        Object path, or None if the file is not backed by an object
+    """
+    object_name = Path(file_path).name.rsplit("_", 1)[-1]
+    content_hash = object_name[:64]
+    if object_name[64:65] != "." or not all(c in "0123456789abcdef" for c in content_hash):
+        return None
+    return Path(settings.upload_dir) / OBJECTS_DIR / content_hash[:2] / object_name
+
+
+def sidecar_path(file_path: str, suffix: str) -> Path:
+    """
+    Get the path of a derived file (index, columnar copy, ...) for a dataset.
+    
+    Sidecars of object-backed files are stored next to the object, so they
+    are shared by every dataset with the same content and deleted with it.
+    
+    Args:
+        file_path: Path to the dataset file
+        suffix: Sidecar suffix, e.g. ``.parquet``
+        
+    Returns:
+        Sidecar path
+    """
+    object_path = _object_for(file_path)
+    try:
+        if object_path is not None and os.path.samefile(object_path, file_path):
+            return object_path.with_name(object_path.name + suffix)
+    except OSError:
+        pass  # Object missing: the dataset keeps a private copy
+    path = Path(file_path)
+    return path.with_name(path.name + suffix)
+
+
+def _install_sidecar(source: Path, dataset_path: Path, suffix: str) -> None:
+    """
+    Move a freshly built sidecar into place, unless one already exists.
+    
+    Args:
+        source: Sidecar built during the upload; missing if it was discarded
+        dataset_path: Path to the dataset file
+        suffix: Sidecar suffix
+    """
+    target = sidecar_path(str(dataset_path), suffix)
+    if source.exists() and not target.exists():
+        os.replace(source, target)
+
+
+def _write_json_atomic(path: Path, data: Dict[str, Any]) -> None:
+    """
+    Write JSON so that readers never see a partially written file.
+    
+    Args:
+        path: Destination path
+        data: JSON-serializable data
+    """
+    temp_path = path.with_name(f"{path.name}.{uuid.uuid4().hex}.tmp")
+    with open(temp_path, "w", encoding="utf-8") as f:
+        json.dump(data, f)
+    os.replace(temp_path, path)
+
+
+def _load_stats(object_path: Path) -> Optional[Dict[str, Any]]:
+    """
+    Load the stats recorded for a stored object.
+    
+    Args:
+        object_path: Object path
+        
+    Returns:
+        Stats dict, or None if the object or its stats are missing
+    """
+    try:
+        with open(_stats_path(object_path), "r", encoding="utf-8") as f:
+            stats = json.load(f)
+    except (OSError, ValueError):
+        return None
+    return stats if object_path.exists() else None
+
+
+def _link_dataset(source: Path, object_path: Path, dataset_path: Path) -> None:
+    """
+    Register content in the object store and link a dataset file to it.
+    
+    The object is created from ``source`` unless identical content is
+    already stored. Each dataset file is a hard link to the object, so the
+    object's link count is its reference count.
+    
+    Args:
+        source: Freshly written copy of the content
+        object_path: Content-addressed object path
+        dataset_path: Path for the dataset's file
+    """
+    object_path.parent.mkdir(parents=True, exist_ok=True)
+    try:
+        try:
+            os.link(source, object_path)
+        except FileExistsError:
+            pass  # Identical content is already stored
+        try:
+            os.link(object_path, dataset_path)
+        except FileNotFoundError:
+            # The object was released concurrently; store this copy instead
+            os.link(source, object_path)
+            os.link(object_path, dataset_path)
+    except OSError:
+        # Filesystem without hard links: keep a private copy
+        if not dataset_path.exists():
+            os.replace(source, dataset_path)
+            return
+    os.remove(source)
+
+
+def _stored_file(dataset_path: Path, content_hash: str, stats: Dict[str, Any]) -> StoredFile:
+    """Build a StoredFile from recorded object stats."""
+    return StoredFile(
+        file_path=str(dataset_path),
+        row_count=stats.get("row_count"),
+        content_hash=content_hash,
+        size_bytes=stats.get("size_bytes", 0),
+        schema_summary=stats.get("schema_summary") or {}
+    )
+
+
+def _reuse_object(source: BinaryIO, dataset_id: str, file_ext: str, content_hash: str) -> Optional[StoredFile]:
+    """
+    Link to an already stored object if the upload matches a claimed hash.
+    
+    The upload is only hashed, not written or parsed, and the recorded stats
+    are reused.
+    
+    Args:
+        source: Upload stream, uncompressed
+        dataset_id: Dataset ID for filename
+        file_ext: File extension
+        content_hash: SHA-256 claimed by the client
+        
+    Returns:
+        Stored file details, or None if no matching object exists
+    """
+    object_path, stats = _find_object(content_hash.lower(), file_ext)
+    if stats is None:
+        return None
+    
+    hasher = hashlib.sha256()
+    while True:
+        chunk = source.read(settings.upload_chunk_size)
+        if not chunk:
+            break
+        hasher.update(chunk)
+    if hasher.hexdigest() != content_hash.lower():
+        return None
+    
+    dataset_path = Path(settings.upload_dir) / f"{dataset_id}_{object_path.name}"
+    try:
+        os.link(object_path, dataset_path)
+    except OSError:
+        return None
+    return _stored_file(dataset_path, content_hash.lower(), stats)
+
+
+def _decoded(source: BinaryIO, encoding: Optional[str]) -> BinaryIO:
+    """Wrap an upload stream so that it reads uncompressed content."""
+    return open_reader(source, encoding) if encoding else source
+
+
+def save_uploaded_file(file: UploadFile, dataset_id: str, content_hash: Optional[str] = None) -> StoredFile:
+    """
+    Stream uploaded file to storage.
     
     Args:
         file: Uploaded file object
         dataset_id: Dataset ID for filename
+        content_hash: Optional SHA-256 of the content, computed by the client
+        
+    Returns:
+        Stored file details
+    """
+    return store_stream(file.file, file.filename, dataset_id, content_hash)
+
+
+def store_stream(source: BinaryIO, filename: str, dataset_id: str, content_hash: Optional[str] = None) -> StoredFile:
+    """
+    Stream dataset content to content-addressed storage.
+    
+    The upload is copied in fixed-size chunks, so peak memory does not depend
+    on the file size. Rows are parsed, counted and profiled, and the content
+    is hashed, in the same pass that writes the bytes. Content that is
+    already stored is not kept twice: the dataset file becomes another link
+    to the existing object and its recorded stats are reused. If the client
+    supplies the SHA-256 of a stored object, the upload is only hashed to
+    verify it. If ``storage_compression`` is set, new objects are compressed
+    as they are written; the content hash and ``size_bytes`` always refer to
+    the uncompressed content. A compressed upload (e.g. ``data.csv.gz``) is
+    decompressed on the fly. This does blocking file I/O; call it from a
+    worker thread when used inside a coroutine.
+    
+    Args:
+        source: Binary stream with the file content
+        filename: Original filename, used for the file type and encoding
+        dataset_id: Dataset ID for filename
+        content_hash: Optional SHA-256 of the content, computed by the client.
+            Requires a seekable source.
         
     Returns:
-        Tuple of (file_path, row_count)
+        Stored file details. ``row_count`` is None if the content could not
+        be parsed.
     """
     # Validate file type
-    if not validate_file_type(file.filename):
+    if not validate_file_type(filename):
         raise ValueError(f"Invalid file type. Allowed: {', '.join(ALLOWED_EXTENSIONS)}")
     
-    # Generate file path
     upload_path = Path(settings.upload_dir)
-    upload_path.mkdir(parents=True, exist_ok=True)
+    temp_dir = upload_path / OBJECTS_DIR / "tmp"
+    temp_dir.mkdir(parents=True, exist_ok=True)
+    name, upload_encoding = split_encoding(filename)
+    file_ext = Path(name).suffix.lower()
+    encoding = settings.storage_compression or None
     
-    # Create filename: {dataset_id}_{original_filename}
-    file_ext = Path(file.filename).suffix
-    filename = f"{dataset_id}_{file.filename}"
-    file_path = upload_path / filename
+    if content_hash:
+        stored = _reuse_object(_decoded(source, upload_encoding), dataset_id, file_ext, content_hash)
+        if stored:
+            return stored
+        source.seek(0)
     
-    # Save file
-    with open(file_path, "wb") as f:
-        content = file.file.read()
-        f.write(content)
+    # Copy, hash, count and profile in a single pass
+    suffix = ENCODING_SUFFIXES[encoding] if encoding else ""
+    temp_path = temp_dir / f"{dataset_id}{file_ext}{suffix}"
+    profiler = SchemaProfiler()
+    index = RowIndexWriter(temp_dir / f"{dataset_id}{ROW_INDEX_SUFFIX}")
+    try:
+        with open(temp_path, "wb") as f:
+            sink = open_writer(f, encoding, settings.storage_compression_level) if encoding else f
+            tee = _TeeReader(_decoded(source, upload_encoding), sink)
+            stream = io.BufferedReader(tee, buffer_size=settings.upload_chunk_size)
+            end = 0
+            try:
+                for row, start, end in iter_row_spans(stream, file_ext):
+                    profiler.add_row(row)
+                    index.add(start)
+            except DecompressionError:
+                raise
+            except (ValueError, UnicodeDecodeError) as e:
+                profiler.error = str(e)
+            tee.drain()
+            if encoding:
+                sink.close()  # Finish the compressed stream
+        if profiler.error:
+            index.discard()
+        else:
+            index.close(end)
+        
+        content_hash = tee.hasher.hexdigest()
+        object_path, stats = _find_object(content_hash, file_ext)
+        if stats is not None and object_path != _object_path(content_hash, file_ext, encoding):
+            # Identical content is stored with another encoding; link to it as is
+            dataset_path = upload_path / f"{dataset_id}_{object_path.name}"
+            try:
+                os.link(object_path, dataset_path)
+                _install_sidecar(index.path, dataset_path, ROW_INDEX_SUFFIX)
+                return _stored_file(dataset_path, content_hash, stats)
+            except OSError:
+                object_path, stats = _object_path(content_hash, file_ext, encoding), None
+        
+        if stats is None:
+            stats = {
+                "row_count": None if profiler.error else profiler.row_count,
+                "size_bytes": tee.size_bytes,
+                "stored_size_bytes": temp_path.stat().st_size,
+                "schema_summary": profiler.summary(),
+            }
+            object_path.parent.mkdir(parents=True, exist_ok=True)
+            _write_json_atomic(_stats_path(object_path), stats)
+        
+        # Dataset files are named {dataset_id}_{object name}
+        dataset_path = upload_path / f"{dataset_id}_{object_path.name}"
+        _link_dataset(temp_path, object_path, dataset_path)
+        _install_sidecar(index.path, dataset_path, ROW_INDEX_SUFFIX)
+    finally:
+        temp_path.unlink(missing_ok=True)
+        index.discard()
     
-    # Count rows
-    row_count = count_rows(file_path, file_ext)
+    return _stored_file(dataset_path, content_hash, stats)
+
+
+def _row_from_span(data: bytes, file_ext: str, header: Optional[List[str]]) -> Any:
+    """
+    Parse one row from the bytes between its index offsets.
     
-    return str(file_path), row_count
+    Args:
+        data: Bytes from the row's start offset to the next row's
+        file_ext: File extension
+        header: CSV header, for CSV files
+        
+    Returns:
+        Parsed row, as produced by ``iter_rows``
+    """
+    if file_ext == ".csv":
+        text = io.StringIO(data.decode("utf-8"), newline="")
+        record = next(record for record in csv.reader(text) if record)
+        # Same shape as csv.DictReader rows
+        row = dict(zip(header, record))
+        if len(record) > len(header):
+            row[None] = record[len(header):]
+        for key in header[len(record):]:
+            row[key] = None
+        return row
+    data = data.strip(b" \t\r\n")
+    if file_ext == ".json" and data.endswith(b","):
+        data = data[:-1]  # Separator before the next array item
+    return json.loads(data)
+
+
+def _skip(stream: BinaryIO, size: int) -> None:
+    """Read and discard bytes from a stream that cannot seek."""
+    while size > 0:
+        chunk = stream.read(min(size, settings.upload_chunk_size))
+        if not chunk:
+            break
+        size -= len(chunk)
 
 
-def count_rows(file_path: Path, file_ext: str) -> int:
+def _seek_row(stream: BinaryIO, file_ext: str, encoding: Optional[str], data_start: int, offset: int) -> Optional[List[str]]:
     """
-    Count rows in uploaded file.
+    Move an opened dataset file to a row's offset.
     
     Args:
-        file_path: Path to the file
+        stream: File opened with ``open_dataset``, at its start
         file_ext: File extension
+        encoding: Compression of the file, which then cannot seek
+        data_start: Offset of the first row
+        offset: Offset of the row
         
     Returns:
-        Number of rows
+        CSV header, for CSV files
     """
-    try:
-        if file_ext == ".csv":
-            with open(file_path, "r", encoding="utf-8") as f:
-                reader = csv.reader(f)
-                return sum(1 for _ in reader) - 1  # Subtract header
-        elif file_ext == ".json":
-            with open(file_path, "r", encoding="utf-8") as f:
-                data = json.load(f)
-                if isinstance(data, list):
-                    return len(data)
-                elif isinstance(data, dict):
-                    return 1
-                return 0
-        elif file_ext == ".jsonl":
-            with open(file_path, "r", encoding="utf-8") as f:
-                return sum(1 for _ in f)
-        return 0
-    except Exception:
-        return 0
-
-
-def read_file(file_path: str) -> bytes:
-    """
-    Read file for download.
+    header = None
+    position = 0
+    if file_ext == ".csv":
+        # The header is everything before the first row
+        position = data_start
+        text = io.StringIO(stream.read(position).decode("utf-8"), newline="")
+        header = next(csv.reader(text), [])
+    if encoding:
+        _skip(stream, offset - position)
+    else:
+        stream.seek(offset)
+    return header
+
+
+def read_rows(file_path: str, offset: int, limit: int) -> List[Any]:
+    """
+    Read a page of rows from a stored dataset file.
+    
+    With a row index, the page is located from its offsets and read with a
+    single seek, without parsing the rows before it. Compressed files cannot
+    seek, so the bytes before the page are decompressed and skipped, still
+    without parsing. Files without an index are parsed from the start.
     
     Args:
-        file_path: Path to the file
+        file_path: Path to the stored file
+        offset: Index of the first row
+        limit: Maximum number of rows
         
     Returns:
-        File content as bytes
+        Parsed rows, as produced by ``iter_rows``
     """
-    with open(file_path, "rb") as f:
-        return f.read()
+    file_ext, encoding = dataset_format(file_path)
+    index_path = sidecar_path(file_path, ROW_INDEX_SUFFIX)
+    if not index_path.exists():
+        return list(itertools.islice(iter_dataset_rows(file_path), offset, offset + limit))
+    
+    with RowIndex(index_path) as index:
+        stop = min(offset + limit, len(index))
+        if offset >= stop:
+            return []
+        offsets = index.offsets(offset, stop)
+        data_start = index.offset(0)
+    
+    with open_dataset(file_path) as f:
+        header = _seek_row(f, file_ext, encoding, data_start, offsets[0])
+        data = f.read(offsets[-1] - offsets[0])
+    
+    base = offsets[0]
+    return [
+        _row_from_span(data[start - base:end - base], file_ext, header)
+        for start, end in zip(offsets, offsets[1:])
+    ]
+
+
+def shard_rows(file_path: str, count: int) -> Optional[List[RowRange]]:
+    """
+    Split a stored dataset into contiguous shards of near-equal row counts.
+    
+    Shards are computed from the row index without reading the file. Byte
+    ranges refer to the uncompressed content.
+    
+    Args:
+        file_path: Path to the stored file
+        count: Number of shards
+        
+    Returns:
+        Range of each shard, or None if the file has no row index
+    """
+    index_path = sidecar_path(file_path, ROW_INDEX_SUFFIX)
+    if not index_path.exists():
+        return None
+    with RowIndex(index_path) as index:
+        return index.shards(count)
+
+
+def iter_shard_rows(file_path: str, shard: RowRange) -> Iterator[Any]:
+    """
+    Stream the rows of one shard of a stored dataset, from ``shard_rows``.
+    
+    The file is positioned at the shard with one seek, and its rows are
+    read in pages of ``SHARD_PAGE_ROWS`` located from the row index.
+    
+    Args:
+        file_path: Path to the stored file
+        shard: Range of the shard
+        
+    Yields:
+        Parsed rows, as produced by ``iter_rows``
+    """
+    file_ext, encoding = dataset_format(file_path)
+    with RowIndex(sidecar_path(file_path, ROW_INDEX_SUFFIX)) as index, open_dataset(file_path) as f:
+        header = _seek_row(f, file_ext, encoding, index.offset(0), shard.start_byte)
+        for start in range(shard.start_row, shard.stop_row, SHARD_PAGE_ROWS):
+            offsets = index.offsets(start, min(start + SHARD_PAGE_ROWS, shard.stop_row))
+            data = f.read(offsets[-1] - offsets[0])
+            base = offsets[0]
+            for row_start, row_end in zip(offsets, offsets[1:]):
+                yield _row_from_span(data[row_start - base:row_end - base], file_ext, header)
 
 
 def delete_file(file_path: str) -> None:
     """
-    Delete a file.
+    Delete a dataset file.
+    
+    Removes the dataset's link to its stored object. The object and its
+    sidecar files are only deleted once no other dataset references them.
     
     Args:
         file_path: Path to the file
     """
-    if os.path.exists(file_path):
-        os.remove(file_path)
+    if not os.path.exists(file_path):
+        return
+    
+    object_path = _object_for(file_path)
+    os.remove(file_path)
+    
+    # Sidecars of a private copy are stored next to the file itself
+    path = Path(file_path)
+    for sidecar in path.parent.glob(f"{path.name}.*"):
+        sidecar.unlink(missing_ok=True)
+    
+    if object_path is None or not object_path.exists():
+        return
+    if os.stat(object_path).st_nlink > 1:
+        return  # Still referenced by other datasets
+    other_encodings = {object_path.name + suffix for suffix in ENCODING_SUFFIXES.values()}
+    for sidecar in object_path.parent.glob(f"{object_path.name}.*"):
+        if sidecar.name not in other_encodings:
+            sidecar.unlink(missing_ok=True)
+    object_path.unlink(missing_ok=True)
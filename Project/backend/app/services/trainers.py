@@ -0,0 +1,659 @@
+"""Training backends run by training jobs, selected by ``training_config["trainer"]``."""
+
+import abc
+import itertools
+import json
+import math
+import random
+import re
+import threading
+import time
+import zlib
+from array import array
+from typing import Any, Callable, Dict, Iterator, List, NamedTuple, Optional, Tuple, Type
+
+from app.config import settings
+from app.services.storage_service import iter_dataset_rows, iter_shard_rows, shard_rows
+
+# Trainer used when the training config does not name one
+DEFAULT_TRAINER = "simulated"
+
+# Epochs assumed when the training config does not set them
+DEFAULT_EPOCHS = 10
+
+# Batch size assumed when the training config does not set one
+DEFAULT_BATCH_SIZE = 8
+
+# Steps the simulation records per epoch, at most
+SIMULATED_MAX_STEPS_PER_EPOCH = 1000
+
+# Without an evaluation dataset, every HOLDOUT_EVERY-th row is held out for validation
+HOLDOUT_EVERY = 10
+
+# Words and single punctuation marks, lowercased
+_TOKEN = re.compile(r"\w+|[^\w\s]")
+
+# Adam hyperparameters of the n-gram trainer
+_BETA1, _BETA2, _EPSILON = 0.9, 0.999, 1e-8
+
+
+class EpochResult(NamedTuple):
+    """What a trainer reports after an epoch."""
+    train_loss: float
+    val_loss: Optional[float]
+    step_losses: List[Tuple[int, float]]  # (step, training loss) of each optimizer step
+    samples: int  # Training rows processed
+    seconds: float  # Time spent training, excluding validation
+
+
+class TrainingFailed(Exception):
+    """Training ran but did not produce a usable model; the job is not retried."""
+
+
+class Trainer(abc.ABC):
+    """
+    Base class of training backends.
+    
+    A trainer is created for each attempt of a training job and trains one
+    epoch per ``train_epoch`` call. Calls run in a worker thread, so they may
+    block the CPU, and return early once ``stop`` is set. Between epochs,
+    its ``state_dict`` is checkpointed, and an attempt that resumes from a
+    checkpoint passes it to ``load_state_dict`` before the next epoch.
+    
+    Trainers that set ``data_parallel`` can also train with ``num_workers``
+    processes (see ``data_parallel.py``): each process trains one shard of
+    the dataset, with the state from ``shared_buffers`` in shared memory,
+    and exchanges gradients through the communicator given to ``attach``.
+    """
+    
+    architecture = "transformer"  # Recorded on the resulting model
+    data_parallel = False  # Whether it can train across processes
+    
+    def __init__(
+        self,
+        training_config: Dict[str, Any],
+        train_path: Optional[str],
+        eval_path: Optional[str] = None,
+        row_count: int = 0
+    ):
+        """
+        Args:
+            training_config: Experiment training config
+            train_path: Stored file of the training dataset
+            eval_path: Stored file of the evaluation dataset, if any
+            row_count: Rows of the training dataset
+        """
+        self.config = training_config
+        self.train_path = train_path
+        self.eval_path = eval_path
+        self.row_count = row_count
+        self.epochs = training_epochs(training_config)
+        self.batch_size = int_option(training_config, "batch_size", DEFAULT_BATCH_SIZE)
+        self.communicator = None
+    
+    @property
+    def rank(self) -> int:
+        """Rank of this process among the processes training the model."""
+        return self.communicator.rank if self.communicator else 0
+    
+    @property
+    def world_size(self) -> int:
+        """Processes training the model."""
+        return self.communicator.world_size if self.communicator else 1
+    
+    @property
+    def start_delay(self) -> float:
+        """Seconds to wait before training starts."""
+        return 0.0
+    
+    @property
+    @abc.abstractmethod
+    def parameters_count(self) -> int:
+        """Parameters of the trained model."""
+    
+    @abc.abstractmethod
+    def train_epoch(self, epoch: int, stop: threading.Event) -> EpochResult:
+        """
+        Train one epoch.
+        
+        Args:
+            epoch: Epoch number, from 0
+            stop: Set when training must stop; the result is then discarded
+        
+        Returns:
+            Losses, steps and throughput of the epoch
+        """
+    
+    @abc.abstractmethod
+    def evaluate(self) -> Dict[str, float]:
+        """
+        Evaluate the trained model.
+        
+        Returns:
+            Evaluation metrics
+        
+        Raises:
+            TrainingFailed: If the model is not usable
+        """
+    
+    def state_dict(self) -> Dict[str, Any]:
+        """
+        State to checkpoint after an epoch, from which ``load_state_dict``
+        resumes training at the next epoch.
+        
+        Returns:
+            JSON values and arrays, by name
+        """
+        return {}
+    
+    def load_state_dict(self, state: Dict[str, Any]) -> None:
+        """
+        Resume from a checkpointed state, before the first ``train_epoch``.
+        
+        Args:
+            state: State from ``state_dict``
+        
+        Raises:
+            ValueError: If the state does not fit the trainer
+        """
+    
+    def shared_buffers(self) -> Dict[str, Tuple[str, int]]:
+        """
+        Buffers holding the trainer's state, which the processes of a
+        data-parallel trainer share.
+        
+        Returns:
+            Array typecode and length of each buffer, by name
+        """
+        return {}
+    
+    def exchange_size(self) -> int:
+        """Values each process of a data-parallel trainer sends the others at a time."""
+        return 0
+    
+    def attach(self, buffers: Dict[str, memoryview], communicator: Any = None) -> None:
+        """
+        Keep the trainer's state in shared buffers.
+        
+        Args:
+            buffers: Views of the buffers from ``shared_buffers``, by name
+            communicator: In the training processes, the ``Communicator``
+                of this process's rank
+        """
+        self.communicator = communicator
+    
+    def close(self) -> None:
+        """Release what the trainer holds once training is over."""
+
+
+# Trainer classes by name
+TRAINERS: Dict[str, Type[Trainer]] = {}
+
+
+def trainer(name: str) -> Callable[[Type[Trainer]], Type[Trainer]]:
+    """
+    Register a class as the trainer of a name.
+    
+    Args:
+        name: Value of ``training_config["trainer"]`` that selects it
+    """
+    def register(cls: Type[Trainer]) -> Type[Trainer]:
+        TRAINERS[name] = cls
+        return cls
+    return register
+
+
+def trainer_class(training_config: Dict[str, Any]) -> Type[Trainer]:
+    """
+    Get the trainer a training config asks for.
+    
+    Args:
+        training_config: Experiment training config
+    
+    Returns:
+        Trainer class
+    
+    Raises:
+        ValueError: If the trainer is unknown
+    """
+    name = training_config.get("trainer") or DEFAULT_TRAINER
+    if name not in TRAINERS:
+        raise ValueError(f"Unknown trainer {name!r}; available: {', '.join(sorted(TRAINERS))}")
+    return TRAINERS[name]
+
+
+def int_option(training_config: Dict[str, Any], name: str, default: int, minimum: int = 1) -> int:
+    """Integer setting of a training config, falling back to the default if invalid."""
+    try:
+        return max(int(training_config.get(name, default)), minimum)
+    except (TypeError, ValueError):
+        return default
+
+
+def training_epochs(training_config: Dict[str, Any]) -> int:
+    """
+    Get the number of epochs a training config asks for.
+    
+    Args:
+        training_config: Experiment training config
+    
+    Returns:
+        Epochs, at least 1
+    """
+    return int_option(training_config, "epochs", DEFAULT_EPOCHS)
+
+
+def float_option(training_config: Dict[str, Any], name: str, default: float) -> float:
+    """Positive float setting of a training config, falling back to the default if invalid."""
+    try:
+        value = float(training_config.get(name, default))
+    except (TypeError, ValueError):
+        return default
+    return value if value > 0 and math.isfinite(value) else default
+
+
+@trainer("simulated")
+class SimulatedTrainer(Trainer):
+    """Sleeps through each epoch and makes up its losses and metrics."""
+    
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.steps_per_epoch = min(
+            max(math.ceil(self.row_count / self.batch_size), 1), SIMULATED_MAX_STEPS_PER_EPOCH
+        )
+        self._parameters_count = random.randint(1000000, 100000000)
+    
+    @property
+    def start_delay(self) -> float:
+        return settings.training_simulation_delay
+    
+    @property
+    def parameters_count(self) -> int:
+        return self._parameters_count
+    
+    def state_dict(self) -> Dict[str, Any]:
+        return {"parameters_count": self._parameters_count}
+    
+    def load_state_dict(self, state: Dict[str, Any]) -> None:
+        self._parameters_count = int(state["parameters_count"])
+    
+    def train_epoch(self, epoch: int, stop: threading.Event) -> EpochResult:
+        started = time.monotonic()
+        stop.wait(settings.training_simulation_duration / self.epochs)
+        train_loss = random.uniform(2.0, 0.1) * (1 - epoch / self.epochs)
+        val_loss = train_loss + random.uniform(0, 0.2)
+        first_step = epoch * self.steps_per_epoch
+        return EpochResult(
+            train_loss,
+            val_loss,
+            [
+                (first_step + step, train_loss * random.uniform(0.9, 1.1))
+                for step in range(1, self.steps_per_epoch + 1)
+            ],
+            self.row_count,
+            time.monotonic() - started
+        )
+    
+    def evaluate(self) -> Dict[str, float]:
+        # Randomly succeed or fail (90% success rate)
+        if random.random() >= 0.9:
+            raise TrainingFailed("Simulated training failure")
+        return {
+            "accuracy": round(random.uniform(0.75, 0.95), 4),
+            "f1": round(random.uniform(0.70, 0.90), 4),
+            "perplexity": round(random.uniform(10.0, 50.0), 4)
+        }
+
+
+def _row_text(row: Any, fields: Optional[List[str]]) -> str:
+    """Text of a dataset row: the given fields, or every string value."""
+    if isinstance(row, dict):
+        values = [row.get(field) for field in fields] if fields else list(row.values())
+        return " ".join(value if isinstance(value, str) else json.dumps(value) for value in values if value is not None)
+    return row if isinstance(row, str) else json.dumps(row)
+
+
+def _hash(text: str) -> int:
+    """Stable across processes, unlike ``hash()``."""
+    return zlib.crc32(text.encode("utf-8"))
+
+
+# A row's examples: the features and the target bucket of each token
+Example = Tuple[Tuple[int, int, int], int]
+
+# Step summed over a process's rows: gradients by feature, summed loss,
+# examples, rows, and whether the rows are exhausted
+Step = Tuple[Dict[int, List[float]], float, int, int, bool]
+
+# Values at the start of a process's slot: the loss, examples, rows and
+# features of its step, and whether its rows are exhausted
+_SLOT_HEADER = 5
+
+
+@trainer("ngram")
+class NGramTrainer(Trainer):
+    """
+    Next-word language model over hashed n-grams, trained with Adam on the CPU.
+    
+    Each word is predicted from the previous word and the previous two words,
+    hashed into ``feature_buckets`` features of a log-linear (softmax
+    regression) model over ``vocab_size`` hashed word buckets. It is small
+    enough to train in pure Python, and gives real losses, perplexities and
+    throughput for any text dataset.
+    
+    Rows are streamed from the dataset file in batches of ``batch_size``,
+    and gradients of ``gradient_accumulation_steps`` batches are summed
+    before each optimizer step. Training config settings: ``learning_rate``
+    (default 0.001), ``batch_size``, ``gradient_accumulation_steps`` (1),
+    ``vocab_size`` (256), ``feature_buckets`` (16384), ``max_tokens`` per
+    row (64), ``text_fields`` (default: every field of a row) and
+    ``max_eval_rows`` (1000).
+    
+    With ``num_workers``, each process trains batches of ``batch_size``
+    rows of its shard. At each step the processes publish their gradients,
+    then each sums the gradients of the features it owns (``feature %
+    world_size == rank``) and updates them in the shared weights. Training
+    is the same as in one process with ``num_workers`` times larger
+    batches, and the update work is split between the processes too.
+    """
+    
+    architecture = "ngram-loglinear"
+    data_parallel = True
+    
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        if not self.train_path:
+            raise ValueError("The n-gram trainer needs a training dataset file")
+        config = self.config
+        self.learning_rate = float_option(config, "learning_rate", 0.001)
+        self.accumulation_steps = int_option(config, "gradient_accumulation_steps", 1)
+        self.vocab_size = int_option(config, "vocab_size", 256, minimum=2)
+        self.feature_buckets = int_option(config, "feature_buckets", 16384, minimum=2)
+        self.max_tokens = int_option(config, "max_tokens", 64)
+        self.max_eval_rows = int_option(config, "max_eval_rows", 1000)
+        fields = config.get("text_fields")
+        self.text_fields = [fields] if isinstance(fields, str) else fields
+        
+        # Weights and Adam moments, float32 rows of vocab_size per feature,
+        # allocated on first use unless they are shared
+        self.weights: Optional[memoryview] = None
+        self.first: Optional[memoryview] = None
+        self.second: Optional[memoryview] = None
+        self.step = 0
+    
+    @property
+    def parameters_count(self) -> int:
+        return self.feature_buckets * self.vocab_size
+    
+    def shared_buffers(self) -> Dict[str, Tuple[str, int]]:
+        return {name: ("f", self.parameters_count) for name in ("weights", "first", "second")}
+    
+    def exchange_size(self) -> int:
+        # A step's features: up to three per word
+        features = min(self.feature_buckets, 3 * self.max_tokens * self.batch_size * self.accumulation_steps)
+        return _SLOT_HEADER + features * (1 + self.vocab_size)
+    
+    def attach(self, buffers: Dict[str, memoryview], communicator: Any = None) -> None:
+        super().attach(buffers, communicator)
+        self.weights, self.first, self.second = buffers["weights"], buffers["first"], buffers["second"]
+    
+    def state_dict(self) -> Dict[str, Any]:
+        self._allocate()
+        return {"step": self.step, "weights": self.weights, "first": self.first, "second": self.second}
+    
+    def load_state_dict(self, state: Dict[str, Any]) -> None:
+        self._allocate()
+        # Arrays already in shared memory are left out of the state of the processes
+        arrays = [name for name in self.shared_buffers() if name in state]
+        for name in arrays:
+            view = getattr(self, name)
+            if len(state[name]) != len(view):
+                raise ValueError(f"The checkpoint's {name} have {len(state[name])} values, the model {len(view)}")
+        for name in arrays:
+            getattr(self, name)[:] = state[name]
+        self.step = int(state["step"])
+    
+    def _allocate(self) -> None:
+        """Allocate the state in this process, unless it is shared."""
+        if self.weights is None:
+            self.attach({
+                name: memoryview(array(typecode, bytes(array(typecode).itemsize * length)))
+                for name, (typecode, length) in self.shared_buffers().items()
+            })
+    
+    def examples(self, row: Any) -> List[Example]:
+        """
+        Turn a row into next-word examples.
+        
+        Args:
+            row: Parsed dataset row
+        
+        Returns:
+            Features (bias, previous word, previous two words) and target
+            bucket of each word
+        """
+        tokens = _TOKEN.findall(_row_text(row, self.text_fields).lower())[:self.max_tokens]
+        buckets = self.feature_buckets - 1  # Feature 0 is the bias
+        examples, previous, before = [], "<s>", "<s>"
+        for token in tokens:
+            examples.append((
+                (0, 1 + _hash(f"1 {previous}") % buckets, 1 + _hash(f"2 {before} {previous}") % buckets),
+                _hash(token) % self.vocab_size
+            ))
+            before, previous = previous, token
+        return examples
+    
+    def _dataset_rows(self, file_path: str) -> Iterator[Tuple[int, Any]]:
+        """Stream the index and row of this process's share of a dataset file."""
+        if self.world_size == 1:
+            yield from enumerate(iter_dataset_rows(file_path))
+            return
+        shards = shard_rows(file_path, self.world_size)
+        if shards is None:
+            # Without a row index, every process parses the whole file
+            for index, row in enumerate(iter_dataset_rows(file_path)):
+                if index % self.world_size == self.rank:
+                    yield index, row
+            return
+        shard = shards[self.rank]
+        yield from enumerate(iter_shard_rows(file_path, shard), shard.start_row)
+    
+    def _rows(self, validation: bool) -> Iterator[Any]:
+        """Stream the training or validation rows."""
+        if validation and self.eval_path:
+            for _, row in self._dataset_rows(self.eval_path):
+                yield row
+            return
+        for index, row in self._dataset_rows(self.train_path):
+            if (index % HOLDOUT_EVERY == HOLDOUT_EVERY - 1) == validation:
+                yield row
+    
+    def _forward(self, features: Tuple[int, int, int]) -> Tuple[List[float], List[float], float]:
+        """Softmax probabilities, with the logits and the log-partition."""
+        size, weights = self.vocab_size, self.weights
+        rows = [weights[feature * size:(feature + 1) * size] for feature in features]
+        logits = [a + b + c for a, b, c in zip(*rows)]
+        peak, exp = max(logits), math.exp
+        exps = [exp(logit - peak) for logit in logits]
+        total = sum(exps)
+        return [e / total for e in exps], logits, peak + math.log(total)
+    
+    def accumulate(self, examples: List[Example], gradients: Dict[int, List[float]]) -> float:
+        """
+        Add the gradients of examples' cross-entropy to ``gradients``.
+        
+        Args:
+            examples: Examples of a batch
+            gradients: Gradient rows by feature, summed over examples
+        
+        Returns:
+            Summed loss of the examples
+        """
+        loss = 0.0
+        for features, target in examples:
+            probabilities, logits, log_partition = self._forward(features)
+            loss += log_partition - logits[target]
+            probabilities[target] -= 1.0
+            for feature in features:
+                gradient = gradients.get(feature)
+                gradients[feature] = probabilities if gradient is None else [
+                    a + b for a, b in zip(gradient, probabilities)
+                ]
+        return loss
+    
+    def apply(self, gradients: Dict[int, List[float]], count: int) -> None:
+        """
+        Take an Adam step on the features with gradients (lazily, so rows
+        without a gradient keep their moments).
+        
+        Args:
+            gradients: Summed gradient rows by feature
+            count: Examples the gradients were summed over
+        """
+        self.step += 1
+        step_size = self.learning_rate * math.sqrt(1 - _BETA2 ** self.step) / (1 - _BETA1 ** self.step)
+        size, sqrt = self.vocab_size, math.sqrt
+        # Locals, with the gradient scale folded in, keep the loops short
+        beta1, beta2, epsilon = _BETA1, _BETA2, _EPSILON
+        rest1, rest2 = (1 - _BETA1) / count, (1 - _BETA2) / count ** 2
+        for feature, gradient in gradients.items():
+            start, end = feature * size, (feature + 1) * size
+            first = [beta1 * m + rest1 * g for m, g in zip(self.first[start:end], gradient)]
+            second = [beta2 * v + rest2 * g * g for v, g in zip(self.second[start:end], gradient)]
+            self.weights[start:end] = array("f", [
+                w - step_size * m / (sqrt(v) + epsilon)
+                for w, m, v in zip(self.weights[start:end], first, second)
+            ])
+            self.first[start:end] = array("f", first)
+            self.second[start:end] = array("f", second)
+    
+    def _local_steps(self, stop: threading.Event) -> Iterator[Step]:
+        """
+        Sum the gradients of each step over this process's training rows.
+        
+        Args:
+            stop: Ends the rows early when set
+        
+        Yields:
+            Each step; once the rows are exhausted, empty steps follow
+        """
+        rows = itertools.takewhile(lambda _: not stop.is_set(), self._rows(validation=False))
+        exhausted = False
+        while True:
+            gradients: Dict[int, List[float]] = {}
+            loss, count, row_count = 0.0, 0, 0
+            for _ in range(self.accumulation_steps):
+                if exhausted:
+                    break
+                batch = [self.examples(row) for row in itertools.islice(rows, self.batch_size)]
+                exhausted = len(batch) < self.batch_size
+                examples = [example for row_examples in batch for example in row_examples]
+                loss += self.accumulate(examples, gradients)
+                count += len(examples)
+                row_count += len(batch)
+            yield gradients, loss, count, row_count, exhausted
+    
+    def _all_reduce_step(self, step: Step) -> Step:
+        """
+        Exchange a step with the other processes.
+        
+        Args:
+            step: This process's step
+        
+        Returns:
+            Gradients of the features this process owns, summed over the
+            processes, with the loss, examples and rows of all of them, and
+            whether all their rows are exhausted
+        """
+        communicator, size = self.communicator, self.vocab_size
+        gradients, loss, count, rows, exhausted = step
+        slot = communicator.slot(communicator.rank)
+        features = len(gradients)
+        slot[:_SLOT_HEADER] = array("d", (loss, count, rows, features, exhausted))
+        slot[_SLOT_HEADER:_SLOT_HEADER + features] = array("d", gradients)
+        position = _SLOT_HEADER + features
+        for gradient in gradients.values():
+            slot[position:position + size] = array("d", gradient)
+            position += size
+        communicator.wait()
+        
+        owned: Dict[int, List[float]] = {}
+        loss, count, rows, exhausted = 0.0, 0, 0, True
+        for rank in range(communicator.world_size):
+            slot = communicator.slot(rank)
+            rank_loss, rank_count, rank_rows, features, rank_exhausted = slot[:_SLOT_HEADER].tolist()
+            loss += rank_loss
+            count += int(rank_count)
+            rows += int(rank_rows)
+            exhausted = exhausted and bool(rank_exhausted)
+            features = int(features)
+            rows_start = _SLOT_HEADER + features
+            for index, feature in enumerate(slot[_SLOT_HEADER:rows_start].tolist()):
+                feature = int(feature)
+                if feature % communicator.world_size != communicator.rank:
+                    continue
+                row = slot[rows_start + index * size:rows_start + (index + 1) * size]
+                gradient = owned.get(feature)
+                owned[feature] = row.tolist() if gradient is None else [a + b for a, b in zip(gradient, row)]
+        return owned, loss, count, rows, exhausted
+    
+    def validate(self) -> Tuple[Optional[float], Optional[float]]:
+        """
+        Measure the model on the validation rows.
+        
+        Returns:
+            Mean cross-entropy per word and next-word accuracy, or None if
+            there are no validation words
+        """
+        self._allocate()
+        loss, correct, count = 0.0, 0, 0
+        rows = itertools.islice(self._rows(validation=True), math.ceil(self.max_eval_rows / self.world_size))
+        for row in rows:
+            for features, target in self.examples(row):
+                probabilities, logits, log_partition = self._forward(features)
+                loss += log_partition - logits[target]
+                correct += probabilities[target] == max(probabilities)
+                count += 1
+        if self.communicator:
+            loss, correct, count = self.communicator.all_reduce([loss, correct, count])
+        if not count:
+            return None, None
+        return loss / count, correct / count
+    
+    def train_epoch(self, epoch: int, stop: threading.Event) -> EpochResult:
+        self._allocate()
+        started = time.monotonic()
+        step_losses: List[Tuple[int, float]] = []
+        epoch_loss, epoch_count, epoch_rows = 0.0, 0, 0
+        steps = self._local_steps(stop)
+        while True:
+            step = next(steps)
+            if self.communicator:
+                step = self._all_reduce_step(step)
+            gradients, loss, count, rows, exhausted = step
+            if count:
+                self.apply(gradients, count)
+                step_losses.append((self.step, loss / count))
+            epoch_loss += loss
+            epoch_count += count
+            epoch_rows += rows
+            if self.communicator:
+                self.communicator.wait()  # Updates are complete before the next step reads them
+            if exhausted:
+                break
+        seconds = time.monotonic() - started
+        if stop.is_set():
+            return EpochResult(math.nan, None, step_losses, epoch_rows, seconds)  # Discarded by the caller
+        if not epoch_count:
+            raise TrainingFailed("The training dataset has no text to train on")
+        return EpochResult(epoch_loss / epoch_count, self.validate()[0], step_losses, epoch_rows, seconds)
+    
+    def evaluate(self) -> Dict[str, float]:
+        val_loss, accuracy = self.validate()
+        if val_loss is None:
+            raise TrainingFailed("The validation data has no text to evaluate on")
+        return {
+            "accuracy": round(accuracy, 4),
+            "perplexity": round(math.exp(val_loss), 4),
+            "loss": round(val_loss, 4)
+        }
@@ -1,110 +1,306 @@
-"""Training service for simulating training jobs."""
+"""Training service that runs the training jobs of experiments."""
 
 import asyncio
-import random
-import uuid
-from datetime import datetime
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Any, Dict
 
+from sqlalchemy import update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import settings
+from app.models.dataset import Dataset
 from app.models.experiment import Experiment, ExperimentStatus
 from app.models.evaluation import Evaluation
 from app.models.model import Model, ModelType
-from app.config import settings
-from app.database import SessionLocal
+from app.database import AsyncSessionLocal
+from app.services.checkpoints import load_checkpoint, remove_checkpoints, save_checkpoint
+from app.services.metrics_store import truncate_metrics
+from app.services.progress import epoch_progress
+from app.services.data_parallel import create_trainer
+from app.services.job_queue import JobFailed
+from app.services.trainers import DEFAULT_TRAINER, Trainer, TrainingFailed
+from app.services.write_buffer import write_buffer
+
+# Kind of the queued jobs that train an experiment
+TRAINING_JOB = "training"
+
+# Experiments that are finished, so their training job has nothing left to do
+FINISHED_STATUSES = (ExperimentStatus.COMPLETED, ExperimentStatus.FAILED, ExperimentStatus.CANCELLED)
+
+
+async def run_training_job(payload: Dict[str, Any]):
+    """
+    Job handler that trains an experiment.
+    
+    Args:
+        payload: Job payload with the ``experiment_id``
+    """
+    await train_experiment(payload["experiment_id"])
+
+
+async def training_job_failed(payload: Dict[str, Any], error: str):
+    """
+    Job failure handler: mark the experiment as failed once its training
+    job has no attempts left, and delete its checkpoints.
+    
+    Args:
+        payload: Job payload with the ``experiment_id``
+        error: Error of the last attempt
+    """
+    async with AsyncSessionLocal() as db:
+        experiment = await db.get(Experiment, payload["experiment_id"])
+        if experiment and experiment.status not in FINISHED_STATUSES:
+            experiment.status = ExperimentStatus.FAILED
+            experiment.checkpoint = None
+            await db.commit()
+    await asyncio.to_thread(remove_checkpoints, payload["experiment_id"])
+
+
+async def training_job_requeued(db: AsyncSession, payload: Dict[str, Any]):
+    """
+    Job requeue handler: show the experiment as waiting again, since its
+    training job is back in the queue (preempted, or released by a stopping
+    worker) and resumes from its last checkpoint when it is claimed. It runs
+    in the transaction that requeues the job, which the caller commits.
+    
+    Args:
+        db: Database session
+        payload: Job payload with the ``experiment_id``
+    """
+    await db.execute(
+        update(Experiment)
+        .where(Experiment.id == payload["experiment_id"], Experiment.status == ExperimentStatus.RUNNING)
+        .values(status=ExperimentStatus.CREATED)
+        .execution_options(synchronize_session=False)
+    )
+
+
+async def _save_checkpoint(db: AsyncSession, trainer: Trainer, experiment_id: str, record: Dict[str, Any]):
+    """
+    Checkpoint a trainer's state after an epoch and record it on the experiment.
+    
+    The experiment's metrics up to the checkpoint are written first, so that
+    a job resuming from it keeps them. The checkpoint is only recorded while
+    the experiment has not finished, and the older ones are then deleted.
+    
+    Args:
+        db: Database session
+        trainer: Trainer, between two epochs
+        experiment_id: ID of the experiment
+        record: Epochs completed, last step, per-epoch losses, and training
+            samples and seconds so far
+    """
+    name = f"epoch-{record['epoch']:06d}.ckpt"
+    await asyncio.to_thread(lambda: save_checkpoint(experiment_id, name, trainer.state_dict()))
+    await write_buffer.flush()
+    result = await db.execute(
+        update(Experiment)
+        .where(Experiment.id == experiment_id, Experiment.status.notin_(FINISHED_STATUSES))
+        .values(checkpoint={**record, "file": name, "created_at": datetime.now(timezone.utc).isoformat()})
+        .execution_options(synchronize_session=False)
+    )
+    await db.commit()
+    await asyncio.to_thread(remove_checkpoints, experiment_id, name if result.rowcount else None)
 
 
-async def simulate_training(experiment_id: str):
+async def train_experiment(experiment_id: str):
     """
-    Simulate a training job.
+    Train an experiment with the trainer its training config names.
+    
+    Resumes from the experiment's last checkpoint when a job is retried or
+    preempted, or runs from the start if it has none, and does nothing if
+    the experiment has already finished. Epochs run in a worker thread, so
+    the event loop stays free for lease renewals. Each epoch's progress is
+    recorded on the experiment and its per-step losses in the metrics store,
+    through the process's write buffer, and training stops after the current
+    epoch once the experiment is cancelled. Between epochs, at most every
+    ``training_checkpoint_interval``, the trainer's state is checkpointed
+    with the losses so far; a job resuming from it drops the metrics
+    recorded after it. A trainer that fails to produce a model marks the
+    experiment failed without a retry.
     
     Args:
         experiment_id: ID of the experiment
+    
+    Raises:
+        JobFailed: If the trainer failed, so that the job fails without a retry
+        Exception: Any other error, so that the job queue retries the job
     """
-    db = SessionLocal()
+    db = AsyncSessionLocal()
+    stop = threading.Event()
+    trainer = None
     try:
-        # Wait before changing to "running"
-        await asyncio.sleep(settings.training_simulation_delay)
-        
-        # Update status to running
-        experiment = db.query(Experiment).filter(Experiment.id == experiment_id).first()
-        if not experiment:
+        experiment = await db.get(Experiment, experiment_id)
+        if not experiment or experiment.status in FINISHED_STATUSES:
             return
         
-        experiment.status = ExperimentStatus.RUNNING
-        db.commit()
+        training_dataset = await db.get(Dataset, experiment.training_dataset_id)
+        eval_dataset = await db.get(Dataset, experiment.eval_dataset_id) if experiment.eval_dataset_id else None
+        trainer = create_trainer(
+            experiment.training_config,
+            training_dataset.file_path if training_dataset else None,
+            eval_dataset.file_path if eval_dataset else None,
+            (training_dataset.row_count or 0) if training_dataset else 0
+        )
+        epochs = trainer.epochs
         
-        # Simulate training duration
-        await asyncio.sleep(settings.training_simulation_duration)
+        # Wait before changing to "running"
+        await asyncio.sleep(trainer.start_delay)
+        await db.refresh(experiment)
+        if experiment.status in FINISHED_STATUSES:
+            return
         
-        # Refresh experiment
-        db.refresh(experiment)
+        train_loss, val_loss = [], []
+        samples, seconds, last_step = 0, 0.0, 0
+        checkpoint = experiment.checkpoint
+        if checkpoint:
+            try:
+                state = await asyncio.to_thread(load_checkpoint, experiment_id, checkpoint["file"])
+                await asyncio.to_thread(trainer.load_state_dict, state)
+                train_loss, val_loss = checkpoint["train_loss"], checkpoint["val_loss"]
+                samples, seconds, last_step = checkpoint["samples"], checkpoint["seconds"], checkpoint["step"]
+            except (OSError, ValueError, KeyError) as e:
+                print(f"Training of experiment {experiment_id} starts over, its checkpoint cannot be loaded: {e}")
+                checkpoint = experiment.checkpoint = None
+        start_epoch = len(train_loss)
         
-        # Randomly succeed or fail (90% success rate)
-        if random.random() < 0.9:
-            experiment.status = ExperimentStatus.COMPLETED
-            
-            # Create resulting model
-            resulting_model = Model(
-                name=f"{experiment.name}_trained",
-                model_type=ModelType.FINE_TUNED,
-                base_model_id=experiment.base_model_id,
-                version="1.0.0",
-                architecture="transformer",
-                parameters_count=random.randint(1000000, 100000000),
-                description=f"Fine-tuned model from experiment {experiment.name}",
-                is_latest_version=True
-            )
-            db.add(resulting_model)
-            db.flush()
-            
-            experiment.resulting_model_id = resulting_model.id
-            
-            # Create evaluation
-            metrics = {
-                "accuracy": round(random.uniform(0.75, 0.95), 4),
-                "f1": round(random.uniform(0.70, 0.90), 4),
-                "perplexity": round(random.uniform(10.0, 50.0), 4)
-            }
-            
-            # Generate loss curve data
-            epochs = experiment.training_config.get("epochs", 10)
-            train_loss = [random.uniform(2.0, 0.1) * (1 - i/epochs) for i in range(epochs)]
-            val_loss = [l + random.uniform(0, 0.2) for l in train_loss]
+        experiment.status = ExperimentStatus.RUNNING
+        experiment.progress = epoch_progress(
+            start_epoch, epochs, train_loss[-1] if train_loss else None, val_loss[-1] if val_loss else None,
+            samples_per_second=samples / seconds if seconds else None
+        )
+        await write_buffer.flush()  # Writes of an earlier attempt, before they are truncated
+        await truncate_metrics(db, experiment_id, last_step + 1 if checkpoint else 0)
+        await db.commit()
+        checkpointed_at = time.monotonic()
+        
+        for epoch in range(start_epoch, epochs):
+            result = await asyncio.to_thread(trainer.train_epoch, epoch, stop)
+            train_loss.append(result.train_loss)
+            val_loss.append(result.val_loss)
+            samples += result.samples
+            seconds += result.seconds
             
-            loss_curve = {
-                "epochs": list(range(1, epochs + 1)),
-                "train_loss": train_loss,
-                "val_loss": val_loss
-            }
+            # Stop between epochs if the experiment was cancelled
+            await db.refresh(experiment)
+            if experiment.status == ExperimentStatus.CANCELLED:
+                print(f"Training of experiment {experiment_id} cancelled after {epoch + 1}/{epochs} epochs")
+                return
             
-            training_statistics = {
-                "total_epochs": epochs,
-                "final_train_loss": train_loss[-1],
-                "final_val_loss": val_loss[-1],
-                "training_time_seconds": settings.training_simulation_duration
-            }
+            # The epoch's steps, in one batch
+            points = [("train_loss", step, loss) for step, loss in result.step_losses]
+            if result.step_losses:
+                last_step = result.step_losses[-1][0]
+                if result.val_loss is not None:
+                    points.append(("val_loss", last_step, result.val_loss))
+            await write_buffer.record_metrics(experiment_id, points)
             
-            evaluation = Evaluation(
-                experiment_id=experiment_id,
-                metrics=metrics,
-                loss_curve=loss_curve,
-                training_statistics=training_statistics
-            )
-            db.add(evaluation)
+            write_buffer.update_experiment(experiment_id, progress=epoch_progress(
+                epoch + 1, epochs, result.train_loss, result.val_loss,
+                samples_per_second=samples / seconds if seconds else None,
+                eta_seconds=seconds / (epoch + 1) * (epochs - epoch - 1)
+            ))
             
-        else:
-            experiment.status = ExperimentStatus.FAILED
+            # No checkpoint after the last epoch: the evaluation follows
+            interval = settings.training_checkpoint_interval
+            if interval is not None and epoch + 1 < epochs and time.monotonic() - checkpointed_at >= interval:
+                await _save_checkpoint(db, trainer, experiment_id, {
+                    "epoch": epoch + 1,
+                    "step": last_step,
+                    "train_loss": list(train_loss),
+                    "val_loss": list(val_loss),
+                    "samples": samples,
+                    "seconds": seconds
+                })
+                checkpointed_at = time.monotonic()
+            await db.rollback()  # End the read transaction of the refresh while waiting
+        
+        metrics = await asyncio.to_thread(trainer.evaluate)
+        
+        # The last epoch is written before the experiment finishes
+        await write_buffer.flush()
+        
+        # Completed only if still running, in the transaction that records the
+        # results, so a cancellation committed meanwhile is never overwritten
+        completed = (await db.execute(
+            update(Experiment)
+            .where(Experiment.id == experiment_id, Experiment.status == ExperimentStatus.RUNNING)
+            .values(status=ExperimentStatus.COMPLETED, checkpoint=None)
+            .execution_options(synchronize_session=False)
+        )).rowcount
+        if not completed:
+            # Cancelled during the evaluation: no model or evaluation is recorded
+            await db.rollback()
+            print(f"Training of experiment {experiment_id} cancelled during its evaluation")
+            return
+        await db.refresh(experiment)
+        
+        # Create resulting model
+        resulting_model = Model(
+            name=f"{experiment.name}_trained",
+            model_type=ModelType.FINE_TUNED,
+            base_model_id=experiment.base_model_id,
+            version="1.0.0",
+            architecture=trainer.architecture,
+            parameters_count=trainer.parameters_count,
+            description=f"Fine-tuned model from experiment {experiment.name}",
+            is_latest_version=True
+        )
+        db.add(resulting_model)
+        await db.flush()
+        
+        experiment.resulting_model_id = resulting_model.id
+        
+        # Loss curve of the epochs
+        loss_curve = {
+            "epochs": list(range(1, epochs + 1)),
+            "train_loss": train_loss,
+            "val_loss": val_loss
+        }
         
-        db.commit()
+        training_statistics = {
+            "trainer": experiment.training_config.get("trainer") or DEFAULT_TRAINER,
+            "total_epochs": epochs,
+            "final_train_loss": train_loss[-1],
+            "final_val_loss": val_loss[-1],
+            "training_samples": samples,
+            "training_time_seconds": round(seconds, 3),
+            "samples_per_second": round(samples / seconds, 2) if seconds else None
+        }
         
+        evaluation = Evaluation(
+            experiment_id=experiment_id,
+            metrics=metrics,
+            loss_curve=loss_curve,
+            training_statistics=training_statistics
+        )
+        db.add(evaluation)
+        
+        await db.commit()
+        await asyncio.to_thread(remove_checkpoints, experiment_id)
+    
+    except TrainingFailed as e:
+        # The trainer cannot produce a model from this data: retrying would fail the same way
+        await write_buffer.flush()
+        await db.refresh(experiment)
+        if experiment.status not in FINISHED_STATUSES:
+            experiment.status = ExperimentStatus.FAILED
+        experiment.checkpoint = None
+        await db.commit()
+        await asyncio.to_thread(remove_checkpoints, experiment_id)
+        raise JobFailed(str(e)) from e
+    except asyncio.CancelledError:
+        # Stopped by its worker: a next attempt resumes from the last checkpoint, so unwritten epochs are dropped
+        stop.set()
+        write_buffer.discard(experiment_id)
+        raise
     except Exception as e:
-        # Mark as failed on error
-        try:
-            experiment = db.query(Experiment).filter(Experiment.id == experiment_id).first()
-            if experiment:
-                experiment.status = ExperimentStatus.FAILED
-                db.commit()
-        except:
-            pass
-        print(f"Training simulation error: {e}")
+        # The job queue retries, and marks the experiment failed after the last attempt
+        print(f"Training error: {e}")
+        raise
     finally:
-        db.close()
+        if trainer:
+            await asyncio.to_thread(trainer.close)
+        await db.close()
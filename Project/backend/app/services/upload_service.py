@@ -0,0 +1,191 @@
+"""Chunked upload service for staging and assembling upload parts."""
+
+import io
+import os
+import hashlib
+import shutil
+import uuid
+from pathlib import Path
+from typing import AsyncIterator, Dict, List, Optional, Tuple
+
+import aiofiles
+
+from app.config import settings
+from app.services.compression import make_decoder
+from app.services.storage_service import StoredFile, store_stream
+
+
+# Subdirectory of upload_dir holding parts of unfinished uploads
+STAGING_DIR = "staging"
+
+
+def _session_dir(upload_id: str) -> Path:
+    """Get the staging directory of an upload session."""
+    return Path(settings.upload_dir) / STAGING_DIR / upload_id
+
+
+def list_parts(upload_id: str) -> Dict[int, Tuple[str, int]]:
+    """
+    List the parts received so far.
+    
+    Parts are stored as ``{part_number}.{sha256}.part`` and only appear
+    once fully written and verified, so the directory listing is the source
+    of truth for resuming an upload.
+    
+    Args:
+        upload_id: Upload session ID
+    
+    Returns:
+        Mapping of part number to (sha256, size)
+    """
+    session_dir = _session_dir(upload_id)
+    if not session_dir.exists():
+        return {}
+    
+    parts = {}
+    for entry in os.scandir(session_dir):
+        name_parts = entry.name.split(".")
+        if len(name_parts) != 3 or name_parts[2] != "part":
+            continue
+        parts[int(name_parts[0])] = (name_parts[1], entry.stat().st_size)
+    return parts
+
+
+async def save_part(
+    upload_id: str,
+    part_number: int,
+    chunks: AsyncIterator[bytes],
+    expected_size: int,
+    expected_sha256: str,
+    content_encoding: Optional[str] = None
+) -> Tuple[str, int]:
+    """
+    Stream one part to the staging directory and verify it.
+    
+    The part is written to a temporary file and only renamed into place
+    once its size and checksum match, so a retried or interrupted part never
+    leaves a corrupt copy behind. A compressed body is decompressed as it
+    arrives; size and checksum refer to the uncompressed part.
+    
+    Args:
+        upload_id: Upload session ID
+        part_number: 1-based part number
+        chunks: Async iterator over the request body
+        expected_size: Size the part must have
+        expected_sha256: SHA-256 sent by the client
+        content_encoding: Encoding of the body, or None if uncompressed
+    
+    Returns:
+        Tuple of (sha256, size)
+    
+    Raises:
+        ValueError: If the size or checksum does not match
+    """
+    session_dir = _session_dir(upload_id)
+    session_dir.mkdir(parents=True, exist_ok=True)
+    temp_path = session_dir / f"{part_number}.{uuid.uuid4().hex}.tmp"
+    
+    decoder = make_decoder(content_encoding) if content_encoding else None
+    hasher = hashlib.sha256()
+    size = 0
+    try:
+        async with aiofiles.open(temp_path, "wb") as f:
+            async for chunk in chunks:
+                if decoder:
+                    # Bounded, so a small body cannot expand without limit in memory
+                    chunk = decoder.decompress(chunk, max_length=expected_size - size + 1)
+                size += len(chunk)
+                if size > expected_size:
+                    raise ValueError(f"Part {part_number} is larger than {expected_size} bytes")
+                hasher.update(chunk)
+                await f.write(chunk)
+            if decoder:
+                decoder.flush()  # Raises if the body was truncated
+        
+        if size != expected_size:
+            raise ValueError(f"Part {part_number} has {size} bytes, expected {expected_size}")
+        sha256 = hasher.hexdigest()
+        if sha256 != expected_sha256.lower():
+            raise ValueError(f"Checksum mismatch for part {part_number}")
+        
+        # Replace any earlier copy of this part
+        for previous in session_dir.glob(f"{part_number}.*.part"):
+            previous.unlink(missing_ok=True)
+        os.replace(temp_path, session_dir / f"{part_number}.{sha256}.part")
+        return sha256, size
+    finally:
+        temp_path.unlink(missing_ok=True)
+
+
+class _PartsReader(io.RawIOBase):
+    """Read-only raw stream over the parts of an upload, in order."""
+    
+    def __init__(self, paths: List[Path]):
+        self._paths = list(paths)
+        self._current = None
+    
+    def readable(self) -> bool:
+        return True
+    
+    def readinto(self, buffer) -> int:
+        while True:
+            if self._current is None:
+                if not self._paths:
+                    return 0
+                self._current = open(self._paths.pop(0), "rb")
+            size = self._current.readinto(buffer)
+            if size:
+                return size
+            self._current.close()
+            self._current = None
+    
+    def close(self) -> None:
+        if self._current is not None:
+            self._current.close()
+            self._current = None
+        super().close()
+
+
+def assemble_upload(upload_id: str, total_parts: int, filename: str, dataset_id: str) -> StoredFile:
+    """
+    Assemble the parts of a finished upload into dataset storage.
+    
+    The parts are streamed in order through the regular storage pipeline,
+    so the file is hashed, counted and profiled while it is assembled. This
+    does blocking file I/O; call it from a worker thread.
+    
+    Args:
+        upload_id: Upload session ID
+        total_parts: Number of parts
+        filename: Original filename
+        dataset_id: Dataset ID for filename
+    
+    Returns:
+        Stored file details
+    
+    Raises:
+        ValueError: If parts are missing
+    """
+    parts = list_parts(upload_id)
+    missing = [n for n in range(1, total_parts + 1) if n not in parts]
+    if missing:
+        raise ValueError(f"Missing parts: {missing[:20]}")
+    
+    session_dir = _session_dir(upload_id)
+    paths = [session_dir / f"{n}.{parts[n][0]}.part" for n in range(1, total_parts + 1)]
+    with _PartsReader(paths) as reader:
+        stream = io.BufferedReader(reader, buffer_size=settings.upload_chunk_size)
+        stored = store_stream(stream, filename, dataset_id)
+    
+    discard_upload(upload_id)
+    return stored
+
+
+def discard_upload(upload_id: str) -> None:
+    """
+    Delete the staged parts of an upload.
+    
+    Args:
+        upload_id: Upload session ID
+    """
+    shutil.rmtree(_session_dir(upload_id), ignore_errors=True)
@@ -0,0 +1,166 @@
+"""Write-behind buffer that batches the frequent writes of running jobs."""
+
+import asyncio
+from typing import Any, Callable, Dict, List, Optional, Sequence, Set, Tuple
+
+from sqlalchemy import bindparam, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import settings
+from app.database import AsyncSessionLocal
+from app.models.experiment import Experiment
+from app.services.metrics_store import record_metrics
+
+
+class WriteBuffer:
+    """
+    Write-behind buffer for the per-epoch writes of training jobs.
+    
+    Jobs hand their experiment updates (e.g. progress) and metric values to
+    the buffer instead of committing them one by one. Every
+    ``write_buffer_flush_interval``, everything pending from all the jobs
+    of the process is written in a single transaction: updates of the same
+    experiment are coalesced, so only the latest values are written, and
+    each experiment's metric values are recorded in one batch, merging
+    their rollups once.
+    
+    The buffer holds at most ``write_buffer_max_pending`` metric values. A
+    job adding more flushes first, so memory stays bounded and jobs slow
+    down to the pace of the database rather than piling up writes. Writes
+    that must be ordered with other changes, like status transitions, are
+    committed directly after a ``flush``.
+    """
+    
+    def __init__(self, session_factory: Callable[[], AsyncSession] = AsyncSessionLocal):
+        self._session_factory = session_factory
+        self._updates: Dict[str, Dict[str, Any]] = {}
+        self._metrics: Dict[str, List[Tuple[str, int, float]]] = {}
+        self._pending = 0
+        self._lock = asyncio.Lock()  # One flush at a time
+        self._flusher: Optional[asyncio.Task] = None
+        self._flushes: Set[asyncio.Task] = set()
+    
+    def update_experiment(self, experiment_id: str, **values: Any) -> None:
+        """
+        Buffer an update of an experiment's columns; later values replace
+        earlier ones not yet written.
+        
+        Args:
+            experiment_id: Experiment ID
+            **values: Column values, e.g. ``progress``
+        """
+        self._updates.setdefault(experiment_id, {}).update(values)
+        self._start()
+    
+    async def record_metrics(self, experiment_id: str, points: Sequence[Tuple[str, int, float]]) -> None:
+        """
+        Buffer metric values, as ``metrics_store.record_metrics`` takes them.
+        
+        Args:
+            experiment_id: Experiment ID
+            points: (metric, step, value) tuples
+        
+        Raises:
+            Exception: If the buffer is full and flushing it fails
+        """
+        if self._pending and self._pending + len(points) > settings.write_buffer_max_pending:
+            await self.flush()
+        self._metrics.setdefault(experiment_id, []).extend(points)
+        self._pending += len(points)
+        self._start()
+    
+    def discard(self, experiment_id: str) -> None:
+        """
+        Drop an experiment's writes not yet flushed, e.g. when its training
+        is stopped to resume from its last checkpoint.
+        
+        Args:
+            experiment_id: Experiment ID
+        """
+        self._updates.pop(experiment_id, None)
+        self._pending -= len(self._metrics.pop(experiment_id, ()))
+    
+    async def flush(self) -> None:
+        """
+        Write everything pending in one transaction. If the transaction
+        fails, the writes stay pending for the next flush. A flush that has
+        started completes even if the caller is cancelled, since a cancelled
+        commit may still have been applied.
+        
+        Raises:
+            Exception: Database errors
+        """
+        task = asyncio.ensure_future(self._flush())
+        self._flushes.add(task)
+        task.add_done_callback(self._flushes.discard)
+        await asyncio.shield(task)
+    
+    async def _flush(self) -> None:
+        async with self._lock:
+            updates, self._updates = self._updates, {}
+            metrics, self._metrics = self._metrics, {}
+            self._pending = 0
+            if not updates and not metrics:
+                return
+            try:
+                async with self._session_factory() as db:
+                    await self._write(db, updates, metrics)
+                    await db.commit()
+            except Exception:
+                # Newer writes, buffered meanwhile, win over the failed ones
+                for experiment_id, values in updates.items():
+                    self._updates[experiment_id] = {**values, **self._updates.get(experiment_id, {})}
+                for experiment_id, points in metrics.items():
+                    self._metrics[experiment_id] = points + self._metrics.get(experiment_id, [])
+                    self._pending += len(points)
+                raise
+    
+    async def close(self) -> None:
+        """Stop the periodic flush and write what is left, e.g. on shutdown."""
+        if self._flusher:
+            self._flusher.cancel()
+            try:
+                await self._flusher
+            except asyncio.CancelledError:
+                pass
+            self._flusher = None
+        await self.flush()
+    
+    @staticmethod
+    async def _write(
+        db: AsyncSession,
+        updates: Dict[str, Dict[str, Any]],
+        metrics: Dict[str, List[Tuple[str, int, float]]]
+    ) -> None:
+        # One executemany per set of updated columns
+        by_columns: Dict[Tuple[str, ...], List[Dict[str, Any]]] = {}
+        for experiment_id, values in updates.items():
+            by_columns.setdefault(tuple(sorted(values)), []).append(
+                {"_id": experiment_id, **{f"_{column}": value for column, value in values.items()}}
+            )
+        table = Experiment.__table__
+        for columns, params in by_columns.items():
+            await db.execute(
+                update(table)
+                .where(table.c.id == bindparam("_id", type_=table.c.id.type))
+                .values({column: bindparam(f"_{column}", type_=table.c[column].type) for column in columns}),
+                params
+            )
+        for experiment_id, points in metrics.items():
+            await record_metrics(db, experiment_id, points)
+    
+    def _start(self) -> None:
+        if self._flusher is None or self._flusher.done():
+            self._flusher = asyncio.create_task(self._flush_periodically())
+    
+    async def _flush_periodically(self) -> None:
+        while self._updates or self._metrics:
+            await asyncio.sleep(settings.write_buffer_flush_interval)
+            try:
+                await self.flush()
+            except Exception as e:
+                print(f"Write buffer flush error: {e}")
+
+
+# Buffer shared by the jobs of the process
+write_buffer = WriteBuffer()
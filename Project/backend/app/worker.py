@@ -0,0 +1,225 @@
+"""
+Worker process that runs queued jobs.
+
+Usage (from the backend directory):
+    python -m app.worker [--concurrency 2]
+
+Start as many workers as needed, on one or more hosts sharing the database.
+Each runs up to ``worker_concurrency`` jobs at once and renews their leases
+while they run, stopping a job soon after it is cancelled or preempted;
+stopping a worker (Ctrl+C or SIGTERM) puts its running jobs back in the queue.
+The jobs' progress and metrics are written together, through a write-behind
+buffer that is flushed when the worker stops.
+"""
+
+import argparse
+import asyncio
+import os
+import signal
+import socket
+import time
+import traceback
+import uuid
+from typing import Any, Awaitable, Callable, Dict, NamedTuple, Optional
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import settings
+from app.database import AsyncSessionLocal, async_engine
+from app.models.job import Job, JobStatus
+from app.services.job_queue import (
+    JobFailed, check_lease, claim_job, complete_job, fail_job, release_job, renew_lease
+)
+from app.services.training_service import (
+    TRAINING_JOB, run_training_job, training_job_failed, training_job_requeued
+)
+from app.services.write_buffer import write_buffer
+
+
+class JobHandler(NamedTuple):
+    """How a worker runs one kind of job."""
+    run: Callable[[Dict[str, Any]], Awaitable[None]]
+    # Called once the job has failed for good, with its last error
+    on_failure: Optional[Callable[[Dict[str, Any], str], Awaitable[None]]] = None
+    # Called when the job was put back in the queue, to make room for a
+    # higher-priority one or by a stopping worker, in the same transaction
+    on_requeued: Optional[Callable[[AsyncSession, Dict[str, Any]], Awaitable[None]]] = None
+
+
+# Handlers by job kind
+HANDLERS: Dict[str, JobHandler] = {
+    TRAINING_JOB: JobHandler(run_training_job, training_job_failed, training_job_requeued),
+}
+
+
+class Worker:
+    """Claims jobs from the queue and runs them, several at a time."""
+    
+    def __init__(self, handlers: Dict[str, JobHandler] = HANDLERS, concurrency: Optional[int] = None):
+        self.handlers = handlers
+        self.concurrency = concurrency or settings.worker_concurrency
+        self.worker_id = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self._stopping = asyncio.Event()
+        self._running: Dict[str, asyncio.Task] = {}
+        self._lost: Dict[str, JobStatus] = {}  # Status of jobs stopped after losing their lease
+    
+    def stop(self) -> None:
+        """Stop claiming jobs, and stop the running ones so they are released."""
+        self._stopping.set()
+        for task in self._running.values():
+            task.cancel()
+    
+    async def run(self) -> None:
+        """Run job slots until ``stop`` is called."""
+        print(f"Worker {self.worker_id} running {self.concurrency} job(s) at a time")
+        await asyncio.gather(*(self._slot() for _ in range(self.concurrency)))
+    
+    async def _slot(self) -> None:
+        while not self._stopping.is_set():
+            try:
+                async with AsyncSessionLocal() as db:
+                    job = await claim_job(db, self.worker_id, list(self.handlers))
+            except Exception as e:
+                print(f"Worker error while claiming a job: {e}")
+                job = None
+            if job is None:
+                try:
+                    await asyncio.wait_for(self._stopping.wait(), timeout=settings.worker_poll_interval)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+            await self._execute(job)
+    
+    async def _execute(self, job: Job) -> None:
+        """Run a claimed job while keeping its lease, then record the outcome."""
+        handler = self.handlers[job.kind]
+        if job.attempts > job.max_attempts:
+            # Claimed again after its worker's lease ran out on the last attempt
+            await self._failed(job, handler, "Worker stopped responding on every attempt")
+            return
+        
+        task = asyncio.create_task(handler.run(job.payload))
+        self._running[job.id] = task
+        lease = asyncio.create_task(self._keep_lease(job.id, task))
+        try:
+            # wait() leaves the job's task alone if this coroutine is cancelled
+            await asyncio.wait({task})
+        finally:
+            lease.cancel()
+            self._running.pop(job.id, None)
+        lost = self._lost.pop(job.id, None)
+        
+        if task.cancelled():
+            if lost == JobStatus.CANCELLED:
+                print(f"Job {job.id} stopped: cancelled")
+            elif lost == JobStatus.QUEUED:
+                print(f"Job {job.id} stopped: preempted by a higher-priority job")
+                await self._requeue(job, handler, release=False)
+            elif self._stopping.is_set():
+                await self._requeue(job, handler, release=True)
+                print(f"Job {job.id} released by stopping worker")
+            else:
+                print(f"Job {job.id} stopped: lease lost")
+            return
+        
+        error = task.exception()
+        if error is None:
+            async with AsyncSessionLocal() as db:
+                await complete_job(db, job.id, self.worker_id)
+            return
+        message = "".join(traceback.format_exception_only(type(error), error)).strip()
+        await self._failed(job, handler, message, retry=not isinstance(error, JobFailed))
+    
+    async def _requeue(self, job: Job, handler: JobHandler, release: bool) -> None:
+        """
+        Put a stopped job back in the queue, unless it already is (when it
+        was preempted), and let its handler reset what the job had started,
+        in one transaction.
+        """
+        try:
+            async with AsyncSessionLocal() as db:
+                if release:
+                    requeued = await release_job(db, job.id, self.worker_id)
+                else:
+                    # Not if another worker has claimed it again since
+                    requeued = await check_lease(db, job.id, self.worker_id) == JobStatus.QUEUED
+                if requeued and handler.on_requeued:
+                    await handler.on_requeued(db, job.payload)
+                await db.commit()
+        except Exception as e:
+            print(f"Job {job.id} requeue error: {e}")
+    
+    async def _failed(self, job: Job, handler: JobHandler, message: str, retry: bool = True) -> None:
+        async with AsyncSessionLocal() as db:
+            status = await fail_job(db, job, self.worker_id, message, retry)
+        print(f"Job {job.id} attempt {job.attempts}/{job.max_attempts} failed: {message}")
+        if status == JobStatus.FAILED and handler.on_failure:
+            try:
+                await handler.on_failure(job.payload, message)
+            except Exception as e:
+                print(f"Job {job.id} failure handler error: {e}")
+    
+    async def _keep_lease(self, job_id: str, task: asyncio.Task) -> None:
+        """
+        Renew a job's lease until it finishes. The lease is checked every
+        ``worker_poll_interval``, so a job that is cancelled, preempted or
+        whose lease is lost stops right away instead of holding the slot.
+        """
+        renew_every = settings.job_lease_seconds / 3
+        renewed_at = time.monotonic()
+        while True:
+            await asyncio.sleep(min(settings.worker_poll_interval, renew_every))
+            try:
+                async with AsyncSessionLocal() as db:
+                    if time.monotonic() - renewed_at >= renew_every and await renew_lease(db, job_id, self.worker_id):
+                        renewed_at = time.monotonic()
+                        continue
+                    lost = await check_lease(db, job_id, self.worker_id)
+            except Exception as e:
+                print(f"Worker error while checking a lease: {e}")
+                continue
+            if lost is not None:
+                self._lost[job_id] = lost
+                task.cancel()
+                return
+
+
+async def main(concurrency: Optional[int] = None) -> None:
+    """
+    Run a worker until it receives SIGINT or SIGTERM.
+    
+    Args:
+        concurrency: Jobs to run at once (default: ``worker_concurrency``)
+    """
+    worker = Worker(concurrency=concurrency)
+    loop = asyncio.get_running_loop()
+    for signum in (signal.SIGINT, signal.SIGTERM):
+        try:
+            loop.add_signal_handler(signum, worker.stop)
+        except NotImplementedError:
+            pass  # Windows: Ctrl+C raises KeyboardInterrupt instead
+    try:
+        await worker.run()
+    finally:
+        try:
+            await write_buffer.close()  # Progress and metrics of the last epochs
+        except Exception as e:
+            print(f"Write buffer flush error: {e}")
+        await async_engine.dispose()
+
+
+if __name__ == "__main__":
+    from app.database import engine, init_db
+    from app.migrations import schema_lock
+    import app.main  # noqa: F401  Registers every model
+    
+    parser = argparse.ArgumentParser(description="Run queued jobs")
+    parser.add_argument("--concurrency", type=int, help="Jobs to run at once")
+    args = parser.parse_args()
+    
+    with schema_lock(engine):
+        init_db()
+    try:
+        asyncio.run(main(args.concurrency))
+    except KeyboardInterrupt:
+        pass
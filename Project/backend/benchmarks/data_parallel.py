@@ -0,0 +1,111 @@
+"""
+Benchmark data-parallel training throughput.
+
+Stores a synthetic text dataset in a throwaway upload directory, then
+trains the n-gram trainer on it with 1, 2, 4... processes, up to the CPU
+cores, and reports training samples/sec of the second epoch (the first
+includes starting the processes) and the speedup over one process. Each
+process trains batches of --batch-size / processes rows, so every run
+takes the same optimizer steps on the same data.
+
+Usage (from the backend directory):
+    python -m benchmarks.data_parallel [--rows 10000] [--batch-size 32] [--workers 1,2,4]
+"""
+
+import argparse
+import io
+import json
+import os
+import random
+import shutil
+import tempfile
+import threading
+import uuid
+from typing import List, Tuple
+
+from app.config import settings
+from app.services.data_parallel import create_trainer
+from app.services.storage_service import store_stream
+
+# Words of the synthetic rows
+WORDS = (
+    "the model learns to predict the next word from the words before it and a small "
+    "vocabulary keeps the softmax cheap while the hashed features cover every pair"
+).split()
+
+# Words per row
+ROW_WORDS = 24
+
+
+def _dataset(rows: int) -> str:
+    """Store the synthetic dataset; returns its file path."""
+    rng = random.Random(0)
+    content = "\n".join(
+        json.dumps({"text": " ".join(rng.choice(WORDS) for _ in range(ROW_WORDS))}) for _ in range(rows)
+    )
+    stored = store_stream(io.BytesIO(content.encode("utf-8")), "benchmark.jsonl", str(uuid.uuid4()))
+    return stored.file_path
+
+
+def run(file_path: str, rows: int, batch_size: int, num_workers: int) -> Tuple[float, float]:
+    """
+    Train two epochs with a number of processes.
+    
+    Args:
+        file_path: Stored dataset file
+        rows: Rows of the dataset
+        batch_size: Rows per optimizer step, over all processes
+        num_workers: Training processes
+    
+    Returns:
+        Samples/sec and final training loss of the second epoch
+    """
+    training_config = {
+        "trainer": "ngram",
+        "epochs": 2,
+        "batch_size": max(batch_size // num_workers, 1),
+        "num_workers": num_workers,
+    }
+    trainer = create_trainer(training_config, file_path, None, rows)
+    try:
+        stop = threading.Event()
+        trainer.train_epoch(0, stop)
+        result = trainer.train_epoch(1, stop)
+    finally:
+        trainer.close()
+    return result.samples / result.seconds, result.train_loss
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=10_000, help="Rows of the dataset")
+    parser.add_argument("--batch-size", type=int, default=32, help="Rows per optimizer step, over all processes")
+    parser.add_argument("--workers", help="Comma-separated process counts (default: powers of 2 up to the CPU cores)")
+    args = parser.parse_args()
+    
+    cores = os.cpu_count() or 1
+    if args.workers:
+        counts = [int(count) for count in args.workers.split(",")]
+    else:
+        counts = [2 ** power for power in range(cores.bit_length()) if 2 ** power <= cores]
+    settings.training_max_workers = max(counts)
+    
+    # The training processes read the upload directory from the environment
+    directory = tempfile.mkdtemp()
+    os.environ["UPLOAD_DIR"] = settings.upload_dir = directory
+    try:
+        file_path = _dataset(args.rows)
+        results: List[Tuple[int, float, float]] = [(count, *run(file_path, args.rows, args.batch_size, count)) for count in counts]
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+    
+    print(f"{args.rows:,} rows of {ROW_WORDS} words, batches of {args.batch_size} rows, {cores} CPU cores\n")
+    print(f"{'Processes':>9}  {'Samples/sec':>11}  {'Speedup':>7}  {'Efficiency':>10}  {'Loss':>6}")
+    baseline = results[0][1]
+    for count, throughput, loss in results:
+        speedup = throughput / baseline
+        print(f"{count:>9}  {throughput:>11,.0f}  {speedup:>6.2f}x  {speedup / count:>9.0%}  {loss:>6.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,121 @@
+"""
+Benchmark loading long training curves from the metrics store.
+
+Records a curve with millions of steps (2M by default) into a throwaway
+SQLite database, in batches as the training loop does, then times chart
+requests served from the rollups against loading every step.
+
+Usage (from the backend directory):
+    python -m benchmarks.metrics_store [--steps 2000000] [--db PATH]
+"""
+
+import argparse
+import asyncio
+import math
+import os
+import random
+import statistics
+import tempfile
+import time
+import uuid
+from typing import Awaitable, Callable, Dict, List, Tuple
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+
+from app.database import Base
+from app.models import dataset, evaluation, experiment, job, model, upload_session  # noqa: F401  Registers the tables
+from app.models.metric import TrainingMetric
+from app.services.metrics_store import DownsampleMethod, load_series, metric_summaries, record_metrics
+
+# Steps recorded per batch, as one epoch of a training loop would
+RECORD_BATCH = 50_000
+
+# Timed runs per query; the median is reported
+REPEATS = 5
+
+
+def queries(experiment_id: str, steps: int) -> List[Tuple[str, Callable[[AsyncSession], Awaitable[object]]]]:
+    """The chart requests, and the naive full load they replace."""
+    def series(points: int, method: DownsampleMethod, start=None, end=None):
+        async def run(session: AsyncSession):
+            return await load_series(session, experiment_id, "train_loss", points, method, start, end)
+        return run
+    
+    async def summaries(session: AsyncSession):
+        return await metric_summaries(session, experiment_id)
+    
+    async def full_load(session: AsyncSession):
+        return (await session.execute(
+            select(TrainingMetric.step, TrainingMetric.value)
+            .where(TrainingMetric.experiment_id == experiment_id, TrainingMetric.metric == "train_loss")
+            .order_by(TrainingMetric.step)
+        )).all()
+    
+    middle = steps // 2
+    return [
+        ("GET /metrics", summaries),
+        ("Full curve, LTTB 1000 points", series(1000, DownsampleMethod.LTTB)),
+        ("Full curve, min/max 1000 buckets", series(1000, DownsampleMethod.MINMAX)),
+        ("10% range, LTTB 1000 points", series(1000, DownsampleMethod.LTTB, middle, middle + steps // 10)),
+        ("5000 steps, LTTB 1000 points", series(1000, DownsampleMethod.LTTB, middle, middle + 4999)),
+        ("Full curve, every step", full_load),
+    ]
+
+
+async def _run(path: str, steps: int) -> Tuple[float, Dict[str, float]]:
+    engine = create_async_engine(f"sqlite+aiosqlite:///{path}")
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    
+    # A decaying, noisy loss; experiments.id is not enforced as a foreign key on SQLite
+    experiment_id = str(uuid.uuid4())
+    rng = random.Random(0)
+    started = time.perf_counter()
+    async with AsyncSession(engine) as session:
+        for start in range(0, steps, RECORD_BATCH):
+            await record_metrics(session, experiment_id, [
+                ("train_loss", step, 2.5 * math.exp(-step / steps * 3) + rng.gauss(0, 0.05))
+                for step in range(start, min(start + RECORD_BATCH, steps))
+            ])
+            await session.commit()
+    recorded = time.perf_counter() - started
+    
+    timings = {}
+    async with AsyncSession(engine) as session:
+        for name, run in queries(experiment_id, steps):
+            await run(session)  # Warm the page cache
+            samples = []
+            for _ in range(REPEATS):
+                started = time.perf_counter()
+                await run(session)
+                samples.append((time.perf_counter() - started) * 1000)
+            timings[name] = statistics.median(samples)
+    await engine.dispose()
+    return recorded, timings
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--steps", type=int, default=2_000_000, help="Steps of the curve to record")
+    parser.add_argument("--db", help="SQLite file to create (default: a temporary file)")
+    args = parser.parse_args()
+    
+    path = args.db or os.path.join(tempfile.mkdtemp(), "benchmark.db")
+    if os.path.exists(path):
+        parser.error(f"{path} already exists")
+    
+    recorded, timings = asyncio.run(_run(path, args.steps))
+    print(f"Recorded {args.steps:,} steps in {recorded:.1f}s ({args.steps / recorded:,.0f} steps/s, {path})")
+    
+    width = max(len(name) for name in timings)
+    print(f"\n{'Query':<{width}}  {'Time':>10}")
+    for name, elapsed in timings.items():
+        print(f"{name:<{width}}  {elapsed:>8.2f}ms")
+    
+    if not args.db:
+        os.remove(path)
+
+
+if __name__ == "__main__":
+    main()
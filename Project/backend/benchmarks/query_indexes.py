@@ -0,0 +1,237 @@
+"""
+Benchmark the API's hot queries with and without the schema's indexes.
+
+Seeds a throwaway SQLite database (about 1M rows by default), times each
+query without indexes, applies the migrations, and times it again.
+
+Usage (from the backend directory):
+    python -m benchmarks.query_indexes [--evaluations 1000000] [--db PATH]
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import statistics
+import tempfile
+import time
+import uuid
+from datetime import datetime, timedelta
+from typing import Awaitable, Callable, Dict, List, Tuple
+
+from sqlalchemy import create_engine, func, select
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.orm import Session
+
+from app.database import Base
+from app.migrations import run_migrations
+from app.models.dataset import Dataset, DatasetType
+from app.models.evaluation import Evaluation
+from app.models.experiment import Experiment, ExperimentStatus
+from app.models.model import Model, ModelType
+from app.models.upload_session import UploadSession  # noqa: F401  Registers the table
+from app.services.pagination import SortOrder, paginate
+
+# Rows inserted per statement while seeding
+BATCH_SIZE = 20_000
+
+# Timed runs per query; the median is reported
+REPEATS = 5
+
+
+def _ids(count: int) -> List[str]:
+    return [str(uuid.uuid4()) for _ in range(count)]
+
+
+def _timestamps(count: int, start: datetime) -> List[datetime]:
+    """Increasing timestamps spread over a year, as rows are created over time."""
+    step = timedelta(days=365) / max(count, 1)
+    return [start + step * i for i in range(count)]
+
+
+def _insert(session: Session, model, rows: List[Dict]) -> None:
+    for start in range(0, len(rows), BATCH_SIZE):
+        session.execute(model.__table__.insert(), rows[start:start + BATCH_SIZE])
+    session.commit()
+
+
+def seed(session: Session, evaluations: int) -> Dict[str, str]:
+    """
+    Fill the database with related rows in realistic proportions.
+    
+    Args:
+        session: Database session
+        evaluations: Number of evaluations; other tables are scaled from it
+    
+    Returns:
+        IDs of sample rows to look up
+    """
+    rng = random.Random(0)
+    start = datetime(2025, 1, 1)
+    experiments = max(evaluations // 5, 1)
+    datasets = max(evaluations // 20, 1)
+    models = max(evaluations // 100, 2)
+    
+    model_ids = _ids(models)
+    base_ids = model_ids[:max(models // 10, 1)]
+    _insert(session, Model, [
+        {
+            "id": model_id,
+            "name": f"model-{i}",
+            "model_type": ModelType.BASE if model_id in base_ids else ModelType.FINE_TUNED,
+            "base_model_id": None if i < len(base_ids) else rng.choice(base_ids),
+            "is_latest_version": rng.random() < 0.5,
+            "created_at": created_at,
+        }
+        for i, (model_id, created_at) in enumerate(zip(model_ids, _timestamps(models, start)))
+    ])
+    
+    dataset_ids = _ids(datasets)
+    _insert(session, Dataset, [
+        {
+            "id": dataset_id,
+            "name": f"dataset-{i}",
+            "dataset_type": rng.choice(list(DatasetType)),
+            "file_path": f"uploads/{dataset_id}.jsonl",
+            "row_count": rng.randint(100, 100_000),
+            "created_at": created_at,
+        }
+        for i, (dataset_id, created_at) in enumerate(zip(dataset_ids, _timestamps(datasets, start)))
+    ])
+    
+    experiment_ids = _ids(experiments)
+    statuses = [ExperimentStatus.COMPLETED] * 90 + [ExperimentStatus.FAILED] * 7 + [ExperimentStatus.RUNNING] * 3
+    _insert(session, Experiment, [
+        {
+            "id": experiment_id,
+            "name": f"experiment-{i}",
+            "base_model_id": rng.choice(base_ids),
+            "training_dataset_id": rng.choice(dataset_ids),
+            "eval_dataset_id": rng.choice(dataset_ids),
+            "status": rng.choice(statuses),
+            "training_config": {"epochs": 3, "learning_rate": 5e-5},
+            "resulting_model_id": rng.choice(model_ids[len(base_ids):] or model_ids),
+            "created_at": created_at,
+        }
+        for i, (experiment_id, created_at) in enumerate(zip(experiment_ids, _timestamps(experiments, start)))
+    ])
+    
+    _insert(session, Evaluation, [
+        {
+            "id": evaluation_id,
+            "experiment_id": rng.choice(experiment_ids),
+            "metrics": {"accuracy": rng.random()},
+            "created_at": created_at,
+        }
+        for evaluation_id, created_at in zip(_ids(evaluations), _timestamps(evaluations, start))
+    ])
+    
+    return {
+        "experiment_id": rng.choice(experiment_ids),
+        "model_id": rng.choice(model_ids[len(base_ids):] or model_ids),
+        "dataset_id": rng.choice(dataset_ids),
+        "base_model_id": rng.choice(base_ids),
+    }
+
+
+def queries(sample: Dict[str, str]) -> List[Tuple[str, Callable[[AsyncSession], Awaitable[object]]]]:
+    """The queries the list, detail and delete routes run."""
+    def page(model, sort="created_at", **filters):
+        async def run(session: AsyncSession):
+            statement = select(model).filter_by(**filters)
+            return await paginate(session, statement, model, sort, SortOrder.DESC, None, 50, (sort,))
+        return run
+    
+    async def linked_evaluations(session: AsyncSession):
+        return (await session.scalars(
+            select(Evaluation.id)
+            .join(Experiment, Evaluation.experiment_id == Experiment.id)
+            .where(Experiment.resulting_model_id == sample["model_id"])
+            .order_by(Evaluation.created_at, Evaluation.id)
+        )).all()
+    
+    async def dataset_in_use(session: AsyncSession):
+        return await session.scalar(select(Experiment.id).where(
+            (Experiment.training_dataset_id == sample["dataset_id"])
+            | (Experiment.eval_dataset_id == sample["dataset_id"])
+        ).limit(1))
+    
+    return [
+        ("GET /evaluations", page(Evaluation)),
+        ("GET /evaluations?experiment_id=", page(Evaluation, experiment_id=sample["experiment_id"])),
+        ("GET /experiments?sort=name", page(Experiment, sort="name")),
+        ("GET /experiments?status=running", page(Experiment, status=ExperimentStatus.RUNNING)),
+        ("GET /experiments?base_model_id=", page(Experiment, base_model_id=sample["base_model_id"])),
+        ("GET /models?model_type=base", page(Model, model_type=ModelType.BASE)),
+        ("GET /datasets?dataset_type=evaluation", page(Dataset, dataset_type=DatasetType.EVALUATION)),
+        ("GET /models/{id} linked evaluations", linked_evaluations),
+        ("DELETE /datasets/{id} in-use check", dataset_in_use),
+    ]
+
+
+async def _time_queries(path: str, sample: Dict[str, str]) -> Dict[str, float]:
+    engine = create_async_engine(f"sqlite+aiosqlite:///{path}")
+    timings = {}
+    async with AsyncSession(engine) as session:
+        for name, run in queries(sample):
+            await run(session)  # Warm the page cache
+            samples = []
+            for _ in range(REPEATS):
+                started = time.perf_counter()
+                await run(session)
+                samples.append((time.perf_counter() - started) * 1000)
+            timings[name] = statistics.median(samples)
+    await engine.dispose()
+    return timings
+
+
+def time_queries(path: str, sample: Dict[str, str]) -> Dict[str, float]:
+    """Median wall time of each query through the API's async session, in milliseconds."""
+    return asyncio.run(_time_queries(path, sample))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--evaluations", type=int, default=1_000_000, help="Evaluation rows to seed")
+    parser.add_argument("--db", help="SQLite file to create (default: a temporary file)")
+    args = parser.parse_args()
+    
+    path = args.db or os.path.join(tempfile.mkdtemp(), "benchmark.db")
+    if os.path.exists(path):
+        parser.error(f"{path} already exists")
+    engine = create_engine(f"sqlite:///{path}")
+    
+    # Start from the tables alone, without any of the declared indexes
+    Base.metadata.create_all(bind=engine)
+    with engine.begin() as conn:
+        for table in Base.metadata.sorted_tables:
+            for index in table.indexes:
+                index.drop(conn)
+    
+    with Session(engine) as session:
+        started = time.perf_counter()
+        sample = seed(session, args.evaluations)
+        total = sum(session.query(func.count()).select_from(model).scalar()
+                    for model in (Model, Dataset, Experiment, Evaluation))
+        print(f"Seeded {total:,} rows in {time.perf_counter() - started:.1f}s ({path})")
+    before = time_queries(path, sample)
+    
+    started = time.perf_counter()
+    run_migrations(engine)
+    print(f"Applied migrations in {time.perf_counter() - started:.1f}s")
+    
+    after = time_queries(path, sample)
+    
+    width = max(len(name) for name in before)
+    print(f"\n{'Query':<{width}}  {'No indexes':>12}  {'Indexed':>10}  {'Speedup':>8}")
+    for name in before:
+        speedup = before[name] / after[name] if after[name] else float("inf")
+        print(f"{name:<{width}}  {before[name]:>10.2f}ms  {after[name]:>8.2f}ms  {speedup:>7.0f}x")
+    
+    engine.dispose()
+    if not args.db:
+        os.remove(path)
+
+
+if __name__ == "__main__":
+    main()
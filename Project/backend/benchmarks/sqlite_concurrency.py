@@ -0,0 +1,180 @@
+"""
+Benchmark concurrent reads and writes on SQLite under each profile.
+
+Writer threads insert evaluations and update experiment statuses, one
+commit each, as training jobs do; reader threads fetch the first page of
+the evaluation list at the same time. Each profile gets its own database,
+since WAL mode is stored in the file.
+
+Usage (from the backend directory):
+    python -m benchmarks.sqlite_concurrency [--seconds 5] [--readers 4] [--writers 2]
+"""
+
+import argparse
+import os
+import random
+import shutil
+import statistics
+import tempfile
+import threading
+import time
+import uuid
+from typing import Dict, List
+
+from sqlalchemy import create_engine, select, update
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import Session
+
+from app.database import Base, apply_sqlite_profile, engine_options
+from app.migrations import run_migrations
+from app.models.dataset import Dataset  # noqa: F401  Registers the table
+from app.models.evaluation import Evaluation
+from app.models.experiment import Experiment, ExperimentStatus
+from app.models.model import Model  # noqa: F401  Registers the table
+from app.models.upload_session import UploadSession  # noqa: F401  Registers the table
+
+PROFILES = ("default", "performance")
+
+# Rows present before the timed run
+SEED_EXPERIMENTS = 1_000
+SEED_EVALUATIONS = 50_000
+
+
+def _seed(session: Session) -> List[str]:
+    """Insert experiments and evaluations; returns the experiment IDs."""
+    rng = random.Random(0)
+    experiment_ids = [str(uuid.uuid4()) for _ in range(SEED_EXPERIMENTS)]
+    session.execute(Experiment.__table__.insert(), [
+        {
+            "id": experiment_id,
+            "name": f"experiment-{i}",
+            "base_model_id": "base",
+            "training_dataset_id": "dataset",
+            "status": ExperimentStatus.COMPLETED,
+            "training_config": {"epochs": 3},
+        }
+        for i, experiment_id in enumerate(experiment_ids)
+    ])
+    session.execute(Evaluation.__table__.insert(), [
+        {"id": str(uuid.uuid4()), "experiment_id": rng.choice(experiment_ids), "metrics": {"accuracy": rng.random()}}
+        for _ in range(SEED_EVALUATIONS)
+    ])
+    session.commit()
+    return experiment_ids
+
+
+def run_profile(path: str, profile: str, seconds: float, readers: int, writers: int) -> Dict[str, float]:
+    """
+    Run readers and writers against a fresh database for a fixed time.
+    
+    Args:
+        path: SQLite file to create
+        profile: SQLite profile to apply
+        seconds: Length of the timed run
+        readers: Reader threads
+        writers: Writer threads
+    
+    Returns:
+        Throughput, read latency and failure counts
+    """
+    url = f"sqlite:///{path}"
+    engine = create_engine(url, **engine_options(url))
+    apply_sqlite_profile(engine, profile)
+    Base.metadata.create_all(bind=engine)
+    run_migrations(engine)
+    with Session(engine) as session:
+        experiment_ids = _seed(session)
+    
+    stop = threading.Event()
+    lock = threading.Lock()
+    counts = {"reads": 0, "writes": 0, "failed": 0}
+    latencies: List[float] = []
+    
+    def read() -> None:
+        statement = select(Evaluation).order_by(Evaluation.created_at.desc(), Evaluation.id.desc()).limit(50)
+        local, done, failed = [], 0, 0
+        with Session(engine) as session:
+            while not stop.is_set():
+                started = time.perf_counter()
+                try:
+                    session.scalars(statement).all()
+                    session.rollback()  # End the read transaction, as a request does
+                    done += 1
+                    local.append(time.perf_counter() - started)
+                except OperationalError:
+                    session.rollback()
+                    failed += 1
+        with lock:
+            counts["reads"] += done
+            counts["failed"] += failed
+            latencies.extend(local)
+    
+    def write(seed: int) -> None:
+        rng = random.Random(seed)
+        done, failed = 0, 0
+        with Session(engine) as session:
+            while not stop.is_set():
+                experiment_id = rng.choice(experiment_ids)
+                try:
+                    session.add(Evaluation(experiment_id=experiment_id, metrics={"accuracy": rng.random()}))
+                    session.execute(
+                        update(Experiment)
+                        .where(Experiment.id == experiment_id)
+                        .values(status=ExperimentStatus.COMPLETED)
+                    )
+                    session.commit()
+                    done += 1
+                except OperationalError:
+                    session.rollback()
+                    failed += 1
+        with lock:
+            counts["writes"] += done
+            counts["failed"] += failed
+    
+    threads = [threading.Thread(target=read) for _ in range(readers)]
+    threads += [threading.Thread(target=write, args=(n,)) for n in range(writers)]
+    for thread in threads:
+        thread.start()
+    time.sleep(seconds)
+    stop.set()
+    for thread in threads:
+        thread.join()
+    engine.dispose()
+    
+    latencies.sort()
+    return {
+        "reads/s": counts["reads"] / seconds,
+        "writes/s": counts["writes"] / seconds,
+        "read p50 ms": statistics.median(latencies) * 1000 if latencies else float("nan"),
+        "read p99 ms": latencies[int(len(latencies) * 0.99)] * 1000 if latencies else float("nan"),
+        "failed": counts["failed"],
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--seconds", type=float, default=5.0, help="Length of each timed run")
+    parser.add_argument("--readers", type=int, default=4, help="Reader threads")
+    parser.add_argument("--writers", type=int, default=2, help="Writer threads")
+    args = parser.parse_args()
+    
+    directory = tempfile.mkdtemp()
+    try:
+        results = {
+            profile: run_profile(
+                os.path.join(directory, f"{profile}.db"), profile, args.seconds, args.readers, args.writers
+            )
+            for profile in PROFILES
+        }
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+    
+    print(f"{args.readers} readers, {args.writers} writers, {args.seconds:g}s per profile\n")
+    metrics = list(results[PROFILES[0]])
+    print(f"{'Profile':<12}" + "".join(f"{metric:>13}" for metric in metrics))
+    for profile, result in results.items():
+        print(f"{profile:<12}" + "".join(f"{result[metric]:>13.1f}" for metric in metrics))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,197 @@
+"""
+Benchmark training writes committed per epoch against the write buffer.
+
+Simulated jobs run concurrently in one worker process, each recording an
+epoch's progress and per-step metrics at a fixed pace, either with one
+commit per job and epoch or through a ``WriteBuffer``. A separate reader
+process fetches the first page of the experiment list meanwhile, as the
+API does, to measure how responsive it stays.
+
+Usage (from the backend directory):
+    python -m benchmarks.write_buffer [--jobs 100] [--epochs 20] [--steps 50]
+"""
+
+import argparse
+import asyncio
+import multiprocessing
+import os
+import random
+import shutil
+import statistics
+import tempfile
+import time
+import uuid
+from typing import Dict, List
+
+from sqlalchemy import create_engine, event, select, update
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.database import Base, apply_sqlite_profile, engine_options
+from app.migrations import run_migrations
+from app.models import dataset, evaluation, job, model, upload_session  # noqa: F401  Registers the tables
+from app.models.experiment import Experiment, ExperimentStatus
+from app.services.metrics_store import record_metrics
+from app.services.progress import epoch_progress
+from app.services.write_buffer import WriteBuffer
+
+MODES = ("per-epoch", "buffered")
+
+# Seconds between the epochs of a job
+EPOCH_SECONDS = 0.25
+
+
+def _seed(path: str, jobs: int) -> List[str]:
+    """Create the database with one running experiment per job; returns their IDs."""
+    url = f"sqlite:///{path}"
+    engine = create_engine(url, **engine_options(url))
+    apply_sqlite_profile(engine, settings.sqlite_profile)
+    Base.metadata.create_all(bind=engine)
+    run_migrations(engine)
+    experiment_ids = [str(uuid.uuid4()) for _ in range(jobs)]
+    with Session(engine) as session:
+        session.execute(Experiment.__table__.insert(), [
+            {
+                "id": experiment_id,
+                "name": f"experiment-{i}",
+                "base_model_id": "base",
+                "training_dataset_id": "dataset",
+                "status": ExperimentStatus.RUNNING,
+                "training_config": {"epochs": 3},
+            }
+            for i, experiment_id in enumerate(experiment_ids)
+        ])
+        session.commit()
+    engine.dispose()
+    return experiment_ids
+
+
+def _read(path: str, stop, results) -> None:
+    """Reader process: fetch the experiment list until stopped."""
+    url = f"sqlite:///{path}"
+    engine = create_engine(url, **engine_options(url))
+    apply_sqlite_profile(engine, settings.sqlite_profile)
+    statement = select(Experiment).order_by(Experiment.created_at.desc(), Experiment.id.desc()).limit(50)
+    latencies, failed = [], 0
+    with Session(engine) as session:
+        while not stop.is_set():
+            started = time.perf_counter()
+            try:
+                session.scalars(statement).all()
+                session.rollback()  # End the read transaction, as a request does
+                latencies.append(time.perf_counter() - started)
+            except OperationalError:
+                session.rollback()
+                failed += 1
+    engine.dispose()
+    results.put((latencies, failed))
+
+
+async def _train(path: str, mode: str, experiment_ids: List[str], epochs: int, steps: int) -> Dict[str, float]:
+    url = f"sqlite+aiosqlite:///{path}"
+    engine = create_async_engine(url, **engine_options(url))
+    apply_sqlite_profile(engine.sync_engine, settings.sqlite_profile)
+    sessions = async_sessionmaker(engine, autoflush=False, expire_on_commit=False)
+    buffer = WriteBuffer(sessions)
+    
+    commits = 0
+    
+    @event.listens_for(engine.sync_engine, "commit")
+    def count_commit(conn) -> None:
+        nonlocal commits
+        commits += 1
+    
+    failed = 0
+    
+    async def job(experiment_id: str, seed: int) -> None:
+        nonlocal failed
+        rng = random.Random(seed)
+        await asyncio.sleep(rng.uniform(0, EPOCH_SECONDS))  # Jobs start at different times
+        for epoch in range(epochs):
+            await asyncio.sleep(EPOCH_SECONDS)
+            loss = 2.0 * (1 - epoch / epochs) + 0.1
+            points = [("train_loss", epoch * steps + step, loss * rng.uniform(0.9, 1.1)) for step in range(1, steps + 1)]
+            progress = epoch_progress(epoch + 1, epochs, loss, loss + 0.1)
+            if mode == "buffered":
+                await buffer.record_metrics(experiment_id, points)
+                buffer.update_experiment(experiment_id, progress=progress)
+                continue
+            async with sessions() as db:
+                try:
+                    await record_metrics(db, experiment_id, points)
+                    await db.execute(update(Experiment).where(Experiment.id == experiment_id).values(progress=progress))
+                    await db.commit()
+                except OperationalError:
+                    failed += 1
+    
+    started = time.perf_counter()
+    await asyncio.gather(*(job(experiment_id, n) for n, experiment_id in enumerate(experiment_ids)))
+    await buffer.close()
+    elapsed = time.perf_counter() - started
+    await engine.dispose()
+    
+    ideal = EPOCH_SECONDS * (epochs + 1)
+    return {"commits": commits, "failed writes": failed, "job overrun %": (elapsed / ideal - 1) * 100}
+
+
+def run_mode(path: str, mode: str, jobs: int, epochs: int, steps: int) -> Dict[str, float]:
+    """
+    Run the jobs against a fresh database while the reader process reads.
+    
+    Args:
+        path: SQLite file to create
+        mode: "per-epoch" or "buffered"
+        jobs: Concurrent jobs
+        epochs: Epochs per job
+        steps: Metric values per job and epoch
+    
+    Returns:
+        Commits, failures, job slowdown and read latency
+    """
+    experiment_ids = _seed(path, jobs)
+    stop, results = multiprocessing.Event(), multiprocessing.Queue()
+    reader = multiprocessing.Process(target=_read, args=(path, stop, results))
+    reader.start()
+    try:
+        result = asyncio.run(_train(path, mode, experiment_ids, epochs, steps))
+    finally:
+        stop.set()
+    latencies, failed_reads = results.get()
+    reader.join()
+    
+    latencies.sort()
+    result.update({
+        "read p50 ms": statistics.median(latencies) * 1000 if latencies else float("nan"),
+        "read p99 ms": latencies[int(len(latencies) * 0.99)] * 1000 if latencies else float("nan"),
+        "failed reads": failed_reads,
+    })
+    return result
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--jobs", type=int, default=100, help="Concurrent training jobs")
+    parser.add_argument("--epochs", type=int, default=20, help="Epochs per job")
+    parser.add_argument("--steps", type=int, default=50, help="Metric values per job and epoch")
+    args = parser.parse_args()
+    
+    directory = tempfile.mkdtemp()
+    try:
+        results = {
+            mode: run_mode(os.path.join(directory, f"{mode}.db"), mode, args.jobs, args.epochs, args.steps)
+            for mode in MODES
+        }
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+    
+    print(f"{args.jobs} jobs x {args.epochs} epochs x {args.steps} steps, an epoch every {EPOCH_SECONDS:g}s\n")
+    metrics = list(results[MODES[0]])
+    print(f"{'Mode':<12}" + "".join(f"{metric:>15}" for metric in metrics))
+    for mode, result in results.items():
+        print(f"{mode:<12}" + "".join(f"{result[metric]:>15.1f}" for metric in metrics))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,3 +1,5 @@
 @echo off
 echo Starting SLM Training Platform API...
+rem Training jobs run in a separate worker process
+start "SLM Training Worker" python -m app.worker
 uvicorn app.main:app --reload --host 0.0.0.0 --port 8000
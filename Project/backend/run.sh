@@ -1,3 +1,7 @@
 #!/bin/bash
 echo "Starting SLM Training Platform API..."
+# Training jobs run in a separate worker process
+python -m app.worker &
+WORKER_PID=$!
+trap "kill $WORKER_PID" EXIT
 uvicorn app.main:app --reload --host 0.0.0.0 --port 8000
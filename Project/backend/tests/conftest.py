@@ -0,0 +1,67 @@
+"""Test setup: the app runs against a throwaway database and upload directory."""
+
+import os
+import tempfile
+import uuid
+
+# Set before the app reads its settings
+_TEMP_DIR = tempfile.mkdtemp(prefix="slm-tests-")
+os.environ["DATABASE_URL"] = f"sqlite:///{_TEMP_DIR}/test.db"
+os.environ["UPLOAD_DIR"] = os.path.join(_TEMP_DIR, "uploads")
+os.environ["TRAINING_SIMULATION_DELAY"] = "0"
+os.environ["TRAINING_SIMULATION_DURATION"] = "0"
+
+import pytest
+from fastapi.testclient import TestClient
+
+
+@pytest.fixture(scope="session")
+def client():
+    """API client; the app starts up once for all tests."""
+    from app.main import app
+    with TestClient(app) as test_client:
+        yield test_client
+
+
+@pytest.fixture
+def kind(client):
+    """A job kind of its own, so a test only claims and counts its own jobs."""
+    from sqlalchemy import delete
+    from app.database import SessionLocal
+    from app.models.job import Job
+    
+    kind = f"test-{uuid.uuid4().hex}"
+    yield kind
+    # Jobs left behind would hold capacity or skew run times in later tests
+    with SessionLocal() as db:
+        db.execute(delete(Job).where(Job.kind == kind))
+        db.commit()
+
+
+@pytest.fixture
+def create_experiment(client):
+    """Create experiments whose training jobs are queued but not run."""
+    def create() -> str:
+        response = client.post(
+            "/datasets/upload",
+            files={"file": ("train.jsonl", f'{{"text": "{uuid.uuid4().hex}"}}\n'.encode(), "application/octet-stream")},
+            data={"name": "train", "dataset_type": "training"},
+        )
+        assert response.status_code == 201, response.text
+        base_model_id = client.get("/models", params={"model_type": "base"}).json()["items"][0]["id"]
+        response = client.post("/experiments", json={
+            "name": "experiment",
+            "base_model_id": base_model_id,
+            "training_dataset_id": response.json()["id"],
+            "training_config": {"trainer": "simulated", "epochs": 2},
+        })
+        assert response.status_code == 201, response.text
+        return response.json()["id"]
+    
+    return create
+
+
+@pytest.fixture
+def experiment_id(create_experiment):
+    """A new experiment, with its training job queued but not run."""
+    return create_experiment()
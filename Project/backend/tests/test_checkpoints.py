@@ -0,0 +1,209 @@
+"""Training checkpoints and resuming from them."""
+
+import asyncio
+import io
+import json
+import random
+import threading
+import uuid
+from array import array
+
+import pytest
+from sqlalchemy import select
+
+from app.config import settings
+from app.database import SessionLocal
+from app.models.evaluation import Evaluation
+from app.models.experiment import Experiment, ExperimentStatus
+from app.services.checkpoints import checkpoint_dir, load_checkpoint, remove_checkpoints, save_checkpoint
+from app.services.storage_service import store_stream
+from app.services.trainers import NGramTrainer
+from app.services.training_service import train_experiment
+
+NGRAM_CONFIG = {"trainer": "ngram", "epochs": 3, "vocab_size": 32, "feature_buckets": 1024, "batch_size": 16}
+
+
+def _text_rows(count: int) -> bytes:
+    rng = random.Random(count)
+    words = "the cat sat on a mat and the dog ran to the park with a ball".split()
+    tag = uuid.uuid4().hex  # Unique content, so the dataset is not shared
+    return "".join(
+        json.dumps({"text": " ".join(rng.choice(words) for _ in range(12)), "id": f"{tag}-{n}"}) + "\n"
+        for n in range(count)
+    ).encode()
+
+
+def test_round_trip():
+    experiment_id = str(uuid.uuid4())
+    state = {
+        "step": 7,
+        "history": [1.5, None, {"lr": 0.1}],
+        "weights": memoryview(array("f", [0.5, -1.25, 3.0])),
+        "counts": array("q", [2 ** 40, -1]),
+        "empty": array("d"),
+    }
+    save_checkpoint(experiment_id, "epoch-1", state)
+    loaded = load_checkpoint(experiment_id, "epoch-1")
+    
+    assert loaded["step"] == 7
+    assert loaded["history"] == [1.5, None, {"lr": 0.1}]
+    assert loaded["weights"] == array("f", [0.5, -1.25, 3.0])
+    assert loaded["counts"] == array("q", [2 ** 40, -1])
+    assert loaded["empty"] == array("d")
+    assert [path.name for path in checkpoint_dir(experiment_id).iterdir()] == ["epoch-1"]
+
+
+def test_damaged_checkpoints_are_rejected():
+    experiment_id = str(uuid.uuid4())
+    save_checkpoint(experiment_id, "good", {"weights": array("d", range(100))})
+    path = checkpoint_dir(experiment_id) / "good"
+    data = path.read_bytes()
+    
+    (path.parent / "truncated").write_bytes(data[:-8])
+    with pytest.raises(ValueError, match="truncated"):
+        load_checkpoint(experiment_id, "truncated")
+    
+    (path.parent / "flipped").write_bytes(data[:-1] + bytes([data[-1] ^ 1]))
+    with pytest.raises(ValueError, match="checksum"):
+        load_checkpoint(experiment_id, "flipped")
+    
+    (path.parent / "other").write_bytes(b"not a checkpoint\n")
+    with pytest.raises(ValueError, match="not a checkpoint"):
+        load_checkpoint(experiment_id, "other")
+    
+    with pytest.raises(OSError):
+        load_checkpoint(experiment_id, "missing")
+
+
+def test_remove_checkpoints():
+    experiment_id = str(uuid.uuid4())
+    for name in ("epoch-1", "epoch-2"):
+        save_checkpoint(experiment_id, name, {"epoch": name})
+    (checkpoint_dir(experiment_id) / "epoch-3.tmp").write_bytes(b"interrupted write")
+    
+    remove_checkpoints(experiment_id, keep="epoch-2")
+    assert [path.name for path in checkpoint_dir(experiment_id).iterdir()] == ["epoch-2"]
+    remove_checkpoints(experiment_id)
+    assert not checkpoint_dir(experiment_id).exists()
+    remove_checkpoints(experiment_id, keep="epoch-2")  # Nothing left to remove
+
+
+def test_trainer_resumes_where_it_stopped():
+    stored = store_stream(io.BytesIO(_text_rows(200)), "train.jsonl", str(uuid.uuid4()))
+    stop = threading.Event()
+    
+    def trainer():
+        return NGramTrainer(NGRAM_CONFIG, stored.file_path, None, stored.row_count)
+    
+    uninterrupted = trainer()
+    losses = [uninterrupted.train_epoch(epoch, stop) for epoch in range(3)]
+    
+    first = trainer()
+    for epoch in range(2):
+        first.train_epoch(epoch, stop)
+    experiment_id = str(uuid.uuid4())
+    save_checkpoint(experiment_id, "epoch-2", first.state_dict())
+    
+    resumed = trainer()
+    resumed.load_state_dict(load_checkpoint(experiment_id, "epoch-2"))
+    result = resumed.train_epoch(2, stop)
+    assert result.train_loss == losses[2].train_loss
+    assert result.step_losses == losses[2].step_losses
+    assert resumed.evaluate() == uninterrupted.evaluate()
+
+
+def test_checkpoint_of_another_model_size_is_rejected():
+    stored = store_stream(io.BytesIO(_text_rows(20)), "train.jsonl", str(uuid.uuid4()))
+    small = NGramTrainer({**NGRAM_CONFIG, "feature_buckets": 512}, stored.file_path, None, stored.row_count)
+    with pytest.raises(ValueError, match="weights"):
+        NGramTrainer(NGRAM_CONFIG, stored.file_path, None, stored.row_count).load_state_dict(small.state_dict())
+
+
+def _create_experiment(client, content: bytes) -> str:
+    response = client.post(
+        "/datasets/upload",
+        files={"file": ("train.jsonl", content, "application/octet-stream")},
+        data={"name": "train", "dataset_type": "training"},
+    )
+    assert response.status_code == 201, response.text
+    base_model_id = client.get("/models", params={"model_type": "base"}).json()["items"][0]["id"]
+    response = client.post("/experiments", json={
+        "name": "experiment",
+        "base_model_id": base_model_id,
+        "training_dataset_id": response.json()["id"],
+        "training_config": NGRAM_CONFIG,
+    })
+    assert response.status_code == 201, response.text
+    return response.json()["id"]
+
+
+def _evaluation(experiment_id: str) -> Evaluation:
+    with SessionLocal() as db:
+        return db.scalar(select(Evaluation).where(Evaluation.experiment_id == experiment_id))
+
+
+def test_training_resumes_from_its_last_checkpoint(client, monkeypatch):
+    monkeypatch.setattr(settings, "training_checkpoint_interval", 0)
+    content = _text_rows(200)
+    reference, interrupted = _create_experiment(client, content), _create_experiment(client, content)
+    asyncio.run(train_experiment(reference))
+    
+    # The first attempt stops after its last epoch, with the checkpoint of epoch 2
+    evaluate = NGramTrainer.evaluate
+    
+    def fail(self):
+        raise RuntimeError("worker lost")
+    
+    monkeypatch.setattr(NGramTrainer, "evaluate", fail)
+    with pytest.raises(RuntimeError):
+        asyncio.run(train_experiment(interrupted))
+    with SessionLocal() as db:
+        checkpoint = db.get(Experiment, interrupted).checkpoint
+    assert checkpoint["epoch"] == 2
+    assert [path.name for path in checkpoint_dir(interrupted).iterdir()] == [checkpoint["file"]]
+    
+    monkeypatch.setattr(NGramTrainer, "evaluate", evaluate)
+    train_epoch, epochs = NGramTrainer.train_epoch, []
+    
+    def record_epoch(self, epoch, stop):
+        epochs.append(epoch)
+        return train_epoch(self, epoch, stop)
+    
+    monkeypatch.setattr(NGramTrainer, "train_epoch", record_epoch)
+    asyncio.run(train_experiment(interrupted))
+    assert epochs == [2]
+    with SessionLocal() as db:
+        experiment = db.get(Experiment, interrupted)
+        assert experiment.status == ExperimentStatus.COMPLETED
+        assert experiment.checkpoint is None
+    assert not checkpoint_dir(interrupted).exists()
+    
+    expected, resumed = _evaluation(reference), _evaluation(interrupted)
+    assert resumed.loss_curve == expected.loss_curve
+    assert resumed.metrics == expected.metrics
+    # The steps recorded before the checkpoint are kept, and none twice
+    expected_points, resumed_points = [
+        client.get(f"/experiments/{experiment_id}/metrics/train_loss", params={"points": 10000}).json()["points"]
+        for experiment_id in (reference, interrupted)
+    ]
+    assert resumed_points == expected_points
+
+
+def test_damaged_checkpoint_starts_training_over(client, monkeypatch):
+    monkeypatch.setattr(settings, "training_checkpoint_interval", 0)
+    experiment_id = _create_experiment(client, _text_rows(50))
+    save_checkpoint(experiment_id, "damaged", {"weights": array("f", [1.0])})
+    path = checkpoint_dir(experiment_id) / "damaged"
+    path.write_bytes(path.read_bytes()[:-1])
+    with SessionLocal() as db:
+        db.get(Experiment, experiment_id).checkpoint = {
+            "epoch": 2, "step": 10, "train_loss": [1.0, 1.0], "val_loss": [1.0, 1.0],
+            "samples": 0, "seconds": 0.0, "file": "damaged",
+        }
+        db.commit()
+    
+    asyncio.run(train_experiment(experiment_id))
+    with SessionLocal() as db:
+        assert db.get(Experiment, experiment_id).status == ExperimentStatus.COMPLETED
+    assert _evaluation(experiment_id).loss_curve["epochs"] == [1, 2, 3]
+    assert 1.0 not in _evaluation(experiment_id).loss_curve["train_loss"]
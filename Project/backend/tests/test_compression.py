@@ -0,0 +1,77 @@
+"""Decompressing readers and decoders."""
+
+import gzip
+import io
+
+import pytest
+
+from app.services import compression
+from app.services.compression import DecompressionError, is_supported, make_decoder, open_reader, open_writer
+
+ENCODINGS = [
+    pytest.param(encoding, marks=pytest.mark.skipif(not is_supported(encoding), reason=f"{encoding} unavailable"))
+    for encoding in ("gzip", "zstd")
+]
+
+
+def _compress(encoding: str, *members: bytes) -> bytes:
+    """Compress each member separately and concatenate them (multi-member/multi-frame)."""
+    output = io.BytesIO()
+    for member in members:
+        with open_writer(output, encoding) as writer:
+            writer.write(member)
+    return output.getvalue()
+
+
+@pytest.mark.parametrize("encoding", ENCODINGS)
+def test_reader_round_trip(encoding):
+    members = [b"first line\n" * 5000, b"", bytes(range(256)) * 300]
+    data = _compress(encoding, *members)
+    assert open_reader(io.BytesIO(data), encoding).read() == b"".join(members)
+
+
+@pytest.mark.parametrize("encoding", ENCODINGS)
+def test_reader_holds_bounded_output(encoding):
+    # 256 MiB of zeros compress to a few hundred KiB at most
+    size = 256 * 1024 * 1024
+    output = io.BytesIO()
+    with open_writer(output, encoding) as writer:
+        block = bytes(1024 * 1024)
+        for _ in range(size // len(block)):
+            writer.write(block)
+    raw = compression._DecodingReader(io.BytesIO(output.getvalue()), make_decoder(encoding))
+    buffer = bytearray(64 * 1024)
+    total = 0
+    while True:
+        read = raw.readinto(buffer)
+        if not read:
+            break
+        total += read
+        assert len(raw._buffer) <= compression._READ_OUTPUT_LIMIT
+    assert total == size
+
+
+@pytest.mark.parametrize("encoding", ENCODINGS)
+def test_reader_rejects_truncated_input(encoding):
+    data = _compress(encoding, b"some text\n" * 1000)
+    with pytest.raises(DecompressionError):
+        open_reader(io.BytesIO(data[:-5]), encoding).read()
+
+
+@pytest.mark.parametrize("encoding", ENCODINGS)
+def test_decoder_keeps_unconsumed_input(encoding):
+    data = b"abcdefgh" * 100000
+    decoder = make_decoder(encoding)
+    output = [decoder.decompress(_compress(encoding, data), max_length=1000)]
+    assert len(output[0]) == 1000
+    while not decoder.needs_input:
+        chunk = decoder.decompress(b"", max_length=1000)
+        assert len(chunk) <= 1000
+        output.append(chunk)
+    output.append(decoder.flush())
+    assert b"".join(output) == data
+
+
+def test_gzip_reader_matches_gzip_module():
+    data = b"\n".join(str(i).encode() for i in range(100000))
+    assert open_reader(io.BytesIO(gzip.compress(data)), "gzip").read() == data
@@ -0,0 +1,65 @@
+"""Dataset download headers."""
+
+import gzip
+from urllib.parse import unquote
+
+import pytest
+
+from app.config import settings
+
+NAMES = ['a "quoted" name', "données é"]
+
+
+def _upload(client, name: str, filename: str, content: bytes) -> str:
+    response = client.post(
+        "/datasets/upload",
+        files={"file": (filename, content, "application/octet-stream")},
+        data={"name": name, "dataset_type": "training"},
+    )
+    assert response.status_code == 201, response.text
+    return response.json()["id"]
+
+
+def _filename(header: str) -> str:
+    """File name a client supporting RFC 5987 reads from the header."""
+    assert header.startswith("attachment; ")
+    params = dict(part.split("=", 1) for part in header[len("attachment; "):].split("; "))
+    assert params["filename"].startswith('"') and params["filename"].endswith('"')
+    fallback = params["filename"][1:-1]
+    assert '"' not in fallback and "\\" not in fallback and fallback.isascii()
+    encoded = params["filename*"]
+    assert encoded.startswith("utf-8''")
+    return unquote(encoded[len("utf-8''"):])
+
+
+@pytest.mark.parametrize("name", NAMES)
+def test_file_download(client, name):
+    dataset_id = _upload(client, name, "data.jsonl", b'{"text": "a"}\n')
+    response = client.get(f"/datasets/{dataset_id}/download")
+    assert response.status_code == 200
+    assert _filename(response.headers["content-disposition"]) == name + ".jsonl"
+
+
+@pytest.mark.parametrize("name", NAMES)
+def test_decompressed_download(client, name):
+    dataset_id = _upload(client, name, "data.jsonl.gz", gzip.compress(b'{"text": "a"}\n'))
+    response = client.get(f"/datasets/{dataset_id}/download", headers={"Accept-Encoding": "identity"})
+    assert response.status_code == 200
+    assert response.content == b'{"text": "a"}\n'
+    assert _filename(response.headers["content-disposition"]) == name + ".jsonl"
+
+
+@pytest.mark.parametrize("name", NAMES)
+def test_offloaded_download(client, monkeypatch, name):
+    monkeypatch.setattr(settings, "download_offload_header", "X-Accel-Redirect")
+    dataset_id = _upload(client, name, "data.jsonl", b'{"text": "a"}\n')
+    response = client.get(f"/datasets/{dataset_id}/download")
+    assert response.status_code == 200
+    assert "x-accel-redirect" in response.headers
+    assert _filename(response.headers["content-disposition"]) == name + ".jsonl"
+
+
+def test_plain_name_download(client):
+    dataset_id = _upload(client, "plain", "data.jsonl", b'{"text": "a"}\n')
+    response = client.get(f"/datasets/{dataset_id}/download")
+    assert response.headers["content-disposition"] == 'attachment; filename="plain.jsonl"'
@@ -0,0 +1,253 @@
+"""Persistent job queue: claims, leases and retries."""
+
+import asyncio
+from datetime import timedelta
+
+from sqlalchemy import update
+
+from app.config import settings
+from app.database import AsyncSessionLocal
+from app.models.job import Job, JobStatus
+from app.services.job_queue import (
+    check_lease, claim_job, complete_job, enqueue_job, fail_job, release_job, renew_lease, utcnow
+)
+from app.worker import JobHandler, Worker
+
+
+async def _enqueue(kind: str, *priorities: int, **options) -> list:
+    async with AsyncSessionLocal() as db:
+        jobs = [enqueue_job(db, kind, {"n": n}, priority=priority, **options) for n, priority in enumerate(priorities)]
+        await db.commit()
+        return [job.id for job in jobs]
+
+
+async def _claim(kind: str, worker_id: str = "worker"):
+    async with AsyncSessionLocal() as db:
+        return await claim_job(db, worker_id, [kind])
+
+
+async def _expire_lease(job_id: str) -> None:
+    async with AsyncSessionLocal() as db:
+        await db.execute(update(Job).where(Job.id == job_id).values(lease_expires_at=utcnow() - timedelta(seconds=1)))
+        await db.commit()
+
+
+def test_claims_highest_priority_then_oldest(kind):
+    async def scenario():
+        ids = await _enqueue(kind, 0, 5, 0)
+        claimed = [await _claim(kind) for _ in range(4)]
+        assert [job.id for job in claimed[:3]] == [ids[1], ids[0], ids[2]]
+        assert claimed[3] is None
+        job = claimed[0]
+        assert job.status == JobStatus.RUNNING
+        assert job.attempts == 1
+        assert job.lease_owner == "worker"
+        assert job.lease_expires_at is not None
+    
+    asyncio.run(scenario())
+
+
+def test_concurrent_claims_take_a_job_once(kind):
+    async def scenario():
+        await _enqueue(kind, 0)
+        claimed = await asyncio.gather(*(_claim(kind, f"worker-{n}") for n in range(5)))
+        assert len([job for job in claimed if job is not None]) == 1
+    
+    asyncio.run(scenario())
+
+
+def test_expired_lease_is_claimed_again(kind):
+    async def scenario():
+        job_id, = await _enqueue(kind, 0)
+        await _claim(kind, "first")
+        assert await _claim(kind, "second") is None
+        
+        await _expire_lease(job_id)
+        job = await _claim(kind, "second")
+        assert job.id == job_id
+        assert job.attempts == 2
+        async with AsyncSessionLocal() as db:
+            # The first worker has lost the job and must stop it
+            assert await check_lease(db, job_id, "first") == JobStatus.RUNNING
+            assert not await renew_lease(db, job_id, "first")
+            assert not await complete_job(db, job_id, "first")
+            assert await check_lease(db, job_id, "second") is None
+            assert await renew_lease(db, job_id, "second")
+            assert await complete_job(db, job_id, "second")
+            assert (await db.get(Job, job_id, populate_existing=True)).status == JobStatus.SUCCEEDED
+    
+    asyncio.run(scenario())
+
+
+def test_failed_attempts_back_off_until_the_last(kind):
+    async def scenario():
+        job_id, = await _enqueue(kind, 0, max_attempts=2)
+        job = await _claim(kind)
+        async with AsyncSessionLocal() as db:
+            assert await fail_job(db, job, "worker", "first error") == JobStatus.QUEUED
+            job = await db.get(Job, job_id, populate_existing=True)
+            assert job.status == JobStatus.QUEUED
+            assert job.run_after is not None
+        # Not claimed again before the backoff delay
+        assert await _claim(kind) is None
+        
+        async with AsyncSessionLocal() as db:
+            await db.execute(update(Job).where(Job.id == job_id).values(run_after=None))
+            await db.commit()
+        job = await _claim(kind)
+        assert job.attempts == 2
+        async with AsyncSessionLocal() as db:
+            assert await fail_job(db, job, "worker", "second error") == JobStatus.FAILED
+            job = await db.get(Job, job_id, populate_existing=True)
+            assert job.last_error == "second error"
+            assert job.finished_at is not None
+    
+    asyncio.run(scenario())
+
+
+def test_failure_without_retry_fails_at_once(kind):
+    async def scenario():
+        await _enqueue(kind, 0, max_attempts=3)
+        job = await _claim(kind)
+        async with AsyncSessionLocal() as db:
+            assert await fail_job(db, job, "worker", "bad input", retry=False) == JobStatus.FAILED
+    
+    asyncio.run(scenario())
+
+
+def test_released_job_keeps_its_attempts(kind):
+    async def scenario():
+        job_id, = await _enqueue(kind, 0)
+        await _claim(kind)
+        async with AsyncSessionLocal() as db:
+            assert await release_job(db, job_id, "worker")
+            await db.commit()
+        job = await _claim(kind, "other")
+        assert job.id == job_id
+        assert job.attempts == 1
+    
+    asyncio.run(scenario())
+
+
+def test_worker_runs_and_retries_jobs(kind, monkeypatch):
+    monkeypatch.setattr(settings, "worker_poll_interval", 0.01)
+    monkeypatch.setattr(settings, "job_retry_backoff", 0)
+    runs = []
+    
+    async def run(payload):
+        runs.append(payload["n"])
+        if len(runs) == 1:
+            raise RuntimeError("flaky")
+    
+    async def scenario():
+        job_id, = await _enqueue(kind, 0)
+        worker = Worker({kind: JobHandler(run)}, concurrency=2)
+        task = asyncio.create_task(worker.run())
+        for _ in range(500):
+            if len(runs) >= 2:
+                break
+            await asyncio.sleep(0.01)
+        await asyncio.sleep(0.1)
+        worker.stop()
+        await task
+        async with AsyncSessionLocal() as db:
+            job = await db.get(Job, job_id)
+            assert job.status == JobStatus.SUCCEEDED
+            assert job.attempts == 2
+            assert "flaky" in job.last_error
+    
+    asyncio.run(scenario())
+    assert runs == [0, 0]
+
+
+async def _statuses(*job_ids: str) -> list:
+    async with AsyncSessionLocal() as db:
+        return [(await db.get(Job, job_id)).status for job_id in job_ids]
+
+
+def test_higher_priority_job_preempts_the_lowest_then_latest(kind, monkeypatch):
+    monkeypatch.setattr(settings, "scheduler_capacity", 3)
+    monkeypatch.setattr(settings, "scheduler_preemption", True)
+    
+    async def scenario():
+        earlier, = await _enqueue(kind, 2)
+        later, = await _enqueue(kind, 1)
+        lowest, = await _enqueue(kind, 0)
+        for job_id in (earlier, later, lowest):
+            assert (await _claim(kind)).id == job_id
+        
+        urgent, = await _enqueue(kind, 5, cost=2)
+        job = await _claim(kind, "other")
+        assert job.id == urgent
+        assert await _statuses(earlier, later, lowest) == [JobStatus.RUNNING, JobStatus.QUEUED, JobStatus.QUEUED]
+        async with AsyncSessionLocal() as db:
+            # The preempted worker stops the job, whose attempt is not counted
+            assert await check_lease(db, lowest, "worker") == JobStatus.QUEUED
+            assert (await db.get(Job, lowest)).attempts == 0
+    
+    asyncio.run(scenario())
+
+
+def test_no_preemption_unless_enough_slots_are_freed(kind, monkeypatch):
+    monkeypatch.setattr(settings, "scheduler_capacity", 2)
+    monkeypatch.setattr(settings, "scheduler_preemption", True)
+    
+    async def scenario():
+        higher, lower = await _enqueue(kind, 9, 1)
+        await _claim(kind)
+        await _claim(kind)
+        await _enqueue(kind, 5, cost=2)
+        assert await _claim(kind) is None
+        assert await _statuses(higher, lower) == [JobStatus.RUNNING, JobStatus.RUNNING]
+    
+    asyncio.run(scenario())
+
+
+def test_no_preemption_when_disabled(kind, monkeypatch):
+    monkeypatch.setattr(settings, "scheduler_capacity", 1)
+    monkeypatch.setattr(settings, "scheduler_preemption", False)
+    
+    async def scenario():
+        running, = await _enqueue(kind, 0)
+        await _claim(kind)
+        await _enqueue(kind, 5)
+        assert await _claim(kind) is None
+        assert await _statuses(running) == [JobStatus.RUNNING]
+    
+    asyncio.run(scenario())
+
+
+def test_worker_stops_a_preempted_job(kind, monkeypatch):
+    monkeypatch.setattr(settings, "worker_poll_interval", 0.01)
+    monkeypatch.setattr(settings, "scheduler_capacity", 1)
+    monkeypatch.setattr(settings, "scheduler_preemption", True)
+    requeued = []
+    
+    async def on_requeued(db, payload):
+        requeued.append(payload["n"])
+    
+    async def scenario():
+        started = asyncio.Event()
+        
+        async def run(payload):
+            started.set()
+            await asyncio.sleep(60)
+        
+        low, = await _enqueue(kind, 0)
+        worker = Worker({kind: JobHandler(run, on_requeued=on_requeued)}, concurrency=1)
+        task = asyncio.create_task(worker.run())
+        await asyncio.wait_for(started.wait(), 10)
+        
+        # Another worker claims a higher-priority job; no slot is free for it
+        high, = await _enqueue(kind, 5)
+        assert (await _claim(kind, "other")).id == high
+        for _ in range(500):
+            if requeued:
+                break
+            await asyncio.sleep(0.01)
+        worker.stop()
+        await task
+        assert requeued == [0]
+        assert await _statuses(low, high) == [JobStatus.QUEUED, JobStatus.RUNNING]
+    
+    asyncio.run(scenario())
@@ -0,0 +1,66 @@
+"""Streaming tokenizer for top-level JSON arrays."""
+
+import io
+import json
+
+import pytest
+
+from app.config import settings
+from app.services.json_stream import count_json_items, iter_json_item_spans, iter_json_items
+
+DOCUMENT = (
+    b' [ {"text": "say \\"hi\\", then [leave]", "tags": ["a,b", {"k": "}"}]},\n'
+    b'  "caf\xc3\xa9 \\\\", 12.5e3, null, [[1, 2], []],\n'
+    b'  {"nested": {"deep": ["\\u005d", "\\\\\\""]}} ]\n'
+)
+
+
+def _chunked(monkeypatch, size: int) -> None:
+    monkeypatch.setattr(settings, "upload_chunk_size", size)
+
+
+@pytest.mark.parametrize("chunk_size", [1, 2, 3, 5, 7, 64, 1 << 20])
+def test_items_match_json_loads_at_any_chunk_boundary(monkeypatch, chunk_size):
+    _chunked(monkeypatch, chunk_size)
+    expected = json.loads(DOCUMENT)
+    assert list(iter_json_items(io.BytesIO(DOCUMENT))) == expected
+    assert count_json_items(io.BytesIO(DOCUMENT)) == len(expected)
+
+
+@pytest.mark.parametrize("chunk_size", [1, 4, 1 << 20])
+def test_spans_cover_each_item(monkeypatch, chunk_size):
+    _chunked(monkeypatch, chunk_size)
+    for item, start, end in iter_json_item_spans(io.BytesIO(DOCUMENT)):
+        assert json.loads(DOCUMENT[start:end]) == item
+
+
+@pytest.mark.parametrize("document, expected", [
+    (b"[]", []),
+    (b"  [ ]  ", []),
+    (b"", []),
+    (b'{"a": 1}', [{"a": 1}]),
+    (b"42", []),
+])
+def test_empty_and_non_array_documents(document, expected):
+    assert list(iter_json_items(io.BytesIO(document))) == expected
+    assert count_json_items(io.BytesIO(document)) == len(expected)
+
+
+@pytest.mark.parametrize("document", [
+    b"[1,]",
+    b"[1, ]",
+    b"[,1]",
+    b"[1,,2]",
+    b"[1, 2",
+    b'["open]',
+    b"[1] 2",
+    b"[1}",
+    b"[1 2]",
+])
+@pytest.mark.parametrize("chunk_size", [1, 1 << 20])
+def test_malformed_arrays_are_rejected(monkeypatch, document, chunk_size):
+    _chunked(monkeypatch, chunk_size)
+    with pytest.raises(json.JSONDecodeError):
+        json.loads(document)
+    with pytest.raises(ValueError):
+        list(iter_json_items(io.BytesIO(document)))
@@ -0,0 +1,153 @@
+"""Training metrics store: rollups and downsampling."""
+
+import asyncio
+import math
+from collections import defaultdict
+
+import pytest
+from sqlalchemy import select
+
+from app.database import AsyncSessionLocal, SessionLocal
+from app.models.metric import TrainingMetricRollup
+from app.services.metrics_store import (
+    ROLLUP_LEVELS, DownsampleMethod, MetricSummary, bucket_width, load_series, lttb, metric_summaries,
+    record_metrics, truncate_metrics
+)
+
+
+def _loss(step: int) -> float:
+    return 1 / (1 + step) + 0.01 * math.sin(step)
+
+
+async def _record(experiment_id: str, points) -> None:
+    async with AsyncSessionLocal() as db:
+        await record_metrics(db, experiment_id, points)
+        await db.commit()
+
+
+def _expected_rollups(points) -> dict:
+    """Rollups computed directly from the values, by (metric, level, bucket)."""
+    values = defaultdict(list)
+    for metric, step, value in points:
+        for level in range(1, ROLLUP_LEVELS + 1):
+            values[(metric, level, step // bucket_width(level))].append((step, value))
+    return {
+        key: (
+            min(step for step, _ in items), max(step for step, _ in items), len(items),
+            min(value for _, value in items), max(value for _, value in items),
+            pytest.approx(sum(value for _, value in items)),
+        )
+        for key, items in values.items()
+    }
+
+
+def _stored_rollups(experiment_id: str) -> dict:
+    with SessionLocal() as db:
+        rows = db.scalars(select(TrainingMetricRollup).where(TrainingMetricRollup.experiment_id == experiment_id))
+        return {
+            (row.metric, row.level, row.bucket): (
+                row.first_step, row.last_step, row.count, row.min_value, row.max_value, row.sum_value
+            )
+            for row in rows
+        }
+
+
+def test_rollups_match_the_values_across_batches(experiment_id):
+    points = [("loss", step, _loss(step)) for step in range(5000)] + \
+        [("accuracy", step, step / 5000) for step in range(0, 5000, 7)]
+    
+    async def scenario():
+        # Batches interleave steps, so buckets are updated several times
+        await _record(experiment_id, points[1::2])
+        await _record(experiment_id, points[::2])
+        async with AsyncSessionLocal() as db:
+            return await metric_summaries(db, experiment_id)
+    
+    summaries = asyncio.run(scenario())
+    assert summaries == [MetricSummary("accuracy", 715, 0, 4998), MetricSummary("loss", 5000, 0, 4999)]
+    assert _stored_rollups(experiment_id) == _expected_rollups(points)
+
+
+@pytest.mark.parametrize("from_step", [0, 16, 1000, 4097])
+def test_truncate_rebuilds_cut_buckets(experiment_id, from_step):
+    points = [("loss", step, _loss(step)) for step in range(5000)]
+    
+    async def scenario():
+        await _record(experiment_id, points)
+        async with AsyncSessionLocal() as db:
+            await truncate_metrics(db, experiment_id, from_step)
+            await db.commit()
+        kept = _stored_rollups(experiment_id)
+        # Training resumes from the cut
+        await _record(experiment_id, points[from_step:])
+        return kept
+    
+    kept = asyncio.run(scenario())
+    assert kept == _expected_rollups(points[:from_step])
+    assert _stored_rollups(experiment_id) == _expected_rollups(points)
+
+
+def test_short_ranges_are_read_from_the_values(experiment_id):
+    points = [("loss", step, _loss(step)) for step in range(100)]
+    
+    async def scenario():
+        await _record(experiment_id, points)
+        async with AsyncSessionLocal() as db:
+            return (
+                await load_series(db, experiment_id, "loss", 200),
+                await load_series(db, experiment_id, "loss", 10, start_step=20, end_step=59),
+            )
+    
+    full, window = asyncio.run(scenario())
+    assert full.resolution == 1
+    assert full.points == [(step, value) for _, step, value in points]
+    assert window.resolution == 1
+    assert len(window.points) == 10
+    assert window.points[0] == (20, _loss(20)) and window.points[-1] == (59, _loss(59))
+
+
+def test_long_ranges_are_read_from_rollups(experiment_id):
+    points = [("loss", step, _loss(step)) for step in range(20000)]
+    points[12345] = ("loss", 12345, 1000.0)  # A spike
+    
+    async def scenario():
+        await _record(experiment_id, points)
+        async with AsyncSessionLocal() as db:
+            return (
+                await load_series(db, experiment_id, "loss", 10, DownsampleMethod.MINMAX),
+                await load_series(db, experiment_id, "loss", 100),
+                await load_series(db, experiment_id, "missing", 100),
+            )
+    
+    minmax, curve, missing = asyncio.run(scenario())
+    # 20,000 steps need at most 4 rows per point: level 3, buckets of 4,096 steps
+    assert minmax.resolution == bucket_width(3)
+    assert len(minmax.buckets) <= 10
+    assert sum(bucket.count for bucket in minmax.buckets) == 20000
+    assert max(bucket.max_value for bucket in minmax.buckets) == 1000.0
+    assert min(bucket.min_value for bucket in minmax.buckets) == min(value for _, _, value in points)
+    assert minmax.buckets[0].first_step == 0 and minmax.buckets[-1].last_step == 19999
+    
+    assert curve.resolution == bucket_width(2)
+    assert len(curve.points) <= 100
+    assert [step for step, _ in curve.points] == sorted(step for step, _ in curve.points)
+    assert missing == (1, [], [])
+
+
+def test_points_out_of_range_are_rejected(experiment_id):
+    async def scenario():
+        async with AsyncSessionLocal() as db:
+            with pytest.raises(ValueError):
+                await load_series(db, experiment_id, "loss", 2)
+    
+    asyncio.run(scenario())
+
+
+def test_lttb_keeps_the_ends_and_spikes():
+    points = [(x, 0.0) for x in range(1000)]
+    points[500] = (500, 10.0)
+    sampled = lttb(points, 20)
+    assert len(sampled) == 20
+    assert sampled[0] == points[0] and sampled[-1] == points[-1]
+    assert (500, 10.0) in sampled
+    assert lttb(points[:10], 20) == points[:10]
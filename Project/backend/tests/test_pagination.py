@@ -0,0 +1,82 @@
+"""Keyset pagination of list endpoints."""
+
+import uuid
+
+import pytest
+
+
+def _upload(client, name: str) -> str:
+    response = client.post(
+        "/datasets/upload",
+        files={"file": ("rows.jsonl", f'{{"text": "{uuid.uuid4().hex}"}}\n'.encode(), "application/octet-stream")},
+        data={"name": name, "dataset_type": "evaluation"},
+    )
+    assert response.status_code == 201, response.text
+    return response.json()["id"]
+
+
+def _all_pages(client, limit: int, **params) -> list:
+    pages, cursor = [], None
+    while True:
+        response = client.get("/datasets", params={**params, "limit": limit, **({"cursor": cursor} if cursor else {})})
+        assert response.status_code == 200, response.text
+        page = response.json()
+        assert len(page["items"]) <= limit
+        pages.append(page["items"])
+        cursor = page["next_cursor"]
+        if cursor is None:
+            return pages
+
+
+@pytest.fixture(scope="module")
+def named_datasets(client):
+    """Datasets sharing a unique name prefix, with repeated names."""
+    tag = uuid.uuid4().hex
+    names = [f"{tag}-b", f"{tag}-a", f"{tag}-c", f"{tag}-a", f"{tag}-b"]
+    return tag, {_upload(client, name): name for name in names}
+
+
+@pytest.mark.parametrize("order", ["asc", "desc"])
+def test_pages_follow_the_sort_with_ties_broken_by_id(client, named_datasets, order):
+    tag, datasets = named_datasets
+    pages = _all_pages(client, 2, name=tag, sort="name", order=order)
+    
+    assert [len(page) for page in pages] == [2, 2, 1]
+    keys = [(item["name"], item["id"]) for page in pages for item in page]
+    assert keys == sorted(((name, id_) for id_, name in datasets.items()), reverse=order == "desc")
+
+
+def test_rows_added_between_pages_do_not_shift_the_next_page(client):
+    tag = uuid.uuid4().hex
+    ids = [_upload(client, f"{tag}-{n}") for n in range(1, 5)]
+    first_page = client.get("/datasets", params={"name": tag, "limit": 2, "sort": "name", "order": "asc"}).json()
+    assert [item["id"] for item in first_page["items"]] == ids[:2]
+    
+    # Rows inserted before the cursor are not seen; an offset would repeat a row
+    _upload(client, f"{tag}-0")
+    last = _upload(client, f"{tag}-9")
+    rest = client.get("/datasets", params={
+        "name": tag, "limit": 50, "sort": "name", "order": "asc", "cursor": first_page["next_cursor"],
+    }).json()
+    assert [item["id"] for item in rest["items"]] == ids[2:] + [last]
+    assert rest["next_cursor"] is None
+
+
+def test_no_cursor_after_a_full_last_page(client, named_datasets):
+    tag, _ = named_datasets
+    response = client.get("/datasets", params={"name": f"{tag}-a", "limit": 2})
+    page = response.json()
+    assert len(page["items"]) == 2
+    assert page["next_cursor"] is None
+
+
+def test_invalid_sort_and_cursor_are_rejected(client, named_datasets):
+    tag, _ = named_datasets
+    assert client.get("/datasets", params={"sort": "size_bytes"}).status_code == 400
+    assert client.get("/datasets", params={"cursor": "not a cursor"}).status_code == 400
+    
+    cursor = client.get("/datasets", params={"name": tag, "limit": 1, "sort": "name"}).json()["next_cursor"]
+    assert client.get("/datasets", params={"cursor": cursor, "sort": "name"}).status_code == 200
+    response = client.get("/datasets", params={"cursor": cursor, "sort": "created_at"})
+    assert response.status_code == 400
+    assert "different sort order" in response.json()["detail"]
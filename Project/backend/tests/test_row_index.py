@@ -0,0 +1,78 @@
+"""Row offset index sidecars."""
+
+import pytest
+
+from app.services import row_index
+from app.services.row_index import RowIndex, RowIndexWriter, RowRange
+
+
+def _write(path, offsets):
+    writer = RowIndexWriter(path)
+    for offset in offsets[:-1]:
+        writer.add(offset)
+    writer.close(offsets[-1])
+
+
+def test_narrow_offsets(tmp_path):
+    path = tmp_path / "data.rows"
+    offsets = [0, 10, 25, 26, 40]
+    _write(path, offsets)
+    with RowIndex(path) as index:
+        assert index._width == 4
+        assert len(index) == 4
+        assert index.offsets(0, 4) == offsets
+        assert index.span(2) == RowRange(2, 3, 25, 26)
+        assert index.offset(4) == 40
+
+
+def test_widens_past_4_gib(tmp_path, monkeypatch):
+    # A small buffer makes widening copy offsets that were already flushed
+    monkeypatch.setattr(row_index, "_BUFFER_ITEMS", 3)
+    path = tmp_path / "data.rows"
+    offsets = [i * 1000 for i in range(10)] + [2 ** 32 + 5, 2 ** 33, 2 ** 40]
+    _write(path, offsets)
+    with RowIndex(path) as index:
+        assert index._width == 8
+        assert len(index) == len(offsets) - 1
+        assert index.offsets(0, len(index)) == offsets
+        assert index.span(10) == RowRange(10, 11, 2 ** 32 + 5, 2 ** 33)
+    assert not path.with_name(path.name + ".tmp").exists()
+
+
+def test_shards_cover_every_row(tmp_path):
+    path = tmp_path / "data.rows"
+    offsets = list(range(0, 110, 10))
+    _write(path, offsets)
+    with RowIndex(path) as index:
+        shards = index.shards(3)
+    assert [(s.start_row, s.stop_row) for s in shards] == [(0, 3), (3, 6), (6, 10)]
+    assert shards[0].start_byte == 0 and shards[-1].end_byte == 100
+    assert all(a.end_byte == b.start_byte for a, b in zip(shards, shards[1:]))
+
+
+def test_empty_index(tmp_path):
+    path = tmp_path / "data.rows"
+    _write(path, [0])
+    with RowIndex(path) as index:
+        assert len(index) == 0
+        assert index.shards(2) == [RowRange(0, 0, 0, 0), RowRange(0, 0, 0, 0)]
+
+
+def test_incomplete_index_is_rejected(tmp_path):
+    path = tmp_path / "data.rows"
+    writer = RowIndexWriter(path)
+    writer.add(0)
+    writer._flush()
+    writer._file.close()
+    with pytest.raises(ValueError):
+        RowIndex(path)
+
+
+def test_index_without_header_is_rejected(tmp_path):
+    path = tmp_path / "data.rows"
+    path.write_bytes(b"\x00" * 8 * 4)
+    with pytest.raises(ValueError):
+        RowIndex(path)
+    path.write_bytes(b"RID")
+    with pytest.raises(ValueError):
+        RowIndex(path)
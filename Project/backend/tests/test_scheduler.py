@@ -0,0 +1,152 @@
+"""Scheduler capacity, run time calibration and ETAs."""
+
+import asyncio
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from app.config import settings
+from app.database import AsyncSessionLocal
+from app.models.job import Job, JobStatus
+from app.services import scheduler
+from app.services.job_queue import capacity_in_use, claim_job, complete_job, enqueue_job
+from app.services.scheduler import RunTimes, estimate_training, queue_status, run_times
+
+# Above the jobs other tests leave queued, so those are never ahead
+PRIORITY = 1000
+
+
+@pytest.fixture(autouse=True)
+def capacity(monkeypatch):
+    monkeypatch.setattr(settings, "scheduler_capacity", 4)
+    monkeypatch.setattr(settings, "scheduler_preemption", False)
+
+
+async def _enqueue(kind: str, cost: int, work: float = None, priority: int = PRIORITY) -> str:
+    async with AsyncSessionLocal() as db:
+        job = enqueue_job(db, kind, {}, priority=priority, cost=cost, work=work)
+        await db.commit()
+        return job.id
+
+
+async def _claim(kind: str):
+    async with AsyncSessionLocal() as db:
+        return await claim_job(db, "worker", [kind])
+
+
+def test_estimate_training(monkeypatch):
+    monkeypatch.setattr(settings, "scheduler_params_per_slot", 100)
+    assert estimate_training(100, 10, 2) == (1, 2000.0)
+    assert estimate_training(101, 10, 2) == (2, 2020.0)
+    # Larger than the whole capacity: runs alone
+    assert estimate_training(10_000, 10, 2).cost == 4
+    assert estimate_training(None, 10, 2) == (1, None)
+    assert estimate_training(100, None, 2) == (1, None)
+
+
+def test_next_job_waits_for_room(kind):
+    async def scenario():
+        large = await _enqueue(kind, 3)
+        medium = await _enqueue(kind, 2)
+        small = await _enqueue(kind, 1)
+        assert (await _claim(kind)).id == large
+        async with AsyncSessionLocal() as db:
+            assert await capacity_in_use(db) == 3
+        # The small job would fit, but waits behind the next one
+        assert await _claim(kind) is None
+        
+        async with AsyncSessionLocal() as db:
+            assert await complete_job(db, large, "worker")
+        assert (await _claim(kind)).id == medium
+        assert (await _claim(kind)).id == small
+        async with AsyncSessionLocal() as db:
+            assert await capacity_in_use(db) == 3
+    
+    asyncio.run(scenario())
+
+
+def test_job_larger_than_capacity_runs_alone(kind):
+    async def scenario():
+        await _enqueue(kind, 10)
+        await _enqueue(kind, 1)
+        assert (await _claim(kind)).cost == 10
+        assert await _claim(kind) is None
+    
+    asyncio.run(scenario())
+
+
+def test_run_times_are_calibrated_from_succeeded_jobs(kind, monkeypatch):
+    monkeypatch.setattr(scheduler, "CALIBRATION_JOBS", 3)
+    # Finished after every other job in the database, so these are the latest
+    start = datetime(2100, 1, 1, tzinfo=timezone.utc)
+    durations = [(100.0, 10, JobStatus.SUCCEEDED), (300.0, 20, JobStatus.SUCCEEDED), (None, 30, JobStatus.SUCCEEDED)]
+    
+    async def scenario():
+        async with AsyncSessionLocal() as db:
+            for n, (work, seconds, status) in enumerate(durations):
+                job = enqueue_job(db, kind, {}, work=work)
+                job.status = status
+                job.started_at = start + timedelta(hours=n)
+                job.finished_at = job.started_at + timedelta(seconds=seconds)
+            # A failed run says nothing about how long a job takes
+            failed = enqueue_job(db, kind, {}, work=1.0)
+            failed.status = JobStatus.FAILED
+            failed.started_at = start + timedelta(hours=5)
+            failed.finished_at = failed.started_at + timedelta(seconds=1000)
+            await db.commit()
+            return await run_times(db)
+    
+    times = asyncio.run(scenario())
+    assert times.seconds_per_work == pytest.approx(30 / 400)
+    assert times.mean_seconds == pytest.approx(20)
+    assert times.seconds(200.0) == pytest.approx(15)
+    assert times.seconds(None) == pytest.approx(20)
+
+
+def test_queue_status_replays_the_scheduler(kind, monkeypatch):
+    monkeypatch.setattr(settings, "scheduler_capacity", 2)
+    
+    async def fixed_run_times(db):
+        return RunTimes(seconds_per_work=1.0, mean_seconds=10.0)
+    
+    monkeypatch.setattr(scheduler, "run_times", fixed_run_times)
+    
+    async def scenario():
+        running = await _enqueue(kind, 2, work=100.0, priority=PRIORITY + 1)
+        assert (await _claim(kind)).id == running
+        first = await _enqueue(kind, 1, work=50.0)
+        second = await _enqueue(kind, 1, work=30.0)
+        last = await _enqueue(kind, 2)
+        
+        async with AsyncSessionLocal() as db:
+            now = datetime.now(timezone.utc)
+            statuses = {
+                job_id: await queue_status(db, await db.get(Job, job_id))
+                for job_id in (running, first, second, last)
+            }
+        
+        def seconds_from_now(value):
+            return (value - now).total_seconds()
+        
+        status = statuses[running]
+        assert status.position is None
+        assert status.capacity_in_use == 2
+        assert seconds_from_now(status.estimated_finish) == pytest.approx(100, abs=2)
+        
+        # Both queued single-slot jobs start once the running one finishes
+        assert [statuses[job_id].position for job_id in (first, second, last)] == [1, 2, 3]
+        assert seconds_from_now(statuses[first].estimated_start) == pytest.approx(100, abs=2)
+        assert seconds_from_now(statuses[first].estimated_finish) == pytest.approx(150, abs=2)
+        assert seconds_from_now(statuses[second].estimated_start) == pytest.approx(100, abs=2)
+        assert seconds_from_now(statuses[second].estimated_finish) == pytest.approx(130, abs=2)
+        # The two-slot job needs both to finish; without a work estimate it takes the mean
+        assert seconds_from_now(statuses[last].estimated_start) == pytest.approx(150, abs=2)
+        assert seconds_from_now(statuses[last].estimated_finish) == pytest.approx(160, abs=2)
+        
+        async with AsyncSessionLocal() as db:
+            assert await complete_job(db, running, "worker")
+            status = await queue_status(db, await db.get(Job, running))
+        assert status.position is None
+        assert status.estimated_start is None and status.estimated_finish is None
+    
+    asyncio.run(scenario())
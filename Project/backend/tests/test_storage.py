@@ -0,0 +1,139 @@
+"""Dataset storage."""
+
+import hashlib
+import io
+import os
+import uuid
+
+from app.database import SessionLocal
+from app.models.dataset import Dataset
+from app.services import storage_service
+from app.services.row_index import ROW_INDEX_SUFFIX
+from app.services.storage_service import iter_dataset_rows, sidecar_path, store_stream
+
+
+class _ReadOnce(io.RawIOBase):
+    """Upload stream that can only be read forward, and counts what is read."""
+    
+    def __init__(self, data: bytes):
+        self._data = io.BytesIO(data)
+        self.bytes_read = 0
+    
+    def readable(self) -> bool:
+        return True
+    
+    def readinto(self, buffer) -> int:
+        chunk = self._data.read(len(buffer))
+        buffer[:len(chunk)] = chunk
+        self.bytes_read += len(chunk)
+        return len(chunk)
+
+
+def _columns(stored):
+    return {column["name"]: column for column in stored.schema_summary["columns"]}
+
+
+def test_csv_counted_and_profiled_in_one_pass():
+    tag = uuid.uuid4().hex
+    content = f'text,label\n"{tag}",1\n"two\nlines",\n,3\n'.encode()
+    source = _ReadOnce(content)
+    stored = store_stream(source, "rows.csv", str(uuid.uuid4()))
+    
+    assert source.bytes_read == len(content)
+    assert stored.row_count == 3
+    assert stored.size_bytes == len(content)
+    columns = _columns(stored)
+    assert columns["text"]["null_count"] == 1
+    assert columns["text"]["max_length"] == len(tag)
+    assert columns["label"]["null_count"] == 1
+    with open(stored.file_path, "rb") as f:
+        assert f.read() == content
+
+
+def test_jsonl_profiles_missing_keys_as_nulls():
+    tag = uuid.uuid4().hex
+    content = f'{{"text": "{tag}", "score": 1.5}}\n\n{{"text": null}}\n{{"extra": [1]}}\n'.encode()
+    stored = store_stream(_ReadOnce(content), "rows.jsonl", str(uuid.uuid4()))
+    
+    assert stored.row_count == 3
+    columns = _columns(stored)
+    assert columns["text"]["types"] == ["string"]
+    assert columns["text"]["null_count"] == 2
+    assert columns["score"]["types"] == ["number"]
+    assert columns["extra"]["types"] == ["array"]
+    assert [row.get("text") for row in iter_dataset_rows(stored.file_path)] == [tag, None, None]
+
+
+def test_unparseable_content_is_stored_without_a_row_count():
+    content = f'{{"text": "{uuid.uuid4().hex}"}}\n{{"text": \n'.encode()
+    source = _ReadOnce(content)
+    stored = store_stream(source, "rows.jsonl", str(uuid.uuid4()))
+    
+    assert source.bytes_read == len(content)
+    assert stored.row_count is None
+    assert "error" in stored.schema_summary
+    with open(stored.file_path, "rb") as f:
+        assert f.read() == content
+
+
+def _upload(client, content: bytes, filename: str = "rows.jsonl", **data) -> dict:
+    response = client.post(
+        "/datasets/upload",
+        files={"file": (filename, content, "application/octet-stream")},
+        data={"name": "rows", "dataset_type": "training", **data},
+    )
+    assert response.status_code == 201, response.text
+    return response.json()
+
+
+def _file_path(dataset_id: str) -> str:
+    with SessionLocal() as db:
+        return db.get(Dataset, dataset_id).file_path
+
+
+def test_identical_uploads_share_one_object(client):
+    content = f'{{"text": "{uuid.uuid4().hex}"}}\n'.encode()
+    first = _upload(client, content)
+    second = _upload(client, content, filename="copy.jsonl")
+    
+    assert first["content_hash"] == second["content_hash"] == hashlib.sha256(content).hexdigest()
+    assert second["row_count"] == 1
+    first_path, second_path = _file_path(first["id"]), _file_path(second["id"])
+    assert first_path != second_path
+    assert os.path.samefile(first_path, second_path)
+    assert sidecar_path(first_path, ROW_INDEX_SUFFIX) == sidecar_path(second_path, ROW_INDEX_SUFFIX)
+
+
+def test_claimed_hash_reuses_the_stored_object(client):
+    content = f'{{"text": "{uuid.uuid4().hex}"}}\n'.encode()
+    content_hash = hashlib.sha256(content).hexdigest()
+    first = _upload(client, content)
+    second = _upload(client, content, content_sha256=content_hash.upper())
+    assert second["content_hash"] == content_hash
+    assert os.path.samefile(_file_path(first["id"]), _file_path(second["id"]))
+    
+    # A claim that does not match the content is ignored
+    other = f'{{"text": "{uuid.uuid4().hex}"}}\n'.encode()
+    third = _upload(client, other, content_sha256=content_hash)
+    assert third["content_hash"] == hashlib.sha256(other).hexdigest()
+    assert not os.path.samefile(_file_path(first["id"]), _file_path(third["id"]))
+
+
+def test_object_is_deleted_with_its_last_dataset(client):
+    content = f'{{"text": "{uuid.uuid4().hex}"}}\n'.encode()
+    first = _upload(client, content)
+    second = _upload(client, content)
+    first_path, second_path = _file_path(first["id"]), _file_path(second["id"])
+    object_path = storage_service._object_for(first_path)
+    index_path = sidecar_path(first_path, ROW_INDEX_SUFFIX)
+    assert index_path.exists()
+    
+    assert client.delete(f"/datasets/{first['id']}").status_code == 204
+    assert not os.path.exists(first_path)
+    assert object_path.exists() and index_path.exists()
+    assert client.get(f"/datasets/{second['id']}/download").content == content
+    
+    assert client.delete(f"/datasets/{second['id']}").status_code == 204
+    assert not os.path.exists(second_path)
+    assert not object_path.exists()
+    assert list(object_path.parent.glob(f"{object_path.name}*")) == []
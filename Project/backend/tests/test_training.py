@@ -0,0 +1,106 @@
+"""Outcome of training jobs."""
+
+import asyncio
+import time
+
+from sqlalchemy import select
+
+from app.config import settings
+from app.database import SessionLocal
+from app.models.evaluation import Evaluation
+from app.models.experiment import Experiment, ExperimentStatus
+from app.models.job import Job, JobStatus
+from app.services.trainers import SimulatedTrainer
+from app.services.training_service import train_experiment
+from app.worker import Worker
+
+
+def _create_experiment(client, content: bytes, training_config: dict) -> str:
+    response = client.post(
+        "/datasets/upload",
+        files={"file": ("train.jsonl", content, "application/octet-stream")},
+        data={"name": "train", "dataset_type": "training"},
+    )
+    assert response.status_code == 201, response.text
+    dataset_id = response.json()["id"]
+    base_model_id = client.get("/models", params={"model_type": "base"}).json()["items"][0]["id"]
+    response = client.post("/experiments", json={
+        "name": "experiment",
+        "base_model_id": base_model_id,
+        "training_dataset_id": dataset_id,
+        "training_config": training_config,
+    })
+    assert response.status_code == 201, response.text
+    return response.json()["id"]
+
+
+def test_completed_run_records_model_and_evaluation(client, monkeypatch):
+    experiment_id = _create_experiment(
+        client, b'{"text": "completed"}\n', {"trainer": "simulated", "epochs": 2}
+    )
+    monkeypatch.setattr(SimulatedTrainer, "evaluate", lambda self: {"accuracy": 1.0})
+    asyncio.run(train_experiment(experiment_id))
+    
+    with SessionLocal() as db:
+        experiment = db.get(Experiment, experiment_id)
+        assert experiment.status == ExperimentStatus.COMPLETED
+        assert experiment.resulting_model_id is not None
+        assert experiment.checkpoint is None
+        evaluation = db.scalar(select(Evaluation).where(Evaluation.experiment_id == experiment_id))
+        assert evaluation.metrics == {"accuracy": 1.0}
+        assert evaluation.loss_curve["epochs"] == [1, 2]
+
+
+def test_cancelled_during_evaluation(client, monkeypatch):
+    experiment_id = _create_experiment(
+        client, b'{"text": "cancelled"}\n', {"trainer": "simulated", "epochs": 2}
+    )
+    
+    def evaluate(self):
+        # The experiment is cancelled while its evaluation runs
+        with SessionLocal() as db:
+            db.get(Experiment, experiment_id).status = ExperimentStatus.CANCELLED
+            db.commit()
+        return {"accuracy": 1.0}
+    
+    monkeypatch.setattr(SimulatedTrainer, "evaluate", evaluate)
+    asyncio.run(train_experiment(experiment_id))
+    
+    with SessionLocal() as db:
+        experiment = db.get(Experiment, experiment_id)
+        assert experiment.status == ExperimentStatus.CANCELLED
+        assert experiment.resulting_model_id is None
+        assert db.scalar(select(Evaluation).where(Evaluation.experiment_id == experiment_id)) is None
+
+
+def test_training_failure_is_not_retried(client, monkeypatch):
+    monkeypatch.setattr(settings, "worker_poll_interval", 0.01)
+    # An empty dataset has no text for the n-gram trainer's epochs
+    experiment_id = _create_experiment(client, b"", {"trainer": "ngram", "epochs": 2})
+    
+    def first_attempt_done():
+        with SessionLocal() as db:
+            job = db.scalar(select(Job).where(Job.experiment_id == experiment_id))
+            return job.attempts >= 1 and job.status != JobStatus.RUNNING
+    
+    async def run_worker():
+        worker = Worker(concurrency=1)
+        task = asyncio.create_task(worker.run())
+        deadline = time.monotonic() + 30
+        while not await asyncio.to_thread(first_attempt_done):
+            assert time.monotonic() < deadline, "the job did not run"
+            await asyncio.sleep(0.05)
+        worker.stop()
+        await task
+    
+    asyncio.run(run_worker())
+    
+    with SessionLocal() as db:
+        job = db.scalar(select(Job).where(Job.experiment_id == experiment_id))
+        assert job.attempts == 1
+        # Failed, so it is left out of the scheduler's run time calibration
+        assert job.status == JobStatus.FAILED
+        assert "no text to train on" in job.last_error
+        experiment = db.get(Experiment, experiment_id)
+        assert experiment.status == ExperimentStatus.FAILED
+        assert experiment.checkpoint is None
@@ -0,0 +1,146 @@
+"""Dataset uploads."""
+
+import gzip
+import hashlib
+import uuid
+
+from sqlalchemy import update
+
+from app.database import SessionLocal
+from app.models.model import Model
+from app.routes import datasets as datasets_routes
+
+
+def test_upload_holds_no_write_transaction_while_storing(client, monkeypatch):
+    save_uploaded_file = datasets_routes.save_uploaded_file
+    
+    def save_while_writing(*args):
+        # Another connection writes while the file is stored; on SQLite it
+        # would wait for busy_timeout and fail if the upload held a write lock
+        with SessionLocal() as db:
+            db.execute(update(Model).where(Model.id == "none").values(description=""))
+            db.commit()
+        return save_uploaded_file(*args)
+    
+    monkeypatch.setattr(datasets_routes, "save_uploaded_file", save_while_writing)
+    response = client.post(
+        "/datasets/upload",
+        files={"file": ("rows.jsonl", b'{"text": "a"}\n{"text": "b"}\n', "application/octet-stream")},
+        data={"name": "rows", "dataset_type": "training"},
+    )
+    assert response.status_code == 201, response.text
+    assert response.json()["row_count"] == 2
+
+
+def _start_upload(client, content: bytes, part_size: int, **fields) -> dict:
+    response = client.post("/datasets/uploads", json={
+        "name": "parts",
+        "dataset_type": "training",
+        "filename": "parts.jsonl",
+        "total_size": len(content),
+        "part_size": part_size,
+        **fields,
+    })
+    assert response.status_code == 201, response.text
+    return response.json()
+
+
+def _put_part(client, upload_id: str, part_number: int, data: bytes, body: bytes = None, **headers):
+    return client.put(
+        f"/datasets/uploads/{upload_id}/parts/{part_number}",
+        content=data if body is None else body,
+        headers={"X-Part-SHA256": hashlib.sha256(data).hexdigest(), **headers},
+    )
+
+
+def _parts(content: bytes, part_size: int) -> list:
+    return [content[i:i + part_size] for i in range(0, len(content), part_size)]
+
+
+def test_chunked_upload_resumes_after_missing_parts(client):
+    content = b"".join(f'{{"text": "{uuid.uuid4().hex}"}}\n'.encode() for _ in range(20))
+    parts = _parts(content, 100)
+    upload = _start_upload(client, content, 100, content_sha256=hashlib.sha256(content).hexdigest())
+    upload_id = upload["upload_id"]
+    assert upload["total_parts"] == len(parts)
+    
+    # Parts arrive out of order and the last one is missing
+    for part_number in reversed(range(1, len(parts))):
+        assert _put_part(client, upload_id, part_number, parts[part_number - 1]).status_code == 200
+    response = client.post(f"/datasets/uploads/{upload_id}/complete")
+    assert response.status_code == 400
+    assert f"[{len(parts)}]" in response.json()["detail"]
+    
+    # The client resumes from the parts the server reports
+    upload = client.get(f"/datasets/uploads/{upload_id}").json()
+    assert upload["status"] == "pending"
+    received = {part["part_number"] for part in upload["received_parts"]}
+    assert received == set(range(1, len(parts)))
+    for part_number in set(range(1, len(parts) + 1)) - received:
+        assert _put_part(client, upload_id, part_number, parts[part_number - 1]).status_code == 200
+    
+    response = client.post(f"/datasets/uploads/{upload_id}/complete")
+    assert response.status_code == 201, response.text
+    dataset = response.json()
+    assert dataset["row_count"] == 20
+    assert dataset["content_hash"] == hashlib.sha256(content).hexdigest()
+    assert client.get(f"/datasets/{dataset['id']}/download").content == content
+    
+    upload = client.get(f"/datasets/uploads/{upload_id}").json()
+    assert upload["status"] == "completed"
+    assert upload["dataset_id"] == dataset["id"]
+    assert client.post(f"/datasets/uploads/{upload_id}/complete").status_code == 409
+
+
+def test_invalid_parts_are_rejected(client):
+    content = f'{{"text": "{uuid.uuid4().hex}"}}\n'.encode() * 4
+    parts = _parts(content, 64)
+    upload_id = _start_upload(client, content, 64)["upload_id"]
+    
+    response = client.put(
+        f"/datasets/uploads/{upload_id}/parts/1",
+        content=parts[0],
+        headers={"X-Part-SHA256": hashlib.sha256(parts[1]).hexdigest()},
+    )
+    assert response.status_code == 400
+    assert "Checksum mismatch" in response.json()["detail"]
+    assert _put_part(client, upload_id, 1, parts[0][:-1]).status_code == 400
+    assert _put_part(client, upload_id, len(parts) + 1, b"x").status_code == 400
+    assert client.get(f"/datasets/uploads/{upload_id}").json()["received_parts"] == []
+    
+    # Re-sending a part replaces it
+    assert _put_part(client, upload_id, 1, parts[0]).status_code == 200
+    assert _put_part(client, upload_id, 1, parts[0]).status_code == 200
+    assert len(client.get(f"/datasets/uploads/{upload_id}").json()["received_parts"]) == 1
+
+
+def test_compressed_parts(client):
+    content = f'{{"text": "{uuid.uuid4().hex}"}}\n'.encode() * 50
+    parts = _parts(content, 1000)
+    upload_id = _start_upload(client, content, 1000)["upload_id"]
+    for part_number, part in enumerate(parts, 1):
+        response = _put_part(client, upload_id, part_number, part, gzip.compress(part), **{"Content-Encoding": "gzip"})
+        assert response.status_code == 200, response.text
+        assert response.json()["size"] == len(part)
+    response = client.post(f"/datasets/uploads/{upload_id}/complete")
+    assert response.status_code == 201, response.text
+    assert response.json()["row_count"] == 50
+
+
+def test_checksum_mismatch_of_assembled_file_aborts(client):
+    content = f'{{"text": "{uuid.uuid4().hex}"}}\n'.encode()
+    upload_id = _start_upload(client, content, 1024, content_sha256="0" * 64)["upload_id"]
+    assert _put_part(client, upload_id, 1, content).status_code == 200
+    response = client.post(f"/datasets/uploads/{upload_id}/complete")
+    assert response.status_code == 400
+    assert client.get(f"/datasets/uploads/{upload_id}").json()["status"] == "aborted"
+
+
+def test_aborted_upload_discards_parts(client):
+    content = f'{{"text": "{uuid.uuid4().hex}"}}\n'.encode()
+    upload_id = _start_upload(client, content, 1024)["upload_id"]
+    assert _put_part(client, upload_id, 1, content).status_code == 200
+    assert client.delete(f"/datasets/uploads/{upload_id}").status_code == 204
+    assert client.get(f"/datasets/uploads/{upload_id}").json()["received_parts"] == []
+    assert _put_part(client, upload_id, 1, content).status_code == 409
+    assert client.post(f"/datasets/uploads/{upload_id}/complete").status_code == 409
@@ -0,0 +1,147 @@
+"""Write-behind buffer for training jobs."""
+
+import asyncio
+
+import pytest
+
+from app.config import settings
+from app.database import AsyncSessionLocal, SessionLocal
+from app.models.experiment import Experiment
+from app.services.metrics_store import MetricSummary, metric_summaries
+from app.services.write_buffer import WriteBuffer
+
+
+class _Sessions:
+    """Session factory that counts transactions and can fail the next commits."""
+    
+    def __init__(self):
+        self.opened = 0
+        self.failures = 0
+    
+    def __call__(self):
+        self.opened += 1
+        db = AsyncSessionLocal()
+        if self.failures:
+            self.failures -= 1
+            
+            async def commit():
+                raise RuntimeError("database unavailable")
+            
+            db.commit = commit
+        return db
+
+
+@pytest.fixture(autouse=True)
+def no_periodic_flush(monkeypatch):
+    monkeypatch.setattr(settings, "write_buffer_flush_interval", 60)
+
+
+def _progress(experiment_id: str):
+    with SessionLocal() as db:
+        return db.get(Experiment, experiment_id).progress
+
+
+async def _summaries(experiment_id: str):
+    async with AsyncSessionLocal() as db:
+        return await metric_summaries(db, experiment_id)
+
+
+def test_flush_coalesces_updates_into_one_transaction(create_experiment):
+    first, second = create_experiment(), create_experiment()
+    sessions = _Sessions()
+    
+    async def scenario():
+        buffer = WriteBuffer(sessions)
+        for epoch in range(1, 4):
+            buffer.update_experiment(first, progress={"epoch": epoch})
+            await buffer.record_metrics(first, [("loss", epoch, 1 / epoch)])
+        buffer.update_experiment(second, progress={"epoch": 1})
+        await buffer.record_metrics(second, [("loss", 1, 0.5), ("accuracy", 1, 0.1)])
+        assert _progress(first) is None
+        
+        await buffer.flush()
+        await buffer.flush()  # Nothing left to write
+        await buffer.close()
+        return await _summaries(first), await _summaries(second)
+    
+    first_metrics, second_metrics = asyncio.run(scenario())
+    assert sessions.opened == 1
+    assert _progress(first) == {"epoch": 3}
+    assert _progress(second) == {"epoch": 1}
+    assert first_metrics == [MetricSummary("loss", 3, 1, 3)]
+    assert second_metrics == [MetricSummary("accuracy", 1, 1, 1), MetricSummary("loss", 1, 1, 1)]
+
+
+def test_full_buffer_flushes_before_adding(experiment_id, monkeypatch):
+    monkeypatch.setattr(settings, "write_buffer_max_pending", 10)
+    sessions = _Sessions()
+    
+    async def scenario():
+        buffer = WriteBuffer(sessions)
+        await buffer.record_metrics(experiment_id, [("loss", step, 1.0) for step in range(6)])
+        assert sessions.opened == 0
+        await buffer.record_metrics(experiment_id, [("loss", step, 1.0) for step in range(6, 12)])
+        assert sessions.opened == 1
+        assert await _summaries(experiment_id) == [MetricSummary("loss", 6, 0, 5)]
+        await buffer.close()
+        return await _summaries(experiment_id)
+    
+    assert asyncio.run(scenario()) == [MetricSummary("loss", 12, 0, 11)]
+
+
+def test_failed_flush_keeps_the_writes(experiment_id):
+    sessions = _Sessions()
+    sessions.failures = 1
+    
+    async def scenario():
+        buffer = WriteBuffer(sessions)
+        buffer.update_experiment(experiment_id, progress={"epoch": 1}, checkpoint={"epoch": 1})
+        await buffer.record_metrics(experiment_id, [("loss", 1, 1.0)])
+        with pytest.raises(RuntimeError):
+            await buffer.flush()
+        
+        # Newer values win over the ones that failed to be written
+        buffer.update_experiment(experiment_id, progress={"epoch": 2})
+        await buffer.record_metrics(experiment_id, [("loss", 2, 0.5)])
+        await buffer.close()
+        return await _summaries(experiment_id)
+    
+    assert asyncio.run(scenario()) == [MetricSummary("loss", 2, 1, 2)]
+    assert sessions.opened == 2
+    with SessionLocal() as db:
+        experiment = db.get(Experiment, experiment_id)
+        assert experiment.progress == {"epoch": 2}
+        assert experiment.checkpoint == {"epoch": 1}
+
+
+def test_discard_drops_pending_writes(create_experiment):
+    kept, dropped = create_experiment(), create_experiment()
+    
+    async def scenario():
+        buffer = WriteBuffer()
+        for experiment_id in (kept, dropped):
+            buffer.update_experiment(experiment_id, progress={"epoch": 1})
+            await buffer.record_metrics(experiment_id, [("loss", 1, 1.0)])
+        buffer.discard(dropped)
+        await buffer.close()
+        return await _summaries(kept), await _summaries(dropped)
+    
+    assert asyncio.run(scenario()) == ([MetricSummary("loss", 1, 1, 1)], [])
+    assert _progress(kept) == {"epoch": 1}
+    assert _progress(dropped) is None
+
+
+def test_writes_are_flushed_periodically(experiment_id, monkeypatch):
+    monkeypatch.setattr(settings, "write_buffer_flush_interval", 0.01)
+    
+    async def scenario():
+        buffer = WriteBuffer()
+        buffer.update_experiment(experiment_id, progress={"epoch": 1})
+        for _ in range(500):
+            if _progress(experiment_id):
+                break
+            await asyncio.sleep(0.01)
+        await buffer.close()
+    
+    asyncio.run(scenario())
+    assert _progress(experiment_id) == {"epoch": 1}